@@ -0,0 +1,175 @@
+"""
+This file is part of SOFA.
+SOFA is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+SOFA is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from typing import Dict, List
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Path to the source folder of SOFA.
+sofaPath = os.path.join(
+	os.path.dirname(os.path.abspath(__file__)),
+	os.pardir,
+	"sofa"
+)
+
+# Defines the measured modules, from the headless core to the GUI.
+benchmarkedModules = [
+	"data_processing.named_tuples",
+	"force_spectroscopy_data.force_volume",
+	"data_processing.import_data.import_data",
+	"data_processing.export_data",
+	"gui.main_window",
+]
+
+# Heavy third party modules which should only be loaded on first use.
+heavyModules = [
+	"pandas",
+	"scipy.stats",
+	"scipy.ndimage",
+	"igor2",
+	"h5py",
+	"tkinter",
+	"ttkbootstrap",
+	"matplotlib",
+]
+
+measurementScript = """
+import sys, time, json
+sys.path.insert(0, {sofaPath!r})
+startTime = time.perf_counter()
+import {moduleName}
+importTime = time.perf_counter() - startTime
+loadedModules = [
+	moduleName for moduleName in {heavyModules!r}
+	if moduleName in sys.modules
+	and type(sys.modules[moduleName]).__name__ != "_LazyModule"
+]
+print(json.dumps({{"importTime": importTime, "loadedModules": loadedModules}}))
+"""
+
+def measure_import_time(
+	moduleName: str,
+	numberOfRepetitions: int
+) -> Dict:
+	"""
+	Measure the time to import a module in a fresh 
+	interpreter.
+
+	Parameters
+	----------
+	moduleName : str
+		Name of the module relative to the source 
+		folder of SOFA.
+	numberOfRepetitions : int
+		Number of fresh interpreters in which the 
+		import is measured.
+
+	Returns
+	-------
+	importResult : dict
+		Median import time in seconds and the heavy 
+		modules loaded by the import.
+	"""
+	script = measurementScript.format(
+		sofaPath=sofaPath,
+		moduleName=moduleName,
+		heavyModules=heavyModules
+	)
+	measurements = [
+		json.loads(
+			subprocess.run(
+				[sys.executable, "-c", script],
+				check=True,
+				capture_output=True,
+				text=True
+			).stdout
+		)
+		for _ in range(numberOfRepetitions)
+	]
+
+	return {
+		"importTime": statistics.median(
+			measurement["importTime"] for measurement in measurements
+		),
+		"loadedModules": measurements[0]["loadedModules"]
+	}
+
+def run_import_time_benchmark(
+	moduleNames: List[str],
+	numberOfRepetitions: int
+) -> Dict:
+	"""
+	Measure the import time of every given module.
+
+	Parameters
+	----------
+	moduleNames : list[str]
+		Names of the modules relative to the source 
+		folder of SOFA.
+	numberOfRepetitions : int
+		Number of fresh interpreters in which every 
+		import is measured.
+
+	Returns
+	-------
+	importResults : dict
+		Import time and loaded heavy modules of every module.
+	"""
+	return {
+		moduleName: measure_import_time(moduleName, numberOfRepetitions)
+		for moduleName in moduleNames
+	}
+
+def main() -> None:
+	"""
+	Run the import time benchmark from the command line.
+	"""
+	parser = argparse.ArgumentParser(
+		description="Measure the startup import time of the SOFA modules."
+	)
+	parser.add_argument(
+		"--repetitions", type=int, default=5,
+		help="number of fresh interpreters per module"
+	)
+	parser.add_argument(
+		"--output", default="",
+		help="optional path of a .json file to store the results"
+	)
+	arguments = parser.parse_args()
+
+	importResults = run_import_time_benchmark(
+		benchmarkedModules,
+		arguments.repetitions
+	)
+
+	for moduleName, importResult in importResults.items():
+		print(
+			"{:<45}{:>8.3f} s   {}".format(
+				moduleName,
+				importResult["importTime"],
+				", ".join(importResult["loadedModules"])
+			)
+		)
+
+	if arguments.output:
+		with open(arguments.output, "w") as outputFile:
+			json.dump(importResults, outputFile, indent=4)
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,370 @@
+"""
+This file is part of SOFA.
+SOFA is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+SOFA is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from typing import Callable, Dict, List, Tuple
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Path to the source folder of SOFA.
+sofaPath = os.path.join(
+	os.path.dirname(os.path.abspath(__file__)),
+	os.pardir,
+	"sofa"
+)
+sys.path.insert(0, sofaPath)
+
+import data_processing.named_tuples as nt
+import data_processing.export_data as exp_data
+import data_processing.mutate_histogram_data as mhd
+from data_processing.import_data.import_data import import_data
+from data_processing.calculate_channel_data import active_channels
+from data_processing.calculate_average import calculate_average
+from force_spectroscopy_data.force_volume import ForceVolume
+from force_spectroscopy_data.force_distance_curve import ForceDistanceCurve
+import synthetic_force_volume as sfv
+
+def measure_time(
+	function: Callable,
+	numberOfRepetitions: int
+) -> float:
+	"""
+	Measure the median wall time of a function.
+
+	Parameters
+	----------
+	function : function
+		Function without arguments which is measured.
+	numberOfRepetitions : int
+		Number of measurements.
+
+	Returns
+	-------
+	time : float
+		Median wall time in seconds.
+	"""
+	measurements = []
+
+	for _ in range(numberOfRepetitions):
+		startTime = time.perf_counter()
+		function()
+		measurements.append(time.perf_counter() - startTime)
+
+	return statistics.median(measurements)
+
+def correct_force_distance_curves(
+	approachCurves: List[nt.ForceDistanceCurve]
+) -> List[ForceDistanceCurve]:
+	"""
+	Correct every approach curve like a force volume does.
+
+	Parameters
+	----------
+	approachCurves : list[nt.ForceDistanceCurve]
+		Imported approach curves.
+
+	Returns
+	-------
+	forceDistanceCurves : list[ForceDistanceCurve]
+		The corrected force distance curves.
+	"""
+	forceDistanceCurves = [
+		ForceDistanceCurve("Curve_" + str(index), approachCurve)
+		for index, approachCurve in enumerate(approachCurves)
+	]
+	for forceDistanceCurve in forceDistanceCurves:
+		forceDistanceCurve.correct_raw_data()
+
+	return forceDistanceCurves
+
+def restrict_histogram(
+	forceVolume: ForceVolume,
+	channelName: str,
+	numberOfSteps: int
+) -> None:
+	"""
+	Raise the lower border of the histogram of a channel
+	step by step like the buttons in the main window.
+
+	Parameters
+	----------
+	forceVolume : ForceVolume
+		The processed force volume.
+	channelName : str
+		Name of the restricted channel.
+	numberOfSteps : int
+		Number of restriction steps.
+	"""
+	data = forceVolume.get_histogram_data(channelName)
+	binValues = np.histogram_bin_edges(data[~np.isnan(data)], bins=100)
+	inactiveDataPoints = []
+
+	for _ in range(numberOfSteps):
+		activeData = forceVolume.get_active_histogram_data(
+			channelName,
+			inactiveDataPoints
+		)
+		newInactiveDataPoints = mhd.restrict_histogram_min_up(
+			mhd.get_index_of_minimum_bin_value(binValues, activeData),
+			mhd.get_index_of_maximum_bin_value(binValues, activeData),
+			binValues,
+			data
+		)
+		for dataPoint in newInactiveDataPoints:
+			if dataPoint not in inactiveDataPoints:
+				inactiveDataPoints.append(dataPoint)
+
+def run_stage_benchmark(
+	parameters: sfv.SyntheticParameters,
+	exportFormats: List[str],
+	numberOfRepetitions: int
+) -> Tuple[Dict[str, float], Dict[str, str]]:
+	"""
+	Create a synthetic force volume and measure every
+	processing stage.
+
+	Parameters
+	----------
+	parameters : sfv.SyntheticParameters
+		Parameters of the synthetic force volume.
+	exportFormats : list[str]
+		Keys of the measured export formats.
+	numberOfRepetitions : int
+		Number of measurements per stage.
+
+	Returns
+	-------
+	timings : dict[str, float]
+		Median wall time in seconds of every stage.
+	skippedStages : dict[str, str]
+		Error message of every stage which could not be run.
+	"""
+	timings = {}
+	skippedStages = {}
+	curves = sfv.create_synthetic_force_volume(parameters)
+
+	with tempfile.TemporaryDirectory() as folderPath:
+		filePaths = {".ibw": os.path.join(folderPath, "synthetic")}
+		sfv.write_ibw_folder(filePaths[".ibw"], curves, parameters.size)
+		if parameters.size[0] == parameters.size[1]:
+			filePaths[".hdf5"] = os.path.join(folderPath, "synthetic.hdf5")
+			sfv.write_hdf5_file(filePaths[".hdf5"], curves)
+
+		for dataFormat, filePath in filePaths.items():
+			importParameter = nt.ImportParameter(dataFormat, filePath, "", "", False)
+			timings["import" + dataFormat] = measure_time(
+				lambda: import_data(importParameter),
+				numberOfRepetitions
+			)
+
+		importedData = import_data(
+			nt.ImportParameter(".ibw", filePaths[".ibw"], "", "", False)
+		)
+		forceVolume = ForceVolume(importedData, filePaths[".ibw"])
+		approachCurves = importedData["measurementData"].approachCurves
+
+		timings["correct_approach_curve"] = measure_time(
+			lambda: correct_force_distance_curves(approachCurves),
+			numberOfRepetitions
+		)
+		for channelName, calculate_channel in active_channels.items():
+			timings["channel." + channelName] = measure_time(
+				lambda: calculate_channel(
+					forceVolume.forceDistanceCurves,
+					forceVolume.size
+				),
+				numberOfRepetitions
+			)
+		activeForceDistanceCurves = forceVolume.get_active_force_distance_curves([])
+		timings["calculate_average"] = measure_time(
+			lambda: calculate_average(activeForceDistanceCurves),
+			numberOfRepetitions
+		)
+		timings["histogram_restriction"] = measure_time(
+			lambda: restrict_histogram(forceVolume, "topography", 10),
+			numberOfRepetitions
+		)
+
+		forceVolume.calculate_average([])
+		for exportFormat in exportFormats:
+			outputFolderPath = exp_data.setup_output_folder(folderPath, exportFormat)
+			try:
+				timings["export." + exportFormat] = measure_time(
+					lambda: exp_data.exportFormats[exportFormat](
+						forceVolume,
+						outputFolderPath
+					),
+					numberOfRepetitions
+				)
+			except Exception as e:
+				skippedStages["export." + exportFormat] = type(e).__name__ + ": " + str(e)
+
+	return timings, skippedStages
+
+def find_regressions(
+	timings: Dict[str, float],
+	baselineTimings: Dict[str, float],
+	tolerance: float,
+	minimumDifference: float
+) -> Dict[str, Tuple[float, float]]:
+	"""
+	Compare the timings with a baseline.
+
+	Parameters
+	----------
+	timings : dict[str, float]
+		Measured time of every stage.
+	baselineTimings : dict[str, float]
+		Time of every stage in the baseline.
+	tolerance : float
+		Allowed relative slowdown, for example 0.2 for 20 %.
+	minimumDifference : float
+		Slowdowns below this time in seconds are ignored,
+		so the noise of very fast stages is not reported.
+
+	Returns
+	-------
+	regressions : dict[str, tuple[float]]
+		Baseline and measured time of every slower stage.
+	"""
+	return {
+		stage: (baselineTimings[stage], stageTime)
+		for stage, stageTime in timings.items()
+		if stage in baselineTimings
+		and stageTime > baselineTimings[stage] * (1 + tolerance)
+		and stageTime - baselineTimings[stage] > minimumDifference
+	}
+
+def parse_arguments() -> argparse.Namespace:
+	"""
+	Define and parse the command line arguments.
+
+	Returns
+	-------
+	arguments : argparse.Namespace
+		Parsed command line arguments.
+	"""
+	parser = argparse.ArgumentParser(
+		description=(
+			"Measure the processing stages of SOFA with a synthetic "
+			"force volume and compare them with a baseline."
+		)
+	)
+	parser.add_argument(
+		"-s", "--size", type=int, nargs=2, default=[32, 32], metavar=("LINES", "POINTS"),
+		help="number of lines and points of the grid (default: 32 32)"
+	)
+	parser.add_argument(
+		"-n", "--points", type=int, default=2000,
+		help="number of values per approach and retract curve (default: 2000)"
+	)
+	parser.add_argument(
+		"-a", "--artifacts", type=float, default=0.05,
+		help="fraction of curves with artifacts (default: 0.05)"
+	)
+	parser.add_argument(
+		"-f", "--formats", nargs="*", default=list(exp_data.exportFormats),
+		choices=exp_data.exportFormats.keys(),
+		help="measured export formats (default: all)"
+	)
+	parser.add_argument(
+		"--repetitions", type=int, default=3,
+		help="number of measurements per stage (default: 3)"
+	)
+	parser.add_argument(
+		"--output", default="",
+		help="optional path of a .json file to store the results as a new baseline"
+	)
+	parser.add_argument(
+		"--baseline", default="",
+		help="optional path of a .json file with the results of an earlier run"
+	)
+	parser.add_argument(
+		"--tolerance", type=float, default=0.2,
+		help="allowed relative slowdown compared with the baseline (default: 0.2)"
+	)
+
+	return parser.parse_args()
+
+def main() -> int:
+	"""
+	Run the stage benchmark from the command line.
+
+	Returns
+	-------
+	exitCode : int
+		1 if a stage is slower than in the baseline, 0 otherwise.
+	"""
+	arguments = parse_arguments()
+	parameters = sfv.SyntheticParameters(
+		size=tuple(arguments.size),
+		numberOfPoints=arguments.points,
+		artifactFraction=arguments.artifacts
+	)
+
+	timings, skippedStages = run_stage_benchmark(
+		parameters,
+		arguments.formats,
+		arguments.repetitions
+	)
+
+	for stage, stageTime in timings.items():
+		print("{:<40}{:>10.4f} s".format(stage, stageTime))
+	for stage, errorMessage in skippedStages.items():
+		print("{:<40}skipped, {}".format(stage, errorMessage))
+
+	if arguments.output:
+		with open(arguments.output, "w") as outputFile:
+			json.dump(
+				{
+					"parameters": parameters._asdict(),
+					"environment": {
+						"python": platform.python_version(),
+						"numpy": np.__version__,
+						"machine": platform.machine()
+					},
+					"timings": timings
+				},
+				outputFile,
+				indent=4
+			)
+
+	if not arguments.baseline:
+		return 0
+
+	with open(arguments.baseline) as baselineFile:
+		baseline = json.load(baselineFile)
+	if baseline["parameters"] != json.loads(json.dumps(parameters._asdict())):
+		print("The baseline was measured with different parameters.")
+	regressions = find_regressions(timings, baseline["timings"], arguments.tolerance, 0.005)
+
+	for stage, (baselineTime, stageTime) in regressions.items():
+		print(
+			"Regression in {}: {:.4f} s -> {:.4f} s".format(
+				stage, baselineTime, stageTime
+			)
+		)
+
+	return 1 if regressions else 0
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,362 @@
+"""
+This file is part of SOFA.
+SOFA is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+SOFA is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from typing import List, NamedTuple, Tuple
+import argparse
+import os
+import struct
+
+import h5py
+import numpy as np
+
+class SyntheticParameters(NamedTuple):
+	size: Tuple[int, int] = (32, 32)
+	numberOfPoints: int = 2000
+	noise: float = 2e-11
+	artifactFraction: float = 0.05
+	seed: int = 0
+
+class SyntheticCurve(NamedTuple):
+	piezo: np.ndarray
+	deflection: np.ndarray
+	indexMaximumPiezo: int
+
+# Types of artifacts which are added to a fraction of the curves.
+artifactTypes = ["spikes", "interference", "noContact", "invalidValues"]
+
+def create_topography(
+	size: Tuple[int, int],
+	rng: np.random.Generator
+) -> np.ndarray:
+	"""
+	Create the contact heights of a tilted sample with a
+	bump in the center and some roughness.
+
+	Parameters
+	----------
+	size : tuple[int]
+		Number of lines and points of the grid.
+	rng : np.random.Generator
+		Source of the random values.
+
+	Returns
+	-------
+	topography : np.ndarray
+		Piezo value of the point of contact of every curve.
+	"""
+	lines, points = np.meshgrid(
+		np.linspace(-1, 1, size[0]),
+		np.linspace(-1, 1, size[1]),
+		indexing="ij"
+	)
+	tilt = 3e-8 * lines + 2e-8 * points
+	bump = 8e-8 * np.exp(-(lines**2 + points**2) / 0.2)
+	roughness = rng.normal(0, 3e-9, size)
+
+	return 1e-7 + tilt + bump + roughness
+
+def create_curve(
+	pointOfContact: float,
+	numberOfPoints: int,
+	noise: float,
+	artifactType: str,
+	rng: np.random.Generator
+) -> SyntheticCurve:
+	"""
+	Create a single approach and retract curve with a tilted
+	zero line, jump to contact, linear contact part, adhesion
+	on retract and optionally an artifact.
+
+	Parameters
+	----------
+	pointOfContact : float
+		Piezo value at which the tip touches the sample.
+	numberOfPoints : int
+		Number of values of the approach and retract part.
+	noise : float
+		Standard deviation of the deflection noise.
+	artifactType : str
+		One of artifactTypes or an empty string.
+	rng : np.random.Generator
+		Source of the random values.
+
+	Returns
+	-------
+	curve : SyntheticCurve
+		Piezo and deflection values of the measurement curve.
+	"""
+	numberOfPointsApproach = numberOfPoints // 2
+	numberOfPointsRetract = numberOfPoints - numberOfPointsApproach
+	piezoMinimum = -3.5e-7 + rng.normal(0, 5e-9)
+	piezoMaximum = 5e-7 + rng.normal(0, 5e-9)
+
+	if artifactType == "noContact":
+		pointOfContact = piezoMaximum + 1e-7
+
+	piezoApproach = np.linspace(piezoMinimum, piezoMaximum, numberOfPointsApproach)
+	piezoRetract = np.linspace(piezoMaximum, piezoMinimum, numberOfPointsRetract + 1)[1:]
+
+	offset = rng.normal(5e-9, 1e-9)
+	tilt = rng.uniform(1e-3, 5e-3)
+	stiffness = rng.uniform(0.1, 0.2)
+	jumpToContact = rng.uniform(5e-10, 2e-9)
+	adhesion = rng.uniform(2e-9, 6e-9)
+
+	def deflection_approach(piezo):
+		distance = piezo - pointOfContact
+		return np.where(
+			distance < 0,
+			-jumpToContact * np.exp(distance / 4e-9),
+			stiffness * distance - jumpToContact
+		)
+
+	def deflection_retract(piezo):
+		distance = piezo - pointOfContact
+		detachDistance = -adhesion / stiffness
+		return np.where(
+			distance < detachDistance,
+			0.0,
+			stiffness * distance - adhesion * (distance < 0)
+		)
+
+	deflectionApproach = deflection_approach(piezoApproach)
+	deflectionRetract = deflection_retract(piezoRetract)
+
+	piezo = np.concatenate([piezoApproach, piezoRetract])
+	deflection = (
+		np.concatenate([deflectionApproach, deflectionRetract])
+		+ offset + tilt * piezo
+		+ rng.normal(0, noise, numberOfPoints)
+	)
+
+	if artifactType == "spikes":
+		indices = rng.integers(0, numberOfPoints, 5)
+		deflection[indices] += rng.normal(0, 2e-8, 5)
+	elif artifactType == "interference":
+		deflection += 5e-10 * np.sin(piezo / 3e-8)
+	elif artifactType == "invalidValues":
+		piezo = np.concatenate([piezo, np.full(10, np.nan)])
+		deflection = np.concatenate([deflection, np.full(10, np.nan)])
+
+	return SyntheticCurve(
+		piezo.astype(np.float32),
+		deflection.astype(np.float32),
+		numberOfPointsApproach - 1
+	)
+
+def create_synthetic_force_volume(
+	parameters: SyntheticParameters
+) -> List[SyntheticCurve]:
+	"""
+	Create the measurement curves of a force volume line by line.
+
+	Parameters
+	----------
+	parameters : SyntheticParameters
+		Grid size, curve length, noise, fraction of curves
+		with artifacts and seed.
+
+	Returns
+	-------
+	curves : list[SyntheticCurve]
+		Every measurement curve of the force volume.
+	"""
+	rng = np.random.default_rng(parameters.seed)
+	topography = create_topography(parameters.size, rng)
+	artifacts = rng.choice(
+		artifactTypes,
+		size=topography.size
+	)
+	hasArtifact = rng.random(topography.size) < parameters.artifactFraction
+
+	return [
+		create_curve(
+			pointOfContact,
+			parameters.numberOfPoints,
+			parameters.noise,
+			artifact if addArtifact else "",
+			rng
+		)
+		for pointOfContact, artifact, addArtifact
+		in zip(topography.ravel(), artifacts, hasArtifact)
+	]
+
+def create_ibw_file_content(
+	waveName: str,
+	data: np.ndarray,
+	note: str = ""
+) -> bytes:
+	"""
+	Create the content of a version 5 Igor binary wave file
+	with a single float32 wave.
+
+	Parameters
+	----------
+	waveName : str
+		Name of the wave, at most 31 characters.
+	data : np.ndarray
+		Values of the wave.
+	note : str
+		Note of the wave.
+
+	Returns
+	-------
+	content : bytes
+		Content of the .ibw file.
+	"""
+	waveData = np.ascontiguousarray(data, dtype="<f4").tobytes()
+	noteData = note.encode("ascii")
+	numberOfPoints = len(data)
+
+	waveHeader = struct.pack(
+		"<IIIihh6sh32siI4i4d4d4s16shhddI4I4II16ihhhccIihhII",
+		0, 0, 0, numberOfPoints, 2, 0, b"", 1, waveName.encode("ascii"), 0, 0,
+		numberOfPoints, 0, 0, 0,
+		1.0, 1.0, 1.0, 1.0,
+		0.0, 0.0, 0.0, 0.0,
+		b"m", b"",
+		0, 0, 0.0, 0.0,
+		0, 0, 0, 0, 0, 0, 0, 0, 0, 0,
+		*([0] * 16),
+		0, 0, 0, b"\x00", b"\x00", 0, 0, 0, 0, 0, 0
+	)
+
+	def create_bin_header(checksum: int) -> bytes:
+		return struct.pack(
+			"<hhiiii4i4iiii",
+			5, checksum, len(waveHeader) + len(waveData), 0, len(noteData), 0,
+			0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0
+		)
+
+	# The 16 bit sum of both headers including the checksum has to be 0.
+	headerSum = np.frombuffer(
+		create_bin_header(0) + waveHeader, dtype="<i2"
+	).sum(dtype=np.int64)
+	checksum = int(np.array(-headerSum).astype(np.int16))
+
+	return create_bin_header(checksum) + waveHeader + waveData + noteData
+
+def write_ibw_folder(
+	folderPath: str,
+	curves: List[SyntheticCurve],
+	size: Tuple[int, int]
+) -> None:
+	"""
+	Write every curve as a pair of piezo and deflection .ibw
+	files into a line folder like the AFM does.
+
+	Parameters
+	----------
+	folderPath : str
+		Path of the measurement folder.
+	curves : list[SyntheticCurve]
+		Every measurement curve of the force volume.
+	size : tuple[int]
+		Number of lines and points of the grid.
+	"""
+	for index, curve in enumerate(curves):
+		line, point = divmod(index, size[1])
+		lineName = "Line{:04d}".format(line)
+		curveName = lineName + "Point{:04d}".format(point)
+		folderPathLine = os.path.join(folderPath, lineName)
+		os.makedirs(folderPathLine, exist_ok=True)
+		note = "Indexes:0,{},{},\r".format(
+			curve.indexMaximumPiezo, len(curve.piezo) - 1
+		)
+
+		for suffix, data in (("ZSnsr", curve.piezo), ("Defl", curve.deflection)):
+			with open(os.path.join(folderPathLine, curveName + suffix + ".ibw"), "wb") as ibwFile:
+				ibwFile.write(create_ibw_file_content(curveName + suffix, data, note))
+
+def write_hdf5_file(
+	filePath: str,
+	curves: List[SyntheticCurve]
+) -> None:
+	"""
+	Write the approach curves in the .hdf5 format SOFA imports,
+	a compound dataset with one column per curve and the values
+	in nanometers. The number of curves has to be a square number.
+
+	Parameters
+	----------
+	filePath : str
+		Path of the .hdf5 file.
+	curves : list[SyntheticCurve]
+		Every measurement curve of the force volume.
+	"""
+	numberOfValues = min(
+		int(np.sum(~np.isnan(curve.piezo[:curve.indexMaximumPiezo])))
+		for curve in curves
+	)
+	data = np.zeros(
+		(numberOfValues, len(curves)),
+		dtype=[("piezo", "<f8"), ("deflection", "<f8")]
+	)
+	for index, curve in enumerate(curves):
+		data["piezo"][:, index] = np.flip(curve.piezo[:numberOfValues]) * 1e9
+		data["deflection"][:, index] = curve.deflection[:numberOfValues] * 1e9
+
+	with h5py.File(filePath, "w") as hdf5File:
+		hdf5File["data"] = data
+
+def parse_arguments() -> argparse.Namespace:
+	"""
+	Define and parse the command line arguments.
+
+	Returns
+	-------
+	arguments : argparse.Namespace
+		Parsed command line arguments.
+	"""
+	parser = argparse.ArgumentParser(
+		description="Create a synthetic force volume as .ibw folder and .hdf5 file."
+	)
+	parser.add_argument("output", help="folder in which the data is created")
+	parser.add_argument(
+		"-s", "--size", type=int, nargs=2, default=[32, 32], metavar=("LINES", "POINTS"),
+		help="number of lines and points of the grid (default: 32 32)"
+	)
+	parser.add_argument(
+		"-n", "--points", type=int, default=2000,
+		help="number of values per approach and retract curve (default: 2000)"
+	)
+	parser.add_argument(
+		"-a", "--artifacts", type=float, default=0.05,
+		help="fraction of curves with artifacts (default: 0.05)"
+	)
+	parser.add_argument("--seed", type=int, default=0, help="random seed (default: 0)")
+
+	return parser.parse_args()
+
+def main() -> None:
+	"""
+	Create a synthetic force volume in both formats.
+	"""
+	arguments = parse_arguments()
+	parameters = SyntheticParameters(
+		size=tuple(arguments.size),
+		numberOfPoints=arguments.points,
+		artifactFraction=arguments.artifacts,
+		seed=arguments.seed
+	)
+	curves = create_synthetic_force_volume(parameters)
+	name = "synthetic_{}x{}".format(*parameters.size)
+
+	write_ibw_folder(os.path.join(arguments.output, name), curves, parameters.size)
+	if parameters.size[0] == parameters.size[1]:
+		write_hdf5_file(os.path.join(arguments.output, name + ".hdf5"), curves)
+
+if __name__ == "__main__":
+	main()
@@ -21,6 +21,7 @@ import data_processing.named_tuples as nt
 
 def calculate_average(
 	activeForceDistanceCurves: List,
+	numberOfDataPoints: int = 2000
 ) -> nt.AverageForceDistanceCurve:
 	"""
 	Calculate the average and standard deviation
@@ -31,6 +32,9 @@ def calculate_average(
 	activeForceDistanceCurves : list[ForceDistanceCurve]
 		Piezo(x) and deflection (y) values of the
 		active force distance curves.
+	numberOfDataPoints : int
+		Number of grid points of the non contact and
+		contact part of the average curve.
 	
 	Returns
 	-------
@@ -39,24 +43,22 @@ def calculate_average(
 		of the average curve and the standard deviation.
 	"""
 	normedCurves = interpolate_normed_curves(
-		activeForceDistanceCurves
+		activeForceDistanceCurves,
+		numberOfDataPoints
+	)
+	# The grids might be stored in float32, the sums are calculated in float64.
+	averagedDeflectionNonContact = np.mean(
+		normedCurves.deflectionNonContact, axis=0, dtype=np.float64
+	)
+	averagedDeflectionContact = np.mean(
+		normedCurves.deflectionContact, axis=0, dtype=np.float64
+	)
+	standardDeviationNonContact = np.std(
+		normedCurves.deflectionNonContact, axis=0, dtype=np.float64
+	)
+	standardDeviationContact = np.std(
+		normedCurves.deflectionContact, axis=0, dtype=np.float64
 	)
-	averagedDeflectionNonContact = [
-		np.mean(nthValues) 
-		for nthValues 
-		in zip(*normedCurves.deflectionNonContact)
-	]
-	averagedDeflectionContact = [
-		np.mean(nthValues) 
-		for nthValues 
-		in zip(*normedCurves.deflectionContact)
-	]
-	standardDeviationNonContact = [
-		np.std(nthValues) for nthValues in zip(*normedCurves.deflectionNonContact)
-	]
-	standardDeviationContact = [
-		np.std(nthValues) for nthValues in zip(*normedCurves.deflectionContact)
-	]
 	return nt.AverageForceDistanceCurve(
 		piezoNonContact=normedCurves.piezoNonContact,
 		deflectionNonContact=averagedDeflectionNonContact,
@@ -67,8 +69,9 @@ def calculate_average(
 	)
 
 def interpolate_normed_curves(
-	activeForceDistanceCurves
-) -> None:
+	activeForceDistanceCurves: List,
+	numberOfDataPoints: int = 2000
+) -> nt.NormedCurves:
 	"""
 	Align the measurement points of every force distance
 	curve of the force volume to be able to calculate the
@@ -79,6 +82,9 @@ def interpolate_normed_curves(
 	activeForceDistanceCurves : list[nt.ForceDistanceCurve]
 		Piezo(x) and deflection (y) values of the
 		active force distance curves.
+	numberOfDataPoints : int
+		Number of grid points of the non contact and
+		contact part.
 	
 	Returns
 	-------
@@ -87,7 +93,6 @@ def interpolate_normed_curves(
 		values of every force distance curve divided into
 		the non contact and contact part.
 	"""
-	numberOfDataPoints = 2000
 	minimumPizeo = get_minimum_piezo(activeForceDistanceCurves)
 	maximumDeflection = get_maximum_deflection(activeForceDistanceCurves)
 
@@ -191,19 +196,20 @@ def interpolate_non_contact_part(
 		Aligned deflecttion (y) values of each force
 		distance curve.
 	"""
-	normedPiezoNonContact = np.linspace(minimumPizeo, 0, numberOfDataPoints)
-	normedDeflectionNonContact = []
+	dtype = get_grid_dtype(activeForceDistanceCurves)
+	normedPiezoNonContact = np.linspace(minimumPizeo, 0, numberOfDataPoints).astype(dtype)
+	normedDeflectionNonContact = np.empty(
+		(len(activeForceDistanceCurves), numberOfDataPoints),
+		dtype=dtype
+	)
 
-	for forceDistanceCurve in activeForceDistanceCurves:
+	for index, forceDistanceCurve in enumerate(activeForceDistanceCurves):
 		indexZeroCrossing = forceDistanceCurve.channelMetadata.pointOfContact.index
-		normedDeflectionNonContact.append(
-			np.interp(
-				normedPiezoNonContact, 
-				forceDistanceCurve.dataApproachCorrected.piezo[:indexZeroCrossing], 
-				forceDistanceCurve.dataApproachCorrected.deflection[:indexZeroCrossing]
-			)
+		normedDeflectionNonContact[index] = np.interp(
+			normedPiezoNonContact, 
+			forceDistanceCurve.dataApproachCorrected.piezo[:indexZeroCrossing], 
+			forceDistanceCurve.dataApproachCorrected.deflection[:indexZeroCrossing]
 		)
-	normedDeflectionNonContact = np.asarray(normedDeflectionNonContact)
 
 	return normedPiezoNonContact, normedDeflectionNonContact
 
@@ -237,18 +243,47 @@ def interpolate_contact_part(
 		Aligned piezo (x) values of each force
 		distance curve.
 	"""
-	normedPiezoContact = np.linspace(0, maximumDeflection, numberOfDataPoints)
-	normedDeflectionContact = []
+	dtype = get_grid_dtype(activeForceDistanceCurves)
+	normedPiezoContact = np.linspace(0, maximumDeflection, numberOfDataPoints).astype(dtype)
+	normedDeflectionContact = np.empty(
+		(len(activeForceDistanceCurves), numberOfDataPoints),
+		dtype=dtype
+	)
 
-	for forceDistanceCurve in activeForceDistanceCurves:
+	for index, forceDistanceCurve in enumerate(activeForceDistanceCurves):
 		indexZeroCrossing = forceDistanceCurve.channelMetadata.pointOfContact.index
-		normedDeflectionContact.append(
-			np.interp(
-				normedPiezoContact, 
-				forceDistanceCurve.dataApproachCorrected.deflection[indexZeroCrossing:], 
-				forceDistanceCurve.dataApproachCorrected.piezo[indexZeroCrossing:]
-			)
+		normedDeflectionContact[index] = np.interp(
+			normedPiezoContact, 
+			forceDistanceCurve.dataApproachCorrected.deflection[indexZeroCrossing:], 
+			forceDistanceCurve.dataApproachCorrected.piezo[indexZeroCrossing:]
 		)
-	normedDeflectionContact = np.asarray(normedDeflectionContact)
 
-	return normedPiezoContact, normedDeflectionContact
\ No newline at end of file
+	return normedPiezoContact, normedDeflectionContact
+
+def get_grid_dtype(
+	activeForceDistanceCurves: List
+) -> np.dtype:
+	"""
+	Get the data type of the interpolated grids, float32
+	if every corrected curve is stored in float32.
+
+	Parameters
+	----------
+	activeForceDistanceCurves : list[ForceDistanceCurve]
+		Piezo(x) and deflection (y) values of the
+		active force distance curves.
+
+	Returns
+	-------
+	dtype : np.dtype
+		Data type of the grids.
+	"""
+	dtypes = {
+		value.dtype
+		for forceDistanceCurve in activeForceDistanceCurves
+		for value in forceDistanceCurve.dataApproachCorrected
+	}
+	if dtypes == {np.dtype(np.float32)}:
+		return np.dtype(np.float32)
+
+	return np.dtype(np.float64)
@@ -17,9 +17,12 @@ from typing import List, Dict, Tuple
 import functools
 
 import numpy as np
-from scipy.stats import linregress
 
 import data_processing.named_tuples as nt
+from utilities.instrumentation import measure_stage
+from utilities.lazy_import import lazy_import
+
+stats = lazy_import("scipy.stats")
 
 def decorator_reshape_channel_data(function):
 	"""
@@ -57,10 +60,11 @@ def calculate_channel_data(
 	channelData = {}
 
 	for channelName, caluclate_channel in active_channels.items():
-		channelData[channelName] = caluclate_channel(
-			forceDistanceCurves,
-			size
-		)
+		with measure_stage("channel." + channelName, len(forceDistanceCurves)):
+			channelData[channelName] = caluclate_channel(
+				forceDistanceCurves,
+				size
+			)
 
 	return channelData
 
@@ -170,7 +174,7 @@ def calculate_slope_linear_fit_to_corrected_approach_curve(
 		Slope of the linear fit to a corrected force distance
 		curve.
 	"""
-	slope, _, _, _, _ = linregress(
+	slope, _, _, _, _ = stats.linregress(
 		correctedForceDistanceCurve.piezo,
 		correctedForceDistanceCurve.deflection
 	)
@@ -238,7 +242,10 @@ def calculate_surface_area_attractive_area(
 		curve.
 	"""
 	return np.trapz(
-		deflection[endOfZeroline.index:pointOfContact.index]
+		np.asarray(
+			deflection[endOfZeroline.index:pointOfContact.index],
+			dtype=np.float64
+		)
 	)
 
 @decorator_reshape_channel_data
@@ -0,0 +1,337 @@
+"""
+This file is part of SOFA.
+SOFA is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+SOFA is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+import data_processing.named_tuples as nt
+
+def calculate_elastic_modulus_channels(
+	forceDistanceCurves: List,
+	size: Tuple[int],
+	indentationParameters: nt.IndentationParameters,
+	springConstant: Optional[Union[float, str]],
+	chunkSize: int = 1024
+) -> Dict[str, np.ndarray]:
+	"""
+	Calculate the elastic modulus and the quality of the fit
+	by fitting the Hertz/Sneddon model of the selected tip
+	geometry to the contact part of every corrected curve.
+	The curves are fitted chunk by chunk in a single
+	vectorized least squares step per chunk.
+
+	Parameters
+	----------
+	forceDistanceCurves : list[ForceDistanceCurve]
+		Every force distance curve of the force volume.
+	size : tuple[int]
+		Size of the force volume.
+	indentationParameters : nt.IndentationParameters
+		Tip geometry, tip radius or half opening angle,
+		poisson ratio, maximum fitted indentation and
+		spring constant. Without a tip parameter the
+		default of the tip geometry is used.
+	springConstant : float, str or None
+		Spring constant of the cantilever in N/m from the
+		imported image, used if the indentation parameters
+		contain none. Without a spring constant the elastic
+		modulus is unknown, but the quality of the fit can
+		still be calculated.
+	chunkSize : int, optional
+		Number of curves which are fitted at once.
+
+	Returns
+	-------
+	channelData : dict[str, np.ndarray]
+		Elastic modulus in Pa and coefficient of
+		determination of the fit of every curve.
+	"""
+	prefactor, exponent = tipGeometries[indentationParameters.tipGeometry](
+		get_tip_parameter(indentationParameters)
+	)
+	coefficients = np.full(len(forceDistanceCurves), np.nan)
+	rSquared = np.full(len(forceDistanceCurves), np.nan)
+
+	for start in range(0, len(forceDistanceCurves), chunkSize):
+		stop = min(start + chunkSize, len(forceDistanceCurves))
+		indentation, deflection, curveIndices = get_contact_parts(
+			forceDistanceCurves[start:stop],
+			indentationParameters.maximumIndentation
+		)
+		coefficients[start:stop], rSquared[start:stop] = fit_power_law(
+			indentation**exponent,
+			deflection,
+			curveIndices,
+			stop - start
+		)
+
+	if indentationParameters.springConstant is not None:
+		springConstant = indentationParameters.springConstant
+	# The spring constant is read as text from the note of ibw images.
+	springConstant = float(springConstant) if springConstant else 0.0
+	if springConstant > 0:
+		elasticModulus = (
+			coefficients * springConstant
+			* (1 - indentationParameters.poissonRatio**2) / prefactor
+		)
+	else:
+		elasticModulus = np.full(len(forceDistanceCurves), np.nan)
+
+	return {
+		"elasticModulus": elasticModulus.reshape(size),
+		"fitQualityElasticModulus": rSquared.reshape(size)
+	}
+
+def get_tip_parameter(
+	indentationParameters: nt.IndentationParameters
+) -> float:
+	"""
+	Get the tip radius in m of a spherical tip or the 
+	half angle in degrees of a conical or pyramidal tip.
+
+	Parameters
+	----------
+	indentationParameters : nt.IndentationParameters
+		Tip geometry and optionally the tip parameter.
+
+	Returns
+	-------
+	tipParameter : float
+		Selected tip parameter or the default of
+		the tip geometry.
+	"""
+	if indentationParameters.tipParameter is None:
+		return defaultTipParameters[indentationParameters.tipGeometry]
+
+	return indentationParameters.tipParameter
+
+def get_contact_parts(
+	forceDistanceCurves: List,
+	maximumIndentation: Optional[float]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+	"""
+	Collect the contact parts of the corrected curves after
+	their point of contact in flat arrays.
+
+	Parameters
+	----------
+	forceDistanceCurves : list[ForceDistanceCurve]
+		Force distance curves of a chunk.
+	maximumIndentation : float or None
+		Values with a larger indentation are not fitted.
+
+	Returns
+	-------
+	indentation : np.ndarray
+		Indentation (piezo minus deflection relative to the
+		point of contact) of every value in the contact parts.
+	deflection : np.ndarray
+		Deflection of every value in the contact parts.
+	curveIndices : np.ndarray
+		Position of the curve of every value in the chunk.
+	"""
+	indentationParts = []
+	deflectionParts = []
+	curveIndexParts = []
+
+	for index, forceDistanceCurve in enumerate(forceDistanceCurves):
+		if not forceDistanceCurve.couldBeCorrected:
+			continue
+		indexPointOfContact = forceDistanceCurve.channelMetadata.pointOfContact.index
+		correctedCurve = forceDistanceCurve.dataApproachCorrected
+		piezo = np.asarray(correctedCurve.piezo[indexPointOfContact:], dtype=np.float64)
+		deflection = np.asarray(correctedCurve.deflection[indexPointOfContact:], dtype=np.float64)
+		if len(piezo) < 2:
+			continue
+		piezoPointOfContact, deflectionPointOfContact = interpolate_point_of_contact(
+			piezo[:2],
+			deflection[:2]
+		)
+		piezo = piezo[1:]
+		deflection = deflection[1:]
+
+		indentationParts.append(
+			(piezo - piezoPointOfContact) - (deflection - deflectionPointOfContact)
+		)
+		deflectionParts.append(deflection)
+		curveIndexParts.append(np.full(len(piezo), index, dtype=np.int64))
+
+	if not indentationParts:
+		return np.array([]), np.array([]), np.array([], dtype=np.int64)
+
+	indentation = np.concatenate(indentationParts)
+	deflection = np.concatenate(deflectionParts)
+	curveIndices = np.concatenate(curveIndexParts)
+
+	isValid = (indentation > 0) & np.isfinite(deflection)
+	if maximumIndentation is not None:
+		isValid &= indentation <= maximumIndentation
+
+	return indentation[isValid], deflection[isValid], curveIndices[isValid]
+
+def interpolate_point_of_contact(
+	piezo: np.ndarray,
+	deflection: np.ndarray
+) -> Tuple[float, float]:
+	"""
+	Interpolate the zero crossing of the corrected deflection
+	between the last value with a deflection smaller or equal
+	to zero and the following value.
+
+	Parameters
+	----------
+	piezo : np.ndarray
+		Corrected piezo (x) values around the zero crossing.
+	deflection : np.ndarray
+		Corrected deflection (y) values around the zero crossing.
+
+	Returns
+	-------
+	piezoPointOfContact : float
+		Interpolated piezo value of the point of contact.
+	deflectionPointOfContact : float
+		Deflection value of the point of contact.
+	"""
+	if deflection[1] == deflection[0]:
+		return piezo[0], deflection[0]
+
+	return np.interp(0, deflection, piezo), 0.0
+
+def fit_power_law(
+	x: np.ndarray,
+	y: np.ndarray,
+	curveIndices: np.ndarray,
+	numberOfCurves: int
+) -> Tuple[np.ndarray, np.ndarray]:
+	"""
+	Fit y = a * x through the origin for every curve at once,
+	x is the indentation raised to the exponent of the model.
+
+	Parameters
+	----------
+	x : np.ndarray
+		Indentation to the power of the exponent of the model.
+	y : np.ndarray
+		Deflection values.
+	curveIndices : np.ndarray
+		Curve of every value.
+	numberOfCurves : int
+		Number of fitted curves.
+
+	Returns
+	-------
+	coefficients : np.ndarray
+		Fitted coefficient a of every curve, nan if the
+		curve has less than three values.
+	rSquared : np.ndarray
+		Coefficient of determination of every fit.
+	"""
+	numberOfValues = np.bincount(curveIndices, minlength=numberOfCurves)
+	sumXY = np.bincount(curveIndices, weights=x*y, minlength=numberOfCurves)
+	sumXX = np.bincount(curveIndices, weights=x*x, minlength=numberOfCurves)
+	sumY = np.bincount(curveIndices, weights=y, minlength=numberOfCurves)
+
+	isFitted = (numberOfValues >= 3) & (sumXX > 0)
+	coefficients = np.full(numberOfCurves, np.nan)
+	coefficients[isFitted] = sumXY[isFitted] / sumXX[isFitted]
+
+	meanY = np.zeros(numberOfCurves)
+	meanY[numberOfValues > 0] = sumY[numberOfValues > 0] / numberOfValues[numberOfValues > 0]
+	residuals = y - np.nan_to_num(coefficients)[curveIndices] * x
+	sumSquaredResiduals = np.bincount(curveIndices, weights=residuals**2, minlength=numberOfCurves)
+	sumSquaredTotal = np.bincount(
+		curveIndices,
+		weights=(y - meanY[curveIndices])**2,
+		minlength=numberOfCurves
+	)
+
+	rSquared = np.full(numberOfCurves, np.nan)
+	hasVariance = isFitted & (sumSquaredTotal > 0)
+	rSquared[hasVariance] = 1 - sumSquaredResiduals[hasVariance] / sumSquaredTotal[hasVariance]
+
+	return coefficients, rSquared
+
+def calculate_sphere_model(radius: float) -> Tuple[float, float]:
+	"""
+	Hertz model of a spherical tip, F = 4/3 E* sqrt(R) d^1.5.
+
+	Parameters
+	----------
+	radius : float
+		Radius of the tip in m.
+
+	Returns
+	-------
+	prefactor : float
+		Prefactor of the reduced elastic modulus.
+	exponent : float
+		Exponent of the indentation.
+	"""
+	return 4 / 3 * np.sqrt(radius), 1.5
+
+def calculate_cone_model(halfAngle: float) -> Tuple[float, float]:
+	"""
+	Sneddon model of a conical tip, F = 2/pi E* tan(a) d^2.
+
+	Parameters
+	----------
+	halfAngle : float
+		Half opening angle of the tip in degrees.
+
+	Returns
+	-------
+	prefactor : float
+		Prefactor of the reduced elastic modulus.
+	exponent : float
+		Exponent of the indentation.
+	"""
+	return 2 / np.pi * np.tan(np.radians(halfAngle)), 2.0
+
+def calculate_pyramid_model(halfAngle: float) -> Tuple[float, float]:
+	"""
+	Bilodeau model of a four sided pyramidal tip,
+	F = 1/sqrt(2) E* tan(a) d^2.
+
+	Parameters
+	----------
+	halfAngle : float
+		Half angle to the face of the tip in degrees.
+
+	Returns
+	-------
+	prefactor : float
+		Prefactor of the reduced elastic modulus.
+	exponent : float
+		Exponent of the indentation.
+	"""
+	return np.tan(np.radians(halfAngle)) / np.sqrt(2), 2.0
+
+# Defines all available tip geometries for the elastic modulus.
+tipGeometries = {
+	"sphere": calculate_sphere_model,
+	"cone": calculate_cone_model,
+	"pyramid": calculate_pyramid_model
+}
+
+# Default tip radius in m or half angle in degrees of every tip geometry.
+defaultTipParameters = {
+	"sphere": 10e-9,
+	"cone": 35,
+	"pyramid": 35
+}
+
+# Names of the channels calculated with the indentation fit.
+elasticModulusChannels = ["elasticModulus", "fitQualityElasticModulus"]
@@ -0,0 +1,601 @@
+"""
+This file is part of SOFA.
+SOFA is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+SOFA is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from typing import Optional, Tuple
+
+import numpy as np
+
+import data_processing.named_tuples as nt
+from utilities.lazy_import import lazy_import
+
+ndimage = lazy_import("scipy.ndimage")
+
+def locate_ends_of_zeroline_derivative(
+	piezo: np.ndarray,
+	deflection: np.ndarray,
+	correctionSettings: nt.CorrectionSettings = nt.CorrectionSettings()
+) -> np.ndarray:
+	"""
+	Locate the end of the zero line of every curve as the last
+	point with a negative smoothed derivative between the first
+	intersection with a linear fit to the curve and the point
+	with the maximum distance to the fit, slightly shifted to
+	the right.
+
+	Parameters
+	----------
+	piezo : np.ndarray
+		Piezo (x) values of curves with the same length,
+		one curve per row.
+	deflection : np.ndarray
+		Deflection (y) values of the curves.
+	correctionSettings : nt.CorrectionSettings, optional
+		Sigma of the gaussian filter of the derivative and
+		shift of the right border.
+
+	Returns
+	-------
+	indicesEndOfZeroline : np.ndarray
+		Index of the end of the zero line of every curve,
+		-1 if it could not be located.
+	"""
+	slopes, intercepts = calculate_linear_fits(piezo, deflection)
+	deflectionBorders = calculate_deflection_borders(
+		piezo,
+		deflection,
+		slopes,
+		intercepts,
+		correctionSettings.borderShift
+	)
+	isDecreasing = calculate_decreasing_derivations(
+		piezo,
+		deflection,
+		correctionSettings.smoothFactor
+	)
+
+	return locate_last_decrease_between_borders(isDecreasing, *deflectionBorders)
+
+def calculate_deflection_borders(
+	piezo: np.ndarray,
+	deflection: np.ndarray,
+	slopes: np.ndarray,
+	intercepts: np.ndarray,
+	borderShift: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+	"""
+	Calculate the borders of the area in which the end of the
+	zero line is searched for, the first intersection of every
+	curve with its linear fit and the point with the maximum
+	distance to the fit, shifted towards the last intersection.
+
+	Parameters
+	----------
+	piezo : np.ndarray
+		Piezo (x) values of curves with the same length,
+		one curve per row.
+	deflection : np.ndarray
+		Deflection (y) values of the curves.
+	slopes : np.ndarray
+		Slope of the linear fit to every curve.
+	intercepts : np.ndarray
+		Intercept of the linear fit to every curve.
+	borderShift : float
+		Shift of the right border relative to the distance
+		to the last intersection.
+
+	Returns
+	-------
+	indicesLeftBorder : np.ndarray
+		Index of the first intersection of every curve.
+	indicesRightBorder : np.ndarray
+		Index of the shifted point with the maximum distance.
+	hasBorders : np.ndarray
+		Whether the borders of a curve could be calculated.
+	"""
+	numberOfValues = piezo.shape[1]
+	valueIndices = np.arange(numberOfValues)
+	fitDeflection = intercepts[:, np.newaxis] + slopes[:, np.newaxis]*piezo
+
+	isBelowFit = deflection < fitDeflection
+	indicesFirstIntersection = np.argmax(isBelowFit, axis=1)
+	indicesLastIntersection = numberOfValues - 1 - np.argmax(isBelowFit[:, ::-1], axis=1)
+
+	isBetweenIntersections = (
+		(valueIndices >= indicesFirstIntersection[:, np.newaxis])
+		& (valueIndices < indicesLastIntersection[:, np.newaxis])
+	)
+	deflectionDifferences = np.where(
+		isBetweenIntersections,
+		np.absolute(fitDeflection - deflection),
+		-np.inf
+	)
+	indicesMaxDeflectionDifference = np.argmax(deflectionDifferences, axis=1)
+	indicesRightBorder = (
+		indicesMaxDeflectionDifference
+		+ (indicesLastIntersection - indicesMaxDeflectionDifference) * borderShift
+	).astype(np.int64)
+
+	return (
+		indicesFirstIntersection,
+		indicesRightBorder,
+		isBelowFit.any(axis=1) & isBetweenIntersections.any(axis=1)
+	)
+
+def calculate_decreasing_derivations(
+	piezo: np.ndarray,
+	deflection: np.ndarray,
+	smoothFactor: float
+) -> np.ndarray:
+	"""
+	Calculate where the smoothed first derivation of the
+	deflection (y) values of every curve is negative.
+
+	Parameters
+	----------
+	piezo : np.ndarray
+		Piezo (x) values of curves with the same length,
+		one curve per row.
+	deflection : np.ndarray
+		Deflection (y) values of the curves.
+	smoothFactor : float
+		Sigma of the gaussian filter of the derivation.
+
+	Returns
+	-------
+	isDecreasing : np.ndarray
+		Whether the smoothed derivation between two values
+		is negative, one value less than the curves.
+	"""
+	smoothedDerivationDeflection = ndimage.gaussian_filter1d(
+		np.diff(deflection, axis=1) / np.diff(piezo, axis=1),
+		sigma=smoothFactor,
+		axis=1
+	)
+
+	return smoothedDerivationDeflection < 0
+
+def locate_last_decrease_between_borders(
+	isDecreasing: np.ndarray,
+	indicesLeftBorder: np.ndarray,
+	indicesRightBorder: np.ndarray,
+	hasBorders: np.ndarray
+) -> np.ndarray:
+	"""
+	Locate the last negative smoothed derivation between
+	the borders of every curve.
+
+	Parameters
+	----------
+	isDecreasing : np.ndarray
+		Whether the smoothed derivation is negative.
+	indicesLeftBorder : np.ndarray
+		First index of the searched area of every curve.
+	indicesRightBorder : np.ndarray
+		Index after the searched area of every curve.
+	hasBorders : np.ndarray
+		Whether the borders of a curve could be calculated.
+
+	Returns
+	-------
+	indicesEndOfZeroline : np.ndarray
+		Index of the end of the zero line of every curve,
+		-1 if it could not be located.
+	"""
+	valueIndices = np.arange(isDecreasing.shape[1])
+
+	return get_last_indices(
+		isDecreasing
+		& (valueIndices >= indicesLeftBorder[:, np.newaxis])
+		& (valueIndices < indicesRightBorder[:, np.newaxis]),
+		hasBorders
+	)
+
+def locate_ends_of_zeroline_ratio_of_variances(
+	piezo: np.ndarray,
+	deflection: np.ndarray,
+	correctionSettings: nt.CorrectionSettings = nt.CorrectionSettings(),
+	windowFraction: float = 0.05
+) -> np.ndarray:
+	"""
+	Locate the end of the zero line of every curve as the point
+	with the largest ratio between the variance of the deflection
+	in a window after the point and a window before the point.
+
+	Parameters
+	----------
+	piezo : np.ndarray
+		Piezo (x) values of curves with the same length,
+		one curve per row.
+	deflection : np.ndarray
+		Deflection (y) values of the curves.
+	correctionSettings : nt.CorrectionSettings, optional
+		Not used by this algorithm.
+	windowFraction : float, optional
+		Size of the windows relative to the length of the curves.
+
+	Returns
+	-------
+	indicesEndOfZeroline : np.ndarray
+		Index of the end of the zero line of every curve,
+		-1 if it could not be located.
+	"""
+	numberOfValues = piezo.shape[1]
+	windowSize = max(int(numberOfValues * windowFraction), 3)
+	if numberOfValues < 2 * windowSize:
+		return np.full(len(piezo), -1, dtype=np.int64)
+
+	standardizedDeflection = standardize_rows(deflection)
+	sums = calculate_prefix_sums(standardizedDeflection)
+	squaredSums = calculate_prefix_sums(standardizedDeflection**2)
+
+	windowSums = sums[:, windowSize:] - sums[:, :-windowSize]
+	windowSquaredSums = squaredSums[:, windowSize:] - squaredSums[:, :-windowSize]
+	windowVariances = windowSquaredSums / windowSize - (windowSums / windowSize)**2
+
+	# The window before a candidate starts windowSize values before the window after it.
+	variancesBefore = windowVariances[:, :-windowSize]
+	variancesAfter = windowVariances[:, windowSize:]
+	ratios = variancesAfter / (np.maximum(variancesBefore, 0) + 1e-12)
+
+	return locate_starts_of_attraction(
+		piezo,
+		deflection,
+		np.argmax(ratios, axis=1) + windowSize
+	)
+
+def locate_ends_of_zeroline_change_point(
+	piezo: np.ndarray,
+	deflection: np.ndarray,
+	correctionSettings: nt.CorrectionSettings = nt.CorrectionSettings(),
+	minimumSegmentFraction: float = 0.05
+) -> np.ndarray:
+	"""
+	Locate the end of the zero line of every curve as the change
+	point of the piecewise linear fit with two segments and the
+	smallest sum of squared residuals.
+
+	Parameters
+	----------
+	piezo : np.ndarray
+		Piezo (x) values of curves with the same length,
+		one curve per row.
+	deflection : np.ndarray
+		Deflection (y) values of the curves.
+	correctionSettings : nt.CorrectionSettings, optional
+		Not used by this algorithm.
+	minimumSegmentFraction : float, optional
+		Minimum length of both segments relative to the
+		length of the curves.
+
+	Returns
+	-------
+	indicesEndOfZeroline : np.ndarray
+		Index of the end of the zero line of every curve,
+		-1 if it could not be located.
+	"""
+	numberOfValues = piezo.shape[1]
+	minimumSegmentLength = max(int(numberOfValues * minimumSegmentFraction), 3)
+	if numberOfValues < 2 * minimumSegmentLength:
+		return np.full(len(piezo), -1, dtype=np.int64)
+
+	standardizedPiezo = standardize_rows(piezo)
+	standardizedDeflection = standardize_rows(deflection)
+	_, _, errorsLeft = calculate_prefix_linear_fits(
+		standardizedPiezo,
+		standardizedDeflection
+	)
+	_, _, errorsRight = calculate_prefix_linear_fits(
+		standardizedPiezo[:, ::-1],
+		standardizedDeflection[:, ::-1]
+	)
+
+	changePoints = np.arange(minimumSegmentLength, numberOfValues - minimumSegmentLength + 1)
+	errors = errorsLeft[:, changePoints] + errorsRight[:, numberOfValues - changePoints]
+	isValid = np.isfinite(errors).any(axis=1)
+	errors[~np.isfinite(errors)] = np.inf
+
+	return locate_starts_of_attraction(
+		piezo,
+		deflection,
+		np.where(isValid, changePoints[np.argmin(errors, axis=1)], -1)
+	)
+
+def locate_ends_of_zeroline_goodness_of_fit(
+	piezo: np.ndarray,
+	deflection: np.ndarray,
+	correctionSettings: nt.CorrectionSettings = nt.CorrectionSettings(),
+	noiseFraction: float = 0.25,
+	threshold: float = 4.0,
+	numberOfDeviatingValues: int = 5
+) -> np.ndarray:
+	"""
+	Locate the end of the zero line of every curve by extending
+	a linear fit to the zero line value by value until the next
+	values deviate from the fit by more than the threshold times
+	the standard deviation of its residuals.
+
+	Parameters
+	----------
+	piezo : np.ndarray
+		Piezo (x) values of curves with the same length,
+		one curve per row.
+	deflection : np.ndarray
+		Deflection (y) values of the curves.
+	correctionSettings : nt.CorrectionSettings, optional
+		Not used by this algorithm.
+	noiseFraction : float, optional
+		Part of the curves which always belongs to the zero line.
+	threshold : float, optional
+		Deviation in standard deviations of the residuals
+		from which a value does not fit the zero line.
+	numberOfDeviatingValues : int, optional
+		Number of consecutive deviating values which end
+		the zero line, so single noisy values are ignored.
+
+	Returns
+	-------
+	indicesEndOfZeroline : np.ndarray
+		Index of the end of the zero line of every curve,
+		-1 if it could not be located.
+	"""
+	numberOfValues = piezo.shape[1]
+	minimumZerolineLength = max(int(numberOfValues * noiseFraction), 3)
+	if numberOfValues < minimumZerolineLength + numberOfDeviatingValues:
+		return np.full(len(piezo), -1, dtype=np.int64)
+
+	standardizedPiezo = standardize_rows(piezo)
+	standardizedDeflection = standardize_rows(deflection)
+	slopes, intercepts, errors = calculate_prefix_linear_fits(
+		standardizedPiezo,
+		standardizedDeflection
+	)
+
+	# Predict every value from the fit to all previous values.
+	valueIndices = np.arange(numberOfValues)
+	with np.errstate(divide="ignore", invalid="ignore"):
+		standardDeviations = np.sqrt(errors[:, :-1] / (valueIndices - 2))
+		residuals = standardizedDeflection - (
+			intercepts[:, :-1] + slopes[:, :-1]*standardizedPiezo
+		)
+		isDeviating = np.absolute(residuals) > threshold*standardDeviations
+	isDeviating[:, :minimumZerolineLength] = False
+
+	deviatingSums = calculate_prefix_sums(isDeviating.astype(np.int64))
+	isStartOfDeviation = (
+		deviatingSums[:, numberOfDeviatingValues:]
+		- deviatingSums[:, :-numberOfDeviatingValues]
+	) == numberOfDeviatingValues
+
+	return locate_starts_of_attraction(
+		piezo,
+		deflection,
+		np.where(isStartOfDeviation.any(axis=1), np.argmax(isStartOfDeviation, axis=1), -1)
+	)
+
+def locate_starts_of_attraction(
+	piezo: np.ndarray,
+	deflection: np.ndarray,
+	indicesContact: np.ndarray
+) -> np.ndarray:
+	"""
+	The change point algorithms locate the contact, which is
+	after the attractive part of curves with a jump to contact.
+	Move the end of the zero line back to the start of the last
+	values before the contact, which are below a linear fit to
+	all values before the contact.
+
+	Parameters
+	----------
+	piezo : np.ndarray
+		Piezo (x) values of curves with the same length,
+		one curve per row.
+	deflection : np.ndarray
+		Deflection (y) values of the curves.
+	indicesContact : np.ndarray
+		Index of the located contact of every curve,
+		-1 if it could not be located.
+
+	Returns
+	-------
+	indicesEndOfZeroline : np.ndarray
+		Index of the end of the zero line of every curve,
+		-1 if it could not be located.
+	"""
+	valueIndices = np.arange(piezo.shape[1])
+	hasContact = indicesContact >= 3
+	indicesContact = np.where(hasContact, indicesContact, piezo.shape[1])
+
+	slopes, intercepts = calculate_linear_fits(piezo, deflection, indicesContact)
+	isBelowFit = deflection <= intercepts[:, np.newaxis] + slopes[:, np.newaxis]*piezo
+	indicesLastValueBelowFit = get_last_indices(
+		isBelowFit & (valueIndices < indicesContact[:, np.newaxis]),
+		hasContact
+	)
+	indicesLastValueAboveFit = get_last_indices(
+		~isBelowFit & (valueIndices < indicesLastValueBelowFit[:, np.newaxis]),
+		indicesLastValueBelowFit >= 0
+	)
+
+	return np.where(
+		indicesLastValueBelowFit >= 0,
+		indicesLastValueAboveFit + 1,
+		-1
+	)
+
+def calculate_linear_fits(
+	piezo: np.ndarray,
+	deflection: np.ndarray,
+	numberOfValues: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+	"""
+	Calculate the slope and intercept of a linear regression
+	to the first values of every curve.
+
+	Parameters
+	----------
+	piezo : np.ndarray
+		Piezo (x) values of curves with the same length,
+		one curve per row.
+	deflection : np.ndarray
+		Deflection (y) values of the curves.
+	numberOfValues : np.ndarray, optional
+		Number of fitted values of every curve,
+		by default all values are fitted.
+
+	Returns
+	-------
+	slopes : np.ndarray
+		Slope of the fit to every curve.
+	intercepts : np.ndarray
+		Intercept of the fit to every curve.
+	"""
+	if numberOfValues is None:
+		numberOfValues = np.full(len(piezo), piezo.shape[1])
+	isFitted = np.arange(piezo.shape[1]) < numberOfValues[:, np.newaxis]
+
+	with np.errstate(divide="ignore", invalid="ignore"):
+		meanPiezo = np.sum(piezo, axis=1, where=isFitted) / numberOfValues
+		meanDeflection = np.sum(deflection, axis=1, where=isFitted) / numberOfValues
+		centeredPiezo = piezo - meanPiezo[:, np.newaxis]
+		centeredDeflection = deflection - meanDeflection[:, np.newaxis]
+
+		slopes = (
+			np.sum(centeredPiezo*centeredDeflection, axis=1, where=isFitted)
+			/ np.sum(centeredPiezo**2, axis=1, where=isFitted)
+		)
+	intercepts = meanDeflection - slopes*meanPiezo
+
+	return slopes, intercepts
+
+def calculate_prefix_linear_fits(
+	piezo: np.ndarray,
+	deflection: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+	"""
+	Calculate the linear regression to the first k values of
+	every curve for every k at once from cumulative sums. The
+	values should be standardized to avoid cancellation.
+
+	Parameters
+	----------
+	piezo : np.ndarray
+		Piezo (x) values of curves with the same length,
+		one curve per row.
+	deflection : np.ndarray
+		Deflection (y) values of the curves.
+
+	Returns
+	-------
+	slopes : np.ndarray
+		Slope of the fit to the first k values in column k.
+	intercepts : np.ndarray
+		Intercept of the fit to the first k values in column k.
+	errors : np.ndarray
+		Sum of the squared residuals of the fit to the first
+		k values in column k, nan for less than three values.
+	"""
+	numberOfValues = np.arange(piezo.shape[1] + 1, dtype=np.float64)
+	sumsPiezo = calculate_prefix_sums(piezo)
+	sumsDeflection = calculate_prefix_sums(deflection)
+
+	with np.errstate(divide="ignore", invalid="ignore"):
+		variationsPiezo = calculate_prefix_sums(piezo**2) - sumsPiezo**2 / numberOfValues
+		covariations = (
+			calculate_prefix_sums(piezo*deflection)
+			- sumsPiezo*sumsDeflection / numberOfValues
+		)
+		variationsDeflection = (
+			calculate_prefix_sums(deflection**2) - sumsDeflection**2 / numberOfValues
+		)
+
+		slopes = covariations / variationsPiezo
+		intercepts = (sumsDeflection - slopes*sumsPiezo) / numberOfValues
+		errors = np.maximum(variationsDeflection - slopes*covariations, 0)
+	errors[:, :3] = np.nan
+
+	return slopes, intercepts, errors
+
+def calculate_prefix_sums(values: np.ndarray) -> np.ndarray:
+	"""
+	Calculate the cumulative sums of every row with a
+	leading zero, so column k is the sum of the first
+	k values.
+
+	Parameters
+	----------
+	values : np.ndarray
+		Values of one curve per row.
+
+	Returns
+	-------
+	prefixSums : np.ndarray
+		Cumulative sums with one more column than the values.
+	"""
+	prefixSums = np.zeros((values.shape[0], values.shape[1] + 1), dtype=values.dtype)
+	np.cumsum(values, axis=1, out=prefixSums[:, 1:])
+
+	return prefixSums
+
+def standardize_rows(values: np.ndarray) -> np.ndarray:
+	"""
+	Shift every row to a mean of zero and scale it
+	to a standard deviation of one.
+
+	Parameters
+	----------
+	values : np.ndarray
+		Values of one curve per row.
+
+	Returns
+	-------
+	standardizedValues : np.ndarray
+		Shifted and scaled values.
+	"""
+	standardDeviations = np.std(values, axis=1, keepdims=True)
+	standardDeviations[standardDeviations == 0] = 1
+
+	return (values - np.mean(values, axis=1, keepdims=True)) / standardDeviations
+
+def get_last_indices(
+	isSelected: np.ndarray,
+	isValid: np.ndarray
+) -> np.ndarray:
+	"""
+	Get the index of the last selected value of every row.
+
+	Parameters
+	----------
+	isSelected : np.ndarray
+		Selected values of one curve per row.
+	isValid : np.ndarray
+		Rows in which the index is valid.
+
+	Returns
+	-------
+	lastIndices : np.ndarray
+		Index of the last selected value of every row,
+		-1 if the row is not valid or nothing is selected.
+	"""
+	lastIndices = isSelected.shape[1] - 1 - np.argmax(isSelected[:, ::-1], axis=1)
+
+	return np.where(isValid & isSelected.any(axis=1), lastIndices, -1)
+
+# Defines all available algorithms to locate the end of the zero line.
+contactDetectionMethods = {
+	"derivative": locate_ends_of_zeroline_derivative,
+	"ratioOfVariances": locate_ends_of_zeroline_ratio_of_variances,
+	"changePoint": locate_ends_of_zeroline_change_point,
+	"goodnessOfFit": locate_ends_of_zeroline_goodness_of_fit
+}
@@ -13,14 +13,20 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
 """
-from typing import Tuple
+from typing import List, Tuple, Union
 
 import numpy as np
-from scipy.stats import linregress
-from scipy.ndimage import gaussian_filter1d
 
 import data_processing.custom_exceptions as ce
 import data_processing.named_tuples as nt
+from data_processing.contact_detection import (
+	contactDetectionMethods,
+	calculate_linear_fits
+)
+from force_spectroscopy_data.curve_buffer import CurveBuffer
+
+# Shorter curves can not be corrected.
+minimumCurveLength = 8
 
 def correct_approach_curve(
 	approachCurve: nt.ForceDistanceCurve,
@@ -41,530 +47,397 @@ def correct_approach_curve(
 		Metadata generated during the correction of the curve, which is used for 
 		calculating the different channels.
 	"""
-	correctedDeflectionValues, endOfZeroline, coefficientsFitApproachCurve = correct_deflection_values(
+	correctionParameters, channelMetadata = calculate_correction_parameters(
 		approachCurve
 	)
-	correctedPiezoValues, pointOfContact = correct_piezo_values(
-		approachCurve, 
-		correctedDeflectionValues,
-		endOfZeroline
-	)
-
-	correctedDataApproach = nt.ForceDistanceCurve(
-		piezo=correctedPiezoValues,
-		deflection=correctedDeflectionValues
-	)
-	channelMetadata = nt.ChannelMetadata(
-		endOfZeroline=endOfZeroline,
-		pointOfContact=pointOfContact,
-		coefficientsFitApproachCurve=coefficientsFitApproachCurve
+	correctedDataApproach = apply_correction(
+		approachCurve,
+		correctionParameters
 	)
 
 	return correctedDataApproach, channelMetadata
 
-def correct_deflection_values(
+def calculate_correction_parameters(
 	approachCurve: nt.ForceDistanceCurve,
-) -> Tuple[np.ndarray, nt.ForceDistancePoint, nt.CoefficientsFitApproachCurve]:
+	correctionSettings: nt.CorrectionSettings = nt.CorrectionSettings()
+) -> Tuple[nt.CorrectionParameters, nt.ChannelMetadata]:
 	"""
-	Correct the deflection values of an approach curve by removing the 
-	virtual deflection.
+	Calculate the parameters of the piecewise linear shift, which 
+	moves the point of contact of an approach curve to the origin.
 
 	Parameters
 	----------
 	approachCurves : nt.ForceDistanceCurve
 		Raw approach curve with piezo (x) and deflection (y) values.
-	
-	Returns
-	-------
-	correctedDeflectionValues : np.ndarray
-		Deflection values shifted to zero along the zero line.
-	endOfZeroline : nt.ForceDistancePoint
-		Index, piezo and deflection value from the last point 
-		of the zero line.
-	coefficientsFitApproachCurve : nt.coefficientsFitApproachCurve
-		Slope and intercept value of a lineare fit to the raw data.
-	"""
-	endOfZeroline, coefficientsFitApproachCurve = calculate_end_of_zeroline(
-		approachCurve
-	)
-	fitZeroline = calculate_linear_fit_to_zeroline(
-		approachCurve,
-		endOfZeroline
-	)
-	correctedDeflectionValues = shif_deflection_values(
-		approachCurve,
-		endOfZeroline,
-		fitZeroline
-	)
-
-	return correctedDeflectionValues, endOfZeroline, coefficientsFitApproachCurve
-
-def calculate_end_of_zeroline(
-	approachCurve: nt.ForceDistanceCurve,
-) -> nt.ForceDistancePoint: 
-	"""
-	Calculate the end of the zero line as the last measurement point
-	with a positive slope before the jump to contact.
-
-	Parameters
-	----------
-	approachCurve : nt.ForceDistanceCurve
-		Raw approach curve with piezo (x) and deflection (y) values.
+	correctionSettings : nt.CorrectionSettings, optional
+		Algorithm and parameters which locate the end of the zero line.
 
 	Returns
 	-------
-	endOfZeroline : nt.ForceDistancePoint
-		Index, piezo and deflection value from the last point 
-		of the zero line.
-	coefficientsFitApproachCurve : nt.coefficientsFitApproachCurve
-		Slope and intercept value of a lineare fit to the raw data.
-		
-	"""
-	fitApproachCurve, coefficientsFitApproachCurve = calculate_linear_fit_to_approach_curve(
-		approachCurve
-	)
-	indexLeftBorder, indexRightBorder = calculate_deflection_borders(
-		approachCurve,
-		fitApproachCurve
-	)
-	smoothedDerivationDeflection = calculate_smoothed_derivation(
-		approachCurve
-	)
-	endOfZeroline = locate_end_of_zeroline(
-		approachCurve,
-		smoothedDerivationDeflection,
-		indexLeftBorder,
-		indexRightBorder
-	)
-
-	return endOfZeroline, coefficientsFitApproachCurve
-
-def calculate_linear_fit_to_approach_curve(
-	approachCurve: nt.ForceDistanceCurve
-) -> Tuple[nt.ForceDistanceCurve, nt.CoefficientsFitApproachCurve]:
-	"""
-	Calculate linear regression curve to a raw approach curve.
-
-	Parameters
-	----------
-	approachCurves : nt.ForceDistanceCurve
-		Raw approach curve with piezo (x) and deflection (y) values.
+	correctionParameters : nt.CorrectionParameters
+		Linear fit to the zero line, index of the end of the zero
+		line and piezo value of the point of contact.
+	channelMetadata : nt.ChannelMetadata
+		Metadata generated during the correction of the curve, which is used for 
+		calculating the different channels.
 
-	Returns
-	-------
-	fitApproachCurve : nt.ForceDistanceCurve
-		Linear regression curve with the same piezo (x) values and
-		new calculated deflection (y) values.
-	coefficientsFitApproachCurve : nt.CoefficientsFitApproachCurve
-		Slope (raw stiffness) and intercept (raw offset) of the fitted
-		line.
+	Raises
+	------
+	ce.CorrectionError
+		If the end of the zero line or the zero crossing
+		after it could not be located.
 	"""
-	slope, intercept, _, _, _ = linregress(
-		approachCurve.piezo,
-		approachCurve.deflection
-	)
-	linearDeflectionValues = np.array(
-		intercept + slope*approachCurve.piezo
-	)
+	correctionResult = calculate_correction_parameters_batch(
+		[approachCurve],
+		correctionSettings
+	)[0]
 
-	fitApproachCurve = nt.ForceDistanceCurve(
-		piezo=approachCurve.piezo,
-		deflection=linearDeflectionValues
-	)
-	coefficientsFitApproachCurve = nt.CoefficientsFitApproachCurve(
-		slope=slope,
-		intercept=intercept
-	)
+	if isinstance(correctionResult, ce.CorrectionError):
+		raise correctionResult
 
-	return fitApproachCurve, coefficientsFitApproachCurve
+	return correctionResult
 
-def calculate_smoothed_derivation(
-	approachCurve: nt.ForceDistanceCurve,
-) -> np.ndarray:
+def calculate_correction_parameters_batch(
+	approachCurves: List[nt.ForceDistanceCurve],
+	correctionSettings: nt.CorrectionSettings = nt.CorrectionSettings(),
+	batchSize: int = 256
+) -> List[Union[Tuple[nt.CorrectionParameters, nt.ChannelMetadata], ce.CorrectionError]]:
 	"""
-	Calculate the first derivation of the raw measurement curve and 
-	smooth it.
+	Calculate the correction parameters of many approach curves.
+	Curves with the same length are corrected together as rows
+	of a matrix, batch by batch.
 
 	Parameters
 	----------
-	approachCurve : nt.ForceDistanceCurve
-		Raw approach curve with piezo (x) and deflection (y) values.
+	approachCurves : list[nt.ForceDistanceCurve]
+		Raw approach curves with piezo (x) and deflection (y) values.
+	correctionSettings : nt.CorrectionSettings, optional
+		Algorithm and parameters which locate the end of the zero line.
+	batchSize : int, optional
+		Number of curves which are corrected at once.
 
 	Returns
 	-------
-	smoothedDerivationDeflection : np.ndarray
-		Smoothed first derivation of the deflection (y) values.
-	"""
-	derivationDeflection = derivate_curve(approachCurve)
-	smoothedDerivationDeflection = smooth_derivation(derivationDeflection)
-
-	return smoothedDerivationDeflection
+	correctionResults : list
+		Correction parameters and channel metadata of every
+		curve or the error if the curve could not be corrected.
+	"""
+	locate_ends_of_zeroline = contactDetectionMethods[correctionSettings.contactDetection]
+	correctionResults = [None] * len(approachCurves)
+
+	for indices in get_batches_of_equal_length(approachCurves, batchSize):
+		piezo, deflection = get_curve_matrices(approachCurves, indices)
+		if piezo.shape[1] < minimumCurveLength:
+			batchResults = [ce.UnableToLocateEndOfZerolineError()] * len(indices)
+		else:
+			batchResults = calculate_correction_parameters_matrix(
+				piezo,
+				deflection,
+				locate_ends_of_zeroline(piezo, deflection, correctionSettings)
+			)
+		for index, correctionResult in zip(indices, batchResults):
+			correctionResults[index] = correctionResult
+
+	return correctionResults
+
+def get_batches_of_equal_length(
+	approachCurves: List[nt.ForceDistanceCurve],
+	batchSize: int
+) -> List[np.ndarray]:
+	"""
+	Group the curves by their length and split the groups
+	into batches.
 
-def derivate_curve(
-	approachCurve: nt.ForceDistanceCurve,
-) -> np.ndarray:
-	"""
-	Calculate the first derivation of the deflection (y) values
-	of the approach curve.
-	
 	Parameters
 	----------
-	approachCurve : nt.ForceDistanceCurve
-		Raw approach curve with piezo (x) and deflection (y) values.
+	approachCurves : list[nt.ForceDistanceCurve]
+		Raw approach curves with piezo (x) and deflection (y) values.
+	batchSize : int
+		Maximum number of curves in a batch.
 
 	Returns
 	-------
-	derivationDeflection : np.ndarray
-		First derivate of the deflection (y) values.
+	batches : list[np.ndarray]
+		Indices of the curves in every batch.
 	"""
-	return (
-		np.diff(approachCurve.deflection) / np.diff(approachCurve.piezo)
+	curveLengths = np.array(
+		[len(approachCurve.piezo) for approachCurve in approachCurves],
+		dtype=np.int64
 	)
+	batches = []
 
-def smooth_derivation(
-	derivationDeflection: np.ndarray,
-	smoothFactor: int = 10
-) -> np.ndarray:
-	"""
-	Smooth the first derivation of the deflection (y) values
-	of the approach curve.
-	
-	Parameters
-	----------
-	derivationDeflection : np.ndarray
-		First derivate of the deflection (y) values.
-	smoothFactor : int
+	for curveLength in np.unique(curveLengths):
+		indices = np.flatnonzero(curveLengths == curveLength)
+		batches.extend(
+			indices[start:start + batchSize]
+			for start in range(0, len(indices), batchSize)
+		)
 
+	return batches
 
-	Returns
-	-------
-	smoothedDerivationDeflection : np.ndarray
-		Smoothed first derivation of the deflection (y) values.
+def get_curve_matrices(
+	approachCurves: List[nt.ForceDistanceCurve],
+	indices: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
 	"""
-	return gaussian_filter1d(
-		derivationDeflection,
-		sigma=smoothFactor
-	)
+	Copy curves with the same length into two matrices
+	with one curve per row.
 
-def calculate_deflection_borders(
-	approachCurve: nt.ForceDistanceCurve,
-	fitApproachCurve: nt.ForceDistanceCurve
-) -> Tuple[int, int, nt.CoefficientsFitApproachCurve]:
-	"""
-	Calculates borders to restrict the area in which the 
-	end of the zero line is searched for.
-	
 	Parameters
 	----------
-	approachCurves : namedTuple
-		Raw approach curve with piezo (x) and deflection (y) values.
-	fitApproachCurve : nt.ForceDistanceCurve
-		Linear curve fit to the approach curve with the same 
-		piezo (x) values and adjusted deflection (y) values.
+	approachCurves : list[nt.ForceDistanceCurve]
+		Raw approach curves with piezo (x) and deflection (y) values.
+	indices : np.ndarray
+		Indices of the copied curves.
 
 	Returns
 	-------
-	indexLeftBorder : int
-		Index of the first intersection point between the approach curve
-		and it's linear fit.
-	indexMaxDeflectionDifference: int
-		Index of the point with the maximum deflection difference
-		within in area between the two intersections, slighty 
-		shifted to the right.
+	piezo : np.ndarray
+		Piezo (x) values of the curves.
+	deflection : np.ndarray
+		Deflection (y) values of the curves.
 	"""
-	indexFirstIntersection, indexLastIntersection = calculate_curve_intersections(
-		approachCurve, 
-		fitApproachCurve
+	# The curves might be stored in float32, the fits are calculated in float64.
+	piezo = np.array(
+		[approachCurves[index].piezo for index in indices],
+		dtype=np.float64
 	)
-	indexMaxDeflectionDifference = calculate_maximum_deflection_difference(
-		approachCurve, 
-		fitApproachCurve,
-		indexFirstIntersection,
-		indexLastIntersection
+	deflection = np.array(
+		[approachCurves[index].deflection for index in indices],
+		dtype=np.float64
 	)
 
-	return indexFirstIntersection, indexMaxDeflectionDifference
+	return piezo, deflection
 
-def calculate_curve_intersections(
-	approachCurve: nt.ForceDistanceCurve,
-	fitApproachCurve: nt.ForceDistanceCurve
-) -> Tuple[int]:
+def calculate_correction_parameters_matrix(
+	piezo: np.ndarray,
+	deflection: np.ndarray,
+	indicesEndOfZeroline: np.ndarray
+) -> List[Union[Tuple[nt.CorrectionParameters, nt.ChannelMetadata], ce.CorrectionError]]:
 	"""
-	Calculate intersections of the approach curve and it's linear 
-	fit.
+	Fit the zero line of curves with the same length, shift their
+	deflection values along it and locate the point of contact as
+	the last zero crossing after the end of the zero line.
 
 	Parameters
 	----------
-	approachCurves : namedTuple
-		Raw approach curve with piezo (x) and deflection (y) values.
-	fitApproachCurve : nt.ForceDistanceCurve
-		Linear curve fit to the approach curve with the same 
-		piezo (x) values and adjusted deflection (y) values.
-		
+	piezo : np.ndarray
+		Raw piezo (x) values, one curve per row.
+	deflection : np.ndarray
+		Raw deflection (y) values, one curve per row.
+	indicesEndOfZeroline : np.ndarray
+		Index of the end of the zero line of every curve,
+		-1 if it could not be located.
+
 	Returns
 	-------
-	indexFirstIntersection : int 
-		Index of the first intersection point.
-	indexLastIntersection : int
-		Index of the last intersection point.
-	"""
-	innerIntersection = np.where(
-		approachCurve.deflection < fitApproachCurve.deflection
-	)[0]
-
-	indexFirstIntersection = innerIntersection[0]
-	indexLastIntersection = innerIntersection[-1]
-	
-	return indexFirstIntersection, indexLastIntersection
-
-def calculate_maximum_deflection_difference(
+	correctionResults : list
+		Correction parameters and channel metadata of every
+		curve or the error if the curve could not be corrected.
+	"""
+	numberOfCurves, numberOfValues = piezo.shape
+	curveIndices = np.arange(numberOfCurves)
+	# The zero line is fitted to the values before its end.
+	hasZeroline = indicesEndOfZeroline >= 2
+	indicesEndOfZeroline = np.where(hasZeroline, indicesEndOfZeroline, numberOfValues)
+
+	slopes, intercepts = calculate_linear_fits(piezo, deflection)
+	slopesZeroline, interceptsZeroline = calculate_linear_fits(
+		piezo,
+		deflection,
+		indicesEndOfZeroline
+	)
+
+	isZeroline = np.arange(numberOfValues) < indicesEndOfZeroline[:, np.newaxis]
+	fittedDeflection = interceptsZeroline[:, np.newaxis] + slopesZeroline[:, np.newaxis]*piezo
+	correctedDeflection = deflection - np.where(
+		isZeroline,
+		fittedDeflection,
+		fittedDeflection[curveIndices, indicesEndOfZeroline - 1][:, np.newaxis]
+	)
+	isAttraction = (correctedDeflection <= 0) & ~isZeroline
+	hasZeroCrossing = isAttraction.any(axis=1)
+	indicesZeroCrossing = numberOfValues - 1 - np.argmax(isAttraction[:, ::-1], axis=1)
+
+	correctionResults = []
+	for index in curveIndices:
+		if not hasZeroline[index]:
+			correctionResults.append(ce.UnableToLocateEndOfZerolineError())
+			continue
+		if not hasZeroCrossing[index]:
+			correctionResults.append(ce.UnableToLocateZeroCrossingAfterEozlError())
+			continue
+
+		indexEndOfZeroline = int(indicesEndOfZeroline[index])
+		pointOfContact = interpolate_unshifted_point_of_contact(
+			nt.ForceDistanceCurve(piezo[index], deflection[index]),
+			int(indicesZeroCrossing[index])
+		)
+		correctionResults.append((
+			nt.CorrectionParameters(
+				coefficientsFitZeroline=nt.CoefficientsFitApproachCurve(
+					slope=slopesZeroline[index],
+					intercept=interceptsZeroline[index]
+				),
+				indexEndOfZeroline=indexEndOfZeroline,
+				piezoPointOfContact=pointOfContact.piezo
+			),
+			nt.ChannelMetadata(
+				endOfZeroline=nt.ForceDistancePoint(
+					index=indexEndOfZeroline,
+					piezo=piezo[index, indexEndOfZeroline],
+					deflection=deflection[index, indexEndOfZeroline]
+				),
+				pointOfContact=pointOfContact,
+				coefficientsFitApproachCurve=nt.CoefficientsFitApproachCurve(
+					slope=slopes[index],
+					intercept=intercepts[index]
+				)
+			)
+		))
+
+	return correctionResults
+
+def apply_correction(
 	approachCurve: nt.ForceDistanceCurve,
-	fitApproachCurve: nt.ForceDistanceCurve,
-	indexFirstIntersection: int,
-	indexLastIntersection: int
-) -> int:
+	correctionParameters: nt.CorrectionParameters
+) -> nt.ForceDistanceCurve:
 	"""
-	Calculate the point with the maximum deflection difference
-	within the area between the two intersections and shift it
-	lightly to the right.
+	Shift the deflection values along the zero line and the piezo
+	values along the point of contact. The corrected curve has the
+	same data type as the raw curve.
 
 	Parameters
 	----------
-	approachCurves : namedTuple
+	approachCurve : nt.ForceDistanceCurve
 		Raw approach curve with piezo (x) and deflection (y) values.
-	fitApproachCurve : nt.ForceDistanceCurve
-		Linear curve fit to the approach curve with the same 
-		piezo (x) values and adjusted deflection (y) values.
-	indexFirstIntersection : int
-		Index of the first intersection point of the approach curve
-		and it's linear fit.
-	indexLastIntersection : int
-		Index of the last intersection point of the approach curve
-		and it's linear fit.
+	correctionParameters : nt.CorrectionParameters
+		Linear fit to the zero line, index of the end of the zero
+		line and piezo value of the point of contact.
 
 	Returns
 	-------
-	adjustedIndexMaxDeflectionDifference : int
-		Index of the point with the maximum deflection difference
-		within in area between the two intersections, slighty 
-		shifted to the right.
+	correctedCurveData : nt.ForceDistanceCurve 
+		Corrected approach curve with shifted piezo (x) and deflection (y) values.
 	"""
-	deflectionDifferences = np.absolute(
-		fitApproachCurve.deflection - approachCurve.deflection
-	)
+	dtype = np.result_type(approachCurve.piezo, approachCurve.deflection)
+	piezo = np.asarray(approachCurve.piezo, dtype=np.float64)
 
-	indexMaxDeflectionDifference = np.argmax(
-		deflectionDifferences[indexFirstIntersection:indexLastIntersection]
-	) + indexFirstIntersection
-
-	adjustedIndexMaxDeflectionDifference = int(
-		indexMaxDeflectionDifference 
-		+ ((indexLastIntersection - indexMaxDeflectionDifference) * 0.05)
+	correctedDeflectionValues = shift_deflection_values_along_zeroline(
+		nt.ForceDistanceCurve(
+			piezo=piezo,
+			deflection=np.asarray(approachCurve.deflection, dtype=np.float64)
+		),
+		correctionParameters.indexEndOfZeroline,
+		correctionParameters.coefficientsFitZeroline
 	)
+	correctedPiezoValues = piezo - correctionParameters.piezoPointOfContact
 
-	return adjustedIndexMaxDeflectionDifference
+	return nt.ForceDistanceCurve(
+		piezo=correctedPiezoValues.astype(dtype, copy=False),
+		deflection=correctedDeflectionValues.astype(dtype, copy=False)
+	)
 
-def locate_end_of_zeroline(
-	approachCurve: nt.ForceDistanceCurve,
-	smoothedDerivationDeflection: np.ndarray,
-	indexLeftBorder: int, 
-	indexRightBorder: int
-) -> nt.ForceDistancePoint:
+def apply_correction_to_curve_buffer(
+	curveBuffer: CurveBuffer,
+	correctionParameters: List[nt.CorrectionParameters]
+) -> CurveBuffer:
 	"""
-	Locate the end of the zero line as the first point with 
-	a negative slope before the jump to contact.
+	Correct every raw curve of a curve buffer at once. The result
+	is equal to applying the correction to every single curve.
 
 	Parameters
 	----------
-	approachCurve : nt.ForceDistanceCurve
-		Raw approach curve with piezo (x) and deflection (y) values.
-	smoothedDerivationDeflection : np.ndarray
-		Smoothed first derivation of the deflection (y) values
-		of the approach curve.
-	indexLeftBorder : int
-		Index of the first intersection point of the approach curve
-		and it's linear fit.
-	indexRightBorder : int
-		Index of the point with the maximum deflection difference
-		in the attractive area.
+	curveBuffer : CurveBuffer
+		Raw piezo (x) and deflection (y) values of the curves.
+	correctionParameters : list[nt.CorrectionParameters]
+		Correction parameters of every curve in the buffer.
 
 	Returns
 	-------
-	endOfZeroline : nt.ForceDistancePoint
-		Index, piezo and deflection value of the end of the 
-		zero line.
-
-	Raises
-	------
-	ce.UnableToLocateEndOfZerolineError : CorrectionError
-		If there are no points with a negative slope within 
-		the area of the left and right border.
+	correctedCurveBuffer : CurveBuffer
+		Corrected piezo (x) and deflection (y) values of
+		the curves with the same offsets and curve ids.
 	"""
-	pointsWithDecreasingDeflection = np.where(
-		smoothedDerivationDeflection[indexLeftBorder:indexRightBorder] < 0
+	curveLengths = curveBuffer.get_curve_lengths()
+	slopes = np.array(
+		[parameters.coefficientsFitZeroline.slope for parameters in correctionParameters],
+		dtype=np.float64
+	)
+	intercepts = np.array(
+		[parameters.coefficientsFitZeroline.intercept for parameters in correctionParameters],
+		dtype=np.float64
+	)
+	indicesEndOfZeroline = np.array(
+		[parameters.indexEndOfZeroline for parameters in correctionParameters],
+		dtype=np.int64
+	)
+	piezoPointsOfContact = np.array(
+		[parameters.piezoPointOfContact for parameters in correctionParameters],
+		dtype=np.float64
 	)
 
-	try:
-		indexEndOfZeroline = pointsWithDecreasingDeflection[0][-1] + indexLeftBorder
-	except IndexError as e:
-		raise ce.UnableToLocateEndOfZerolineError from e
-	else:
-		return nt.ForceDistancePoint(
-			index=indexEndOfZeroline,
-			piezo=approachCurve.piezo[indexEndOfZeroline],
-			deflection=approachCurve.deflection[indexEndOfZeroline]
-		)
+	piezo = curveBuffer.piezo.astype(np.float64)
+	deflection = curveBuffer.deflection.astype(np.float64)
 
-def calculate_linear_fit_to_zeroline(
-	approachCurve: nt.ForceDistanceCurve,
-	endOfZeroline: nt.ForceDistancePoint
-) -> nt.ForceDistanceCurve:
-	"""
-	Calculate linear regression curve to the zeroline of the raw
-	approach curve.
-
-	Parameters
-	----------
-	approachCurve : nt.ForceDistanceCurve
-		Raw approach curve with piezo (x) and deflection (y) values.
-	endOfZeroline : nt.ForceDistancePoint
-		Index, piezo and deflection value of the end of the 
-		zero line.
-
-	Returns
-	-------
-	fitApproachCurve : nt.ForceDistanceCurve
-		Linear regression curve to the zero line, with raw 
-		piezo (x) values and fitted deflection (y) values.
-	"""
-	slope, intercept, _, _, _ = linregress(
-		approachCurve.piezo[0:endOfZeroline.index],
-		approachCurve.deflection[0:endOfZeroline.index]
+	# The values after the end of the zero line are shifted by the last fitted value.
+	piezoEndOfZeroline = piezo[curveBuffer.offsets[:-1] + indicesEndOfZeroline - 1]
+	shiftsAfterZeroline = intercepts + slopes*piezoEndOfZeroline
+	isZeroline = (
+		curveBuffer.get_value_indices() 
+		< np.repeat(indicesEndOfZeroline, curveLengths)
 	)
-
-	linearZerolineDeflectionValues = np.array(
-		intercept + slope*approachCurve.piezo[0:endOfZeroline.index]
+	shifts = np.where(
+		isZeroline,
+		np.repeat(intercepts, curveLengths) + np.repeat(slopes, curveLengths)*piezo,
+		np.repeat(shiftsAfterZeroline, curveLengths)
 	)
 
-	fitApproachCurve = nt.ForceDistanceCurve(
-		piezo=approachCurve.piezo[0:endOfZeroline.index],
-		deflection=linearZerolineDeflectionValues
+	return CurveBuffer(
+		(piezo - np.repeat(piezoPointsOfContact, curveLengths)).astype(
+			curveBuffer.piezo.dtype, copy=False
+		),
+		(deflection - shifts).astype(curveBuffer.deflection.dtype, copy=False),
+		curveBuffer.offsets,
+		curveBuffer.curveIds
 	)
 
-	return fitApproachCurve
-
-def shif_deflection_values(
+def shift_deflection_values_along_zeroline(
 	approachCurve: nt.ForceDistanceCurve,
-	endOfZeroline: nt.ForceDistancePoint,
-	fitZeroline: nt.ForceDistanceCurve
+	indexEndOfZeroline: int,
+	coefficientsFitZeroline: nt.CoefficientsFitApproachCurve
 ) -> np.ndarray:
 	"""
-	Shift the deflection values along the zero line to zero.
-	Values to the end of the zero line are smoothed.
+	Subtract the linear fit to the zero line from the deflection values
+	up to the end of the zero line and the last fitted value from the 
+	remaining deflection values.
 
 	Parameters
 	----------
 	approachCurve : nt.ForceDistanceCurve
 		Raw approach curve with piezo (x) and deflection (y) values.
-	endOfZeroline : nt.ForceDistancePoint
-		Index, piezo and deflection value of the end of the 
-		zero line.
-	fitZeroline : nt.ForceDistanceCurve
-		Linear regression curve to the zero line, with raw 
-		piezo (x) values and fitted deflection (y) values.
+	indexEndOfZeroline : int
+		Index of the end of the zero line.
+	coefficientsFitZeroline : nt.CoefficientsFitApproachCurve
+		Slope and intercept of the linear fit to the zero line.
 
 	Returns
 	-------
 	correctedDeflectionValues : np.ndarray
 		Deflection values shifted to zero along the zero line.
 	"""
+	fittedDeflectionValues = (
+		coefficientsFitZeroline.intercept 
+		+ coefficientsFitZeroline.slope*approachCurve.piezo[0:indexEndOfZeroline]
+	)
+
 	return np.concatenate(
 		[
-			approachCurve.deflection[0:endOfZeroline.index] - fitZeroline.deflection,
-			approachCurve.deflection[endOfZeroline.index:] - fitZeroline.deflection[-1]
+			approachCurve.deflection[0:indexEndOfZeroline] - fittedDeflectionValues,
+			approachCurve.deflection[indexEndOfZeroline:] - fittedDeflectionValues[-1]
 		]
 	)
 
-def correct_piezo_values(
-	approachCurve: nt.ForceDistanceCurve, 
-	correctedDeflectionValues: np.ndarray, 
-	endOfZeroline: nt.ForceDistancePoint
-) -> Tuple[np.ndarray, nt.ForceDistancePoint]:
-	"""
-	Correct the piezo values of an approach curve by removing the 
-	virtual topography offset.
-
-	Parameters
-	----------
-	approachCurve : nt.ForceDistanceCurve
-		Raw approach curve with piezo (x) and deflection (y) values.
-	correctedDeflectionValues : np.ndarray
-		Deflection (y) values shifted to zero along the zero line.
-	endOfZeroline : nt.ForceDistancePoint
-		Index, piezo (x) and deflection (y) value from the last 
-		point of the zero line.
-
-	Returns
-	-------
-	correctedPiezoValues : np.ndarray
-		Piezo values shifted to zero with the unshifted point of contact.
-	unshiftedPointOfContact : nt.ForceDistancePoint
-		Index, piezo and deflection value from the point of contact
-		before the shift along the x axis.
-	"""
-	indexZeroCrossing = locate_index_zero_crossing(
-		correctedDeflectionValues,
-		endOfZeroline
-	)
-	unshiftedPointOfContact = interpolate_unshifted_point_of_contact(
-		approachCurve,
-		indexZeroCrossing
-	)
-	correctedPiezoValues = shif_piezo_values(
-		approachCurve,
-		unshiftedPointOfContact
-	)
-
-	return correctedPiezoValues, unshiftedPointOfContact
-
-def locate_index_zero_crossing(
-	correctedDeflectionValues: np.ndarray,
-	endOfZeroline: nt.ForceDistancePoint
-) -> int:
-	"""
-	Locate the first zero crossing after the end of the zeroline.
-
-	Parameters
-	----------
-	correctedDeflectionValues : np.ndarray
-		Already corrected deflection values shifted to zero 
-		along the end of the zero line.
-	endOfZeroline : nt.ForceDistancePoint
-		Index, piezo and deflection value of the end of the 
-		zero line.
-
-	Returns
-	-------
-	indexZeroCrossing : int
-		Index of the last point after the end of the zeroline
-		with a deflection value samller or equal to zero.
-
-	Raises
-	------
-	ce.UnableToLocateZeroCrossingAfterEozlError : CorrectionError
-		If no negative values exist after the end of the zeroline.
-	"""
-	deflectionAttractionPart = np.where(
-		correctedDeflectionValues[endOfZeroline.index:] <= 0
-	)[0]
-
-	try: 
-		indexZeroCrossing = deflectionAttractionPart[-1] + endOfZeroline.index
-	except IndexError as e:
-		raise ce.UnableToLocateZeroCrossingAfterEozlError from e
-	else:
-		return indexZeroCrossing
-
 def interpolate_unshifted_point_of_contact(
 	approachCurve: nt.ForceDistanceCurve,
 	indexZeroCrossing: int
@@ -597,27 +470,3 @@ def interpolate_unshifted_point_of_contact(
 		piezo=piezoUnshiftedPointOfContact,
 		deflection=0
 	)
-
-def shif_piezo_values(
-	approachCurve: nt.ForceDistanceCurve,
-	unshiftedPointOfContact: nt.ForceDistancePoint
-) -> np.ndarray:
-	"""
-	Shift the piezo values along the point of contact to zero.
-
-	Parameters
-	----------
-	approachCurve : nt.ForceDistanceCurve
-		Raw approach curve with piezo (x) and deflection (y) values.
-	unshiftedPointOfContact : nt.ForceDistancePoint
-		Index, piezo and deflection value of the point of contact
-		before the correction of the piezo values.
-
-	Returns
-	-------
-	correctedPiezoValues : np.ndarray
-		Piezo values shifted to zero along the point of contact.
-	"""
-	return (
-		approachCurve.piezo - unshiftedPointOfContact.piezo
-	)
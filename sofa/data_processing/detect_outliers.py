@@ -0,0 +1,194 @@
+"""
+This file is part of SOFA.
+SOFA is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+SOFA is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from typing import Dict, List
+
+import numpy as np
+
+import data_processing.named_tuples as nt
+from data_processing.calculate_average import interpolate_normed_curves
+
+# Scales the median absolute deviation to the standard deviation of normal distributed values.
+madToStandardDeviation = 1.4826
+
+def detect_outliers(
+	forceDistanceCurves: List,
+	channelData: Dict[str, np.ndarray],
+	inactiveDataPoints: List[int],
+	outlierParameters: nt.OutlierParameters,
+	numberOfDataPoints: int = 2000
+) -> nt.OutlierScores:
+	"""
+	Score every active corrected curve with robust statistics
+	and mark the curves whose score exceeds the threshold.
+	The curves are compared to the median curve on the grid
+	of the average and every selected channel is compared to
+	the median of its values.
+
+	Parameters
+	----------
+	forceDistanceCurves : list[ForceDistanceCurve]
+		Every force distance curve of the force volume.
+	channelData : dict[str, np.ndarray]
+		Unoriented values of the channels of the force volume.
+	inactiveDataPoints : list[int]
+		Indices of inactive data points/force
+		distance curves, which are not scored.
+	outlierParameters : nt.OutlierParameters
+		Threshold of the robust z-scores, scored channels
+		and whether curves with artifacts are outliers.
+	numberOfDataPoints : int, optional
+		Number of grid points of the non contact and
+		contact part.
+
+	Returns
+	-------
+	outlierScores : nt.OutlierScores
+		Robust z-scores of the distance to the median curve
+		and of every channel, the artifact flag and whether
+		a curve is an outlier, nan or false for inactive
+		and uncorrected curves.
+	"""
+	numberOfCurves = len(forceDistanceCurves)
+	isActive = np.array([
+		forceDistanceCurve.couldBeCorrected
+		for forceDistanceCurve in forceDistanceCurves
+	], dtype=bool)
+	isActive[np.asarray(inactiveDataPoints, dtype=np.int64)] = False
+	activeIndices = np.flatnonzero(isActive)
+
+	curveDistance = np.full(numberOfCurves, np.nan)
+	if len(activeIndices) > 0:
+		normedCurves = interpolate_normed_curves(
+			[forceDistanceCurves[index] for index in activeIndices],
+			numberOfDataPoints
+		)
+		curveDistance[activeIndices] = calculate_robust_z_scores(
+			calculate_curve_distances(normedCurves)
+		)
+
+	channelScores = {}
+	for channelName in outlierParameters.channels:
+		scores = np.full(numberOfCurves, np.nan)
+		scores[activeIndices] = calculate_robust_z_scores(
+			np.asarray(channelData[channelName], dtype=np.float64).ravel()[activeIndices]
+		)
+		channelScores[channelName] = scores
+
+	hasArtifacts = isActive & (
+		np.asarray(channelData["curvesWithArtifacts"]).ravel() == 1
+	)
+
+	isOutlier = curveDistance > outlierParameters.threshold
+	for scores in channelScores.values():
+		isOutlier |= np.abs(scores) > outlierParameters.threshold
+	if outlierParameters.useArtifactFlag:
+		isOutlier |= hasArtifacts
+
+	return nt.OutlierScores(
+		curveDistance=curveDistance,
+		channelScores=channelScores,
+		hasArtifacts=hasArtifacts,
+		isOutlier=isOutlier
+	)
+
+def calculate_curve_distances(
+	normedCurves: nt.NormedCurves
+) -> np.ndarray:
+	"""
+	Calculate the distance of every interpolated curve
+	to the median curve. At every grid point the deviation
+	is scaled by the median absolute deviation of all curves,
+	so parts with a large spread weigh less.
+
+	Parameters
+	----------
+	normedCurves : nt.NormedCurves
+		Interpolated non contact and contact part of
+		every active curve.
+
+	Returns
+	-------
+	curveDistances : np.ndarray
+		Root mean square of the scaled deviations
+		of every curve.
+	"""
+	scaledDeviations = [
+		calculate_scaled_deviations(normedCurves.deflectionNonContact),
+		calculate_scaled_deviations(normedCurves.deflectionContact)
+	]
+
+	return np.sqrt(
+		np.mean(np.concatenate(scaledDeviations, axis=1)**2, axis=1)
+	)
+
+def calculate_scaled_deviations(
+	curveMatrix: np.ndarray
+) -> np.ndarray:
+	"""
+	Calculate the deviation of every value from the median
+	of its grid point in units of the median absolute deviation.
+
+	Parameters
+	----------
+	curveMatrix : np.ndarray
+		Interpolated values with one row per curve.
+
+	Returns
+	-------
+	scaledDeviations : np.ndarray
+		Scaled deviation of every value, zero at grid
+		points without any spread.
+	"""
+	curveMatrix = np.asarray(curveMatrix, dtype=np.float64)
+	deviations = curveMatrix - np.median(curveMatrix, axis=0)
+	spread = madToStandardDeviation * np.median(np.abs(deviations), axis=0)
+
+	scaledDeviations = np.zeros_like(deviations)
+	np.divide(deviations, spread, out=scaledDeviations, where=spread > 0)
+
+	return scaledDeviations
+
+def calculate_robust_z_scores(
+	values: np.ndarray
+) -> np.ndarray:
+	"""
+	Calculate the z-scores of values with the median
+	and the median absolute deviation, which are not
+	affected by a few outliers.
+
+	Parameters
+	----------
+	values : np.ndarray
+		One dimensional values, nan values are ignored.
+
+	Returns
+	-------
+	zScores : np.ndarray
+		Robust z-score of every value, zero if the values
+		have no spread and nan for nan values.
+	"""
+	zScores = np.full(len(values), np.nan)
+	isValid = np.isfinite(values)
+	if not np.any(isValid):
+		return zScores
+
+	median = np.median(values[isValid])
+	spread = madToStandardDeviation * np.median(np.abs(values[isValid] - median))
+	zScores[isValid] = 0.0
+	if spread > 0:
+		zScores[isValid] = (values[isValid] - median) / spread
+
+	return zScores
@@ -14,13 +14,39 @@ You should have received a copy of the GNU General Public License
 along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
 """
 import os
-from typing import List, Tuple, Dict
+from typing import Iterator, List, Optional, Sequence, Tuple, Dict
 import functools
+import gzip
+import json
+import pickle
+import zipfile
 
 import numpy as np
-import pandas as pd
 
 import data_processing.named_tuples as nt
+from force_spectroscopy_data.curve_buffer import (
+	calculate_offsets,
+	get_value_dtype,
+	iterate_curve_buffers
+)
+from force_spectroscopy_data.corrected_curves import (
+	CorrectedCurves,
+	materialize_corrected_curves
+)
+from utilities.instrumentation import decorator_measure_stage
+from utilities.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+h5py = lazy_import("h5py")
+
+try:
+	pa = lazy_import("pyarrow")
+except ModuleNotFoundError:
+	# The export to .parquet files is only available if pyarrow is installed.
+	pa = None
+
+curveTypes = ["raw", "corrected"]
+valueNames = ["piezo", "deflection"]
 
 def decorator_check_average(function):
 	"""Check if average data exists."""
@@ -34,6 +60,13 @@ def decorator_check_average(function):
 
 	return wrapper_check_average
 
+def count_exported_curves(forceVolume, *args, **kwargs) -> int:
+	"""
+	Get the number of curves of an exported force volume
+	for the measurement of the export stages.
+	"""
+	return len(forceVolume.forceDistanceCurves)
+
 def setup_output_folder(
 	folderPath: str,
 	folderName: str
@@ -62,13 +95,20 @@ def setup_output_folder(
 
 	return outputFolderPath
 
+@decorator_measure_stage(name="export.csv", count_curves=count_exported_curves)
 def export_to_csv(
 	forceVolume, 
 	pathOutputFolder: str, 
+	compress: bool = False,
+	chunkSize: int = 1000,
+	dataFramesForceVolume: Optional[nt.DataFramesForceVolume] = None
 ) -> None:
 	"""
 	Export the processed data of the imported 
-	force volume to the .csv file format.
+	force volume to the .csv file format. The raw and 
+	corrected curves are streamed chunk by chunk in long
+	format into a single file, the meta data, average 
+	and channels are written to separate files.
 
 	Parameters
 	----------
@@ -77,32 +117,74 @@ def export_to_csv(
 		imported measurement.
 	pathOutputFolder : str
 		Path to the folder in which the data will be stored.
+	compress : bool
+		Compress every file with gzip.
+	chunkSize : int
+		Number of curves which are written at once.
+	dataFramesForceVolume : nt.DataFramesForceVolume, optional
+		Already created data frames of the force volume.
 	"""
-	dataFramesForceVolume = get_force_volume_data(forceVolume)
-	dataFrameCombinedCurveData = combine_data_frames(
-		[
-			dataFramesForceVolume.rawCurves,
-			dataFramesForceVolume.correctedCurves,
-			dataFramesForceVolume.averageData,
-		]
-	)
+	fileExtension = ".csv.gz" if compress else ".csv"
+
+	if dataFramesForceVolume is None:
+		dataFrameMetaData = create_data_frame_metadata(forceVolume)
+		dataFrameChannelData = create_data_frame_channel_data(forceVolume.channels)
+		dataFrameAverageData = create_data_frame_average_data(forceVolume)
+	else:
+		dataFrameMetaData = dataFramesForceVolume.metaData
+		dataFrameChannelData = dataFramesForceVolume.channelData
+		dataFrameAverageData = dataFramesForceVolume.averageData
 
 	write_csv_file(
-		dataFramesForceVolume.metaData,
-		os.path.join(pathOutputFolder, "meta_data.csv")
+		dataFrameMetaData,
+		os.path.join(pathOutputFolder, "meta_data" + fileExtension)
 	)
 	write_csv_file(
-		dataFrameCombinedCurveData,
-		os.path.join(pathOutputFolder, "curve_data.csv")
+		dataFrameChannelData,
+		os.path.join(pathOutputFolder, "channel_data" + fileExtension)
 	)
 	write_csv_file(
-		dataFramesForceVolume.channelData,
-		os.path.join(pathOutputFolder, "channel_data.csv")
+		dataFrameAverageData,
+		os.path.join(pathOutputFolder, "average_data" + fileExtension)
+	)
+	write_curve_data_csv_file(
+		forceVolume,
+		os.path.join(pathOutputFolder, "curve_data" + fileExtension),
+		chunkSize
+	)
+
+@decorator_measure_stage(name="export.csv.gz", count_curves=count_exported_curves)
+def export_to_csv_gzip(
+	forceVolume, 
+	pathOutputFolder: str,
+	dataFramesForceVolume: Optional[nt.DataFramesForceVolume] = None
+) -> None:
+	"""
+	Export the processed data of the imported 
+	force volume to gzip compressed .csv files.
+
+	Parameters
+	----------
+	forceVolume : ForceVolume
+		Contains the raw and calculated data from the 
+		imported measurement.
+	pathOutputFolder : str
+		Path to the folder in which the data will be stored.
+	dataFramesForceVolume : nt.DataFramesForceVolume, optional
+		Already created data frames of the force volume.
+	"""
+	export_to_csv(
+		forceVolume, 
+		pathOutputFolder, 
+		compress=True,
+		dataFramesForceVolume=dataFramesForceVolume
 	)
 
+@decorator_measure_stage(name="export.xlsx", count_curves=count_exported_curves)
 def export_to_xlsx(
 	forceVolume, 
-	pathOutputFolder: str
+	pathOutputFolder: str,
+	dataFramesForceVolume: Optional[nt.DataFramesForceVolume] = None
 ) -> None:
 	"""
 	Export the processed data of the imported 
@@ -115,8 +197,17 @@ def export_to_xlsx(
 		imported measurement.
 	pathOutputFolder : str
 		Path to the folder in which the data will be stored.
+	dataFramesForceVolume : nt.DataFramesForceVolume, optional
+		Already created data frames of the force volume,
+		missing curve data frames are created.
 	"""
-	dataFramesForceVolume = get_force_volume_data(forceVolume)
+	if dataFramesForceVolume is None:
+		dataFramesForceVolume = get_force_volume_data(forceVolume)
+	elif dataFramesForceVolume.rawCurves is None:
+		dataFramesForceVolume = dataFramesForceVolume._replace(
+			rawCurves=create_data_frame_raw_curves(forceVolume.forceDistanceCurves),
+			correctedCurves=create_data_frame_corrected_curves(forceVolume.forceDistanceCurves)
+		)
 	outPutFilePath = os.path.join(pathOutputFolder, "data.xlsx")
 	
 	with pd.ExcelWriter(outPutFilePath) as writer:  
@@ -126,6 +217,190 @@ def export_to_xlsx(
 		dataFramesForceVolume.averageData.to_excel(writer, sheet_name='Average Data')
 		dataFramesForceVolume.channelData.to_excel(writer, sheet_name='Channel Data')
 
+@decorator_measure_stage(name="export.npz", count_curves=count_exported_curves)
+def export_to_npz(
+	forceVolume,
+	pathOutputFolder: str,
+	chunkSize: int = 1000
+) -> None:
+	"""
+	Export the processed data of the imported force volume
+	to a single .npz file. The curves are stored as flat value
+	arrays with offsets and curve ids, the channels as two 
+	dimensional arrays and the meta data as a json string.
+
+	Parameters
+	----------
+	forceVolume : ForceVolume
+		Contains the raw and calculated data from the 
+		imported measurement.
+	pathOutputFolder : str
+		Path to the folder in which the data will be stored.
+	chunkSize : int
+		Number of curves which are written at once.
+	"""
+	outputFilePath = os.path.join(pathOutputFolder, "force_volume.npz")
+
+	with zipfile.ZipFile(outputFilePath, "w", allowZip64=True) as npzFile:
+		write_npy_array(
+			npzFile,
+			"meta_data",
+			np.array(json.dumps(get_metadata(forceVolume)))
+		)
+		for curveType in curveTypes:
+			curveIds, curves = forceVolume.get_curves(curveType)
+			offsets, valueDtypes = get_curve_layout(curves)
+			write_npy_array(npzFile, curveType + "_offsets", offsets)
+			write_npy_array(
+				npzFile,
+				curveType + "_curve_ids",
+				np.asarray(curveIds, dtype=np.int64)
+			)
+			for valueName in valueNames:
+				write_npy_array_chunks(
+					npzFile,
+					curveType + "_" + valueName,
+					offsets[-1],
+					valueDtypes[valueName],
+					(
+						getattr(curveBuffer, valueName)
+						for curveBuffer
+						in iterate_curve_buffers(curves, curveIds, chunkSize)
+					)
+				)
+		for channel in forceVolume.channels.values():
+			write_npy_array(npzFile, "channel_" + channel.name, channel.rawData)
+		for name, averageData in get_average_data(forceVolume).items():
+			write_npy_array(npzFile, "average_" + name, averageData)
+
+@decorator_measure_stage(name="export.hdf5", count_curves=count_exported_curves)
+def export_to_hdf5(
+	forceVolume,
+	pathOutputFolder: str,
+	chunkSize: int = 1000
+) -> None:
+	"""
+	Export the processed data of the imported force volume
+	to a single .h5 file. The curves are stored as flat value
+	datasets with offsets and curve ids, the channels as two 
+	dimensional datasets and the meta data as attributes.
+
+	Parameters
+	----------
+	forceVolume : ForceVolume
+		Contains the raw and calculated data from the 
+		imported measurement.
+	pathOutputFolder : str
+		Path to the folder in which the data will be stored.
+	chunkSize : int
+		Number of curves which are written at once.
+	"""
+	outputFilePath = os.path.join(pathOutputFolder, "force_volume.h5")
+
+	with h5py.File(outputFilePath, "w") as hdf5File:
+		hdf5File.attrs.update(get_metadata(forceVolume))
+
+		for curveType in curveTypes:
+			curveIds, curves = forceVolume.get_curves(curveType)
+			offsets, valueDtypes = get_curve_layout(curves)
+			group = hdf5File.create_group("curves/" + curveType)
+			group["offsets"] = offsets
+			group["curve_ids"] = np.asarray(curveIds, dtype=np.int64)
+			datasets = {
+				valueName: group.create_dataset(
+					valueName,
+					shape=(offsets[-1],),
+					dtype=valueDtypes[valueName]
+				)
+				for valueName in valueNames
+			}
+			start = 0
+			for curveBuffer in iterate_curve_buffers(curves, curveIds, chunkSize):
+				stop = start + curveBuffer.offsets[-1]
+				for valueName, dataset in datasets.items():
+					dataset[start:stop] = getattr(curveBuffer, valueName)
+				start = stop
+
+		groupChannels = hdf5File.create_group("channels")
+		for channel in forceVolume.channels.values():
+			groupChannels[channel.name] = channel.rawData
+
+		groupAverage = hdf5File.create_group("average")
+		for name, averageData in get_average_data(forceVolume).items():
+			groupAverage[name] = averageData
+
+@decorator_measure_stage(name="export.parquet", count_curves=count_exported_curves)
+def export_to_parquet(
+	forceVolume,
+	pathOutputFolder: str,
+	chunkSize: int = 1000
+) -> None:
+	"""
+	Export the processed data of the imported force volume
+	to .parquet files. The raw and corrected curves are stored
+	in long format with one row group per chunk, the channels
+	with their row and column and the meta data in the schema
+	of every file.
+
+	Parameters
+	----------
+	forceVolume : ForceVolume
+		Contains the raw and calculated data from the 
+		imported measurement.
+	pathOutputFolder : str
+		Path to the folder in which the data will be stored.
+	chunkSize : int
+		Number of curves which are written at once.
+	"""
+	pq = lazy_import("pyarrow.parquet")
+	schemaMetadata = {"sofa": json.dumps(get_metadata(forceVolume))}
+
+	for curveType in curveTypes:
+		curveIds, curves = forceVolume.get_curves(curveType)
+		_, valueDtypes = get_curve_layout(curves)
+		schema = pa.schema(
+			[
+				("curve_id", pa.int64()),
+				("index", pa.int64()),
+				("piezo", pa.from_numpy_dtype(valueDtypes["piezo"])),
+				("deflection", pa.from_numpy_dtype(valueDtypes["deflection"]))
+			],
+			metadata=schemaMetadata
+		)
+		outputFilePath = os.path.join(
+			pathOutputFolder, 
+			curveType + "_curves.parquet"
+		)
+		with pq.ParquetWriter(outputFilePath, schema) as writer:
+			for curveBuffer in iterate_curve_buffers(curves, curveIds, chunkSize):
+				writer.write_table(
+					pa.Table.from_arrays(
+						[
+							curveBuffer.get_value_curve_ids(),
+							curveBuffer.get_value_indices(),
+							curveBuffer.piezo,
+							curveBuffer.deflection
+						],
+						schema=schema
+					)
+				)
+
+	rows, columns = np.indices(forceVolume.size)
+	channelData = {"row": rows.ravel(), "column": columns.ravel()}
+	for channel in forceVolume.channels.values():
+		channelData[channel.name] = channel.rawData.ravel()
+	pq.write_table(
+		pa.table(channelData).replace_schema_metadata(schemaMetadata),
+		os.path.join(pathOutputFolder, "channel_data.parquet")
+	)
+
+	averageData = get_average_data(forceVolume)
+	if averageData:
+		pq.write_table(
+			pa.table(averageData).replace_schema_metadata(schemaMetadata),
+			os.path.join(pathOutputFolder, "average_data.parquet")
+		)
+
 def export_plots(
 	holderLinePlot,
 	holderHeatmap,
@@ -157,7 +432,8 @@ def export_plots(
 	)
 
 def get_force_volume_data(
-	forceVolume
+	forceVolume,
+	includeCurves: bool = True
 ) -> nt.DataFramesForceVolume:
 	"""
 	Convert the data of a force volume to panda dataframes
@@ -168,16 +444,23 @@ def get_force_volume_data(
 	forceVolume : ForceVolume
 		Contains the raw and calculated data from the 
 		imported measurement.
+	includeCurves : bool, optional
+		Create the data frames of the raw and corrected
+		curves, which are only read by the .xlsx export.
 
 	Returns
 	-------
 	dataFramesForceVolume : nt.DataFramesForceVolume
 		Data of the force volume cached in different
-		distinct panda data frames.
+		distinct panda data frames, without the curves
+		the curve data frames are None.
 	"""
 	dataFrameMetaData = create_data_frame_metadata(forceVolume)
-	dataFramerawCurves = create_data_frame_raw_curves(forceVolume.forceDistanceCurves)
-	dataFrameCorrectedCurves = create_data_frame_corrected_curves(forceVolume.forceDistanceCurves)
+	dataFramerawCurves = None
+	dataFrameCorrectedCurves = None
+	if includeCurves:
+		dataFramerawCurves = create_data_frame_raw_curves(forceVolume.forceDistanceCurves)
+		dataFrameCorrectedCurves = create_data_frame_corrected_curves(forceVolume.forceDistanceCurves)
 	dataFrameAverageData = create_data_frame_average_data(forceVolume)
 	dataFrameChannelData = create_data_frame_channel_data(forceVolume.channels)
 
@@ -189,12 +472,12 @@ def get_force_volume_data(
 		channelData=dataFrameChannelData
 	)
 
-def create_data_frame_metadata(
+def get_metadata(
 	forceVolume
-) -> pd.DataFrame:
+) -> Dict:
 	"""
-	Cache the general data and if imported additional
-	data from an image in a pandas dataframe.
+	Collect the general data and if imported additional
+	data from an image.
 
 	Parameters
 	----------
@@ -204,27 +487,47 @@ def create_data_frame_metadata(
 
 	Returns
 	-------
-	dataFrameMetaData : pd.Dataframe
+	metaData : dict
 		Contains the name, size and additional data from 
-		the measurement, if an image was imported
+		the measurement, if an image was imported.
 	"""
 	metaData = {
 		"name": forceVolume.name,
-		"size": forceVolume.size
+		"size": [int(length) for length in forceVolume.size]
 	} 
 
 	if forceVolume.imageData:
-		metaData["fss"] = forceVolume.imageData["fss"]
-		metaData["sss"] = forceVolume.imageData["sss"]
-		metaData["xOffset"] = forceVolume.imageData["xOffset"]
-		metaData["yOffset"] = forceVolume.imageData["yOffset"]
-		metaData["springConstant"] = forceVolume.imageData["springConstant"]
+		for key in ["fss", "sss", "xOffset", "yOffset", "springConstant"]:
+			metaData[key] = float(forceVolume.imageData[key])
+
+	return metaData
+
+def create_data_frame_metadata(
+	forceVolume
+) -> "pd.DataFrame":
+	"""
+	Cache the general data and if imported additional
+	data from an image in a pandas dataframe.
+
+	Parameters
+	----------
+	forceVolume : ForceVolume
+		Contains the raw and calculated data from the 
+		imported measurement.
+
+	Returns
+	-------
+	dataFrameMetaData : pd.Dataframe
+		Contains the name, size and additional data from 
+		the measurement, if an image was imported
+	"""
+	metaData = get_metadata(forceVolume)
 
 	return pd.DataFrame.from_dict(metaData)
 
 def create_data_frame_raw_curves(
 	forceDistanceCurves: List
-) -> pd.DataFrame:
+) -> "pd.DataFrame":
 	"""
 	Cache the raw imported measurment data in a 
 	pandas dataframe.
@@ -250,16 +553,16 @@ def create_data_frame_raw_curves(
 		for forceDistanceCurve
 		in forceDistanceCurves
 	]
-	rawData = np.array([rawPiezo, rawDeflection], dtype=object).transpose()
-
 	return pd.DataFrame(
-		rawData,
-		columns=["raw piezo", "raw deflection"]
+		{
+			"raw piezo": rawPiezo,
+			"raw deflection": rawDeflection
+		}
 	)
 
 def create_data_frame_corrected_curves(
 	forceDistanceCurves: List
-) -> pd.DataFrame:
+) -> "pd.DataFrame":
 	"""
 	Cache the corrected measurment data in a 
 	pandas dataframe.
@@ -275,29 +578,30 @@ def create_data_frame_corrected_curves(
 		Contains the data of the corrected 
 		measurement curves.
 	"""
-	correctedPiezo = [
-		forceDistanceCurve.dataApproachCorrected.piezo
-		for forceDistanceCurve
-		in forceDistanceCurves
-		if forceDistanceCurve.couldBeCorrected
-	]
-	correctedDeflection = [
-		forceDistanceCurve.dataApproachCorrected.deflection
-		for forceDistanceCurve
-		in forceDistanceCurves
-		if forceDistanceCurve.couldBeCorrected
-	]
-	correctedData = np.array([correctedPiezo, correctedDeflection], dtype=object).transpose()
-
+	with materialize_corrected_curves(forceDistanceCurves):
+		correctedPiezo = [
+			forceDistanceCurve.dataApproachCorrected.piezo
+			for forceDistanceCurve
+			in forceDistanceCurves
+			if forceDistanceCurve.couldBeCorrected
+		]
+		correctedDeflection = [
+			forceDistanceCurve.dataApproachCorrected.deflection
+			for forceDistanceCurve
+			in forceDistanceCurves
+			if forceDistanceCurve.couldBeCorrected
+		]
 	return pd.DataFrame(
-		correctedData,
-		columns=["corrected piezo", "corrected deflection"]
+		{
+			"corrected piezo": correctedPiezo,
+			"corrected deflection": correctedDeflection
+		}
 	)
 
 @decorator_check_average
 def create_data_frame_average_data(
 	forceVolume
-) -> pd.DataFrame:
+) -> "pd.DataFrame":
 	"""
 	Cache the the calculated average data in a 
 	pandas dataframe.
@@ -315,23 +619,17 @@ def create_data_frame_average_data(
 		curve.
 	"""
 	return pd.DataFrame(
-		forceVolume.average.piezoNonContact,
-		forceVolume.average.deflectionNonContact,
-		forceVolume.average.piezoContact,
-		forceVolume.average.deflectionContact,
-		forceVolume.average.standardDeviationNonContact,
-		forceVolume.average.standardDeviationContact,
-		columns=[
-			"average piezo non contact", 
-			"average deflection non contact",
-			"average piezo contact", 
-			"average deflection contact", 
-			"standard deviation non contact",
-			"standard deviation contact"
-		]
+		{
+			"average piezo non contact": forceVolume.average.piezoNonContact,
+			"average deflection non contact": forceVolume.average.deflectionNonContact,
+			"average piezo contact": forceVolume.average.piezoContact,
+			"average deflection contact": forceVolume.average.deflectionContact,
+			"standard deviation non contact": forceVolume.average.standardDeviationNonContact,
+			"standard deviation contact": forceVolume.average.standardDeviationContact
+		}
 	) 
 
-def create_data_frame_empty_average_data() -> pd.DataFrame:
+def create_data_frame_empty_average_data() -> "pd.DataFrame":
 	"""
 	Create an empty data frame to indicate that 
 	no average data as been calculated.
@@ -349,7 +647,7 @@ def create_data_frame_empty_average_data() -> pd.DataFrame:
 
 def create_data_frame_channel_data(
 	channels: List
-) -> pd.DataFrame:
+) -> "pd.DataFrame":
 	"""
 	Cache the flattended data of the calculated 
 	channels in a pandas dataframe.
@@ -371,33 +669,8 @@ def create_data_frame_channel_data(
 
 	return pd.DataFrame.from_dict(channelData)
 
-def combine_data_frames(
-	dataFrames: List[pd.DataFrame]
-) -> pd.DataFrame:
-	"""
-	Combine a list of data frames with the same
-	shape to a single dataframe, to reduce the 
-	number of files created when exporting to 
-	.csv file format.
-
-	Parameters
-	----------
-	dataFrames : list[pd.DataFrame]
-		List of data frames with similar shape
-		which are combined into one data frame.
-	
-	Returns
-	-------
-	comninedDataFrame : pd.DataFrame
-		Contains the combined data of the 
-		data frames.
-	"""
-	return pd.concat(
-		dataFrames
-	)
-
 def write_csv_file(
-	dataFrame: pd.DataFrame,
+	dataFrame: "pd.DataFrame",
 	filePathOutput: str
 ) -> None:
 	"""
@@ -415,6 +688,168 @@ def write_csv_file(
 		filePathOutput
 	)
 
+def write_curve_data_csv_file(
+	forceVolume,
+	filePathOutput: str,
+	chunkSize: int
+) -> None:
+	"""
+	Write the raw and corrected curves in long format with
+	one row per measurement point. Only a single chunk of 
+	curves is kept in memory at once.
+
+	Parameters
+	----------
+	forceVolume : ForceVolume
+		Contains the raw and calculated data from the 
+		imported measurement.
+	filePathOutput : str
+		File path where the file is to be saved, files 
+		ending with .gz are compressed.
+	chunkSize : int
+		Number of curves which are written at once.
+	"""
+	if filePathOutput.endswith(".gz"):
+		# The fastest compression level, higher levels take several
+		# times longer while reducing the size only slightly.
+		csvFile = gzip.open(filePathOutput, "wt", compresslevel=1, newline="")
+	else:
+		csvFile = open(filePathOutput, "w", newline="")
+
+	with csvFile:
+		writeHeader = True
+		for curveType in curveTypes:
+			curveIds, curves = forceVolume.get_curves(curveType)
+			for curveBuffer in iterate_curve_buffers(curves, curveIds, chunkSize):
+				pd.DataFrame(
+					{
+						"curve_id": curveBuffer.get_value_curve_ids(),
+						"index": curveBuffer.get_value_indices(),
+						"piezo": curveBuffer.piezo,
+						"deflection": curveBuffer.deflection,
+						"kind": curveType
+					}
+				).to_csv(csvFile, header=writeHeader, index=False)
+				writeHeader = False
+
+		if writeHeader:
+			csvFile.write("curve_id,index,piezo,deflection,kind\n")
+
+def get_curve_layout(
+	curves: Sequence[nt.ForceDistanceCurve]
+) -> Tuple[np.ndarray, Dict[str, np.dtype]]:
+	"""
+	Get the offsets and the data types of the values of
+	exported curves. Curves which are corrected on access
+	are measured by their raw curves, so they are only 
+	corrected while they are written.
+
+	Parameters
+	----------
+	curves : list[nt.ForceDistanceCurve] or CorrectedCurves
+		Piezo (x) and deflection (y) values of the curves.
+
+	Returns
+	-------
+	offsets : np.ndarray
+		Start of every curve followed by the total
+		number of values.
+	valueDtypes : dict[str, np.dtype]
+		Data type of the piezo and deflection values.
+	"""
+	if isinstance(curves, CorrectedCurves):
+		curves = curves.get_raw_curves()
+
+	return (
+		calculate_offsets(curves),
+		{
+			valueName: get_value_dtype(curves, valueName)
+			for valueName in valueNames
+		}
+	)
+
+def get_average_data(
+	forceVolume
+) -> Dict[str, np.ndarray]:
+	"""
+	Get the calculated average data as arrays.
+
+	Parameters
+	----------
+	forceVolume : ForceVolume
+		Contains the raw and calculated data from the 
+		imported measurement.
+
+	Returns
+	-------
+	averageData : dict[str, np.ndarray]
+		Every field of the average curve or an empty 
+		dictionary if no average has been calculated.
+	"""
+	if not hasattr(forceVolume, "average"):
+		return {}
+
+	return {
+		name: np.asarray(values)
+		for name, values in forceVolume.average._asdict().items()
+	}
+
+def write_npy_array(
+	npzFile: zipfile.ZipFile,
+	name: str,
+	array: np.ndarray
+) -> None:
+	"""
+	Write a single array into an open .npz file.
+
+	Parameters
+	----------
+	npzFile : zipfile.ZipFile
+		The .npz file opened for writing.
+	name : str
+		Key of the array in the .npz file.
+	array : np.ndarray
+		Data which is to be written.
+	"""
+	with npzFile.open(name + ".npy", "w", force_zip64=True) as npyFile:
+		np.lib.format.write_array(npyFile, np.asanyarray(array))
+
+def write_npy_array_chunks(
+	npzFile: zipfile.ZipFile,
+	name: str,
+	numberOfValues: int,
+	dtype: np.dtype,
+	chunks: Iterator[np.ndarray]
+) -> None:
+	"""
+	Write a one dimensional array chunk by chunk into an open
+	.npz file without keeping the whole array in memory.
+
+	Parameters
+	----------
+	npzFile : zipfile.ZipFile
+		The .npz file opened for writing.
+	name : str
+		Key of the array in the .npz file.
+	numberOfValues : int
+		Total length of all chunks.
+	dtype : np.dtype
+		Data type of the array.
+	chunks : iterator[np.ndarray]
+		Consecutive parts of the array.
+	"""
+	with npzFile.open(name + ".npy", "w", force_zip64=True) as npyFile:
+		np.lib.format.write_array_header_1_0(
+			npyFile,
+			{
+				"descr": np.lib.format.dtype_to_descr(np.dtype(dtype)),
+				"fortran_order": False,
+				"shape": (int(numberOfValues),)
+			}
+		)
+		for chunk in chunks:
+			npyFile.write(np.ascontiguousarray(chunk, dtype=dtype).tobytes())
+
 def save_figure(
 	holder,
 	filePath: str
@@ -434,8 +869,43 @@ def save_figure(
 		dpi=300
 	)
 
+@decorator_measure_stage(name="export.figure")
+def render_figure(
+	figureData: bytes,
+	filePath: str
+) -> None:
+	"""
+	Render a pickled matplotlib figure off-screen with the
+	Agg backend and save it to the given location, so the
+	figures can be exported outside of the tkinter thread.
+
+	Parameters
+	----------
+	figureData : bytes
+		Pickled copy of the figure.
+	filePath : str
+		Path in which the figure will be saved.
+	"""
+	backendAgg = lazy_import("matplotlib.backends.backend_agg")
+
+	figure = pickle.loads(figureData)
+	backendAgg.FigureCanvasAgg(figure)
+	figure.savefig(
+		filePath, 
+		dpi=300
+	)
+
 # Defines all available file types to which the data can be exported.
 exportFormats = {
 	"csv": export_to_csv,
-	"xlsx": export_to_xlsx
-}
\ No newline at end of file
+	"csv.gz": export_to_csv_gzip,
+	"xlsx": export_to_xlsx,
+	"npz": export_to_npz,
+	"hdf5": export_to_hdf5
+}
+
+if pa is not None:
+	exportFormats["parquet"] = export_to_parquet
+
+# Export formats which can reuse the data frames of get_force_volume_data.
+dataFrameExportFormats = {"csv", "csv.gz", "xlsx"}
\ No newline at end of file
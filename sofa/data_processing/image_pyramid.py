@@ -0,0 +1,121 @@
+"""
+This file is part of SOFA.
+SOFA is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+SOFA is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from typing import List, Tuple
+
+import numpy as np
+
+class ImagePyramid():
+	"""
+	Two dimensional data in several resolutions, every level
+	halves the number of rows and columns of the previous one.
+	The levels are only calculated when they are requested.
+
+	Attributes
+	----------
+	shape : tuple[int]
+		Number of rows and columns of the full resolution.
+	levels : list[np.ndarray]
+		Calculated levels, starting with the full resolution.
+	"""
+	def __init__(self, data: np.ndarray) -> None:
+		"""
+		Initialize a pyramid with the full resolution data.
+
+		Parameters
+		----------
+		data : np.ndarray
+			Two dimensional data, nan for missing values.
+		"""
+		self.shape: Tuple[int, int] = data.shape
+		self.levels: List[np.ndarray] = [data]
+
+	def get_level(self, level: int) -> np.ndarray:
+		"""
+		Get the data of a level and calculate it and
+		all missing levels before if necessary.
+
+		Parameters
+		----------
+		level : int
+			Level of the data, 0 is the full resolution.
+
+		Returns
+		-------
+		levelData : np.ndarray
+			Data reduced by a factor of 2 to the power
+			of the level in both directions.
+		"""
+		while len(self.levels) <= level:
+			self.levels.append(reduce_image(self.levels[-1]))
+
+		return self.levels[level]
+
+	def get_image(self, outputShape: Tuple[int, int]) -> np.ndarray:
+		"""
+		Get the coarsest level which still has at least
+		one value per pixel of the displayed image.
+
+		Parameters
+		----------
+		outputShape : tuple[int]
+			Number of rows and columns of the displayed image.
+
+		Returns
+		-------
+		levelData : np.ndarray
+			Data of the matching level.
+		"""
+		reduction = min(
+			self.shape[0] / max(outputShape[0], 1),
+			self.shape[1] / max(outputShape[1], 1)
+		)
+		level = int(np.floor(np.log2(reduction))) if reduction >= 2 else 0
+
+		return self.get_level(level)
+
+def reduce_image(data: np.ndarray) -> np.ndarray:
+	"""
+	Halve the resolution of two dimensional data by averaging
+	blocks of 2x2 values and ignoring nan values.
+
+	Parameters
+	----------
+	data : np.ndarray
+		Two dimensional data, nan for missing values.
+
+	Returns
+	-------
+	reducedData : np.ndarray
+		Mean of every block, nan if all values of
+		the block are missing.
+	"""
+	numberOfRows, numberOfColumns = data.shape
+	# Pad data with an odd number of rows or columns with missing values.
+	paddedData = np.full(
+		(numberOfRows + numberOfRows % 2, numberOfColumns + numberOfColumns % 2),
+		np.nan
+	)
+	paddedData[:numberOfRows, :numberOfColumns] = data
+	blocks = paddedData.reshape(
+		paddedData.shape[0] // 2, 2, paddedData.shape[1] // 2, 2
+	)
+
+	isValid = np.isfinite(blocks)
+	blockSums = np.where(isValid, blocks, 0.0).sum(axis=(1, 3))
+	numberOfValues = isValid.sum(axis=(1, 3))
+
+	with np.errstate(invalid="ignore", divide="ignore"):
+		return np.where(numberOfValues > 0, blockSums / numberOfValues, np.nan)
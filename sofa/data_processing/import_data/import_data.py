@@ -13,11 +13,14 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
 """
-from typing import Dict, Callable
+from typing import Dict, Callable, List
+
+import numpy as np
 
 import data_processing.named_tuples as nt
 from data_processing.import_data.import_formats.import_ibw_data import import_ibw_data
 from data_processing.import_data.import_formats.import_hdf5_data import import_hdf5_data
+from utilities.instrumentation import measure_stage
 
 def import_data(
 	importParameter: nt.ImportParameter,
@@ -38,7 +41,18 @@ def import_data(
 		Combined data of all the imported data files.
 	"""
 	importFunction = get_import_function(importParameter.dataFormat)
-	importedData = importFunction(importParameter)
+	with measure_stage("import" + importParameter.dataFormat) as measurement:
+		importedData = importFunction(importParameter)
+		if measurement is not None:
+			measurement.numberOfCurves = len(
+				importedData["measurementData"].approachCurves
+			)
+
+	if precisions[importParameter.precision] is not None:
+		importedData["measurementData"] = convert_measurement_data_precision(
+			importedData["measurementData"],
+			precisions[importParameter.precision]
+		)
 
 	return importedData
 
@@ -62,6 +76,68 @@ def get_import_function(
 	"""
 	return importFunctions[fileformat][0]
 
+def convert_measurement_data_precision(
+	measurementData: nt.MeasurementData,
+	dtype: np.dtype
+) -> nt.MeasurementData:
+	"""
+	Store the piezo and deflection values of every
+	measurement curve with a different precision.
+
+	Parameters
+	----------
+	measurementData : nt.MeasurementData
+		The imported measurement data.
+	dtype : np.dtype
+		Data type of the stored values.
+
+	Returns
+	-------
+	measurementData : nt.MeasurementData
+		The measurement data with converted curves.
+	"""
+	return measurementData._replace(
+		approachCurves=convert_curves_precision(measurementData.approachCurves, dtype),
+		retractCurves=convert_curves_precision(measurementData.retractCurves, dtype)
+	)
+
+def convert_curves_precision(
+	curves: List[nt.ForceDistanceCurve],
+	dtype: np.dtype
+) -> List[nt.ForceDistanceCurve]:
+	"""
+	Convert the piezo and deflection values of
+	measurement curves to another data type.
+
+	Parameters
+	----------
+	curves : list[nt.ForceDistanceCurve]
+		Piezo (x) and deflection (y) values of the curves.
+	dtype : np.dtype
+		Data type of the converted values.
+
+	Returns
+	-------
+	convertedCurves : list[nt.ForceDistanceCurve]
+		The curves with converted values.
+	"""
+	return [
+		nt.ForceDistanceCurve(
+			np.asarray(curve.piezo, dtype=dtype),
+			np.asarray(curve.deflection, dtype=dtype)
+		)
+		for curve in curves
+	]
+
+# Defines the precisions in which the measurement curves can be stored,
+# "native" keeps the data type of the measurement files. Fits and sums 
+# are always calculated in float64.
+precisions = {
+	"native": None,
+	"float64": np.float64,
+	"float32": np.float32
+}
+
 # Defines all available import options.
 importFunctions = {
 	".ibw": (import_ibw_data, "*.ibw"),
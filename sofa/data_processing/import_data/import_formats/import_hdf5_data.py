@@ -15,10 +15,12 @@ along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
 """
 from typing import Dict, Tuple, List
 
-import h5py
 import numpy as np
 
 import data_processing.named_tuples as nt
+from utilities.lazy_import import lazy_import
+
+h5py = lazy_import("h5py")
 
 def import_hdf5_data(
 	importParameter: nt.ImportParameter,
@@ -20,10 +20,12 @@ import re
 import functools
 
 import numpy as np
-from igor2.binarywave import load as loadibw
 
 import data_processing.custom_exceptions as ce
 import data_processing.named_tuples as nt
+from utilities.lazy_import import lazy_import
+
+igor2 = lazy_import("igor2")
 
 def decorator_check_file_size_image(function):
 	"""
@@ -35,7 +37,7 @@ def decorator_check_file_size_image(function):
 		imagedData = function(*args, **kwargs)
 		measurementDataSize = args[1]
 		if measurementDataSize != imagedData.size:
-			raise WrongImageSizeError(
+			raise ce.WrongImageSizeError(
 				"The image size does not match the " 
 				"size of the measurement data."
 			)
@@ -54,7 +56,7 @@ def decorator_check_file_size_channel(function):
 		channelData = function(*args, **kwargs)
 		measurementDataSize = args[1]
 		if measurementDataSize != channelData.size:
-			raise WrongChannelSizeError(
+			raise ce.WrongChannelSizeError(
 				"The channel size does not match the "
 				"size of the measurement data."
 			)
@@ -92,13 +94,13 @@ def import_ibw_data(
 	if importParameter.filePathImage:
 		importedData["imageData"] = import_ibw_image(
 			importParameter.filePathImage,
-			measurementData.size
+			importedData["measurementData"].size
 		)
 
 	if importParameter.filePathChannel:
-		importedData["importedChannelData"] = import_channel(
+		importedData["importedChannelData"] = import_ibw_channel(
 			importParameter.filePathChannel,
-			measurementData.size
+			importedData["measurementData"].size
 		)
 
 	return importedData
@@ -318,7 +320,7 @@ def load_ibw_measurement_curve_file(
 		and the expected keys are missing.
 	"""
 	try:
-		curveData = loadibw(filePathCurveData)["wave"]["wData"]
+		curveData = igor2.binarywave.load(filePathCurveData)["wave"]["wData"]
 	except ValueError as e: 
 		raise ce.UnableToReadMeasurementFileError(
 			"Unable to read measurement file. Expected "
@@ -410,7 +412,7 @@ def import_ibw_image(
 		Contains meta data from the measurement and
 		two pre processed channels.
 	"""
-	imageData = loadibw(importParameters.filePathImage)
+	imageData = igor2.binarywave.load(filePathImage)
 
 	imageSize = get_image_size(imageData)
 	imageDataNote = get_image_data_note(imageData)
@@ -457,7 +459,7 @@ def get_image_size(
 			imageData['wave']['wave_header']['nDim'][0]
 		)
 	except ValueError as e:
-		raise UnableToReadImageFileError(
+		raise ce.UnableToReadImageFileError(
 			"Can't read image data size. Unable to find " 
 			"'wave|wave_header' key in the image file. "
 			"For further information see the docs or "
@@ -496,7 +498,7 @@ def get_image_data_note(
 			imageData['wave']['note'].decode("utf-8", errors="replace")
 		)
 	except ValueError as e:
-		raise UnableToReadImageFileError(
+		raise ce.UnableToReadImageFileError(
 			"Can't read image data note. Unable to find " 
 			"'wave|note' key in the image file. "
 			"For further information see the docs or "
@@ -531,7 +533,7 @@ def get_image_channel_data(
 	try:
 		imageChannelData = np.asarray(imageData["wave"]["wData"])
 	except ValueError as e:
-		raise UnableToReadImageFileError(
+		raise ce.UnableToReadImageFileError(
 			"Can't read image channel data. Unable to find " 
 			"'wave|wData' key in the image file. "
 			"For further information see the docs or "
@@ -14,42 +14,14 @@ You should have received a copy of the GNU General Public License
 along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
 """
 
-from typing import NamedTuple, Tuple, List
+from typing import NamedTuple, Optional, Tuple, List, Dict, TYPE_CHECKING
 from numpy import ndarray
-from pandas import DataFrame
-import matplotlib as mpl
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import tkinter as tk
-import ttkbootstrap as ttk
 
-# GUI interface
-class ActiveForceVolumeParameters(NamedTuple):
-	key: ttk.StringVar
-	name: ttk.StringVar
-	size: ttk.StringVar
-	location: ttk.StringVar
-	dropdownList: List
-	dropdown: ttk.OptionMenu
-
-class LinePlotParameters(NamedTuple):
-	linked: tk.BooleanVar
-	holder: FigureCanvasTkAgg
-	plotInactive: bool 
-	plotAverage: bool
-	plotErrorbar: bool
-
-class HeatmapParameters(NamedTuple): 
-	linked: tk.BooleanVar
-	holder: FigureCanvasTkAgg
-	activeChannel: tk.StringVar
-
-class HistogramParameters(NamedTuple):  
-	linked: tk.BooleanVar
-	holder: FigureCanvasTkAgg
-	activeChannel: tk.StringVar
-	zoom: tk.BooleanVar
-	numberOfBins: ttk.Entry
+if TYPE_CHECKING:
+	from pandas import DataFrame
+	from data_processing.image_pyramid import ImagePyramid
 
+# GUI interface
 class HistogramRestrictionParameters(NamedTuple):
 	data: ndarray
 	activeData: ndarray
@@ -76,6 +48,22 @@ class ChannelMetadata(NamedTuple):
 	pointOfContact: ForceDistancePoint
 	coefficientsFitApproachCurve: CoefficientsFitApproachCurve
 
+class CorrectionParameters(NamedTuple):
+	coefficientsFitZeroline: CoefficientsFitApproachCurve
+	indexEndOfZeroline: int
+	piezoPointOfContact: float
+
+class CorrectionSettings(NamedTuple):
+	contactDetection: str = "derivative"
+	smoothFactor: float = 10
+	borderShift: float = 0.05
+	numberOfDataPoints: int = 2000
+
+class CorrectionUpdate(NamedTuple):
+	changedCurves: ndarray
+	changedChannels: List[str]
+	averageChanged: bool
+
 class AverageForceDistanceCurve(NamedTuple):
 	piezoNonContact: ndarray
 	deflectionNonContact: ndarray
@@ -90,6 +78,28 @@ class NormedCurves(NamedTuple):
 	piezoContact: ndarray
 	deflectionContact: ndarray
 
+# Elastic modulus
+class IndentationParameters(NamedTuple):
+	tipGeometry: str = "sphere"
+	# None uses the default radius or half angle of the tip geometry.
+	tipParameter: Optional[float] = None
+	poissonRatio: float = 0.5
+	maximumIndentation: Optional[float] = None
+	# None uses the spring constant of the imported image.
+	springConstant: Optional[float] = None
+
+# Outlier detection
+class OutlierParameters(NamedTuple):
+	threshold: float = 3.5
+	channels: Tuple[str, ...] = ("topography", "stiffness", "maxDeflection")
+	useArtifactFlag: bool = False
+
+class OutlierScores(NamedTuple):
+	curveDistance: ndarray
+	channelScores: Dict[str, ndarray]
+	hasArtifacts: ndarray
+	isOutlier: ndarray
+
 # Data import
 class ImportParameter(NamedTuple):
 	dataFormat: str
@@ -97,6 +107,9 @@ class ImportParameter(NamedTuple):
 	filePathImage: str 
 	filePathChannel: str 
 	showPoorCurves: bool
+	precision: str = "native"
+	storeCorrectedCurves: bool = True
+	contactDetection: str = "derivative"
 
 class MeasurementData(NamedTuple):
 	folderName: str
@@ -123,20 +136,79 @@ class ImportedChannelData(NamedTuple):
 class ExportParameter(NamedTuple):
 	folderPath: str
 	folderName: str
-	exportToCsv: bool
-	exportToXlsx: bool
+	exportFormats: List[str]
 	exportPlots: bool
 
 class DataFramesForceVolume(NamedTuple):
-	metaData: DataFrame
-	rawCurves: DataFrame
-	correctedCurves: DataFrame
-	averageData: DataFrame
-	channelData: DataFrame
+	metaData: "DataFrame"
+	# The curves are only created for the .xlsx export.
+	rawCurves: Optional["DataFrame"]
+	correctedCurves: Optional["DataFrame"]
+	averageData: "DataFrame"
+	channelData: "DataFrame"
 
 # Lineplot toolbar
 class ViewLimits(NamedTuple):
 	xMin: int
 	xMax: int
 	yMin: int
-	yMax: int
\ No newline at end of file
+	yMax: int
+
+# Heatmap
+class HeatmapImage(NamedTuple):
+	channelVersion: int
+	data: ndarray
+	colorLimits: Tuple[float, float]
+	pyramid: "ImagePyramid"
+
+# Batch processing
+class BatchParameter(NamedTuple):
+	measurementPaths: List[str]
+	outputFolderPath: str
+	exportFormats: List[str]
+	numberOfProcesses: int
+	memoryLimit: int
+	precision: str = "native"
+	storeCorrectedCurves: bool = True
+	indentationParameters: IndentationParameters = IndentationParameters()
+	contactDetection: str = "derivative"
+
+class BatchResult(NamedTuple):
+	name: str
+	filePath: str
+	succeeded: bool
+	numberOfCurves: int
+	numberOfFailedCurves: int
+	importTime: float
+	processingTime: float
+	exportTime: float
+	errorMessage: str
+
+# Watch folder
+class CurveFilePaths(NamedTuple):
+	index: int
+	filePathPiezo: str
+	filePathDeflection: str
+
+# Instrumentation
+class StageRecord(NamedTuple):
+	name: str
+	wallTime: float
+	cpuTime: float
+	numberOfCurves: int
+	peakMemory: Optional[int]
+
+class StageSummary(NamedTuple):
+	name: str
+	numberOfCalls: int
+	wallTime: float
+	cpuTime: float
+	numberOfCurves: int
+	peakMemory: Optional[int]
+
+class ProfiledAction(NamedTuple):
+	name: str
+	size: Tuple[int, ...]
+	wallTime: float
+	filePathStats: str
+	filePathStacks: str
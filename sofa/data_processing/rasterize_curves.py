@@ -0,0 +1,248 @@
+"""
+This file is part of SOFA.
+SOFA is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+SOFA is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from typing import Tuple
+
+import numpy as np
+
+import data_processing.named_tuples as nt
+from force_spectroscopy_data.curve_buffer import CurveBuffer
+
+def rasterize_curves(
+	curveBuffer: CurveBuffer,
+	curveMask: np.ndarray,
+	viewLimits: nt.ViewLimits,
+	shape: Tuple[int, int],
+	batchSize: int = 1000000
+) -> np.ndarray:
+	"""
+	Accumulate the line segments of several force distance
+	curves into a density image of the current view.
+
+	Parameters
+	----------
+	curveBuffer : CurveBuffer
+		Piezo (x) and deflection (y) values of the curves.
+	curveMask : np.ndarray
+		True for every curve in the buffer which is
+		added to the image.
+	viewLimits : nt.ViewLimits
+		The minimum and maximum x and y values
+		covered by the image.
+	shape : tuple[int]
+		Number of rows and columns of the image.
+	batchSize : int, optional
+		Maximum number of line segments rasterized
+		at once to limit the required memory.
+
+	Returns
+	-------
+	densityImage : np.ndarray
+		Number of line segments passing every pixel,
+		the first row belongs to the minimum y value.
+	"""
+	numberOfRows, numberOfColumns = shape
+	densityImage = np.zeros(numberOfRows * numberOfColumns, dtype=np.int64)
+
+	segmentStarts = get_segment_starts(curveBuffer, curveMask)
+	# Transform the values into pixel coordinates.
+	xScale = numberOfColumns / (viewLimits.xMax - viewLimits.xMin)
+	yScale = numberOfRows / (viewLimits.yMax - viewLimits.yMin)
+
+	for batchStart in range(0, len(segmentStarts), batchSize):
+		starts = segmentStarts[batchStart:batchStart + batchSize]
+		x = (curveBuffer.piezo[starts] - viewLimits.xMin) * xScale
+		y = (curveBuffer.deflection[starts] - viewLimits.yMin) * yScale
+		dx = (curveBuffer.piezo[starts + 1] - viewLimits.xMin) * xScale - x
+		dy = (curveBuffer.deflection[starts + 1] - viewLimits.yMin) * yScale - y
+
+		# The end of a continued segment is the start of the next segment.
+		isContinued = np.isin(starts + 1, segmentStarts, assume_unique=True)
+
+		pixels = rasterize_segments(
+			x, y, dx, dy, isContinued, numberOfRows, numberOfColumns
+		)
+		densityImage += np.bincount(
+			pixels, minlength=numberOfRows * numberOfColumns
+		)
+
+	return densityImage.reshape(shape)
+
+def get_segment_starts(
+	curveBuffer: CurveBuffer,
+	curveMask: np.ndarray
+) -> np.ndarray:
+	"""
+	Get the first value of every line segment with two
+	valid values within the selected curves.
+
+	Parameters
+	----------
+	curveBuffer : CurveBuffer
+		Piezo (x) and deflection (y) values of the curves.
+	curveMask : np.ndarray
+		True for every selected curve in the buffer.
+
+	Returns
+	-------
+	segmentStarts : np.ndarray
+		Indices of the first value of every segment.
+	"""
+	numberOfValues = curveBuffer.offsets[-1]
+	if numberOfValues < 2:
+		return np.array([], dtype=np.int64)
+
+	isValid = np.isfinite(curveBuffer.piezo) & np.isfinite(curveBuffer.deflection)
+	isSelected = np.repeat(curveMask, np.diff(curveBuffer.offsets))
+
+	# A segment ends at the last value of its curve.
+	hasSuccessor = np.ones(numberOfValues, dtype=bool)
+	curveEnds = curveBuffer.offsets[1:]
+	hasSuccessor[curveEnds[curveEnds > 0] - 1] = False
+
+	isSegmentStart = (
+		hasSuccessor[:-1] & isSelected[:-1]
+		& isValid[:-1] & isValid[1:]
+	)
+
+	return np.flatnonzero(isSegmentStart)
+
+def rasterize_segments(
+	x: np.ndarray,
+	y: np.ndarray,
+	dx: np.ndarray,
+	dy: np.ndarray,
+	isContinued: np.ndarray,
+	numberOfRows: int,
+	numberOfColumns: int
+) -> np.ndarray:
+	"""
+	Get the pixels passed by line segments in pixel coordinates.
+	The segments are clipped to the image and sampled at least
+	once per pixel along their longer axis.
+
+	Parameters
+	----------
+	x : np.ndarray
+		X coordinate of the start of every segment.
+	y : np.ndarray
+		Y coordinate of the start of every segment.
+	dx : np.ndarray
+		Extent of every segment along the x axis.
+	dy : np.ndarray
+		Extent of every segment along the y axis.
+	isContinued : np.ndarray
+		True for every segment whose end is the start of
+		the next segment and is therefore not counted twice.
+	numberOfRows : int
+		Number of rows of the image.
+	numberOfColumns : int
+		Number of columns of the image.
+
+	Returns
+	-------
+	pixels : np.ndarray
+		Flat index of every passed pixel, each segment
+		contributes a pixel only once.
+	"""
+	tStart, tEnd = clip_segments(x, y, dx, dy, numberOfRows, numberOfColumns)
+	isVisible = tStart <= tEnd
+	x, y, dx, dy = x[isVisible], y[isVisible], dx[isVisible], dy[isVisible]
+	tStart, tEnd = tStart[isVisible], tEnd[isVisible]
+	isContinued = isContinued[isVisible] & (tEnd >= 1)
+
+	numberOfSamples = np.ceil(
+		np.maximum(np.abs(dx), np.abs(dy)) * (tEnd - tStart)
+	).astype(np.int64) + 1
+	firstSamples = np.cumsum(numberOfSamples) - numberOfSamples
+	segments = np.repeat(np.arange(len(x)), numberOfSamples)
+	steps = np.arange(np.sum(numberOfSamples)) - firstSamples[segments]
+
+	stepSize = (tEnd - tStart) / np.maximum(numberOfSamples - 1, 1)
+	t = tStart[segments] + steps * stepSize[segments]
+	columns = np.clip(
+		np.floor(x[segments] + t * dx[segments]).astype(np.int64),
+		0, numberOfColumns - 1
+	)
+	rows = np.clip(
+		np.floor(y[segments] + t * dy[segments]).astype(np.int64),
+		0, numberOfRows - 1
+	)
+	pixels = rows * numberOfColumns + columns
+
+	# Consecutive samples of a segment often lie within the same pixel.
+	isNewPixel = np.ones(len(pixels), dtype=bool)
+	isNewPixel[1:] = (pixels[1:] != pixels[:-1]) | (steps[1:] == 0)
+	isSharedEnd = (steps == numberOfSamples[segments] - 1) & isContinued[segments]
+
+	return pixels[isNewPixel & ~isSharedEnd]
+
+def clip_segments(
+	x: np.ndarray,
+	y: np.ndarray,
+	dx: np.ndarray,
+	dy: np.ndarray,
+	numberOfRows: int,
+	numberOfColumns: int
+) -> Tuple[np.ndarray, np.ndarray]:
+	"""
+	Clip line segments to the image with the Liang-Barsky
+	algorithm.
+
+	Parameters
+	----------
+	x : np.ndarray
+		X coordinate of the start of every segment.
+	y : np.ndarray
+		Y coordinate of the start of every segment.
+	dx : np.ndarray
+		Extent of every segment along the x axis.
+	dy : np.ndarray
+		Extent of every segment along the y axis.
+	numberOfRows : int
+		Number of rows of the image.
+	numberOfColumns : int
+		Number of columns of the image.
+
+	Returns
+	-------
+	tStart : np.ndarray
+		Relative position along every segment where
+		it enters the image.
+	tEnd : np.ndarray
+		Relative position along every segment where it
+		leaves the image, smaller than tStart if the
+		segment lies outside of the image.
+	"""
+	tStart = np.zeros(len(x))
+	tEnd = np.ones(len(x))
+
+	borders = (
+		(-dx, x),
+		(dx, numberOfColumns - x),
+		(-dy, y),
+		(dy, numberOfRows - y)
+	)
+	with np.errstate(divide="ignore", invalid="ignore"):
+		for direction, distance in borders:
+			ratio = distance / direction
+			isEntering = direction < 0
+			isLeaving = direction > 0
+			tStart[isEntering] = np.maximum(tStart[isEntering], ratio[isEntering])
+			tEnd[isLeaving] = np.minimum(tEnd[isLeaving], ratio[isLeaving])
+			# Segments parallel to and outside of a border are not visible.
+			tEnd[(direction == 0) & (distance < 0)] = -1.0
+
+	return tStart, tEnd
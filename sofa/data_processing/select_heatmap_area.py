@@ -0,0 +1,168 @@
+"""
+This file is part of SOFA.
+SOFA is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+SOFA is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from typing import Tuple
+
+import numpy as np
+from matplotlib.path import Path
+
+from utilities.lazy_import import lazy_import
+
+ndimage = lazy_import("scipy.ndimage")
+
+def get_rectangular_area(
+	shape: Tuple[int, int],
+	xStart: int,
+	xEnd: int,
+	yStart: int,
+	yEnd: int
+) -> np.ndarray:
+	"""
+	Get the mask of all data points of the heatmap
+	that lie within a rectangular area.
+
+	Parameters
+	----------
+	shape : tuple[int]
+		Number of rows and columns of the heatmap.
+	xStart : int
+		First column of the rectangular area.
+	xEnd : int
+		Column after the last column of the rectangular area.
+	yStart : int
+		First row of the rectangular area.
+	yEnd : int
+		Row after the last row of the rectangular area.
+
+	Returns
+	-------
+	selectedArea : np.ndarray
+		True for every data point within the area.
+	"""
+	selectedArea = np.zeros(shape, dtype=bool)
+	selectedArea[max(yStart, 0):yEnd, max(xStart, 0):xEnd] = True
+
+	return selectedArea
+
+def get_polygon_area(
+	shape: Tuple[int, int],
+	vertices: np.ndarray
+) -> np.ndarray:
+	"""
+	Get the mask of all data points of the heatmap whose
+	center lies within a polygon, for example a lasso.
+
+	Parameters
+	----------
+	shape : tuple[int]
+		Number of rows and columns of the heatmap.
+	vertices : np.ndarray
+		X and y values of the vertices of the polygon,
+		which is closed automatically.
+
+	Returns
+	-------
+	selectedArea : np.ndarray
+		True for every data point within the polygon.
+	"""
+	rows, columns = np.indices(shape)
+	centers = np.column_stack((columns.ravel() + 0.5, rows.ravel() + 0.5))
+
+	return Path(vertices).contains_points(centers).reshape(shape)
+
+def get_connected_region(
+	channelData: np.ndarray,
+	row: int,
+	column: int,
+	relativeTolerance: float
+) -> np.ndarray:
+	"""
+	Get the mask of the region of data points which are
+	connected to a clicked data point and whose values lie
+	within a tolerance around the value of the clicked point.
+
+	Parameters
+	----------
+	channelData : np.ndarray
+		Two dimensional values of the displayed channel,
+		nan for inactive data points.
+	row : int
+		Row of the clicked data point.
+	column : int
+		Column of the clicked data point.
+	relativeTolerance : float
+		Maximum difference to the value of the clicked
+		point relative to the range of the channel values.
+
+	Returns
+	-------
+	selectedArea : np.ndarray
+		True for every data point in the connected region,
+		empty if the clicked data point is inactive.
+	"""
+	seedValue = channelData[row, column]
+	if np.isnan(seedValue):
+		return np.zeros(channelData.shape, dtype=bool)
+
+	tolerance = relativeTolerance * (np.nanmax(channelData) - np.nanmin(channelData))
+	with np.errstate(invalid="ignore"):
+		isSimilar = np.abs(channelData - seedValue) <= tolerance
+
+	labels, _ = ndimage.label(isSimilar)
+
+	return labels == labels[row, column]
+
+def get_area_outlines(
+	selectedArea: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+	"""
+	Get the borders between selected and unselected data
+	points as line segments separated by nan values, so
+	the whole outline can be drawn as a single line.
+
+	Parameters
+	----------
+	selectedArea : np.ndarray
+		True for every selected data point.
+
+	Returns
+	-------
+	xValues : np.ndarray
+		X values of the start and end point of every
+		segment followed by nan.
+	yValues : np.ndarray
+		Y values of the start and end point of every
+		segment followed by nan.
+	"""
+	paddedArea = np.pad(selectedArea, 1)
+	# A border lies between two neighbouring points with a different state.
+	rowsVertical, columnsVertical = np.nonzero(
+		paddedArea[1:-1, 1:] != paddedArea[1:-1, :-1]
+	)
+	rowsHorizontal, columnsHorizontal = np.nonzero(
+		paddedArea[1:, 1:-1] != paddedArea[:-1, 1:-1]
+	)
+	numberOfSegments = len(rowsVertical) + len(rowsHorizontal)
+
+	xValues = np.full((numberOfSegments, 3), np.nan)
+	yValues = np.full((numberOfSegments, 3), np.nan)
+	xValues[:len(rowsVertical), 0] = xValues[:len(rowsVertical), 1] = columnsVertical
+	yValues[:len(rowsVertical), 0] = rowsVertical
+	yValues[:len(rowsVertical), 1] = rowsVertical + 1
+	xValues[len(rowsVertical):, 0] = columnsHorizontal
+	xValues[len(rowsVertical):, 1] = columnsHorizontal + 1
+	yValues[len(rowsVertical):, 0] = yValues[len(rowsVertical):, 1] = rowsHorizontal
+
+	return xValues.ravel(), yValues.ravel()
@@ -13,7 +13,7 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
 """
-from typing import List
+from typing import List, Tuple, Optional
 import functools
 
 import numpy as np
@@ -98,6 +98,36 @@ def create_corrected_line(
 		zorder=5
 	)
 	
+def create_selected_area_outline(
+	xValues: np.ndarray, 
+	yValues: np.ndarray
+) -> mpl.lines.Line2D:
+	"""
+	Construct a displayable matplotlib line from the 
+	outline of the selected area in the heatmap.
+
+	Parameters
+	----------
+	xValues : np.ndarray
+		X values of the outline, segments are
+		separated by nan values.
+	yValues : np.ndarray
+		Y values of the outline, segments are
+		separated by nan values.
+
+	Returns
+	-------
+	outline : mpl.lines.Line2D
+		Line representation of the outline.
+	"""
+	return mpl.lines.Line2D(
+		xValues, 
+		yValues, 
+		color="r", 
+		linestyle="-", 
+		linewidth=2
+	)
+
 def get_axes(
 	holder: mpl.backends.backend_tkagg.FigureCanvasTkAgg
 ) -> mpl.axes:
@@ -120,9 +150,48 @@ def get_axes(
 	except IndexError:
 		return holder.figure.add_subplot(111)
 
+def show_no_valid_values(
+	ax: mpl.axes,
+	isShown: bool
+) -> None:
+	"""
+	Show or remove a note in the center of the axes, that 
+	the displayed channel has no valid values.
+
+	Parameters
+	----------
+	ax : mpl.axes
+		Axes of a heatmap or histogram.
+	isShown : bool
+		Whether the note is shown.
+	"""
+	for text in list(ax.texts):
+		text.remove()
+
+	if isShown:
+		ax.text(
+			0.5, 0.5, "No valid values",
+			transform=ax.transAxes, ha="center", va="center"
+		)
+
+def clear_plot(
+	holder: mpl.backends.backend_tkagg.FigureCanvasTkAgg
+) -> None:
+	"""
+	Remove every element of a plot.
+
+	Parameters
+	----------
+	holder : mpl.backends.backend_tkagg.FigureCanvasTkAgg
+		Holder of the plot.
+	"""
+	get_axes(holder).cla()
+	holder.draw()
+
 def plot_line_plot(
 	holder: mpl.backends.backend_tkagg.FigureCanvasTkAgg,
-	lines: List[mpl.lines.Line2D]
+	lines: List[mpl.lines.Line2D],
+	showLines: bool = True
 ) -> None: 
 	"""
 	Plot every force distance curve of a force volume 
@@ -136,6 +205,9 @@ def plot_line_plot(
 	lines : list[mpl.lines.Line2D]
 		Line representations of all force distance curves
 		in a force volume.
+	showLines : bool, optional
+		Whether the lines are displayed or hidden
+		behind a density image.
 	"""
 	ax = get_axes(holder)
 	ax.cla()
@@ -146,6 +218,7 @@ def plot_line_plot(
 
 	# Add lines to axes.
 	for line in lines:
+		line.set_visible(showLines)
 		ax.add_line(line)
 
 	# Set view limits.
@@ -155,37 +228,86 @@ def plot_line_plot(
 
 def plot_heatmap(
 	holder: mpl.backends.backend_tkagg.FigureCanvasTkAgg, 
-	activeData: np.ndarray,
+	heatmapImage: nt.HeatmapImage,
 	linesSelectedArea: List[mpl.lines.Line2D]
 ) -> None:
 	"""
-	Plot the active data of a channel as a grayscale heatmap.
+	Plot the active data of a channel as a grayscale heatmap,
+	a channel without valid values is noted in the plot.
+	The level of the resolution pyramid which matches the size
+	of the axes is displayed. If a heatmap of the same shape is
+	displayed, only the data and color limits of its image are
+	replaced.
 
 	Parameters
 	----------
 	holder : mpl.backends.backend_tkagg.FigureCanvasTkAgg
 		Interface between the matplotlib figure and the 
 		main window in which the plot is located.
-	activeData : np.ndarray
+	heatmapImage : nt.HeatmapImage
 		Two dimensional data of the active data points
-		of the channel.
+		of the channel, its color limits and resolution
+		pyramid.
 	linesSelectedArea : list[mpl.lines.Line2D]
 		Lines enclosing the selected area. 
 	"""
-	m, n = np.shape(activeData)
+	m, n = heatmapImage.pyramid.shape
 
 	ax = get_axes(holder)
+	images = ax.get_images()
+	# The data limits span the whole heatmap, even if a coarser level is displayed.
+	if (
+		len(images) == 1
+		and (ax.dataLim.width, ax.dataLim.height) == (n, m)
+		and set(ax.get_lines()) <= set(linesSelectedArea)
+	):
+		update_heatmap_image(holder, images[0], heatmapImage)
+		for line in linesSelectedArea:
+			if line.axes is None:
+				ax.add_line(line)
+		show_no_valid_values(ax, not np.isfinite(heatmapImage.data).any())
+		holder.draw()
+		return
+
 	ax.cla()
-	ax.imshow(activeData, cmap="gray", extent=[0, n, m, 0])
+	image = ax.imshow(heatmapImage.data[:1, :1], cmap="gray", extent=[0, n, m, 0])
+	update_heatmap_image(holder, image, heatmapImage)
 	# Simplify mouse hover by removing currenet x and y coordinates.
 	ax.format_coord = lambda x, y: ""
 
 	# Plot potentional marking lines.
 	for line in linesSelectedArea:
 		ax.add_line(line)
+	show_no_valid_values(ax, not np.isfinite(heatmapImage.data).any())
 
 	holder.draw()
 
+def update_heatmap_image(
+	holder: mpl.backends.backend_tkagg.FigureCanvasTkAgg,
+	image: mpl.image.AxesImage,
+	heatmapImage: nt.HeatmapImage
+) -> None:
+	"""
+	Display the level of the resolution pyramid of a
+	channel which matches the size of the heatmap.
+
+	Parameters
+	----------
+	holder : mpl.backends.backend_tkagg.FigureCanvasTkAgg
+		Interface between the matplotlib figure and the 
+		main window in which the plot is located.
+	image : mpl.image.AxesImage
+		Displayed image of the heatmap.
+	heatmapImage : nt.HeatmapImage
+		Two dimensional data of the active data points
+		of the channel, its color limits and resolution
+		pyramid.
+	"""
+	# The equal aspect of the image shrinks the axes before the first draw.
+	image.axes.apply_aspect()
+	image.set_data(heatmapImage.pyramid.get_image(get_axes_shape(holder)))
+	image.set_clim(*heatmapImage.colorLimits)
+
 def plot_histogram(
 	holder: mpl.backends.backend_tkagg.FigureCanvasTkAgg,
 	data: np.ndarray,
@@ -195,7 +317,9 @@ def plot_histogram(
 ) -> None:
 	"""
 	Plot the data versus the data of the active data 
-	points of a channel as a histogram.
+	points of a channel as a histogram. A channel without
+	valid values, like the elastic modulus without a
+	spring constant, is displayed as an empty histogram.
 	
 	Parameters
 	----------
@@ -216,13 +340,19 @@ def plot_histogram(
 	Returns
 	-------
 	binValues : list
-		Values of the bins from the general channel data.
+		Values of the bins from the general channel data,
+		empty if the channel has no valid values.
 	"""
 	ax = get_axes(holder)
 
 	ax.cla()
 	ax.ticklabel_format(axis="y", style="sci", scilimits=(0,0))
 
+	if np.ma.count(data) == 0:
+		show_no_valid_values(ax, True)
+		holder.draw()
+		return np.array([])
+
 	_, binValues, _ = ax.hist(
 		data, 
 		bins=numberOfBins, 
@@ -240,7 +370,7 @@ def plot_histogram(
 		color="red"
 	)
 
-	if zoom:
+	if zoom and np.ma.count(activeData) > 0:
 		ax.set_ylim(
 			binValues[np.where(binValues <= np.min(activeData))[0][-1]],
 			binValues[np.where(binValues >= np.max(activeData))[0][0]]
@@ -459,7 +589,9 @@ def update_line_plot(
 	holder: mpl.backends.backend_tkagg.FigureCanvasTkAgg,
 	forceDistanceCurves: List[mpl.lines.Line2D],
 	inactiveDataPoints: List[int],
-	showInactive: bool
+	showInactive: bool,
+	flaggedDataPoints: List[int],
+	showLines: bool = True
 ) -> None:
 	"""
 	Update the state of every force distance curve
@@ -479,8 +611,18 @@ def update_line_plot(
 	showInactive : bool
 		Specifies whether inactice force distance curves
 		should be displayed as grey or hidden.
+	flaggedDataPoints : list[int]
+		Indices of the active force distance curves
+		which are flagged as outliers.
+	showLines : bool, optional
+		Whether the lines are displayed or hidden
+		behind a density image.
 	"""
+	inactiveDataPoints = set(inactiveDataPoints)
+	flaggedDataPoints = set(flaggedDataPoints)
+
 	for index, forceDistanceCurve in enumerate(forceDistanceCurves):
+		forceDistanceCurve.set_visible(showLines)
 		if index in inactiveDataPoints and showInactive:
 			deactivate_line(
 				forceDistanceCurve, 
@@ -489,6 +631,10 @@ def update_line_plot(
 			hide_line(
 				forceDistanceCurve, 
 			)
+		elif index in flaggedDataPoints:
+			flag_line(
+				forceDistanceCurve, 
+			)
 		else:
 			activate_line(
 				forceDistanceCurve, 
@@ -496,6 +642,104 @@ def update_line_plot(
 	
 	holder.draw()
 
+def get_view_limits(
+	holder: mpl.backends.backend_tkagg.FigureCanvasTkAgg
+) -> nt.ViewLimits:
+	"""
+	Get the current x and y axis limits of a plot.
+
+	Parameters
+	----------
+	holder : mpl.backends.backend_tkagg.FigureCanvasTkAgg
+		Interface between the matplotlib figure and the 
+		main window in which the plot is located.
+
+	Returns
+	-------
+	viewLimits : nt.ViewLimits
+		The minimum and maximum x and y values
+		of the current view.
+	"""
+	axes = get_axes(holder)
+
+	return nt.ViewLimits(*axes.get_xlim(), *axes.get_ylim())
+
+def get_axes_shape(
+	holder: mpl.backends.backend_tkagg.FigureCanvasTkAgg
+) -> Tuple[int, int]:
+	"""
+	Get the size of the axes of a plot in pixels.
+
+	Parameters
+	----------
+	holder : mpl.backends.backend_tkagg.FigureCanvasTkAgg
+		Interface between the matplotlib figure and the 
+		main window in which the plot is located.
+
+	Returns
+	-------
+	shape : tuple[int]
+		Number of pixel rows and columns of the axes.
+	"""
+	axesBox = get_axes(holder).bbox
+
+	return max(int(axesBox.height), 1), max(int(axesBox.width), 1)
+
+def add_density_images(
+	holder: mpl.backends.backend_tkagg.FigureCanvasTkAgg,
+	activeDensityImage: np.ndarray,
+	inactiveDensityImage: Optional[np.ndarray],
+	viewLimits: nt.ViewLimits
+) -> List[mpl.image.AxesImage]:
+	"""
+	Add the density images of the active and inactive force
+	distance curves to the line plot without redrawing it.
+	Empty pixels stay transparent and the number of curves
+	per pixel is displayed on a logarithmic scale.
+
+	Parameters
+	----------
+	holder : mpl.backends.backend_tkagg.FigureCanvasTkAgg
+		Interface between the matplotlib figure and the 
+		main window in which the plot is located.
+	activeDensityImage : np.ndarray
+		Number of active curves passing every pixel.
+	inactiveDensityImage : np.ndarray or None
+		Number of inactive curves passing every pixel,
+		None if the inactive curves are not displayed.
+	viewLimits : nt.ViewLimits
+		The minimum and maximum x and y values
+		covered by the images.
+
+	Returns
+	-------
+	densityImages : list[mpl.image.AxesImage]
+		Displayed density images.
+	"""
+	axes = get_axes(holder)
+	densityImages = []
+
+	for densityImage, colorMap, zorder in (
+		(inactiveDensityImage, "Greys", -1),
+		(activeDensityImage, "Reds", 0)
+	):
+		if densityImage is None or not np.any(densityImage):
+			continue
+		densityImages.append(
+			axes.imshow(
+				np.ma.masked_equal(densityImage, 0),
+				cmap=colorMap,
+				norm=mpl.colors.LogNorm(vmin=1, vmax=max(np.max(densityImage), 2)),
+				extent=(viewLimits.xMin, viewLimits.xMax, viewLimits.yMin, viewLimits.yMax),
+				origin="lower",
+				aspect="auto",
+				interpolation="nearest",
+				zorder=zorder
+			)
+		)
+
+	return densityImages
+
 def deactivate_line(line: mpl.lines.Line2D) -> None: 
 	"""
 	Deactivate the line representation of a inactive
@@ -539,4 +783,19 @@ def activate_line(line: mpl.lines.Line2D) -> None:
 		Line representation of a force distance curve.
 	"""
 	line.set_color("red")
-	line.zorder = 1
\ No newline at end of file
+	line.zorder = 1
+
+def flag_line(line: mpl.lines.Line2D) -> None: 
+	"""
+	Flag the line representation of an active force
+	distance curve as an outlier by setting the line 
+	color to orange and adjusting the z order so it
+	appears before the other force distance curves.
+
+	Parameters
+	----------
+	line : mpl.lines.Line2D
+		Line representation of a force distance curve.
+	"""
+	line.set_color("orange")
+	line.zorder = 2
\ No newline at end of file
@@ -37,6 +37,11 @@ class Channel():
 	data : np.ndarray
 		Data of the channel with the current orientation -
 		can be flipped or rotated by the toolbar.
+	positions : np.ndarray
+		Index of the raw data of every value in the data
+		with the current orientation.
+	version : int
+		Number of changes to the values of the channel.
 	"""
 	def __init__(
 		self,
@@ -63,12 +68,35 @@ class Channel():
 		self.size: Tuple = size
 		self.rawData: np.ndarray = data.copy()
 		self.data: np.ndarray = data.copy()
+		self.positions: np.ndarray = np.arange(data.size).reshape(data.shape)
+		self.version: int = 0
 
 	def reset_data(self) -> None:
 		"""
 		Reset the orientation of the data.
 		"""
 		self.data = self.rawData.copy()
+		self.positions = np.arange(self.rawData.size).reshape(self.rawData.shape)
+
+	def update_data(
+		self,
+		indices: np.ndarray,
+		values: np.ndarray
+	) -> None:
+		"""
+		Replace the values of some force distance curves
+		and keep the current orientation.
+
+		Parameters
+		----------
+		indices : np.ndarray
+			Indices of the force distance curves.
+		values : np.ndarray
+			New values of the curves.
+		"""
+		self.rawData.flat[indices] = values
+		self.data = self.rawData.flat[self.positions]
+		self.version += 1
 
 	def get_active_heatmap_data(
 		self,
@@ -92,25 +120,18 @@ class Channel():
 			Channel data of the currently active force distance 
 			curves.
 		"""
-		flatHeatmapData = self.data.copy().flatten()
-		mappedInactiveDataPoints = self._map_heatmap_orientation_to_inactive_datapoints(
+		isInactive = self._map_heatmap_orientation_to_inactive_datapoints(
 			inactiveDataPoints,
-			heatmapOrientationMatrix.flatten()
-		)
-		np.put(
-			flatHeatmapData, 
-			mappedInactiveDataPoints,
-			np.nan
+			heatmapOrientationMatrix
 		)
-		activeHeatmapData = flatHeatmapData.reshape(self.size)
 
-		return activeHeatmapData
+		return np.where(isInactive, np.nan, self.data)
 
 	@staticmethod
 	def _map_heatmap_orientation_to_inactive_datapoints(
 		inactiveDataPoints: List[int],
 		heatmapOrientationMatrix: np.ndarray
-	) -> List[int]:
+	) -> np.ndarray:
 		"""
 		Map the indices of the currently inactive force distance curves
 		to the orientation of the heatmap. This is necessary because a 
@@ -126,14 +147,14 @@ class Channel():
 
 		Returns
 		-------
-		mappedInactiveDataPoints : list[int]
-			Indices of the currently inactive force distance curves
-			taking into account the orientation of the heatmap. 
+		isInactive : np.ndarray
+			True for every position of the heatmap whose force 
+			distance curve is currently inactive.
 		"""
-		return [
-			np.where(dataPoint == heatmapOrientationMatrix)[0][0]
-			for dataPoint in inactiveDataPoints
-		]
+		isInactiveCurve = np.zeros(heatmapOrientationMatrix.size, dtype=bool)
+		isInactiveCurve[np.asarray(inactiveDataPoints, dtype=np.int64)] = True
+
+		return isInactiveCurve[heatmapOrientationMatrix]
 
 	def get_histogram_data(
 		self
@@ -170,8 +191,9 @@ class Channel():
 			force distance curves without potential nan values.
 		"""
 		histogramData = self.rawData.copy().flatten()
-		validHistogramData = self._mask_nan_values(histogramData)
-		activeValidHistogramData = np.delete(validHistogramData, inactiveDataPoints)
+		# Deleting values from a masked array drops its mask.
+		activeHistogramData = np.delete(histogramData, inactiveDataPoints)
+		activeValidHistogramData = self._mask_nan_values(activeHistogramData)
 
 		return activeValidHistogramData
 
@@ -199,15 +221,18 @@ class Channel():
 		Flip the channel data horizontaly.
 		"""
 		self.data = np.flip(self.data, 0)
+		self.positions = np.flip(self.positions, 0)
 
 	def flip_channel_vertical(self) -> None: 
 		"""
 		Flip the channel data vertically.
 		"""
 		self.data = np.flip(self.data, 1)
+		self.positions = np.flip(self.positions, 1)
 
 	def rotate_channel(self) -> None: 
 		"""
 		Rotate the channel data by 90 degress.
 		"""
-		self.data = np.rot90(self.data)
\ No newline at end of file
+		self.data = np.rot90(self.data)
+		self.positions = np.rot90(self.positions)
\ No newline at end of file
@@ -0,0 +1,165 @@
+"""
+This file is part of SOFA.
+SOFA is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+SOFA is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from contextlib import contextmanager
+from typing import Iterator, List, Sequence, Union
+
+import data_processing.named_tuples as nt
+from data_processing.correct_data import apply_correction_to_curve_buffer
+from force_spectroscopy_data.curve_buffer import CurveBuffer
+
+class CorrectedCurves(Sequence):
+	"""
+	Read only sequence of the corrected data of force distance
+	curves, which do not store their corrected data. The curves
+	are corrected on access, slices and iteration correct them
+	batch by batch from a buffer of the raw data.
+
+	Attributes
+	----------
+	forceDistanceCurves : list[ForceDistanceCurve]
+		Force distance curves which could be corrected.
+	batchSize : int
+		Number of curves which are corrected at once
+		while iterating.
+	"""
+	def __init__(
+		self,
+		forceDistanceCurves: List,
+		batchSize: int = 256
+	) -> None:
+		"""
+		Initialize the sequence.
+
+		Parameters
+		----------
+		forceDistanceCurves : list[ForceDistanceCurve]
+			Force distance curves which could be corrected.
+		batchSize : int, optional
+			Number of curves which are corrected at once
+			while iterating.
+		"""
+		self.forceDistanceCurves: List = forceDistanceCurves
+		self.batchSize: int = batchSize
+
+	def __len__(self) -> int:
+		return len(self.forceDistanceCurves)
+
+	def __getitem__(
+		self,
+		index: Union[int, slice]
+	) -> Union[nt.ForceDistanceCurve, List[nt.ForceDistanceCurve]]:
+		if isinstance(index, slice):
+			return self.get_batch(self.forceDistanceCurves[index])
+
+		return self.forceDistanceCurves[index].dataApproachCorrected
+
+	def __iter__(self) -> Iterator[nt.ForceDistanceCurve]:
+		for start in range(0, len(self), self.batchSize):
+			yield from self.get_batch(
+				self.forceDistanceCurves[start:start + self.batchSize]
+			)
+
+	def get_raw_curves(self) -> List[nt.ForceDistanceCurve]:
+		"""
+		Get the raw data of the curves, which has the same
+		lengths and data types as the corrected data.
+
+		Returns
+		-------
+		rawCurves : list[nt.ForceDistanceCurve]
+			Raw piezo (x) and deflection (y) values of 
+			every curve.
+		"""
+		return [
+			forceDistanceCurve.dataApproachRaw
+			for forceDistanceCurve in self.forceDistanceCurves
+		]
+
+	@staticmethod
+	def get_batch(
+		forceDistanceCurves: Sequence
+	) -> List[nt.ForceDistanceCurve]:
+		"""
+		Correct several curves at once.
+
+		Parameters
+		----------
+		forceDistanceCurves : list[ForceDistanceCurve]
+			Force distance curves which could be corrected.
+
+		Returns
+		-------
+		correctedCurves : list[nt.ForceDistanceCurve]
+			Corrected piezo (x) and deflection (y) values of
+			every curve as views into a shared buffer.
+		"""
+		rawCurveBuffer = CurveBuffer.from_curves(
+			[
+				forceDistanceCurve.dataApproachRaw
+				for forceDistanceCurve in forceDistanceCurves
+			],
+			range(len(forceDistanceCurves))
+		)
+		correctedCurveBuffer = apply_correction_to_curve_buffer(
+			rawCurveBuffer,
+			[
+				forceDistanceCurve.correctionParameters
+				for forceDistanceCurve in forceDistanceCurves
+			]
+		)
+
+		return [
+			correctedCurveBuffer.get_curve(index)
+			for index in range(len(correctedCurveBuffer))
+		]
+
+@contextmanager
+def materialize_corrected_curves(
+	forceDistanceCurves: List,
+	batchSize: int = 256
+) -> Iterator[None]:
+	"""
+	Correct the curves which do not store their corrected data
+	batch by batch and let them hold it until the context is left.
+	Consumers which read the corrected data of every single curve, 
+	like the average and the channels, do not correct them one by one.
+
+	Parameters
+	----------
+	forceDistanceCurves : list[ForceDistanceCurve]
+		Force distance curves which are read in the context.
+	batchSize : int, optional
+		Number of curves which are corrected at once.
+	"""
+	implicitForceDistanceCurves = [
+		forceDistanceCurve
+		for forceDistanceCurve in forceDistanceCurves
+		if forceDistanceCurve.couldBeCorrected 
+		and not forceDistanceCurve.storeCorrectedData
+	]
+
+	try:
+		for start in range(0, len(implicitForceDistanceCurves), batchSize):
+			batch = implicitForceDistanceCurves[start:start + batchSize]
+			for forceDistanceCurve, correctedCurve in zip(
+				batch, CorrectedCurves.get_batch(batch)
+			):
+				forceDistanceCurve.hold_corrected_data(correctedCurve)
+
+		yield
+	finally:
+		for forceDistanceCurve in implicitForceDistanceCurves:
+			forceDistanceCurve.hold_corrected_data(None)
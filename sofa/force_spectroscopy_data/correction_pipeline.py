@@ -0,0 +1,322 @@
+"""
+This file is part of SOFA.
+SOFA is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+SOFA is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from typing import Any, Dict, List, Set, Tuple
+
+import numpy as np
+
+import data_processing.named_tuples as nt
+import data_processing.custom_exceptions as ce
+from data_processing.contact_detection import (
+	contactDetectionMethods,
+	calculate_linear_fits,
+	calculate_deflection_borders,
+	calculate_decreasing_derivations,
+	locate_last_decrease_between_borders
+)
+from data_processing.correct_data import (
+	minimumCurveLength,
+	get_batches_of_equal_length,
+	get_curve_matrices,
+	calculate_correction_parameters_matrix
+)
+
+# Settings every cached stage depends on and the stages it uses. Only the
+# derivative algorithm uses the borders and derivations to locate the end
+# of the zero line.
+correctionStages = {
+	"fitApproachCurve": ((), ()),
+	"deflectionBorders": (("borderShift",), ("fitApproachCurve",)),
+	"decreasingDerivations": (("smoothFactor",), ()),
+	"endOfZeroline": (("contactDetection",), ("deflectionBorders", "decreasingDerivations")),
+}
+
+class CorrectionPipeline():
+	"""
+	Corrects the curves of a force volume batch by batch and
+	caches the output of every stage of the correction per curve.
+	If the correction settings change, only the stages which
+	depend on the changed settings are recalculated and only
+	curves with a new end of the zero line are corrected again.
+
+	Attributes
+	----------
+	approachCurves : list[nt.ForceDistanceCurve]
+		Raw approach curves of the force volume.
+	correctionSettings : nt.CorrectionSettings
+		Current settings of the correction.
+	batches : list[np.ndarray]
+		Indices of the curves with the same length
+		which are corrected together.
+	stageOutputs : list[dict]
+		Cached output of every calculated stage for
+		every batch. The signs of the smoothed derivations
+		are stored as bits to save memory.
+	"""
+	def __init__(
+		self,
+		approachCurves: List[nt.ForceDistanceCurve],
+		correctionSettings: nt.CorrectionSettings,
+		batchSize: int = 256
+	) -> None:
+		"""
+		Group the curves into batches.
+
+		Parameters
+		----------
+		approachCurves : list[nt.ForceDistanceCurve]
+			Raw approach curves of the force volume.
+		correctionSettings : nt.CorrectionSettings
+			Settings of the correction.
+		batchSize : int, optional
+			Maximum number of curves in a batch.
+		"""
+		self.approachCurves: List[nt.ForceDistanceCurve] = approachCurves
+		self.correctionSettings: nt.CorrectionSettings = correctionSettings
+		self.batches: List[np.ndarray] = get_batches_of_equal_length(
+			approachCurves,
+			batchSize
+		)
+		self.stageOutputs: List[Dict[str, Any]] = [{} for _ in self.batches]
+
+		self._stageFunctions = {
+			"fitApproachCurve": self._calculate_fit_approach_curve,
+			"deflectionBorders": self._calculate_deflection_borders,
+			"decreasingDerivations": self._calculate_decreasing_derivations,
+			"endOfZeroline": self._locate_ends_of_zeroline,
+		}
+
+	def calculate_correction_results(self) -> List:
+		"""
+		Correct every curve with the current settings.
+
+		Returns
+		-------
+		correctionResults : list
+			Correction parameters and channel metadata of every
+			curve or the error if the curve could not be corrected.
+		"""
+		correctionResults = [None] * len(self.approachCurves)
+
+		for batchIndex, batch in enumerate(self.batches):
+			for index, correctionResult in zip(
+				batch, self._correct_batch(batchIndex, np.arange(len(batch)))
+			):
+				correctionResults[index] = correctionResult
+
+		return correctionResults
+
+	def update_correction_settings(
+		self,
+		correctionSettings: nt.CorrectionSettings
+	) -> Tuple[np.ndarray, List]:
+		"""
+		Change the settings and correct every curve whose end
+		of the zero line changes.
+
+		Parameters
+		----------
+		correctionSettings : nt.CorrectionSettings
+			New settings of the correction.
+
+		Returns
+		-------
+		changedCurves : np.ndarray
+			Indices of the curves which were corrected again.
+		correctionResults : list
+			New correction result of every changed curve.
+		"""
+		invalidStages = self.get_invalid_stages(correctionSettings)
+		self.correctionSettings = correctionSettings
+		changedCurves = []
+		correctionResults = []
+
+		if not invalidStages:
+			return np.array([], dtype=np.int64), correctionResults
+
+		for batchIndex, batch in enumerate(self.batches):
+			outputs = self.stageOutputs[batchIndex]
+			previousEndsOfZeroline = outputs.get("endOfZeroline")
+			for stage in invalidStages:
+				outputs.pop(stage, None)
+
+			endsOfZeroline = self._get_stage_output("endOfZeroline", batchIndex)
+			if previousEndsOfZeroline is None:
+				changedRows = np.arange(len(batch))
+			else:
+				changedRows = np.flatnonzero(endsOfZeroline != previousEndsOfZeroline)
+			if len(changedRows) == 0:
+				continue
+
+			changedCurves.extend(batch[changedRows])
+			correctionResults.extend(self._correct_batch(batchIndex, changedRows))
+
+		return np.array(changedCurves, dtype=np.int64), correctionResults
+
+	def get_invalid_stages(
+		self,
+		correctionSettings: nt.CorrectionSettings
+	) -> Set[str]:
+		"""
+		Get the stages which depend on settings that differ
+		from the current settings.
+
+		Parameters
+		----------
+		correctionSettings : nt.CorrectionSettings
+			New settings of the correction.
+
+		Returns
+		-------
+		invalidStages : set[str]
+			Names of the stages which have to be recalculated.
+		"""
+		changedSettings = {
+			name for name in nt.CorrectionSettings._fields
+			if getattr(correctionSettings, name) != getattr(self.correctionSettings, name)
+		}
+		invalidStages = set()
+
+		# The stages are ordered, so every used stage is checked before its users.
+		for stage, (settings, usedStages) in correctionStages.items():
+			if stage == "endOfZeroline" and correctionSettings.contactDetection != "derivative":
+				usedStages = ()
+			if changedSettings.intersection(settings) or invalidStages.intersection(usedStages):
+				invalidStages.add(stage)
+
+		return invalidStages
+
+	def _correct_batch(
+		self,
+		batchIndex: int,
+		rows: np.ndarray
+	) -> List:
+		"""
+		Correct some curves of a batch with the cached
+		end of the zero line.
+
+		Parameters
+		----------
+		batchIndex : int
+			Position of the batch.
+		rows : np.ndarray
+			Positions of the corrected curves in the batch.
+
+		Returns
+		-------
+		correctionResults : list
+			Correction result of every corrected curve.
+		"""
+		batch = self.batches[batchIndex]
+		endsOfZeroline = self._get_stage_output("endOfZeroline", batchIndex)
+		if len(self.approachCurves[batch[0]].piezo) < minimumCurveLength:
+			return [ce.UnableToLocateEndOfZerolineError()] * len(rows)
+
+		piezo, deflection = get_curve_matrices(self.approachCurves, batch[rows])
+
+		return calculate_correction_parameters_matrix(
+			piezo,
+			deflection,
+			endsOfZeroline[rows]
+		)
+
+	def _get_stage_output(
+		self,
+		stage: str,
+		batchIndex: int
+	) -> Any:
+		"""
+		Get the cached output of a stage or calculate it.
+
+		Parameters
+		----------
+		stage : str
+			Name of the stage.
+		batchIndex : int
+			Position of the batch.
+
+		Returns
+		-------
+		output : any
+			Output of the stage for every curve of the batch.
+		"""
+		outputs = self.stageOutputs[batchIndex]
+		if stage not in outputs:
+			outputs[stage] = self._stageFunctions[stage](batchIndex)
+
+		return outputs[stage]
+
+	def _get_batch_matrices(self, batchIndex: int) -> Tuple[np.ndarray, np.ndarray]:
+		"""
+		Copy the raw values of the curves of a batch into matrices.
+		"""
+		return get_curve_matrices(self.approachCurves, self.batches[batchIndex])
+
+	def _calculate_fit_approach_curve(self, batchIndex: int) -> Tuple[np.ndarray, np.ndarray]:
+		"""
+		Fit a line to every raw curve of a batch.
+		"""
+		return calculate_linear_fits(*self._get_batch_matrices(batchIndex))
+
+	def _calculate_deflection_borders(self, batchIndex: int) -> Tuple[np.ndarray, ...]:
+		"""
+		Calculate the borders of the area in which the end
+		of the zero line is searched for.
+		"""
+		return calculate_deflection_borders(
+			*self._get_batch_matrices(batchIndex),
+			*self._get_stage_output("fitApproachCurve", batchIndex),
+			self.correctionSettings.borderShift
+		)
+
+	def _calculate_decreasing_derivations(self, batchIndex: int) -> np.ndarray:
+		"""
+		Calculate where the smoothed derivations are negative
+		and pack the signs into bits.
+		"""
+		return np.packbits(
+			calculate_decreasing_derivations(
+				*self._get_batch_matrices(batchIndex),
+				self.correctionSettings.smoothFactor
+			),
+			axis=1
+		)
+
+	def _locate_ends_of_zeroline(self, batchIndex: int) -> np.ndarray:
+		"""
+		Locate the end of the zero line of every curve of a batch
+		with the selected algorithm.
+		"""
+		batch = self.batches[batchIndex]
+		numberOfValues = len(self.approachCurves[batch[0]].piezo)
+		if numberOfValues < minimumCurveLength:
+			return np.full(len(batch), -1, dtype=np.int64)
+
+		if self.correctionSettings.contactDetection != "derivative":
+			return contactDetectionMethods[self.correctionSettings.contactDetection](
+				*self._get_batch_matrices(batchIndex),
+				self.correctionSettings
+			)
+
+		isDecreasing = np.unpackbits(
+			self._get_stage_output("decreasingDerivations", batchIndex),
+			axis=1,
+			count=numberOfValues - 1
+		).astype(bool)
+
+		return locate_last_decrease_between_borders(
+			isDecreasing,
+			*self._get_stage_output("deflectionBorders", batchIndex)
+		)
@@ -0,0 +1,305 @@
+"""
+This file is part of SOFA.
+SOFA is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+SOFA is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from typing import Iterator, List, Sequence
+
+import numpy as np
+
+import data_processing.named_tuples as nt
+
+class CurveBuffer():
+	"""
+	Force distance curves of different length stored in two
+	flat arrays. The values of the i-th curve are located
+	between offsets[i] and offsets[i + 1].
+
+	Attributes
+	----------
+	piezo : np.ndarray
+		Piezo (x) values of every curve.
+	deflection : np.ndarray
+		Deflection (y) values of every curve.
+	offsets : np.ndarray
+		Start of every curve in the flat arrays followed by
+		the total number of values.
+	curveIds : np.ndarray
+		Index of every curve in the force volume.
+	isSpilled : bool
+		True while the piezo and deflection values are
+		memory mapped from a scratch file.
+	"""
+	def __init__(
+		self,
+		piezo: np.ndarray,
+		deflection: np.ndarray,
+		offsets: np.ndarray,
+		curveIds: np.ndarray
+	) -> None:
+		"""
+		Initialize a curve buffer from flat arrays.
+
+		Parameters
+		----------
+		piezo : np.ndarray
+			Piezo (x) values of every curve.
+		deflection : np.ndarray
+			Deflection (y) values of every curve.
+		offsets : np.ndarray
+			Start of every curve in the flat arrays followed
+			by the total number of values.
+		curveIds : np.ndarray
+			Index of every curve in the force volume.
+		"""
+		self.piezo: np.ndarray = piezo
+		self.deflection: np.ndarray = deflection
+		self.offsets: np.ndarray = offsets
+		self.curveIds: np.ndarray = curveIds
+		self.isSpilled: bool = False
+
+	@classmethod
+	def from_curves(
+		cls,
+		curves: List[nt.ForceDistanceCurve],
+		curveIds: Sequence[int]
+	) -> "CurveBuffer":
+		"""
+		Copy a list of curves into a new curve buffer.
+
+		Parameters
+		----------
+		curves : list[nt.ForceDistanceCurve]
+			Piezo (x) and deflection (y) values of the curves.
+		curveIds : list[int]
+			Index of every curve in the force volume.
+
+		Returns
+		-------
+		curveBuffer : CurveBuffer
+			Buffer with the values of every curve.
+		"""
+		offsets = calculate_offsets(curves)
+
+		# Empty curves, for example of missing data points, do not change the data type.
+		curves = [curve for curve in curves if len(curve.piezo) > 0] or curves
+		if curves:
+			piezo = np.concatenate([curve.piezo for curve in curves])
+			deflection = np.concatenate([curve.deflection for curve in curves])
+		else:
+			piezo = np.array([])
+			deflection = np.array([])
+
+		return cls(
+			piezo,
+			deflection,
+			offsets,
+			np.asarray(curveIds, dtype=np.int64)
+		)
+
+	def __len__(self) -> int:
+		return len(self.curveIds)
+
+	def get_curve(self, index: int) -> nt.ForceDistanceCurve:
+		"""
+		Get a single curve as views into the flat arrays.
+
+		Parameters
+		----------
+		index : int
+			Position of the curve in the buffer.
+
+		Returns
+		-------
+		curve : nt.ForceDistanceCurve
+			Piezo (x) and deflection (y) values of the curve.
+		"""
+		start, stop = self.offsets[index], self.offsets[index + 1]
+
+		return nt.ForceDistanceCurve(
+			self.piezo[start:stop],
+			self.deflection[start:stop]
+		)
+
+	def get_memory_footprint(self) -> int:
+		"""
+		Get the number of bytes of the arrays held in memory,
+		memory mapped values are not included.
+
+		Returns
+		-------
+		memoryFootprint : int
+			Size of the arrays in bytes.
+		"""
+		return sum(
+			array.nbytes
+			for array in (self.piezo, self.deflection, self.offsets, self.curveIds)
+			if not isinstance(array, np.memmap)
+		)
+
+	def spill(self, filePath: str) -> None:
+		"""
+		Write the piezo and deflection values into a scratch
+		file and replace them with read only memory maps of it.
+
+		Parameters
+		----------
+		filePath : str
+			Path of the scratch file.
+		"""
+		if self.isSpilled or self.offsets[-1] == 0:
+			return
+
+		with open(filePath, "wb") as scratchFile:
+			self.piezo.tofile(scratchFile)
+			self.deflection.tofile(scratchFile)
+
+		piezoBytes = self.piezo.nbytes
+		self.piezo = np.memmap(
+			filePath, dtype=self.piezo.dtype, mode="r", shape=self.piezo.shape
+		)
+		self.deflection = np.memmap(
+			filePath, dtype=self.deflection.dtype, mode="r",
+			offset=piezoBytes, shape=self.deflection.shape
+		)
+		self.isSpilled = True
+
+	def reload(self) -> None:
+		"""
+		Copy memory mapped piezo and deflection values
+		back into memory. The scratch file is not removed.
+		"""
+		if not self.isSpilled:
+			return
+
+		self.piezo = np.array(self.piezo)
+		self.deflection = np.array(self.deflection)
+		self.isSpilled = False
+
+	def get_curve_lengths(self) -> np.ndarray:
+		"""
+		Get the number of values of every curve.
+
+		Returns
+		-------
+		curveLengths : np.ndarray
+			Number of values of every curve.
+		"""
+		return np.diff(self.offsets)
+
+	def get_value_curve_ids(self) -> np.ndarray:
+		"""
+		Get the curve id of every single value.
+
+		Returns
+		-------
+		valueCurveIds : np.ndarray
+			Index of the curve in the force volume for
+			every value in the flat arrays.
+		"""
+		return np.repeat(self.curveIds, self.get_curve_lengths())
+
+	def get_value_indices(self) -> np.ndarray:
+		"""
+		Get the position of every single value within its curve.
+
+		Returns
+		-------
+		valueIndices : np.ndarray
+			Index of every value in its curve.
+		"""
+		return (
+			np.arange(self.offsets[-1], dtype=np.int64)
+			- np.repeat(self.offsets[:-1], self.get_curve_lengths())
+		)
+
+def calculate_offsets(
+	curves: List[nt.ForceDistanceCurve]
+) -> np.ndarray:
+	"""
+	Calculate the start of every curve in flat arrays
+	of the concatenated curves.
+
+	Parameters
+	----------
+	curves : list[nt.ForceDistanceCurve]
+		Piezo (x) and deflection (y) values of the curves.
+
+	Returns
+	-------
+	offsets : np.ndarray
+		Start of every curve followed by the total
+		number of values.
+	"""
+	offsets = np.zeros(len(curves) + 1, dtype=np.int64)
+	np.cumsum([len(curve.piezo) for curve in curves], out=offsets[1:])
+
+	return offsets
+
+def get_value_dtype(
+	curves: List[nt.ForceDistanceCurve],
+	valueName: str
+) -> np.dtype:
+	"""
+	Get a data type which holds the piezo or deflection
+	values of every curve without loss.
+
+	Parameters
+	----------
+	curves : list[nt.ForceDistanceCurve]
+		Piezo (x) and deflection (y) values of the curves.
+	valueName : str
+		Either "piezo" or "deflection".
+
+	Returns
+	-------
+	dtype : np.dtype
+		Common data type of the values.
+	"""
+	# Empty curves do not change the data type, as in CurveBuffer.from_curves.
+	curves = [curve for curve in curves if len(curve.piezo) > 0] or curves
+	if not curves:
+		return np.dtype(np.float64)
+
+	return np.result_type(
+		*{getattr(curve, valueName).dtype for curve in curves}
+	)
+
+def iterate_curve_buffers(
+	curves: List[nt.ForceDistanceCurve],
+	curveIds: Sequence[int],
+	chunkSize: int
+) -> Iterator[CurveBuffer]:
+	"""
+	Copy a list of curves chunk by chunk into curve buffers,
+	so only a single chunk has to be kept in memory.
+
+	Parameters
+	----------
+	curves : list[nt.ForceDistanceCurve]
+		Piezo (x) and deflection (y) values of the curves.
+	curveIds : list[int]
+		Index of every curve in the force volume.
+	chunkSize : int
+		Maximum number of curves per buffer.
+
+	Yields
+	------
+	curveBuffer : CurveBuffer
+		Buffer with the values of the next chunk of curves.
+	"""
+	for start in range(0, len(curves), chunkSize):
+		yield CurveBuffer.from_curves(
+			curves[start:start + chunkSize],
+			curveIds[start:start + chunkSize]
+		)
@@ -0,0 +1,298 @@
+"""
+This file is part of SOFA.
+SOFA is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+SOFA is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from typing import Sequence
+
+import numpy as np
+
+import data_processing.named_tuples as nt
+from force_spectroscopy_data.curve_buffer import CurveBuffer
+
+class CurveIndex():
+	"""
+	Spatial index over the values of force distance curves
+	to find every curve with a value inside a rectangular view.
+	The values are sorted into a coarse grid of cells. Curves
+	with a value in a cell completely inside the view are found
+	from the unique curves of every cell, only the values in
+	cells at the border of the view are checked one by one.
+
+	Attributes
+	----------
+	numberOfCurves : int
+		Number of indexed curves.
+	boundingBoxes : np.ndarray
+		Minimum and maximum x and y value of every curve,
+		nan for curves without valid values.
+	xEdges : np.ndarray
+		X values of the borders of the cells.
+	yEdges : np.ndarray
+		Y values of the borders of the cells.
+	x : np.ndarray
+		X values sorted by their cell.
+	y : np.ndarray
+		Y values sorted by their cell.
+	curves : np.ndarray
+		Curve of every sorted value.
+	cellOffsets : np.ndarray
+		Start of the values of every cell followed by
+		the number of values.
+	cellCurves : np.ndarray
+		Unique curves of every cell sorted by their cell.
+	cellCurveOffsets : np.ndarray
+		Start of the unique curves of every cell followed
+		by the number of cell curve pairs.
+	"""
+	def __init__(
+		self,
+		curveBuffer: CurveBuffer,
+		numberOfCells: int = 64
+	) -> None:
+		"""
+		Calculate the bounding boxes of the curves and
+		sort their values into the cells of the grid.
+
+		Parameters
+		----------
+		curveBuffer : CurveBuffer
+			Values of the indexed curves, the position of
+			a curve in the buffer is its index.
+		numberOfCells : int, optional
+			Number of cells along each axis of the grid.
+		"""
+		self.numberOfCurves: int = len(curveBuffer.offsets) - 1
+		self._numberOfCells: int = numberOfCells
+
+		x = np.asarray(curveBuffer.piezo, dtype=np.float64)
+		y = np.asarray(curveBuffer.deflection, dtype=np.float64)
+		curves = np.repeat(
+			np.arange(self.numberOfCurves),
+			np.diff(curveBuffer.offsets)
+		)
+		isValid = np.isfinite(x) & np.isfinite(y)
+		x, y, curves = x[isValid], y[isValid], curves[isValid]
+
+		self.boundingBoxes: np.ndarray = self._calculate_bounding_boxes(x, y, curves)
+
+		if len(x) == 0:
+			x0, x1, y0, y1 = 0.0, 1.0, 0.0, 1.0
+		else:
+			x0, x1, y0, y1 = np.min(x), np.max(x), np.min(y), np.max(y)
+		self.xEdges: np.ndarray = np.linspace(x0, x1 if x1 > x0 else x0 + 1, numberOfCells + 1)
+		self.yEdges: np.ndarray = np.linspace(y0, y1 if y1 > y0 else y0 + 1, numberOfCells + 1)
+
+		cells = (
+			self._get_cells(y, self.yEdges) * numberOfCells
+			+ self._get_cells(x, self.xEdges)
+		)
+		order = np.argsort(cells, kind="stable")
+		cells = cells[order]
+		self.x: np.ndarray = x[order]
+		self.y: np.ndarray = y[order]
+		self.curves: np.ndarray = curves[order]
+		self.cellOffsets: np.ndarray = np.searchsorted(
+			cells, np.arange(numberOfCells**2 + 1)
+		)
+
+		cellCurveKeys = np.unique(cells * self.numberOfCurves + self.curves)
+		self.cellCurves: np.ndarray = cellCurveKeys % max(self.numberOfCurves, 1)
+		self.cellCurveOffsets: np.ndarray = np.searchsorted(
+			cellCurveKeys // max(self.numberOfCurves, 1),
+			np.arange(numberOfCells**2 + 1)
+		)
+
+	@classmethod
+	def from_curves(
+		cls,
+		curves: Sequence[nt.ForceDistanceCurve],
+		numberOfCells: int = 64
+	) -> "CurveIndex":
+		"""
+		Index a sequence of curves.
+
+		Parameters
+		----------
+		curves : list[nt.ForceDistanceCurve]
+			Piezo (x) and deflection (y) values of the curves.
+		numberOfCells : int, optional
+			Number of cells along each axis of the grid.
+
+		Returns
+		-------
+		curveIndex : CurveIndex
+			Index of the curves in their order.
+		"""
+		return cls(
+			CurveBuffer.from_curves(list(curves), range(len(curves))),
+			numberOfCells
+		)
+
+	def get_curves_in_view(
+		self,
+		viewLimits: nt.ViewLimits
+	) -> np.ndarray:
+		"""
+		Get every curve with a value inside the view.
+
+		Parameters
+		----------
+		viewLimits : nt.ViewLimits
+			The minimum and maximum x and y values
+			of the view.
+
+		Returns
+		-------
+		curves : np.ndarray
+			Sorted indices of the curves.
+		"""
+		xMin, xMax = sorted((viewLimits.xMin, viewLimits.xMax))
+		yMin, yMax = sorted((viewLimits.yMin, viewLimits.yMax))
+
+		# Curves completely inside the view are hits, curves outside can not be.
+		isInside = (
+			(self.boundingBoxes[:, 0] >= xMin) & (self.boundingBoxes[:, 1] <= xMax)
+			& (self.boundingBoxes[:, 2] >= yMin) & (self.boundingBoxes[:, 3] <= yMax)
+		)
+		isOverlapping = (
+			(self.boundingBoxes[:, 0] <= xMax) & (self.boundingBoxes[:, 1] >= xMin)
+			& (self.boundingBoxes[:, 2] <= yMax) & (self.boundingBoxes[:, 3] >= yMin)
+		)
+		if not np.any(isOverlapping & ~isInside):
+			return np.flatnonzero(isInside)
+
+		columns, isInnerColumn = self._get_overlapped_cells(xMin, xMax, self.xEdges)
+		rows, isInnerRow = self._get_overlapped_cells(yMin, yMax, self.yEdges)
+		cells = (rows[:, np.newaxis] * self._numberOfCells + columns).ravel()
+		isInnerCell = (isInnerRow[:, np.newaxis] & isInnerColumn).ravel()
+
+		innerCells = cells[isInnerCell]
+		innerCurves = self.cellCurves[
+			get_range_indices(
+				self.cellCurveOffsets[innerCells],
+				self.cellCurveOffsets[innerCells + 1]
+			)
+		]
+
+		borderCells = cells[~isInnerCell]
+		borderValues = get_range_indices(
+			self.cellOffsets[borderCells],
+			self.cellOffsets[borderCells + 1]
+		)
+		borderValues = borderValues[isOverlapping[self.curves[borderValues]]]
+		x, y = self.x[borderValues], self.y[borderValues]
+		borderCurves = self.curves[borderValues][
+			(x >= xMin) & (x <= xMax) & (y >= yMin) & (y <= yMax)
+		]
+
+		return np.union1d(
+			np.flatnonzero(isInside),
+			np.union1d(innerCurves, borderCurves)
+		)
+
+	def get_memory_footprint(self) -> int:
+		"""
+		Get the number of bytes of the index.
+
+		Returns
+		-------
+		memoryFootprint : int
+			Size of the arrays of the index in bytes.
+		"""
+		return sum(
+			array.nbytes
+			for array in (
+				self.boundingBoxes, self.xEdges, self.yEdges,
+				self.x, self.y, self.curves, self.cellOffsets,
+				self.cellCurves, self.cellCurveOffsets
+			)
+		)
+
+	def _calculate_bounding_boxes(
+		self,
+		x: np.ndarray,
+		y: np.ndarray,
+		curves: np.ndarray
+	) -> np.ndarray:
+		"""
+		Calculate the minimum and maximum x and y value of
+		every curve from the values grouped by their curve.
+		"""
+		boundingBoxes = np.full((self.numberOfCurves, 4), np.nan)
+		numberOfValues = np.bincount(curves, minlength=self.numberOfCurves)
+		hasValues = numberOfValues > 0
+		starts = (np.cumsum(numberOfValues) - numberOfValues)[hasValues]
+		if len(starts) == 0:
+			return boundingBoxes
+
+		boundingBoxes[hasValues, 0] = np.minimum.reduceat(x, starts)
+		boundingBoxes[hasValues, 1] = np.maximum.reduceat(x, starts)
+		boundingBoxes[hasValues, 2] = np.minimum.reduceat(y, starts)
+		boundingBoxes[hasValues, 3] = np.maximum.reduceat(y, starts)
+
+		return boundingBoxes
+
+	def _get_cells(
+		self,
+		values: np.ndarray,
+		edges: np.ndarray
+	) -> np.ndarray:
+		"""
+		Get the cell of every value along one axis.
+		"""
+		cells = np.floor(
+			(values - edges[0]) / (edges[-1] - edges[0]) * self._numberOfCells
+		).astype(np.int64)
+
+		return np.clip(cells, 0, self._numberOfCells - 1)
+
+	def _get_overlapped_cells(
+		self,
+		minimum: float,
+		maximum: float,
+		edges: np.ndarray
+	) -> np.ndarray:
+		"""
+		Get the cells along one axis which overlap with the view
+		and whether they are completely inside the view.
+		"""
+		first, last = self._get_cells(np.array([minimum, maximum]), edges)
+		cells = np.arange(first, last + 1)
+		isInner = (edges[cells] >= minimum) & (edges[cells + 1] <= maximum)
+
+		return cells, isInner
+
+def get_range_indices(
+	starts: np.ndarray,
+	ends: np.ndarray
+) -> np.ndarray:
+	"""
+	Concatenate the indices of several ranges.
+
+	Parameters
+	----------
+	starts : np.ndarray
+		First index of every range.
+	ends : np.ndarray
+		Index after the last index of every range.
+
+	Returns
+	-------
+	indices : np.ndarray
+		Indices of all ranges in their order.
+	"""
+	lengths = ends - starts
+	startsOutput = np.cumsum(lengths) - lengths
+
+	return np.repeat(starts - startsOutput, lengths) + np.arange(np.sum(lengths))
@@ -13,12 +13,14 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
 """
-from typing import List, Dict, Tuple
+from typing import List, Dict, NamedTuple, Optional, Tuple, Union
 
 import numpy as np
-from matplotlib.lines import Line2D
 
-from data_processing.correct_data import correct_approach_curve
+from data_processing.correct_data import (
+	calculate_correction_parameters,
+	apply_correction
+)
 import data_processing.named_tuples as nt
 import data_processing.custom_exceptions as ce
 
@@ -36,13 +38,25 @@ class ForceDistanceCurve():
 	dataApproachCorrected : namedTuple
 		Corrected approach data with shifted piezo (x) 
 		and deflection (y) values.
+	storeCorrectedData : bool
+		Whether the corrected data is stored or calculated
+		from the raw data and the correction parameters
+		every time it is needed.
 	couldBeCorrected : bool
 		Indicates whether the curve could be corrected.
+	correctionParameters : nt.CorrectionParameters
+		Fit to the zero line, end of the zero line and
+		point of contact which define the correction.
 	channelMetadata : namedtuple
 		Data created while correcting the curve used
 		to calculate the different channels.
 	"""
-	def __init__(self, identifier: str, dataApproachRaw: nt.ForceDistanceCurve):
+	def __init__(
+		self, 
+		identifier: str, 
+		dataApproachRaw: nt.ForceDistanceCurve,
+		storeCorrectedData: bool = True
+	):
 		"""
 		Initialize a force distance curve by setting it's identifier 
 		and raw data. 
@@ -54,23 +68,149 @@ class ForceDistanceCurve():
 		dataApproachRaw : namedTuple
 			Raw imported approach data with piezo (x) and
 			deflection (y) values.
+		storeCorrectedData : bool, optional
+			Whether the corrected data is stored, otherwise
+			it is calculated on demand.
 		"""
 		self.identifier: str = identifier
 		
 		self.dataApproachRaw: NamedTuple = dataApproachRaw
-		self.dataApproachCorrected: NamedTuple
+		self.storeCorrectedData: bool = storeCorrectedData
 		self.couldBeCorrected: bool
+		self.correctionParameters: nt.CorrectionParameters
 		self.channelMetadata: NamedTuple
 
-	def correct_raw_data(self) -> None:
+		self._dataApproachCorrected: Optional[nt.ForceDistanceCurve] = None
+
+	@property
+	def dataApproachCorrected(self) -> nt.ForceDistanceCurve:
+		"""
+		Corrected approach data, calculated from the raw
+		data if it is not stored.
+		"""
+		if self._dataApproachCorrected is not None:
+			return self._dataApproachCorrected
+
+		return apply_correction(
+			self.dataApproachRaw,
+			self.correctionParameters
+		)
+
+	def correct_raw_data(
+		self,
+		correctionSettings: nt.CorrectionSettings = nt.CorrectionSettings()
+	) -> None:
 		"""
 		Correct the raw data of the approach curve.
+
+		Parameters
+		----------
+		correctionSettings : nt.CorrectionSettings, optional
+			Algorithm and parameters which locate the end
+			of the zero line.
 		"""
 		try:
-			self.dataApproachCorrected, self.channelMetadata = correct_approach_curve(
-				self.dataApproachRaw
+			correctionResult = calculate_correction_parameters(
+				self.dataApproachRaw,
+				correctionSettings
 			)
-		except ce.CorrectionError:
+		except ce.CorrectionError as e:
+			correctionResult = e
+
+		self.set_correction_result(correctionResult)
+
+	def set_correction_result(
+		self,
+		correctionResult: Union[Tuple[nt.CorrectionParameters, nt.ChannelMetadata], ce.CorrectionError]
+	) -> None:
+		"""
+		Set the result of a correction, which might have been
+		calculated for many curves at once.
+
+		Parameters
+		----------
+		correctionResult : tuple or ce.CorrectionError
+			Correction parameters and channel metadata of the
+			curve or the error if it could not be corrected.
+		"""
+		self._dataApproachCorrected = None
+
+		if isinstance(correctionResult, ce.CorrectionError):
 			self.couldBeCorrected = False
-		else:
-			self.couldBeCorrected = True 
\ No newline at end of file
+			return
+
+		self.correctionParameters, self.channelMetadata = correctionResult
+		self.couldBeCorrected = True
+		if self.storeCorrectedData:
+			self._dataApproachCorrected = apply_correction(
+				self.dataApproachRaw,
+				self.correctionParameters
+			)
+
+	def set_raw_data(
+		self,
+		dataApproachRaw: nt.ForceDistanceCurve,
+		storeCorrectedData: bool
+	) -> None:
+		"""
+		Replace the raw data with the same values at a 
+		different location, for example in a memory mapped
+		file, and store or drop the corrected data.
+
+		Parameters
+		----------
+		dataApproachRaw : nt.ForceDistanceCurve
+			Raw approach data with piezo (x) and
+			deflection (y) values.
+		storeCorrectedData : bool
+			Whether the corrected data is stored, otherwise
+			it is calculated on demand.
+		"""
+		self.dataApproachRaw = dataApproachRaw
+		self.storeCorrectedData = storeCorrectedData
+		self._dataApproachCorrected = None
+
+		if self.storeCorrectedData and self.couldBeCorrected:
+			self._dataApproachCorrected = apply_correction(
+				self.dataApproachRaw,
+				self.correctionParameters
+			)
+
+	def hold_corrected_data(
+		self,
+		dataApproachCorrected: Optional[nt.ForceDistanceCurve]
+	) -> None:
+		"""
+		Hold corrected data, which has been calculated for
+		many curves at once, until it is released with None.
+		Curves which store their corrected data are unchanged.
+
+		Parameters
+		----------
+		dataApproachCorrected : nt.ForceDistanceCurve or None
+			Corrected approach data or None to release it.
+		"""
+		if self.storeCorrectedData:
+			return
+
+		self._dataApproachCorrected = dataApproachCorrected
+
+	def get_memory_footprint(self) -> int:
+		"""
+		Get the number of bytes of the raw and stored corrected 
+		data held in memory, memory mapped values are not included.
+
+		Returns
+		-------
+		memoryFootprint : int
+			Size of the data in bytes.
+		"""
+		arrays = list(self.dataApproachRaw)
+		if self._dataApproachCorrected is not None:
+			arrays.extend(self._dataApproachCorrected)
+
+		return sum(
+			array.nbytes
+			for array in arrays
+			if not isinstance(array, np.memmap)
+		)
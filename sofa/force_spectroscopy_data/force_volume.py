@@ -13,15 +13,27 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
 """
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Sequence, Tuple
+import copy
 
 import numpy as np
 
 import data_processing.named_tuples as nt
-from data_processing.calculate_channel_data import calculate_channel_data
+import data_processing.custom_exceptions as ce
+from data_processing.calculate_channel_data import calculate_channel_data, active_channels
 from data_processing.calculate_average import calculate_average
+from data_processing.calculate_elastic_modulus import calculate_elastic_modulus_channels
+from data_processing.correct_data import calculate_correction_parameters_batch
+from data_processing.detect_outliers import detect_outliers
 from force_spectroscopy_data.force_distance_curve import ForceDistanceCurve
+from force_spectroscopy_data.corrected_curves import (
+	CorrectedCurves,
+	materialize_corrected_curves
+)
+from force_spectroscopy_data.curve_buffer import CurveBuffer
 from force_spectroscopy_data.channel import Channel
+from force_spectroscopy_data.correction_pipeline import CorrectionPipeline
+from utilities.instrumentation import measure_stage
 
 class ForceVolume():
 	"""
@@ -46,11 +58,31 @@ class ForceVolume():
 	average : nt.
 		The average data of the currently active force 
 		distance curves.
+	storeCorrectedCurves : bool
+		Whether the corrected data of every force distance
+		curve is stored or calculated on demand from the
+		raw data and the correction parameters.
+	indentationParameters : nt.IndentationParameters
+		Tip geometry and sample parameters of the
+		elastic modulus channel.
+	correctionSettings : nt.CorrectionSettings
+		Algorithm and parameters of the correction and
+		the number of grid points of the average.
+	correctionPipeline : CorrectionPipeline
+		Cached stages of the correction of every curve.
+	inactiveDataPoints : list[int]
+		Inactive curves of the last calculated average.
+	spilledCurveBuffer : CurveBuffer
+		Raw values of every curve memory mapped from a
+		scratch file, None while the curves are in memory.
 	"""
 	def __init__(
 		self, 
 		importedData: Dict,
-		filePathImportedData: str
+		filePathImportedData: str,
+		storeCorrectedCurves: bool = True,
+		indentationParameters: nt.IndentationParameters = nt.IndentationParameters(),
+		correctionSettings: nt.CorrectionSettings = nt.CorrectionSettings()
 	) -> None:
 		"""
 		Initialize a force volume by setting its name, size and if
@@ -64,10 +96,23 @@ class ForceVolume():
 			Data of all imported measurement files.
 		filePathImportedData : str.
 			File path of the imported measurement files.
+		storeCorrectedCurves : bool, optional
+			Whether the corrected data is stored, which
+			doubles the memory of the curves.
+		indentationParameters : nt.IndentationParameters, optional
+			Tip geometry and sample parameters of the
+			elastic modulus channel.
+		correctionSettings : nt.CorrectionSettings, optional
+			Algorithm and parameters of the correction.
 		"""
 		self.name: str = importedData["measurementData"].folderName
 		self.size: Tuple[int] = importedData["measurementData"].size
 		self.location: str = filePathImportedData
+		self.storeCorrectedCurves: bool = storeCorrectedCurves
+		self.indentationParameters: nt.IndentationParameters = indentationParameters
+		self.correctionSettings: nt.CorrectionSettings = correctionSettings
+		self.inactiveDataPoints: List[int] = None
+		self.spilledCurveBuffer: Optional[CurveBuffer] = None
 
 		self.imageData: Dict = {}
 		self.forceDistanceCurves: List[ForceDistanceCurve] = []
@@ -79,14 +124,18 @@ class ForceVolume():
 			self._set_image_data(importedData["imageData"])
 		if "importedChannelData" in importedData:
 			self._set_channel_data(importedData["importedChannelData"])
+		approachCurves = importedData["measurementData"].approachCurves
 		# Create a list of force distance curves from the imported data.
-		self._create_force_distance_curves(
-			importedData["measurementData"].approachCurves
-		)
+		with measure_stage("force_volume.create_curves", len(approachCurves)):
+			self._create_force_distance_curves(approachCurves)
 		# Correct the measurement data.
-		self._correct_force_distance_curves()
+		with measure_stage("force_volume.correct_curves", len(approachCurves)):
+			self._correct_force_distance_curves()
 		# Calculate every defined channel.
-		self._calculate_channel_data()
+		with measure_stage("force_volume.calculate_channels", len(approachCurves)):
+			self._calculate_channel_data()
+		# Fit the contact part of the curves to get the elastic modulus.
+		self.calculate_elastic_modulus(self.indentationParameters)
 
 	def _set_image_data(self, imageData: nt.ImageData) -> None: 
 		"""
@@ -157,7 +206,8 @@ class ForceVolume():
 			self.forceDistanceCurves.append(
 				ForceDistanceCurve(
 					identifier="Curve_" + str(index),
-					dataApproachRaw=approachCurve
+					dataApproachRaw=approachCurve,
+					storeCorrectedData=self.storeCorrectedCurves
 				)
 			)
 
@@ -166,18 +216,159 @@ class ForceVolume():
 		Correct the raw data of all force distance 
 		curves in the force volume.
 		"""
-		for forceDistanceCurve in self.forceDistanceCurves:
-			forceDistanceCurve.correct_raw_data()
+		self.correctionPipeline = CorrectionPipeline(
+			[
+				forceDistanceCurve.dataApproachRaw
+				for forceDistanceCurve in self.forceDistanceCurves
+			],
+			self.correctionSettings
+		)
+		correctionResults = self.correctionPipeline.calculate_correction_results()
+
+		for forceDistanceCurve, correctionResult in zip(
+			self.forceDistanceCurves, correctionResults
+		):
+			forceDistanceCurve.set_correction_result(correctionResult)
+
+	def update_correction_settings(
+		self,
+		correctionSettings: nt.CorrectionSettings
+	) -> nt.CorrectionUpdate:
+		"""
+		Change the settings of the correction and only correct
+		the curves whose end of the zero line changes. The
+		channels are updated for these curves and the average
+		is recalculated if it has been calculated before and
+		any curve or the number of grid points changed.
+
+		Parameters
+		----------
+		correctionSettings : nt.CorrectionSettings
+			New settings of the correction.
+
+		Returns
+		-------
+		correctionUpdate : nt.CorrectionUpdate
+			Indices of the corrected curves, names of the
+			updated channels and whether the average changed.
+		"""
+		previousSettings = self.correctionSettings
+		self.correctionSettings = correctionSettings
+
+		with measure_stage("force_volume.update_correction", len(self.forceDistanceCurves)):
+			changedCurves, correctionResults = self.correctionPipeline.update_correction_settings(
+				correctionSettings
+			)
+		for index, correctionResult in zip(changedCurves, correctionResults):
+			self.forceDistanceCurves[index].set_correction_result(correctionResult)
+
+		changedChannels = []
+		if len(changedCurves) > 0:
+			with measure_stage("force_volume.update_channels", len(changedCurves)):
+				changedChannels = self._update_channel_data(changedCurves)
+
+		averageChanged = self.inactiveDataPoints is not None and (
+			len(changedCurves) > 0
+			or correctionSettings.numberOfDataPoints != previousSettings.numberOfDataPoints
+		)
+		if averageChanged:
+			self.calculate_average(self.inactiveDataPoints, recalculate=True)
+
+		return nt.CorrectionUpdate(
+			changedCurves=changedCurves,
+			changedChannels=changedChannels,
+			averageChanged=averageChanged
+		)
+
+	def _update_channel_data(self, changedCurves: np.ndarray) -> List[str]:
+		"""
+		Recalculate the values of every calculated channel
+		for the corrected curves.
+
+		Parameters
+		----------
+		changedCurves : np.ndarray
+			Indices of the corrected curves.
+
+		Returns
+		-------
+		changedChannels : list[str]
+			Names of the updated channels.
+		"""
+		changedForceDistanceCurves = [
+			self.forceDistanceCurves[index] for index in changedCurves
+		]
+		size = (len(changedCurves),)
+
+		with materialize_corrected_curves(changedForceDistanceCurves):
+			channels = {
+				channelName: calculate_channel(changedForceDistanceCurves, size)
+				for channelName, calculate_channel in active_channels.items()
+			}
+			channels.update(
+				calculate_elastic_modulus_channels(
+					changedForceDistanceCurves,
+					size,
+					self.indentationParameters,
+					self.imageData.get("springConstant")
+				)
+			)
+
+		for channelName, channelData in channels.items():
+			self.channels[channelName].update_data(changedCurves, channelData)
+
+		return list(channels)
+
+	def compare_contact_detection(
+		self,
+		contactDetections: List[str]
+	) -> Dict[str, np.ndarray]:
+		"""
+		Locate the point of contact of every curve with several
+		algorithms without changing the correction of the curves.
+
+		Parameters
+		----------
+		contactDetections : list[str]
+			Names of the compared algorithms.
+
+		Returns
+		-------
+		pointsOfContact : dict[str, np.ndarray]
+			Unshifted piezo value of the point of contact of
+			every curve for every algorithm, nan if the curve
+			could not be corrected.
+		"""
+		approachCurves = [
+			forceDistanceCurve.dataApproachRaw
+			for forceDistanceCurve in self.forceDistanceCurves
+		]
+		pointsOfContact = {}
+
+		for contactDetection in contactDetections:
+			with measure_stage("contact_detection." + contactDetection, len(approachCurves)):
+				correctionResults = calculate_correction_parameters_batch(
+					approachCurves,
+					self.correctionSettings._replace(contactDetection=contactDetection)
+				)
+			pointsOfContact[contactDetection] = np.array([
+				np.nan if isinstance(correctionResult, ce.CorrectionError)
+				else correctionResult[0].piezoPointOfContact
+				for correctionResult in correctionResults
+			]).reshape(self.size)
+
+		return pointsOfContact
 
 	def _calculate_channel_data(self) -> None: 
 		"""
 		Calculate the different channels after the 
 		force distance curves have been corrected.
 		"""
-		channels = calculate_channel_data(
-			self.forceDistanceCurves,
-			self.size
-		)
+		with materialize_corrected_curves(self.forceDistanceCurves):
+			channels = calculate_channel_data(
+				self.forceDistanceCurves,
+				self.size
+			)
 
 		for channelName, channelData in channels.items():
 			self.channels[channelName] = Channel(
@@ -186,40 +377,301 @@ class ForceVolume():
 				data=channelData
 			)
 
+	def calculate_elastic_modulus(
+		self,
+		indentationParameters: nt.IndentationParameters
+	) -> None:
+		"""
+		Calculate the elastic modulus and fit quality channels
+		with the spring constant of the imported image data.
+
+		Parameters
+		----------
+		indentationParameters : nt.IndentationParameters
+			Tip geometry and sample parameters of the fit.
+		"""
+		self.indentationParameters = indentationParameters
+
+		with measure_stage("channel.elasticModulus", len(self.forceDistanceCurves)):
+			with materialize_corrected_curves(self.forceDistanceCurves):
+				channels = calculate_elastic_modulus_channels(
+					self.forceDistanceCurves,
+					self.size,
+					indentationParameters,
+					self.imageData.get("springConstant")
+				)
+
+		for channelName, channelData in channels.items():
+			# Keep the current orientation of existing channels.
+			if channelName in self.channels:
+				self.channels[channelName].update_data(
+					np.arange(channelData.size),
+					channelData.flatten()
+				)
+			else:
+				self.channels[channelName] = Channel(
+					name=channelName,
+					size=self.size,
+					data=channelData
+				)
+
 	def calculate_average(
 		self,
-		inactiveDataPoints: List[int]
+		inactiveDataPoints: List[int],
+		recalculate: bool = False
 	) -> None:
 		"""
 		Calculate the average from the currently active 
-		force distance curves.
+		force distance curves, if the inactive data points
+		changed since the last average.
+
+		Parameters
+		----------
+		inactiveDataPoints : List[int]
+			Indices of inactive data points/force
+			distance curves.
+		recalculate : bool, optional
+			Calculate the average even if the inactive
+			data points are unchanged, for example
+			because the curves changed.
 		"""
+		if (
+			not recalculate 
+			and self.inactiveDataPoints is not None
+			and set(inactiveDataPoints) == set(self.inactiveDataPoints)
+		):
+			return
+
+		# Copy the data points, the list of the caller is changed in place.
+		self.inactiveDataPoints = list(inactiveDataPoints)
 		activeForceDistanceCurves = self.get_active_force_distance_curves(
 			inactiveDataPoints
 		)
-		self.average = calculate_average(
-			activeForceDistanceCurves
+		with measure_stage("force_volume.calculate_average", len(activeForceDistanceCurves)):
+			with materialize_corrected_curves(activeForceDistanceCurves):
+				self.average = calculate_average(
+					activeForceDistanceCurves,
+					self.correctionSettings.numberOfDataPoints
+				)
+
+	def detect_outliers(
+		self,
+		inactiveDataPoints: List[int],
+		outlierParameters: nt.OutlierParameters = nt.OutlierParameters()
+	) -> nt.OutlierScores:
+		"""
+		Score the active force distance curves with robust
+		statistics of the curves and channels to find outliers.
+
+		Parameters
+		----------
+		inactiveDataPoints : List[int]
+			Indices of inactive data points/force
+			distance curves.
+		outlierParameters : nt.OutlierParameters, optional
+			Threshold of the robust z-scores, scored channels
+			and whether curves with artifacts are outliers.
+
+		Returns
+		-------
+		outlierScores : nt.OutlierScores
+			Scores of every curve and whether it is an outlier.
+		"""
+		activeForceDistanceCurves = self.get_active_force_distance_curves(
+			inactiveDataPoints
+		)
+		with measure_stage("force_volume.detect_outliers", len(self.forceDistanceCurves)):
+			with materialize_corrected_curves(activeForceDistanceCurves):
+				return detect_outliers(
+					self.forceDistanceCurves,
+					{
+						channelName: channel.rawData
+						for channelName, channel in self.channels.items()
+					},
+					inactiveDataPoints,
+					outlierParameters,
+					self.correctionSettings.numberOfDataPoints
+				)
+
+	def get_memory_footprint(self) -> int:
+		"""
+		Get the number of bytes of the curves and channels
+		held in memory.
+
+		Returns
+		-------
+		memoryFootprint : int
+			Size of the curves and channels in bytes.
+		"""
+		curvesFootprint = sum(
+			forceDistanceCurve.get_memory_footprint()
+			for forceDistanceCurve in self.forceDistanceCurves
+		)
+		channelsFootprint = sum(
+			channel.rawData.nbytes + channel.data.nbytes + channel.positions.nbytes
+			for channel in self.channels.values()
 		)
 
+		return curvesFootprint + channelsFootprint
+
+	def spill_curves(self, filePath: str) -> None:
+		"""
+		Move the raw values of every curve into a memory mapped
+		scratch file and drop the stored corrected values, which
+		are calculated on demand until the curves are reloaded.
+
+		Parameters
+		----------
+		filePath : str
+			Path of the scratch file.
+		"""
+		if self.spilledCurveBuffer is not None:
+			return
+
+		curveBuffer = CurveBuffer.from_curves(
+			[
+				forceDistanceCurve.dataApproachRaw
+				for forceDistanceCurve in self.forceDistanceCurves
+			],
+			range(len(self.forceDistanceCurves))
+		)
+		curveBuffer.spill(filePath)
+		self._set_raw_curves(curveBuffer, storeCorrectedData=False)
+		self.spilledCurveBuffer = curveBuffer
+
+	def reload_curves(self) -> None:
+		"""
+		Copy the raw values of every curve back into memory
+		and restore the stored corrected values.
+		"""
+		if self.spilledCurveBuffer is None:
+			return
+
+		self.spilledCurveBuffer.reload()
+		self._set_raw_curves(self.spilledCurveBuffer, self.storeCorrectedCurves)
+		self.spilledCurveBuffer = None
+
+	def _set_raw_curves(
+		self,
+		curveBuffer: CurveBuffer,
+		storeCorrectedData: bool
+	) -> None:
+		"""
+		Replace the raw data of every curve with its
+		values in a curve buffer.
+
+		Parameters
+		----------
+		curveBuffer : CurveBuffer
+			Raw values of every curve in their order.
+		storeCorrectedData : bool
+			Whether the corrected data is stored, otherwise
+			it is calculated on demand.
+		"""
+		for index, forceDistanceCurve in enumerate(self.forceDistanceCurves):
+			forceDistanceCurve.set_raw_data(
+				curveBuffer.get_curve(index),
+				storeCorrectedData
+			)
+
+		self.correctionPipeline.approachCurves = [
+			forceDistanceCurve.dataApproachRaw
+			for forceDistanceCurve in self.forceDistanceCurves
+		]
+
+	def create_snapshot(self) -> "ForceVolume":
+		"""
+		Copy the state of the force volume which is changed by 
+		the GUI, so the copy can be read in another thread. The
+		values of the curves and the average are shared, because
+		they are replaced instead of changed in place.
+
+		Returns
+		-------
+		snapshot : ForceVolume
+			Read only copy of the force volume.
+		"""
+		snapshot = copy.copy(self)
+		snapshot.forceDistanceCurves = [
+			copy.copy(forceDistanceCurve)
+			for forceDistanceCurve in self.forceDistanceCurves
+		]
+		snapshot.channels = copy.deepcopy(self.channels)
+		snapshot.imageData = dict(self.imageData)
+		if self.inactiveDataPoints is not None:
+			snapshot.inactiveDataPoints = list(self.inactiveDataPoints)
+
+		return snapshot
+
 	def get_force_distance_curves_data(
 		self
-	) -> List:
+	) -> Sequence[nt.ForceDistanceCurve]:
 		"""
 		Get the data of the corrected force distance
 		curves.
 
 		Returns
 		-------
-		forceDistanceCurvesData : list
+		forceDistanceCurvesData : list or CorrectedCurves
 			Piezo (x) and deflection (y) values of 
-			every corrected force distance curve.
+			every corrected force distance curve. If the
+			corrected data is not stored, the curves are
+			corrected batch by batch on access.
 		"""
+		correctedForceDistanceCurves = [
+			forceDistanceCurve
+			for forceDistanceCurve
+			in self.forceDistanceCurves
+			if forceDistanceCurve.couldBeCorrected
+		]
+
+		if not self.storeCorrectedCurves:
+			return CorrectedCurves(correctedForceDistanceCurves)
+
 		return [
 			forceDistanceCurve.dataApproachCorrected
 			for forceDistanceCurve
-			in self.forceDistanceCurves
+			in correctedForceDistanceCurves
+		]
+
+	def get_curves(
+		self,
+		curveType: str
+	) -> Tuple[List[int], Sequence[nt.ForceDistanceCurve]]:
+		"""
+		Get the raw data of every force distance curve or
+		the data of the corrected curves.
+
+		Parameters
+		----------
+		curveType : str
+			Either "raw" or "corrected".
+
+		Returns
+		-------
+		curveIds : list[int]
+			Index of every returned curve.
+		curves : list[nt.ForceDistanceCurve]
+			Piezo (x) and deflection (y) values of
+			every returned curve.
+		"""
+		if curveType == "raw":
+			return (
+				list(range(len(self.forceDistanceCurves))),
+				[
+					forceDistanceCurve.dataApproachRaw
+					for forceDistanceCurve
+					in self.forceDistanceCurves
+				]
+			)
+
+		curveIds = [
+			index
+			for index, forceDistanceCurve
+			in enumerate(self.forceDistanceCurves)
 			if forceDistanceCurve.couldBeCorrected
 		]
+		return curveIds, self.get_force_distance_curves_data()
 
 	def get_active_force_distance_curves(
 		self,
@@ -241,6 +693,8 @@ class ForceVolume():
 			Piezo (x) and deflection (y) values of every 
 			active and corrected force distance curve.
 		"""
+		inactiveDataPoints = set(inactiveDataPoints)
+
 		return [
 			forceDistanceCurve
 			for index, forceDistanceCurve
@@ -336,7 +790,7 @@ class ForceVolume():
 		Reset the orientation of every channel.
 		"""
 		for channel in self.channels.values():
-			channel.data = channel.rawData.copy()
+			channel.reset_data()
 
 	def flip_channel_horizontal(self) -> None: 
 		"""
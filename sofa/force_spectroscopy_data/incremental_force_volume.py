@@ -0,0 +1,445 @@
+"""
+This file is part of SOFA.
+SOFA is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+SOFA is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from typing import List, Tuple
+
+import numpy as np
+
+import data_processing.named_tuples as nt
+from data_processing.calculate_channel_data import active_channels
+from data_processing.calculate_elastic_modulus import (
+	calculate_elastic_modulus_channels,
+	elasticModulusChannels
+)
+from data_processing.calculate_average import (
+	calculate_average,
+	interpolate_non_contact_part,
+	interpolate_contact_part
+)
+from force_spectroscopy_data.force_volume import ForceVolume
+from force_spectroscopy_data.force_distance_curve import ForceDistanceCurve
+from force_spectroscopy_data.corrected_curves import materialize_corrected_curves
+from force_spectroscopy_data.channel import Channel
+from force_spectroscopy_data.correction_pipeline import CorrectionPipeline
+
+class IncrementalForceVolume(ForceVolume):
+	"""
+	A force volume which is filled curve by curve while the
+	measurement is still acquired. Every added curve is corrected
+	immediately, its values are inserted into the channels and it
+	is added to a running average of the corrected curves.
+
+	Attributes
+	----------
+	numberOfDataPoints : int
+		Number of grid points of the non contact and
+		contact part of the average curve.
+	addedDataPoints : set[int]
+		Indices of the force distance curves which have
+		already been added.
+	failedDataPoints : set[int]
+		Indices of the force distance curves which could
+		not be imported and will not be added.
+	"""
+	def __init__(
+		self,
+		name: str,
+		size: Tuple[int],
+		filePathImportedData: str,
+		numberOfDataPoints: int = 2000
+	) -> None:
+		"""
+		Initialize an empty force volume of the expected size. Curves
+		which have not been measured yet count as not corrected and
+		their channel values are set to nan.
+
+		Parameters
+		----------
+		name : str
+			Name of the measurement data.
+		size : tuple[int]
+			Expected number of lines and points of the
+			measurement grid.
+		filePathImportedData : str
+			Path of the watched measurement folder.
+		numberOfDataPoints : int
+			Number of grid points of the non contact and
+			contact part of the average curve.
+		"""
+		self.name: str = name
+		self.size: Tuple[int] = tuple(size)
+		self.location: str = filePathImportedData
+		self.storeCorrectedCurves: bool = True
+		self.indentationParameters: nt.IndentationParameters = nt.IndentationParameters()
+		self.correctionSettings: nt.CorrectionSettings = nt.CorrectionSettings(
+			numberOfDataPoints=numberOfDataPoints
+		)
+		self.inactiveDataPoints: List[int] = None
+		self.spilledCurveBuffer = None
+
+		self.imageData = {}
+		self.forceDistanceCurves: List[ForceDistanceCurve] = [
+			self._create_missing_force_distance_curve(index)
+			for index in range(self.size[0] * self.size[1])
+		]
+		self.channels = {
+			channelName: Channel(
+				name=channelName,
+				size=self.size,
+				data=np.full(self.size, np.nan)
+			)
+			for channelName in list(active_channels) + elasticModulusChannels
+		}
+		self.average: nt.AverageForceDistanceCurve
+		self.correctionPipeline = CorrectionPipeline(
+			[
+				forceDistanceCurve.dataApproachRaw
+				for forceDistanceCurve in self.forceDistanceCurves
+			],
+			self.correctionSettings
+		)
+
+		self.numberOfDataPoints: int = numberOfDataPoints
+		self.addedDataPoints = set()
+		self.failedDataPoints = set()
+		# The batches of the pipeline depend on the lengths of the added curves.
+		self._isCorrectionPipelineOutdated: bool = False
+
+		self._minimumPiezo: float = 0.0
+		self._maximumDeflection: float = 0.0
+		self._numberOfAveragedCurves: int
+		self._sumNonContact: np.ndarray
+		self._squaredSumNonContact: np.ndarray
+		self._sumContact: np.ndarray
+		self._squaredSumContact: np.ndarray
+		self._reset_running_average()
+
+	@staticmethod
+	def _create_missing_force_distance_curve(
+		index: int
+	) -> ForceDistanceCurve:
+		"""
+		Create a placeholder for a force distance curve
+		which has not been measured yet.
+
+		Parameters
+		----------
+		index : int
+			Position of the curve in the measurement grid.
+
+		Returns
+		-------
+		forceDistanceCurve : ForceDistanceCurve
+			Curve without data which could not be corrected.
+		"""
+		forceDistanceCurve = ForceDistanceCurve(
+			identifier="Curve_" + str(index),
+			dataApproachRaw=nt.ForceDistanceCurve(np.array([]), np.array([]))
+		)
+		forceDistanceCurve.couldBeCorrected = False
+
+		return forceDistanceCurve
+
+	@property
+	def isComplete(self) -> bool:
+		"""
+		Whether every curve of the measurement grid has been added
+		or could not be imported.
+		"""
+		return (
+			len(self.addedDataPoints | self.failedDataPoints) 
+			== len(self.forceDistanceCurves)
+		)
+
+	def add_failed_data_point(self, index: int) -> None:
+		"""
+		Mark a curve which could not be imported, it stays
+		not corrected and its channel values stay nan.
+
+		Parameters
+		----------
+		index : int
+			Position of the curve in the measurement grid.
+		"""
+		self.failedDataPoints.add(index)
+
+	def add_force_distance_curve(
+		self,
+		index: int,
+		approachCurve: nt.ForceDistanceCurve
+	) -> ForceDistanceCurve:
+		"""
+		Correct a newly measured curve and update the channels
+		and the running average.
+
+		Parameters
+		----------
+		index : int
+			Position of the curve in the measurement grid.
+		approachCurve : nt.ForceDistanceCurve
+			Raw imported approach data with piezo (x) and
+			deflection (y) values.
+
+		Returns
+		-------
+		forceDistanceCurve : ForceDistanceCurve
+			The added and possibly corrected curve.
+		"""
+		forceDistanceCurve = ForceDistanceCurve(
+			identifier="Curve_" + str(index),
+			dataApproachRaw=approachCurve
+		)
+		forceDistanceCurve.correct_raw_data(self.correctionSettings)
+
+		self.forceDistanceCurves[index] = forceDistanceCurve
+		self.addedDataPoints.add(index)
+		self.failedDataPoints.discard(index)
+		self._isCorrectionPipelineOutdated = True
+
+		self._update_curve_channel_data(index, forceDistanceCurve)
+		if forceDistanceCurve.couldBeCorrected:
+			self._update_running_average(forceDistanceCurve)
+
+		return forceDistanceCurve
+
+	def update_correction_settings(
+		self,
+		correctionSettings: nt.CorrectionSettings
+	) -> nt.CorrectionUpdate:
+		"""
+		Change the settings of the correction of every added
+		curve, update the channels and recalculate the running 
+		average and, if it has been calculated before, the average.
+
+		Parameters
+		----------
+		correctionSettings : nt.CorrectionSettings
+			New settings of the correction.
+
+		Returns
+		-------
+		correctionUpdate : nt.CorrectionUpdate
+			Indices of the corrected curves, names of the
+			updated channels and whether the average changed.
+		"""
+		if self._isCorrectionPipelineOutdated:
+			self.correctionPipeline = CorrectionPipeline(
+				[
+					forceDistanceCurve.dataApproachRaw
+					for forceDistanceCurve in self.forceDistanceCurves
+				],
+				self.correctionSettings
+			)
+			self._isCorrectionPipelineOutdated = False
+
+		previousNumberOfDataPoints = self.numberOfDataPoints
+		# The average is calculated after the running average is updated.
+		inactiveDataPoints = self.inactiveDataPoints
+		self.inactiveDataPoints = None
+		correctionUpdate = super().update_correction_settings(correctionSettings)
+		self.inactiveDataPoints = inactiveDataPoints
+
+		self.numberOfDataPoints = correctionSettings.numberOfDataPoints
+		self._reset_running_average()
+		activeForceDistanceCurves = self.get_active_force_distance_curves([])
+		if activeForceDistanceCurves:
+			with materialize_corrected_curves(activeForceDistanceCurves):
+				self._minimumPiezo = min(
+					np.min(forceDistanceCurve.dataApproachCorrected.piezo)
+					for forceDistanceCurve in activeForceDistanceCurves
+				)
+				self._maximumDeflection = max(
+					np.max(forceDistanceCurve.dataApproachCorrected.deflection)
+					for forceDistanceCurve in activeForceDistanceCurves
+				)
+				self._add_to_running_average(activeForceDistanceCurves)
+
+		averageChanged = self.inactiveDataPoints is not None and (
+			len(correctionUpdate.changedCurves) > 0
+			or self.numberOfDataPoints != previousNumberOfDataPoints
+		)
+		if averageChanged:
+			self.calculate_average(self.inactiveDataPoints, recalculate=True)
+
+		return correctionUpdate._replace(averageChanged=averageChanged)
+
+	def _update_curve_channel_data(
+		self,
+		index: int,
+		forceDistanceCurve: ForceDistanceCurve
+	) -> None:
+		"""
+		Calculate every channel value of a single curve
+		and insert it at the position of the curve.
+
+		Parameters
+		----------
+		index : int
+			Position of the curve in the measurement grid.
+		forceDistanceCurve : ForceDistanceCurve
+			The added curve.
+		"""
+		for channelName, calculate_channel in active_channels.items():
+			channelValue = calculate_channel([forceDistanceCurve], (1, 1))[0, 0]
+			self.channels[channelName].update_data(index, channelValue)
+
+		elasticModulusChannelData = calculate_elastic_modulus_channels(
+			[forceDistanceCurve],
+			(1, 1),
+			self.indentationParameters,
+			self.imageData.get("springConstant")
+		)
+		for channelName, channelData in elasticModulusChannelData.items():
+			self.channels[channelName].update_data(index, channelData[0, 0])
+
+	def _update_running_average(
+		self,
+		forceDistanceCurve: ForceDistanceCurve
+	) -> None:
+		"""
+		Add a corrected curve to the running sums of the average.
+		If the curve exceeds the current grid of the average, the
+		grid is extended and the sums are recalculated from every
+		corrected curve.
+
+		Parameters
+		----------
+		forceDistanceCurve : ForceDistanceCurve
+			The added corrected curve.
+		"""
+		minimumPiezo = np.min(forceDistanceCurve.dataApproachCorrected.piezo)
+		maximumDeflection = np.max(forceDistanceCurve.dataApproachCorrected.deflection)
+
+		if (
+			self._numberOfAveragedCurves == 0
+			or minimumPiezo < self._minimumPiezo
+			or maximumDeflection > self._maximumDeflection
+		):
+			if self._numberOfAveragedCurves == 0:
+				self._minimumPiezo = minimumPiezo
+				self._maximumDeflection = maximumDeflection
+			else:
+				self._minimumPiezo = min(self._minimumPiezo, minimumPiezo)
+				self._maximumDeflection = max(self._maximumDeflection, maximumDeflection)
+			self._reset_running_average()
+			activeForceDistanceCurves = self.get_active_force_distance_curves([])
+			with materialize_corrected_curves(activeForceDistanceCurves):
+				self._add_to_running_average(activeForceDistanceCurves)
+		else:
+			self._add_to_running_average([forceDistanceCurve])
+
+	def _reset_running_average(self) -> None:
+		"""
+		Remove every curve from the running sums of the average.
+		"""
+		self._numberOfAveragedCurves = 0
+		self._sumNonContact = np.zeros(self.numberOfDataPoints)
+		self._squaredSumNonContact = np.zeros(self.numberOfDataPoints)
+		self._sumContact = np.zeros(self.numberOfDataPoints)
+		self._squaredSumContact = np.zeros(self.numberOfDataPoints)
+
+	def _add_to_running_average(
+		self,
+		forceDistanceCurves: List[ForceDistanceCurve]
+	) -> None:
+		"""
+		Interpolate corrected curves onto the current grid
+		of the average and add them to the running sums.
+
+		Parameters
+		----------
+		forceDistanceCurves : list[ForceDistanceCurve]
+			Corrected curves which are added to the average.
+		"""
+		_, normedDeflectionNonContact = interpolate_non_contact_part(
+			forceDistanceCurves,
+			self._minimumPiezo,
+			self.numberOfDataPoints
+		)
+		_, normedDeflectionContact = interpolate_contact_part(
+			forceDistanceCurves,
+			self._maximumDeflection,
+			self.numberOfDataPoints
+		)
+
+		self._numberOfAveragedCurves += len(forceDistanceCurves)
+		# The grids might be stored in float32, the sums are calculated in float64.
+		normedDeflectionNonContact = normedDeflectionNonContact.astype(np.float64)
+		normedDeflectionContact = normedDeflectionContact.astype(np.float64)
+		self._sumNonContact += np.sum(normedDeflectionNonContact, axis=0)
+		self._squaredSumNonContact += np.sum(normedDeflectionNonContact**2, axis=0)
+		self._sumContact += np.sum(normedDeflectionContact, axis=0)
+		self._squaredSumContact += np.sum(normedDeflectionContact**2, axis=0)
+
+	def calculate_average(
+		self,
+		inactiveDataPoints: List[int],
+		recalculate: bool = False
+	) -> None:
+		"""
+		Calculate the average from the currently active
+		force distance curves. Without inactive curves the
+		running average is used instead of recalculating it.
+
+		Parameters
+		----------
+		inactiveDataPoints : List[int]
+			Indices of inactive data points/force
+			distance curves.
+		recalculate : bool, optional
+			Only for compatibility, the average is always 
+			calculated as new curves might have been added.
+		"""
+		# Copy the data points, the list of the caller is changed in place.
+		self.inactiveDataPoints = list(inactiveDataPoints)
+
+		if inactiveDataPoints or self._numberOfAveragedCurves == 0:
+			activeForceDistanceCurves = self.get_active_force_distance_curves(
+				inactiveDataPoints
+			)
+			with materialize_corrected_curves(activeForceDistanceCurves):
+				self.average = calculate_average(
+					activeForceDistanceCurves,
+					self.numberOfDataPoints
+				)
+			return
+
+		meanNonContact = self._sumNonContact / self._numberOfAveragedCurves
+		meanContact = self._sumContact / self._numberOfAveragedCurves
+		varianceNonContact = (
+			self._squaredSumNonContact / self._numberOfAveragedCurves
+			- meanNonContact**2
+		)
+		varianceContact = (
+			self._squaredSumContact / self._numberOfAveragedCurves
+			- meanContact**2
+		)
+
+		self.average = nt.AverageForceDistanceCurve(
+			piezoNonContact=np.linspace(
+				self._minimumPiezo, 0, self.numberOfDataPoints
+			),
+			deflectionNonContact=meanNonContact,
+			piezoContact=np.linspace(
+				0, self._maximumDeflection, self.numberOfDataPoints
+			),
+			deflectionContact=meanContact,
+			standardDeviationNonContact=np.sqrt(
+				np.clip(varianceNonContact, 0, None)
+			),
+			standardDeviationContact=np.sqrt(
+				np.clip(varianceContact, 0, None)
+			)
+		)
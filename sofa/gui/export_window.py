@@ -24,6 +24,7 @@ from ttkbootstrap.constants import *
 
 import data_processing.named_tuples as nt
 import data_processing.export_data as exp_data
+from interfaces.export_interface import ExportScheduler
 
 def decorator_check_required_folder_path(function):
 	"""
@@ -79,14 +80,13 @@ class ExportWindow(ttk.Frame):
 		Location where folder is created to store the data.
 	folderName : tk.StringVar
 		Name of the folder to store the data.
-	exportToCsv : tk.BooleanVar
-		Indicates whether the data should be exported 
-		to the .csv file format.
-	exportToXlsx : tk.BooleanVar
-		Indicates whether the data should be exported 
-		to the .xlsx file format.
+	exportFormats : dict[tk.BooleanVar]
+		Indicates for every available export format whether
+		the data should be exported to it.
 	exportPlots : tk.BooleanVar
 		Indicates whether the plots should be exported.
+	exportScheduler : ExportScheduler
+		Exports the data and plots in worker threads.
 	"""
 	def __init__(
 		self, 
@@ -102,6 +102,7 @@ class ExportWindow(ttk.Frame):
 
 		self.toplevel = root
 		self.guiInterface = guiInterface
+		self.exportScheduler = ExportScheduler()
 
 		self._setup_input_variables()
 		self._create_window()
@@ -114,8 +115,10 @@ class ExportWindow(ttk.Frame):
 		self.folderName = tk.StringVar(self, value="")
 		self.folderPath = tk.StringVar(self, value="")
 
-		self.exportToCsv = tk.BooleanVar(self, value=0)
-		self.exportToXlsx = tk.BooleanVar(self, value=0)
+		self.exportFormats = {
+			exportFormat: tk.BooleanVar(self, value=0)
+			for exportFormat in exp_data.exportFormats
+		}
 		self.exportPlots = tk.BooleanVar(self, value=0)
 
 		self.progressbarCurrentLabel = tk.StringVar(self, value="")
@@ -173,16 +176,12 @@ class ExportWindow(ttk.Frame):
 		frameDataTypes = ttk.Labelframe(self, text="Data Types", padding=15)
 		frameDataTypes.pack(fill=X, expand=YES, anchor=N, padx=15, pady=5)
 
-		self._create_checkbutton_data_type(
-			frameDataTypes,
-			self.exportToCsv,
-			"export to csv"
-		)
-		self._create_checkbutton_data_type(
-			frameDataTypes,
-			self.exportToXlsx,
-			"export to xlsx"
-		)
+		for exportFormat, booleanVar in self.exportFormats.items():
+			self._create_checkbutton_data_type(
+				frameDataTypes,
+				booleanVar,
+				"export to " + exportFormat
+			)
 		self._create_checkbutton_data_type(
 			frameDataTypes,
 			self.exportPlots,
@@ -224,17 +223,26 @@ class ExportWindow(ttk.Frame):
 
 	def _create_export_button(self) -> None:
 		"""
-		Create the export button.
+		Create the export and cancel button.
 		"""
 		rowExportButton = ttk.Frame(self)
 		rowExportButton.pack(fill=X, expand=YES, pady=(20, 10))
 
-		buttonExportData = ttk.Button(
+		self.buttonExportData = ttk.Button(
 			rowExportButton,
 			text="Export Data",
 			command=self._export_data
 		)
-		buttonExportData.pack(side=LEFT, padx=15)
+		self.buttonExportData.pack(side=LEFT, padx=15)
+
+		self.buttonCancelExport = ttk.Button(
+			rowExportButton,
+			text="Cancel",
+			command=self._cancel_export,
+			state=DISABLED,
+			bootstyle=SECONDARY
+		)
+		self.buttonCancelExport.pack(side=LEFT)
 
 	def _create_progressbar(self) -> None:
 		"""
@@ -267,10 +275,34 @@ class ExportWindow(ttk.Frame):
 
 	@decorator_check_required_folder_path
 	@decorator_check_required_folder_name
-	def _export_data(self) -> messagebox:
+	def _export_data(self) -> None:
+		"""
+		Start to export the data of the force volume and if 
+		selected the plots as well to the specified location
+		in the background.
+		"""
+		exportParameters = self._create_selected_export_parameters()
+		activeForceVolume = self.guiInterface.get_active_force_volume()
+
+		self.exportScheduler.start(
+			activeForceVolume,
+			exportParameters,
+			{
+				"lineplot": self.guiInterface.linePlotParameters.holder.figure,
+				"heatmap": self.guiInterface.heatmapParameters.holder.figure,
+				"histogram": self.guiInterface.histogramParameters.holder.figure
+			}
+		)
+
+		self.buttonExportData.configure(state=DISABLED)
+		self.buttonCancelExport.configure(state=NORMAL)
+		self.progressbar["maximum"] = max(self.exportScheduler.numberOfTasks, 1)
+		self._check_export_progress()
+
+	def _check_export_progress(self) -> messagebox:
 		"""
-		Export the data of the force volume and if selected
-		the plots as well to the specified location.
+		Update the progressbar until every export task is done 
+		and inform the user about the result.
 
 		Returns
 		-------
@@ -278,38 +310,49 @@ class ExportWindow(ttk.Frame):
 			Informs the user whether the data could 
 			be exported or not.
 		"""
-		self._update_progressbar("Exporting data...", 0)
-
-		exportParameters = self._create_selected_export_parameters()
-		outputFolder = exp_data.setup_output_folder(
-			exportParameters.folderPath,
-			exportParameters.folderName
+		numberOfFinishedTasks = self.exportScheduler.numberOfFinishedTasks
+		if self.exportScheduler.isCancelled:
+			label = "Cancelling..."
+		else:
+			label = "Exported {} of {}...".format(
+				numberOfFinishedTasks, 
+				self.exportScheduler.numberOfTasks
+			)
+		self._update_progressbar(
+			label,
+			numberOfFinishedTasks - self.progressbar["value"]
 		)
-		activeForceVolume = self.guiInterface.get_active_force_volume()
 
-		if exportParameters.exportToCsv:
-			self._update_progressbar("Exporting to csv...", 25.0)
-			exp_data.export_to_csv(activeForceVolume, outputFolder)
-
-		if exportParameters.exportToXlsx:
-			self._update_progressbar("Exporting to xlsx...", 25.0)
-			exp_data.export_to_xlsx(activeForceVolume, outputFolder)
-
-		if exportParameters.exportPlots:
-			self._update_progressbar("Exporting plots...", 25.0)
-			exp_data.export_plots(
-				self.guiInterface.linePlotParameters.holder,
-				self.guiInterface.heatmapParameters.holder,
-				self.guiInterface.histogramParameters.holder,
-				outputFolder
-			)
+		if not self.exportScheduler.isFinished:
+			self.after(100, self._check_export_progress)
+			return
 
 		self._reset_progrressbar()
+		self.buttonExportData.configure(state=NORMAL)
+		self.buttonCancelExport.configure(state=DISABLED)
+
+		errors = self.exportScheduler.get_errors()
+		if errors:
+			return messagebox.showerror(
+				"Error", 
+				"Data could not be exported.\n" + "\n".join(errors),
+				parent=self
+			)
+		if self.exportScheduler.isCancelled:
+			return messagebox.showinfo("Cancelled", "Export is cancelled.", parent=self)
 
 		self.toplevel.destroy()
 
 		return messagebox.showinfo("Success", "Data is exported.")
 
+	def _cancel_export(self) -> None:
+		"""
+		Cancel the export tasks which have not started yet.
+		"""
+		self.exportScheduler.cancel()
+		self.buttonCancelExport.configure(state=DISABLED)
+		self.progressbarCurrentLabel.set("Cancelling...")
+
 	def _create_selected_export_parameters(self) -> nt.ExportParameter:
 		"""
 		Combine the selected export parameter.
@@ -324,8 +367,11 @@ class ExportWindow(ttk.Frame):
 		return nt.ExportParameter(
 			folderPath=self.folderPath.get(),
 			folderName=self.folderName.get(),
-			exportToCsv=self.exportToCsv.get(),
-			exportToXlsx=self.exportToXlsx.get(),
+			exportFormats=[
+				exportFormat
+				for exportFormat, booleanVar in self.exportFormats.items()
+				if booleanVar.get()
+			],
 			exportPlots=self.exportPlots.get(),
 		)
 
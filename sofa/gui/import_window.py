@@ -26,6 +26,7 @@ from ttkbootstrap.constants import *
 import data_processing.named_tuples as nt
 import data_processing.custom_exceptions as ce
 import data_processing.import_data.import_data as imp_data
+from data_processing.contact_detection import contactDetectionMethods
 
 def decorator_check_required_folder_path(function):
 	"""
@@ -71,6 +72,18 @@ class ImportWindow(ttk.Frame):
 	showPoorCurves : tk.BooleanVar
 		Specifies whether curves that cannot be corrected 
 		are to be displayed in the line plot. 
+	precisions : dict_keys
+		Every available precision of the stored curves.
+	selectedPrecision : tk.StringVar
+		Precision in which the curves are stored.
+	storeCorrectedCurves : tk.BooleanVar
+		Specifies whether the corrected curves are stored
+		or calculated from the raw curves when needed.
+	contactDetections : dict_keys
+		Every available algorithm to locate the end of
+		the zero line.
+	selectedContactDetection : tk.StringVar
+		Algorithm which locates the end of the zero line.
 	"""
 	def __init__(
 		self, 
@@ -87,6 +100,8 @@ class ImportWindow(ttk.Frame):
 		self.toplevel = root
 		self.guiInterface = guiInterface
 		self.dataTypes = imp_data.importFunctions.keys()
+		self.precisions = imp_data.precisions.keys()
+		self.contactDetections = contactDetectionMethods.keys()
 
 		self._setup_input_variables()
 		self._create_window()
@@ -98,6 +113,9 @@ class ImportWindow(ttk.Frame):
 		"""
 		self.selectedDataType = tk.StringVar(self, value=".ibw")
 		self.showPoorCurves = tk.BooleanVar(self)
+		self.selectedPrecision = tk.StringVar(self, value="native")
+		self.storeCorrectedCurves = tk.BooleanVar(self, value=True)
+		self.selectedContactDetection = tk.StringVar(self, value="derivative")
 
 		self.filePathData = tk.StringVar(self)
 
@@ -140,6 +158,36 @@ class ImportWindow(ttk.Frame):
 		)
 		dropdownDataType.pack(side=RIGHT, padx=5)
 
+		# Precision
+		rowPrecision = ttk.Frame(frameImportOptions)
+		rowPrecision.pack(fill=X, expand=YES, pady=(0, 15))
+
+		precisionLabel = ttk.Label(rowPrecision, text="Precision")
+		precisionLabel.pack(side=LEFT, padx=(15, 0))
+
+		dropdownPrecision = ttk.OptionMenu(
+			rowPrecision, 
+			self.selectedPrecision, 
+			"native", 
+			*self.precisions
+		)
+		dropdownPrecision.pack(side=RIGHT, padx=5)
+
+		# Contact detection
+		rowContactDetection = ttk.Frame(frameImportOptions)
+		rowContactDetection.pack(fill=X, expand=YES, pady=(0, 15))
+
+		contactDetectionLabel = ttk.Label(rowContactDetection, text="Contact Detection")
+		contactDetectionLabel.pack(side=LEFT, padx=(15, 0))
+
+		dropdownContactDetection = ttk.OptionMenu(
+			rowContactDetection, 
+			self.selectedContactDetection, 
+			"derivative", 
+			*self.contactDetections
+		)
+		dropdownContactDetection.pack(side=RIGHT, padx=5)
+
 		# Show poor curves
 		rowShowPoorCurves = ttk.Frame(frameImportOptions)
 		rowShowPoorCurves.pack(fill=X, expand=YES)
@@ -153,6 +201,19 @@ class ImportWindow(ttk.Frame):
 		)
 		checkButtonShowPoorCurves.pack(side=LEFT, padx=(15, 0))
 
+		# Store corrected curves
+		rowStoreCorrectedCurves = ttk.Frame(frameImportOptions)
+		rowStoreCorrectedCurves.pack(fill=X, expand=YES, pady=(15, 0))
+
+		checkButtonStoreCorrectedCurves = ttk.Checkbutton(
+			rowStoreCorrectedCurves,
+			text="Store corrected curves",
+			variable=self.storeCorrectedCurves,
+			onvalue=True,
+			offvalue=False
+		)
+		checkButtonStoreCorrectedCurves.pack(side=LEFT, padx=(15, 0))
+
 	def _create_frame_required_data(self) -> None:
 		"""
 		Define an entry to specify the location of the 
@@ -359,7 +420,9 @@ class ImportWindow(ttk.Frame):
 			self._update_progressbar("Processing data...", 50.0)
 			self.guiInterface.create_force_volume(
 				importedData,
-				selectedImportParameters.filePathData
+				selectedImportParameters.filePathData,
+				selectedImportParameters.storeCorrectedCurves,
+				selectedImportParameters.contactDetection
 			)
 		self._reset_progrressbar()
 
@@ -381,7 +444,10 @@ class ImportWindow(ttk.Frame):
 			filePathData=self.filePathData.get(),
 			filePathImage=self.filePathImage.get(),
 			filePathChannel=self.filePathChannel.get(),
-			showPoorCurves=self.showPoorCurves.get()
+			showPoorCurves=self.showPoorCurves.get(),
+			precision=self.selectedPrecision.get(),
+			storeCorrectedCurves=self.storeCorrectedCurves.get(),
+			contactDetection=self.selectedContactDetection.get()
 		)
 
 	def _update_progressbar(
@@ -31,8 +31,11 @@ from interfaces.gui_interface import GUIInterface
 from gui.export_window import ExportWindow
 from gui.import_window import ImportWindow
 from data_processing.calculate_channel_data import active_channels as activeChannels
+from data_processing.calculate_elastic_modulus import elasticModulusChannels
 from toolbars.line_plot_toolbar import LinePlotToolbar
 from toolbars.heatmap_toolbar import HeatmapToolbar
+import utilities.instrumentation as instr
+from utilities.action_profiling import decorator_profile_action
 
 def decorator_check_imported_data_set_with_feedback(function):
 	"""
@@ -92,7 +95,7 @@ class MainWindow(ttk.Frame):
 
 		self.channelNames = [
 			self._camel_case_to_text(channelName)
-			for channelName in activeChannels.keys()
+			for channelName in list(activeChannels.keys()) + elasticModulusChannels
 		]
 
 		self.colorPlot = "#e6f7f4"
@@ -107,6 +110,9 @@ class MainWindow(ttk.Frame):
 		self._create_first_row()
 		self._create_second_row()
 
+		if instr.isEnabled:
+			self._create_status_bar()
+
 	def _create_first_row(self) -> None: 
 		"""
 		Define all frames in the first row, consisting of
@@ -138,7 +144,8 @@ class MainWindow(ttk.Frame):
 		frameParent: ttk.Frame
 	) -> None: 
 		"""
-		Define a button to import and export data.
+		Define a button to import and export data
+		and to close the active data.
 
 		Parameters
 		----------
@@ -160,6 +167,12 @@ class MainWindow(ttk.Frame):
 		)
 		buttonExport.grid(row=1, column=0, padx=10, pady=5, sticky=W)
 
+		buttonClose = ttk.Button(
+			frameFiles, text="Close Data",
+			bootstyle="", command=self._close_force_volume
+		)
+		buttonClose.grid(row=2, column=0, padx=10, pady=5, sticky=W)
+
 	def _create_frame_active_data(
 		self, 
 		frameParent: ttk.Frame
@@ -341,13 +354,39 @@ class MainWindow(ttk.Frame):
 		self.holderFigureLineplot.get_tk_widget().grid(row=1, column=0, columnspan=3)
 		frameToolbarLineplot.grid(row=2, column=0, columnspan=3)
 
+		self.deactivateOutliers = tk.BooleanVar(self, value=False)
+		checkbuttonDeactivateOutliers = ttk.Checkbutton(
+			frameLinePlot, 
+			text="Deactivate Outliers", 
+			variable=self.deactivateOutliers,
+			bootstyle="round-toggle")
+		checkbuttonDeactivateOutliers.grid(row=3, column=0, padx=5, pady=(10, 0), sticky=W)
+
+		self.displayDensity = tk.BooleanVar(self, value=False)
+		checkbuttonDensity = ttk.Checkbutton(
+			frameLinePlot, 
+			text="Display Density", 
+			variable=self.displayDensity,
+			command=self._update_line_plot,
+			bootstyle="round-toggle")
+		checkbuttonDensity.grid(row=3, column=1, padx=5, pady=(10, 0))
+
+		buttonDetectOutliers = ttk.Button(
+			frameLinePlot, 
+			text="Detect Outliers", 
+			command=self._detect_outliers,
+			bootstyle=""
+		)
+		buttonDetectOutliers.grid(row=3, column=2, padx=5, pady=(10, 0), sticky=E)
+
 	def _create_heatmap_frame(
 		self, 
 		frameParent: ttk.Frame
 	) -> None:
 		"""
-		Define the figure for the heatmap and a dropdown 
-		menu to select the displayed channel.
+		Define the figure for the heatmap, a dropdown 
+		menu to select the displayed channel and an entry
+		to set the tolerance of the region selection.
 
 		Parameters
 		----------
@@ -369,6 +408,20 @@ class MainWindow(ttk.Frame):
 		)
 		dropdownHeatmapChannel.grid(row=0, column=0, pady=10, sticky=E)
 
+		frameRegionTolerance = ttk.Frame(frameHeatmap)
+		frameRegionTolerance.grid(row=0, column=0, pady=10, sticky=W)
+
+		labelRegionTolerance = ttk.Label(frameRegionTolerance, text="Region Tolerance (%):")
+		labelRegionTolerance.pack(side=LEFT, padx=(0, 5))
+
+		self.regionTolerance = tk.DoubleVar(self, value=5.0)
+		entryRegionTolerance = ttk.Entry(
+			frameRegionTolerance, 
+			textvariable=self.regionTolerance,
+			width=6
+		)
+		entryRegionTolerance.pack(side=LEFT)
+
 		figureHeatmap = Figure(figsize=(6, 4.8), facecolor=self.colorPlot)
 		self.holderFigureHeatmap = FigureCanvasTkAgg(figureHeatmap, frameHeatmap)
 		frameToolbarHeatmap = ttk.Frame(frameHeatmap)
@@ -470,6 +523,35 @@ class MainWindow(ttk.Frame):
 		frameHistogram.columnconfigure(2, weight=1)
 		frameHistogram.columnconfigure(3, weight=1)
 
+	def _create_status_bar(self) -> None:
+		"""
+		Define a status bar below the figures, which displays
+		the measurement of the last finished stage.
+		"""
+		self.stringVarStatusBar = ttk.StringVar(self, value="")
+		labelStatusBar = ttk.Label(
+			self,
+			textvariable=self.stringVarStatusBar,
+			font="Courier 9"
+		)
+		labelStatusBar.pack(fill=X, expand=YES, pady=(10, 0))
+
+		self._update_status_bar()
+
+	def _update_status_bar(self) -> None:
+		"""
+		Display the last recorded stage and check again
+		after half a second. The stages are polled, because
+		exports record them in worker threads.
+		"""
+		lastStageRecord = instr.get_last_stage_record()
+		if lastStageRecord is not None:
+			self.stringVarStatusBar.set(
+				instr.format_stage_record(lastStageRecord)
+			)
+
+		self.after(500, self._update_status_bar)
+
 	def _set_gui_parameters_in_gui_interface(self) -> None:
 		"""
 		Give the GUIInterface all relevant parameters to handle the plots.
@@ -486,8 +568,11 @@ class MainWindow(ttk.Frame):
 			"displayAverage": self.displayAverage,
 			"displayErrorbar": self.displayErrorbar,
 			"displayInactiveCurves": self.displayInactiveCurves,
+			"displayDensity": self.displayDensity,
+			"deactivateOutliers": self.deactivateOutliers,
 			"holderHeatmap": self.holderFigureHeatmap,
 			"activeChannelHeatmap": self.heatmapChannel,
+			"regionToleranceHeatmap": self.regionTolerance,
 			"linkedHeatmap": self.interactiveHeatmap,
 			"holderHistogram": self.holderFigureHistogram,
 			"activeChannelHistogram": self.histogramChannel,
@@ -518,6 +603,13 @@ class MainWindow(ttk.Frame):
 			self.guiInterface
 		)
 
+	@decorator_check_imported_data_set_with_feedback
+	def _close_force_volume(self) -> None:
+		"""
+		Close the active force volume.
+		"""
+		self.guiInterface.close_force_volume()
+
 	def _update_active_force_volume(self, _) -> None: 
 		"""
 		Update the active force volume.
@@ -538,6 +630,13 @@ class MainWindow(ttk.Frame):
 		"""
 		self.guiInterface.update_line_plot()
 
+	@decorator_check_imported_data_set_with_feedback
+	def _detect_outliers(self) -> None:
+		"""
+		Flag or deactivate the outliers of the active force volume.
+		"""
+		self.guiInterface.detect_outliers()
+
 	@decorator_check_imported_data_set
 	def _update_heatmap_channel(self, _) -> None:
 		"""
@@ -552,6 +651,7 @@ class MainWindow(ttk.Frame):
 		"""
 		self.guiInterface.plot_histogram()
 
+	@decorator_profile_action
 	@decorator_check_imported_data_set_with_feedback
 	def _restrict_histogram(self, direction) -> None:
 		"""
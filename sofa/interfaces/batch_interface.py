@@ -0,0 +1,370 @@
+"""
+This file is part of SOFA.
+SOFA is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+SOFA is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from typing import Callable, Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import csv
+import glob
+import os
+import time
+
+import data_processing.named_tuples as nt
+import data_processing.export_data as exp_data
+from data_processing.import_data.import_data import import_data, importFunctions
+from force_spectroscopy_data.force_volume import ForceVolume
+
+try:
+	import resource
+except ImportError:
+	# The resource module is not available on Windows.
+	resource = None
+
+def get_measurement_paths(
+	pathPatterns: List[str]
+) -> List[str]:
+	"""
+	Expand paths and glob patterns to the measurement
+	folders and files which can be imported.
+
+	Parameters
+	----------
+	pathPatterns : list[str]
+		Paths or glob patterns of measurement folders
+		(.ibw) and files (.hdf5).
+
+	Returns
+	-------
+	measurementPaths : list[str]
+		Sorted unique paths of every importable
+		measurement.
+	"""
+	measurementPaths = set()
+
+	for pathPattern in pathPatterns:
+		for path in glob.glob(pathPattern):
+			if get_data_format(path):
+				measurementPaths.add(os.path.normpath(path))
+
+	return sorted(measurementPaths)
+
+def get_output_folder_names(
+	measurementPaths: List[str]
+) -> Dict[str, str]:
+	"""
+	Get a unique output folder name for every measurement.
+	The name is the base name of the measurement, measurements
+	with the same base name are distinguished by the name of
+	their parent folder and, if necessary, by an index.
+
+	Parameters
+	----------
+	measurementPaths : list[str]
+		Paths of the measurement folders and files.
+
+	Returns
+	-------
+	outputFolderNames : dict[str, str]
+		Name of the output folder of every measurement path.
+	"""
+	baseNames = [
+		os.path.splitext(os.path.basename(os.path.normpath(path)))[0]
+		for path in measurementPaths
+	]
+	outputFolderNames = {}
+	usedNames = set()
+
+	for measurementPath, baseName in zip(measurementPaths, baseNames):
+		name = baseName
+		if baseNames.count(baseName) > 1:
+			parentFolder = os.path.basename(
+				os.path.dirname(os.path.abspath(measurementPath))
+			)
+			name = baseName + "_" + parentFolder
+		uniqueName = name
+		index = 1
+		while uniqueName in usedNames:
+			uniqueName = name + "_" + str(index)
+			index += 1
+		usedNames.add(uniqueName)
+		outputFolderNames[measurementPath] = uniqueName
+
+	return outputFolderNames
+
+def get_data_format(
+	measurementPath: str
+) -> Optional[str]:
+	"""
+	Map a measurement path to the matching import format.
+	Folders contain .ibw files, files are identified by
+	their extension.
+
+	Parameters
+	----------
+	measurementPath : str
+		Path to a measurement folder or file.
+
+	Returns
+	-------
+	dataFormat : str or None
+		Key of the matching import function or None if
+		the measurement can not be imported.
+	"""
+	if os.path.isdir(measurementPath):
+		return ".ibw"
+
+	extension = os.path.splitext(measurementPath)[1].lower()
+	if extension in importFunctions and extension != ".ibw":
+		return extension
+
+	return None
+
+def set_memory_limit(memoryLimit: int) -> None:
+	"""
+	Limit the address space of the current worker process,
+	so a single oversized job fails with a MemoryError
+	instead of exhausting the memory of the machine.
+
+	Parameters
+	----------
+	memoryLimit : int
+		Maximum memory of a job in megabytes, no limit if 0.
+	"""
+	if not memoryLimit or resource is None:
+		return
+
+	memoryLimitBytes = memoryLimit * 1024**2
+	_, hardLimit = resource.getrlimit(resource.RLIMIT_AS)
+	if hardLimit != resource.RLIM_INFINITY:
+		memoryLimitBytes = min(memoryLimitBytes, hardLimit)
+
+	resource.setrlimit(resource.RLIMIT_AS, (memoryLimitBytes, hardLimit))
+
+def process_measurement(
+	measurementPath: str,
+	outputFolderPath: str,
+	exportFormats: List[str],
+	precision: str = "native",
+	storeCorrectedCurves: bool = True,
+	indentationParameters: nt.IndentationParameters = nt.IndentationParameters(),
+	contactDetection: str = "derivative",
+	outputFolderName: str = ""
+) -> nt.BatchResult:
+	"""
+	Import, correct and export a single measurement and
+	time every step.
+
+	Parameters
+	----------
+	measurementPath : str
+		Path to a measurement folder or file.
+	outputFolderPath : str
+		Folder in which a subfolder for the processed
+		data of the measurement is created.
+	exportFormats : list[str]
+		Keys of the export formats to which the data
+		is exported.
+	precision : str, optional
+		Precision in which the curves are stored.
+	storeCorrectedCurves : bool, optional
+		Whether the corrected curves are stored or
+		calculated from the raw curves when needed.
+	indentationParameters : nt.IndentationParameters, optional
+		Tip geometry and sample parameters of the
+		elastic modulus channel.
+	contactDetection : str, optional
+		Name of the algorithm which locates the end
+		of the zero line of the curves.
+	outputFolderName : str, optional
+		Name of the subfolder for the processed data,
+		the name of the force volume if empty.
+
+	Returns
+	-------
+	batchResult : nt.BatchResult
+		Timings, number of curves and possible error
+		of the processed measurement.
+	"""
+	name = os.path.splitext(os.path.basename(measurementPath))[0]
+	numberOfCurves = numberOfFailedCurves = 0
+	importTime = processingTime = exportTime = 0.0
+
+	try:
+		startTime = time.perf_counter()
+		importedData = import_data(
+			nt.ImportParameter(
+				dataFormat=get_data_format(measurementPath),
+				filePathData=measurementPath,
+				filePathImage="",
+				filePathChannel="",
+				showPoorCurves=False,
+				precision=precision
+			)
+		)
+		importTime = time.perf_counter() - startTime
+
+		startTime = time.perf_counter()
+		forceVolume = ForceVolume(
+			importedData,
+			measurementPath,
+			storeCorrectedCurves,
+			indentationParameters,
+			nt.CorrectionSettings(contactDetection=contactDetection)
+		)
+		name = forceVolume.name
+		numberOfCurves = len(forceVolume.forceDistanceCurves)
+		numberOfFailedCurves = numberOfCurves - len(
+			forceVolume.get_force_distance_curves_data()
+		)
+		if numberOfFailedCurves < numberOfCurves:
+			forceVolume.calculate_average([])
+		processingTime = time.perf_counter() - startTime
+
+		startTime = time.perf_counter()
+		pathOutputFolder = exp_data.setup_output_folder(
+			outputFolderPath,
+			outputFolderName or forceVolume.name
+		)
+		for exportFormat in exportFormats:
+			exp_data.exportFormats[exportFormat](forceVolume, pathOutputFolder)
+		exportTime = time.perf_counter() - startTime
+	except Exception as e:
+		return nt.BatchResult(
+			name, measurementPath, False, numberOfCurves, numberOfFailedCurves,
+			importTime, processingTime, exportTime,
+			type(e).__name__ + ": " + str(e)
+		)
+
+	return nt.BatchResult(
+		name, measurementPath, True, numberOfCurves, numberOfFailedCurves,
+		importTime, processingTime, exportTime, ""
+	)
+
+def run_batch_processing(
+	batchParameter: nt.BatchParameter,
+	report_progress: Optional[Callable] = None
+) -> List[nt.BatchResult]:
+	"""
+	Process every measurement in parallel across a pool
+	of worker processes.
+
+	Parameters
+	----------
+	batchParameter : nt.BatchParameter
+		Measurements, output folder, export formats,
+		number of processes, memory limit per job,
+		precision and storage of the corrected curves.
+	report_progress : function, optional
+		Called with every finished nt.BatchResult.
+
+	Returns
+	-------
+	batchResults : list[nt.BatchResult]
+		Result of every measurement in the order of
+		the measurement paths.
+	"""
+	batchResults = {}
+	# Measurements with the same name must not export into the same folder.
+	outputFolderNames = get_output_folder_names(batchParameter.measurementPaths)
+
+	with ProcessPoolExecutor(
+		max_workers=batchParameter.numberOfProcesses,
+		initializer=set_memory_limit,
+		initargs=(batchParameter.memoryLimit,)
+	) as executor:
+		futures = {
+			executor.submit(
+				process_measurement,
+				measurementPath,
+				batchParameter.outputFolderPath,
+				batchParameter.exportFormats,
+				batchParameter.precision,
+				batchParameter.storeCorrectedCurves,
+				batchParameter.indentationParameters,
+				batchParameter.contactDetection,
+				outputFolderNames[measurementPath]
+			): measurementPath
+			for measurementPath in batchParameter.measurementPaths
+		}
+		for future in as_completed(futures):
+			measurementPath = futures[future]
+			try:
+				batchResult = future.result()
+			except BrokenProcessPool as e:
+				# A worker was killed, for example by the operating system.
+				batchResult = create_failed_batch_result(
+					measurementPath,
+					"BrokenProcessPool: " + str(e)
+				)
+			batchResults[measurementPath] = batchResult
+			if report_progress:
+				report_progress(batchResult)
+
+	return [
+		batchResults[measurementPath]
+		for measurementPath in batchParameter.measurementPaths
+	]
+
+def create_failed_batch_result(
+	measurementPath: str,
+	errorMessage: str
+) -> nt.BatchResult:
+	"""
+	Create the result of a measurement whose worker
+	process terminated unexpectedly.
+
+	Parameters
+	----------
+	measurementPath : str
+		Path to the measurement folder or file.
+	errorMessage : str
+		Description of the error.
+
+	Returns
+	-------
+	batchResult : nt.BatchResult
+		Result without timings or curve counts.
+	"""
+	return nt.BatchResult(
+		os.path.splitext(os.path.basename(measurementPath))[0],
+		measurementPath, False, 0, 0, 0.0, 0.0, 0.0, errorMessage
+	)
+
+def write_summary_report(
+	batchResults: List[nt.BatchResult],
+	filePathReport: str
+) -> None:
+	"""
+	Write the timings and number of failed curves of
+	every processed measurement to a .csv file.
+
+	Parameters
+	----------
+	batchResults : list[nt.BatchResult]
+		Results of the processed measurements.
+	filePathReport : str
+		Path of the summary report.
+	"""
+	with open(filePathReport, "w", newline="") as reportFile:
+		writer = csv.writer(reportFile)
+		writer.writerow(nt.BatchResult._fields + ("totalTime",))
+		for batchResult in batchResults:
+			writer.writerow(
+				batchResult + (
+					batchResult.importTime
+					+ batchResult.processingTime
+					+ batchResult.exportTime,
+				)
+			)
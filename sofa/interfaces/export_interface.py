@@ -0,0 +1,208 @@
+"""
+This file is part of SOFA.
+SOFA is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+SOFA is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from typing import Callable, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, wait
+import os
+import pickle
+import threading
+
+import data_processing.named_tuples as nt
+import data_processing.export_data as exp_data
+
+class ExportScheduler():
+	"""
+	Export the data of a force volume to several formats and
+	render the figures concurrently in a pool of worker threads.
+
+	Attributes
+	----------
+	numberOfWorkers : int or None
+		Maximum number of worker threads, None to use
+		the default of the ThreadPoolExecutor.
+	outputFolderPath : str
+		Path of the folder in which the data is stored.
+	"""
+	def __init__(
+		self,
+		numberOfWorkers: Optional[int] = None
+	) -> None:
+		"""
+		Initialize an export scheduler without tasks.
+
+		Parameters
+		----------
+		numberOfWorkers : int, optional
+			Maximum number of worker threads.
+		"""
+		self.numberOfWorkers: Optional[int] = numberOfWorkers
+		self.outputFolderPath: str = ""
+
+		self._futures: Dict = {}
+		self._cancelEvent = threading.Event()
+
+	def start(
+		self,
+		forceVolume,
+		exportParameter: nt.ExportParameter,
+		figures: Dict
+	) -> None:
+		"""
+		Create the output folder, a snapshot of the force volume,
+		the data frames shared by the selected formats and a copy
+		of every figure in the calling thread, then submit an export
+		task for every format and figure to the worker pool. The
+		data frames of the curves are only created by the .xlsx
+		task. The GUI can change or close the force volume while
+		the snapshot is exported.
+
+		Parameters
+		----------
+		forceVolume : ForceVolume
+			Contains the raw and calculated data from the
+			imported measurement.
+		exportParameter : nt.ExportParameter
+			Location and name of the output folder, the selected
+			export formats and whether the plots are exported.
+		figures : dict[str, matplotlib.figure.Figure]
+			Figures to export with their file names.
+		"""
+		self._cancelEvent.clear()
+		self.outputFolderPath = exp_data.setup_output_folder(
+			exportParameter.folderPath,
+			exportParameter.folderName
+		)
+
+		snapshotForceVolume = forceVolume.create_snapshot()
+
+		dataFramesForceVolume = None
+		if any(
+			exportFormat in exp_data.dataFrameExportFormats
+			for exportFormat in exportParameter.exportFormats
+		):
+			dataFramesForceVolume = exp_data.get_force_volume_data(
+				snapshotForceVolume,
+				includeCurves=False
+			)
+
+		tasks = {}
+		for exportFormat in exportParameter.exportFormats:
+			kwargs = {}
+			if exportFormat in exp_data.dataFrameExportFormats:
+				kwargs["dataFramesForceVolume"] = dataFramesForceVolume
+			tasks[exportFormat] = (
+				exp_data.exportFormats[exportFormat],
+				(snapshotForceVolume, self.outputFolderPath),
+				kwargs
+			)
+		if exportParameter.exportPlots:
+			for figureName, figure in figures.items():
+				# The pickled copy can not be changed by the GUI while it is rendered.
+				tasks[figureName] = (
+					exp_data.render_figure,
+					(
+						pickle.dumps(figure),
+						os.path.join(self.outputFolderPath, figureName)
+					),
+					{}
+				)
+
+		executor = ThreadPoolExecutor(max_workers=self.numberOfWorkers)
+		self._futures = {
+			executor.submit(self._run_task, function, args, kwargs): taskName
+			for taskName, (function, args, kwargs) in tasks.items()
+		}
+		executor.shutdown(wait=False)
+
+	def _run_task(
+		self,
+		function: Callable,
+		args: tuple,
+		kwargs: Dict
+	) -> bool:
+		"""
+		Run a single export task unless the export was cancelled.
+
+		Returns
+		-------
+		wasRun : bool
+			False if the task was skipped.
+		"""
+		if self._cancelEvent.is_set():
+			return False
+
+		function(*args, **kwargs)
+
+		return True
+
+	@property
+	def numberOfTasks(self) -> int:
+		"""
+		Number of submitted export tasks.
+		"""
+		return len(self._futures)
+
+	@property
+	def numberOfFinishedTasks(self) -> int:
+		"""
+		Number of export tasks which are done.
+		"""
+		return sum(future.done() for future in self._futures)
+
+	@property
+	def isFinished(self) -> bool:
+		"""
+		Whether every export task is done.
+		"""
+		return all(future.done() for future in self._futures)
+
+	@property
+	def isCancelled(self) -> bool:
+		"""
+		Whether the export was cancelled.
+		"""
+		return self._cancelEvent.is_set()
+
+	def cancel(self) -> None:
+		"""
+		Skip every export task which has not started yet,
+		running tasks are finished.
+		"""
+		self._cancelEvent.set()
+		for future in self._futures:
+			future.cancel()
+
+	def wait(self) -> None:
+		"""
+		Block until every export task is done.
+		"""
+		wait(self._futures)
+
+	def get_errors(self) -> List[str]:
+		"""
+		Get the errors of the failed export tasks.
+
+		Returns
+		-------
+		errors : list[str]
+			Name and error message of every failed task.
+		"""
+		return [
+			taskName + ": " + str(future.exception())
+			for future, taskName in self._futures.items()
+			if future.done()
+			and not future.cancelled()
+			and future.exception() is not None
+		]
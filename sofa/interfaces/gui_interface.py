@@ -13,14 +13,21 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
 """
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 import functools
 
+import numpy as np
+
 import data_processing.mutate_histogram_data as mhd 
 import data_processing.named_tuples as nt
+import interfaces.gui_named_tuples as gui_nt
 import data_visualization.plot_data as plt_data
 from force_spectroscopy_data.force_volume import ForceVolume
 from interfaces.plot_interface import PlotInterface
+from utilities.instrumentation import decorator_measure_stage
+from utilities.action_profiling import decorator_profile_action
+from utilities.redraw_scheduler import RedrawScheduler
+from utilities.memory_manager import MemoryManager
 
 def decorator_get_active_data_set(function):
 	"""
@@ -93,28 +100,42 @@ class GUIInterface():
 	importedDataSets : Dict
 		Contains the imported force volumes and their associated
 		PlotInterfaces.
-	activeForceVolumeParameters : nt.ActiveForceVolumeParameters
+	activeForceVolumeParameters : gui_nt.ActiveForceVolumeParameters
 		Contains all GUI elements of the main window
 		which are related to the active force volume.
-	linePlotParameters : nt.LinePlotParameters
+	linePlotParameters : gui_nt.LinePlotParameters
 		Contains all GUI elements of the main window
 		which are related to the line plot.
-	heatmapParameters : nt.HeatmapParameters
+	heatmapParameters : gui_nt.HeatmapParameters
 		Contains all GUI elements of the main window
 		which are related to the heatmap.
-	histogramParameters : nt.HistogramParameters
+	histogramParameters : gui_nt.HistogramParameters
 		Contains all GUI elements of the main window
 		which are related to the histogram.
+	redrawScheduler : RedrawScheduler
+		Collects the plots which need to be redrawn after
+		a change to the inactive data points.
+	memoryManager : MemoryManager
+		Keeps the memory footprint of the imported data
+		sets within a budget by spilling the curves of the
+		least recently active force volumes to disk.
+	maximumForceVolumesWithArtists : int
+		Number of recently active force volumes which
+		keep their artists, the artists of the others
+		are released.
 	"""
 	def __init__(self) -> None:
 		"""
 		Initialize a blank gui interface. 
 		"""
 		self.importedDataSets: Dict = {}
-		self.activeForceVolumeParameters: nt.ActiveForceVolumeParameters
-		self.linePlotParameters: nt.LinePlotParameters 
-		self.heatmapParameters: nt.HeatmapParameters
-		self.histogramParameters: nt.HistogramParameters
+		self.activeForceVolumeParameters: gui_nt.ActiveForceVolumeParameters
+		self.linePlotParameters: gui_nt.LinePlotParameters 
+		self.heatmapParameters: gui_nt.HeatmapParameters
+		self.histogramParameters: gui_nt.HistogramParameters
+		self.redrawScheduler: RedrawScheduler
+		self.memoryManager: MemoryManager = MemoryManager()
+		self.maximumForceVolumesWithArtists: int = 2
 
 	def set_gui_parameters(self, guiParameters: Dict) -> None:
 		"""
@@ -127,7 +148,7 @@ class GUIInterface():
 			Contains the relevant parameters of every plot
 			in the main window of SOFA.
 		"""
-		self.activeForceVolumeParameters = nt.ActiveForceVolumeParameters(
+		self.activeForceVolumeParameters = gui_nt.ActiveForceVolumeParameters(
 			key=guiParameters["keyActiveForceVolume"],
 			name=guiParameters["activeForceVolumeName"],
 			size=guiParameters["activeForceVolumeSize"],
@@ -135,30 +156,40 @@ class GUIInterface():
 			dropdownList=guiParameters["activeForceVolumeDropdownList"],
 			dropdown=guiParameters["activeForceVolumeDropdown"]
 		)
-		self.linePlotParameters = nt.LinePlotParameters(
+		self.linePlotParameters = gui_nt.LinePlotParameters(
 			linked=guiParameters["linkedLinePlot"],
 			holder=guiParameters["holderLinePlot"],
 			plotInactive=guiParameters["displayInactiveCurves"],
 			plotAverage=guiParameters["displayAverage"],
-			plotErrorbar=guiParameters["displayErrorbar"]
+			plotErrorbar=guiParameters["displayErrorbar"],
+			plotDensity=guiParameters["displayDensity"],
+			deactivateOutliers=guiParameters["deactivateOutliers"]
 		)
-		self.heatmapParameters = nt.HeatmapParameters(
+		self.heatmapParameters = gui_nt.HeatmapParameters(
 			linked=guiParameters["linkedHeatmap"],
 			holder=guiParameters["holderHeatmap"],
-			activeChannel=guiParameters["activeChannelHeatmap"]
+			activeChannel=guiParameters["activeChannelHeatmap"],
+			regionTolerance=guiParameters["regionToleranceHeatmap"]
 		)
-		self.histogramParameters = nt.HistogramParameters(
+		self.histogramParameters = gui_nt.HistogramParameters(
 			linked=guiParameters["linkedHistogram"],
 			holder=guiParameters["holderHistogram"],
 			activeChannel=guiParameters["activeChannelHistogram"],
 			zoom=guiParameters["zoomHistogram"],
 			numberOfBins=guiParameters["numberOfBins"]
 		)
+		self.redrawScheduler = RedrawScheduler(
+			self.linePlotParameters.holder.get_tk_widget().after_idle,
+			self._redraw_plots
+		)
 
+	@decorator_measure_stage
 	def create_force_volume(
 		self, 
 		importedData: Dict,
-		filePathImportedData: str
+		filePathImportedData: str,
+		storeCorrectedCurves: bool = True,
+		contactDetection: str = "derivative"
 	) -> None: 
 		"""
 		Create a force volume from the imported measurement
@@ -173,10 +204,18 @@ class GUIInterface():
 		filePathImportedData : str
 			File path of the imported measurement 
 			files.
+		storeCorrectedCurves : bool, optional
+			Whether the corrected curves are stored or
+			calculated from the raw curves when needed.
+		contactDetection : str, optional
+			Name of the algorithm which locates the end
+			of the zero line of the curves.
 		"""
 		forceVolume = ForceVolume(
 			importedData,
-			filePathImportedData
+			filePathImportedData,
+			storeCorrectedCurves,
+			correctionSettings=nt.CorrectionSettings(contactDetection=contactDetection)
 		)
 		plotInterface = PlotInterface(
 			forceVolume.size,
@@ -187,12 +226,18 @@ class GUIInterface():
 			"forceVolume": forceVolume,
 			"plotInterface": plotInterface
 		}
+		self.memoryManager.add_data_set(
+			forceVolume.name, 
+			(forceVolume, plotInterface)
+		)
 		self.activeForceVolumeParameters.key.set(forceVolume.name)
 
 		self.update_active_force_volume(
 			newlyImportedForceVolume=True
 		)
 
+	@decorator_profile_action
+	@decorator_measure_stage
 	def update_active_force_volume(
 		self,
 		newlyImportedForceVolume: bool = False
@@ -208,12 +253,75 @@ class GUIInterface():
 			Indicates wheter the force volume was newly
 			imported or not.
 		"""
+		createdArtists = self._update_force_volumes_with_artists()
 		self._update_active_force_volume_meta_data(
 			newlyImportedForceVolume
 		)
 		self._plot_line_plot()
+		# Restore the state of the recreated lines.
+		if createdArtists and not newlyImportedForceVolume:
+			self.update_line_plot()
 		self.plot_heatmap()
 		self.plot_histogram()
+
+	def _update_force_volumes_with_artists(self) -> bool:
+		"""
+		Reload the curves and create the artists of the 
+		active force volume if necessary and release the
+		artists of the force volumes which were not active
+		recently.
+
+		Returns
+		-------
+		createdArtists : bool
+			True if the artists of the active force 
+			volume had to be created.
+		"""
+		self.memoryManager.activate_data_set(
+			self.activeForceVolumeParameters.key.get()
+		)
+		activePlotInterface = self.get_active_plot_interface()
+		createdArtists = not activePlotInterface.hasArtists
+		activePlotInterface.create_artists()
+
+		recentForceVolumes = self.memoryManager.recentDataSets
+		for releasedKey in recentForceVolumes[:-self.maximumForceVolumesWithArtists]:
+			self.importedDataSets[releasedKey]["plotInterface"].release_artists()
+
+		return createdArtists
+
+	def close_force_volume(self) -> None:
+		"""
+		Close the active force volume, free its data and 
+		activate the most recently active remaining one.
+		"""
+		activeKey = self.activeForceVolumeParameters.key.get()
+		self.memoryManager.remove_data_set(activeKey)
+		del self.importedDataSets[activeKey]
+
+		self.activeForceVolumeParameters.dropdownList.remove(activeKey)
+		self.activeForceVolumeParameters.dropdown.set_menu(
+			"", 
+			*self.activeForceVolumeParameters.dropdownList
+		)
+
+		if self.memoryManager.recentDataSets:
+			self.activeForceVolumeParameters.key.set(
+				self.memoryManager.recentDataSets[-1]
+			)
+			self.update_active_force_volume()
+			return
+
+		self.activeForceVolumeParameters.key.set("")
+		self.activeForceVolumeParameters.name.set("")
+		self.activeForceVolumeParameters.size.set("")
+		self.activeForceVolumeParameters.location.set("")
+		for holder in (
+			self.linePlotParameters.holder,
+			self.heatmapParameters.holder,
+			self.histogramParameters.holder
+		):
+			plt_data.clear_plot(holder)
 	
 	@decorator_get_active_force_volume
 	def _update_active_force_volume_meta_data(
@@ -243,6 +351,7 @@ class GUIInterface():
 				*self.activeForceVolumeParameters.dropdownList
 			)
 
+	@decorator_measure_stage
 	@decorator_get_active_data_set
 	def _plot_line_plot(
 		self, 
@@ -264,9 +373,15 @@ class GUIInterface():
 		"""
 		plt_data.plot_line_plot(
 			self.linePlotParameters.holder, 
-			activePlotInterface.forceDistanceLines
+			activePlotInterface.forceDistanceLines,
+			not self.linePlotParameters.plotDensity.get()
 		)
 
+		if self.linePlotParameters.plotDensity.get():
+			self.update_density_image()
+			self.linePlotParameters.holder.draw()
+
+	@decorator_measure_stage
 	@decorator_get_active_heatmap_channel
 	@decorator_get_active_data_set
 	def plot_heatmap(
@@ -293,14 +408,30 @@ class GUIInterface():
 		"""
 		plt_data.plot_heatmap(
 			self.heatmapParameters.holder,
-			activeForceVolume.get_active_heatmap_data(
-				keyActiveHeatmapChannel,
-				activePlotInterface.inactiveDataPoints,
-				activePlotInterface.orientationMatrix
+			activePlotInterface.get_heatmap_image(
+				activeForceVolume.channels[keyActiveHeatmapChannel]
 			),
 			activePlotInterface.selectedAreaOutlines
 		)
 
+	def get_active_heatmap_data(self) -> np.ndarray:
+		"""
+		Get the active data of the channel displayed
+		in the heatmap in its current orientation.
+
+		Returns
+		-------
+		activeHeatmapData : np.ndarray
+			Two dimensional data of the channel, nan
+			for inactive data points.
+		"""
+		activeChannel = self.get_active_force_volume().channels[
+			self._text_to_camel_case(self.heatmapParameters.activeChannel.get())
+		]
+
+		return self.get_active_plot_interface().get_heatmap_image(activeChannel).data
+
+	@decorator_measure_stage
 	@decorator_get_active_histogram_channel
 	@decorator_get_active_data_set
 	def plot_histogram(
@@ -365,6 +496,8 @@ class GUIInterface():
 			activePlotInterface,
 			keyActiveHistogramChannel
 		)
+		if restrictionParameters is None:
+			return
 		inactiveDataPoints = mhd.restrict_histogram_min_up(
 			restrictionParameters.indexMinBinValue,
 			restrictionParameters.indexMaxBinValue,
@@ -402,6 +535,8 @@ class GUIInterface():
 			activePlotInterface,
 			keyActiveHistogramChannel
 		)
+		if restrictionParameters is None:
+			return
 		reactivatedDataPoints = mhd.restrict_histogram_min_down(
 			restrictionParameters.indexMinBinValue,
 			restrictionParameters.indexMaxBinValue,
@@ -440,6 +575,8 @@ class GUIInterface():
 			activePlotInterface,
 			keyActiveHistogramChannel
 		)
+		if restrictionParameters is None:
+			return
 		reactivatedDataPoints = mhd.restrict_histogram_max_up(
 			restrictionParameters.indexMinBinValue,
 			restrictionParameters.indexMaxBinValue,
@@ -479,6 +616,8 @@ class GUIInterface():
 			activePlotInterface,
 			keyActiveHistogramChannel
 		)
+		if restrictionParameters is None:
+			return
 		inactiveDataPoints = mhd.restrict_histogram_max_down(
 			restrictionParameters.indexMinBinValue,
 			restrictionParameters.indexMaxBinValue,
@@ -493,7 +632,7 @@ class GUIInterface():
 		activeForceVolume: ForceVolume,
 		activePlotInterface: PlotInterface,
 		keyActiveHistogramChannel: str
-	) -> nt.HistogramRestrictionParameters:
+	) -> Optional[nt.HistogramRestrictionParameters]:
 		"""
 		Get all parameters needed to restrict the
 		borders of the histogram.
@@ -512,9 +651,10 @@ class GUIInterface():
 
 		Returns
 		-------
-		restrictionParameters : nt.HistogramRestrictionParameters
+		restrictionParameters : nt.HistogramRestrictionParameters or None
 			Contains all parameters needed to restrict
-			the histogram.
+			the histogram, None if the histogram has no
+			active values.
 		"""
 		data = activeForceVolume.get_histogram_data(
 			keyActiveHistogramChannel
@@ -524,6 +664,9 @@ class GUIInterface():
 			activePlotInterface.inactiveDataPoints
 		)
 		binValues = activePlotInterface.binValues
+		if len(binValues) == 0 or np.ma.count(activeData) == 0:
+			return None
+
 		indexMinBinValue = mhd.get_index_of_minimum_bin_value(
 			binValues,
 			activeData
@@ -542,11 +685,31 @@ class GUIInterface():
 
 	def update_active_force_volume_plots(self) -> None: 
 		"""
-		Update the inactive data points in every plot.
+		Update the inactive data points in every plot
+		once the main window is idle.
 		"""
-		self.update_line_plot()
-		self.plot_heatmap()
-		self.plot_histogram()
+		self.redrawScheduler.mark_dirty("linePlot", "heatmap", "histogram")
+
+	@decorator_profile_action
+	@decorator_measure_stage
+	def _redraw_plots(self, dirtyPlots: Set[str]) -> None:
+		"""
+		Redraw the plots which are out of date.
+
+		Parameters
+		----------
+		dirtyPlots : set[str]
+			Names of the plots which need to be redrawn.
+		"""
+		if not self.check_imported_data_set():
+			return
+
+		if "linePlot" in dirtyPlots:
+			self.update_line_plot()
+		if "heatmap" in dirtyPlots:
+			self.plot_heatmap()
+		if "histogram" in dirtyPlots:
+			self.plot_histogram()
 
 	def update_inactive_data_points_line_plot(self) -> None:
 		"""
@@ -557,7 +720,7 @@ class GUIInterface():
 		if self.linePlotParameters.linked.get():
 			self.update_active_force_volume_plots()
 		else:
-			self.update_line_plot()
+			self.redrawScheduler.mark_dirty("linePlot")
 
 	def update_inactive_data_points_heatmap(self) -> None:
 		"""
@@ -568,7 +731,7 @@ class GUIInterface():
 		if self.heatmapParameters.linked.get():
 			self.update_active_force_volume_plots()
 		else:
-			self.plot_heatmap()
+			self.redrawScheduler.mark_dirty("heatmap")
 
 	def update_inactive_data_points_histogram(self) -> None:
 		"""
@@ -579,8 +742,10 @@ class GUIInterface():
 		if self.histogramParameters.linked.get():
 			self.update_active_force_volume_plots()
 		else:
-			self.plot_histogram()
+			self.redrawScheduler.mark_dirty("histogram")
 
+	@decorator_profile_action
+	@decorator_measure_stage
 	@decorator_get_active_data_set
 	def update_line_plot(
 		self,
@@ -602,16 +767,56 @@ class GUIInterface():
 			the different plots.
 		"""
 		activePlotInterface.delete_average_lines()
+		self.update_density_image()
 		plt_data.update_line_plot(
 			self.linePlotParameters.holder,
 			activePlotInterface.forceDistanceLines,
 			activePlotInterface.inactiveDataPoints,
-			self.linePlotParameters.plotInactive.get()
+			self.linePlotParameters.plotInactive.get(),
+			activePlotInterface.flaggedDataPoints,
+			not self.linePlotParameters.plotDensity.get()
 		)
 
 		if self.linePlotParameters.plotAverage.get():
 			self.update_line_plot_average()
 
+	@decorator_measure_stage
+	@decorator_get_active_plot_interface
+	def update_density_image(
+		self,
+		activePlotInterface: PlotInterface
+	) -> None:
+		"""
+		Replace the density image of the force distance
+		curves in the line plot by one of the current view,
+		if the density mode is selected. The line plot is
+		redrawn by the caller.
+
+		Parameters
+		----------
+		activePlotInterface : PlotInterface
+			Interface between a force volume and 
+			the different plots.
+		"""
+		activePlotInterface.delete_density_images()
+		if not self.linePlotParameters.plotDensity.get():
+			return
+
+		viewLimits = plt_data.get_view_limits(self.linePlotParameters.holder)
+		activeDensityImage, inactiveDensityImage = activePlotInterface.get_density_images(
+			viewLimits,
+			plt_data.get_axes_shape(self.linePlotParameters.holder),
+			self.linePlotParameters.plotInactive.get()
+		)
+		activePlotInterface.densityImages = plt_data.add_density_images(
+			self.linePlotParameters.holder,
+			activeDensityImage,
+			inactiveDensityImage,
+			viewLimits
+		)
+
+	@decorator_profile_action
+	@decorator_measure_stage
 	@decorator_get_active_data_set
 	def update_line_plot_average(
 		self,
@@ -652,6 +857,35 @@ class GUIInterface():
 				)
 			)
 
+	@decorator_profile_action
+	@decorator_get_active_data_set
+	def detect_outliers(
+		self,
+		activeForceVolume: ForceVolume,
+		activePlotInterface: PlotInterface
+	) -> None:
+		"""
+		Detect outliers in the active curves and either
+		flag them in the line plot or deactivate them.
+
+		Parameters
+		----------
+		activeForceVolume : ForceVolume
+			Contains the imported and corrected
+			measurement data.
+		activePlotInterface : PlotInterface
+			Interface between a force volume and 
+			the different plots.
+		"""
+		outlierScores = activeForceVolume.detect_outliers(
+			activePlotInterface.inactiveDataPoints
+		)
+		activePlotInterface.add_outliers(
+			np.flatnonzero(outlierScores.isOutlier).tolist(),
+			self.linePlotParameters.deactivateOutliers.get()
+		)
+		self.update_inactive_data_points_line_plot()
+
 	def check_imported_data_set(self) -> bool: 
 		"""
 		Checks whether measurement data has 
@@ -0,0 +1,49 @@
+"""
+This file is part of SOFA.
+SOFA is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+SOFA is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from typing import NamedTuple, List
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import tkinter as tk
+import ttkbootstrap as ttk
+
+class ActiveForceVolumeParameters(NamedTuple):
+	key: ttk.StringVar
+	name: ttk.StringVar
+	size: ttk.StringVar
+	location: ttk.StringVar
+	dropdownList: List
+	dropdown: ttk.OptionMenu
+
+class LinePlotParameters(NamedTuple):
+	linked: tk.BooleanVar
+	holder: FigureCanvasTkAgg
+	plotInactive: bool 
+	plotAverage: bool
+	plotErrorbar: bool
+	plotDensity: tk.BooleanVar
+	deactivateOutliers: tk.BooleanVar
+
+class HeatmapParameters(NamedTuple): 
+	linked: tk.BooleanVar
+	holder: FigureCanvasTkAgg
+	activeChannel: tk.StringVar
+	regionTolerance: tk.DoubleVar
+
+class HistogramParameters(NamedTuple):  
+	linked: tk.BooleanVar
+	holder: FigureCanvasTkAgg
+	activeChannel: tk.StringVar
+	zoom: tk.BooleanVar
+	numberOfBins: ttk.Entry
\ No newline at end of file
@@ -13,11 +13,17 @@ GNU General Public License for more details.
 You should have received a copy of the GNU General Public License
 along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
 """
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 
 import numpy as np
 
+import data_processing.named_tuples as nt
+from data_processing.image_pyramid import ImagePyramid
+from data_processing.rasterize_curves import rasterize_curves
+from data_processing.select_heatmap_area import get_area_outlines
 import data_visualization.plot_data as plt_data
+from force_spectroscopy_data.curve_buffer import CurveBuffer
+from force_spectroscopy_data.curve_index import CurveIndex
 
 class PlotInterface():
 	"""
@@ -31,10 +37,27 @@ class PlotInterface():
 	inactiveDataPoints : list[int]
 		Inactive force distance curve/data points
 		of the force volume.
+	flaggedDataPoints : list[int]
+		Force distance curves/data points which are
+		marked as outliers but remain active.
+	hasArtists : bool
+		True while the lines of the force distance 
+		curves exist, the artists of inactive force
+		volumes are released.
 	forceDistanceLines : list[mpl.lines.Line2D]
 		Displayable line representation of every
 		force distance curve of the associated force
-		volume.
+		volume, empty while the artists are released.
+	curveBuffer : CurveBuffer
+		Piezo (x) and deflection (y) values of every
+		force distance curve in a single buffer.
+	curveIndex : CurveIndex
+		Spatial index of the force distance curves
+		to find the curves within a view of the line plot,
+		None while the curve buffer is spilled.
+	densityImages : list[mpl.image.AxesImage]
+		Density images of the active and inactive force
+		distance curves displayed instead of the lines.
 	averageLines : list[mpl.lines.Line2D]
 		Displayable line representation of the
 		average curve of the associated force volume.
@@ -43,16 +66,22 @@ class PlotInterface():
 		zoom settings.
 	orientationMatrix : np.ndarray
 		Contains the original position of the data points
-		in the current orientation of the channel.
-	selectedArea : list[tuple[int]]
-		X and y coordinates of the data points
-		within the selected area of the heatmap. 
+		in the current orientation of the channel, None
+		while the artists are released.
+	selectedArea : np.ndarray
+		Mask of the data points within the selected 
+		area of the heatmap in the current orientation,
+		None while the artists are released.
 	selectedAreaOutlines : list[mpl.lines.Line2D]
 		Outlines of the selected area in the 
 		heatmap.
 	binValues : list[float]
 		Values of the bins from the general channel data
 		displayed in the histogram.
+	heatmapImages : dict[str, nt.HeatmapImage]
+		Active data of the channels displayed in the 
+		heatmap with the current orientation and inactive
+		data points.
 	"""
 	def __init__(
 		self, 
@@ -60,35 +89,46 @@ class PlotInterface():
 		forceDistanceCurves
 	) -> None:
 		"""
-		Initialize a plot interface, create a line
-		representation for every force distance curve
-		and initialize the orientation matrix.
+		Initialize a plot interface, index the force 
+		distance curves and initialize the orientation 
+		matrix. The artists are created on activation.
 		"""
 		self.size: Tuple[int] = size
 		self.inactiveDataPoints: List = []
+		self.flaggedDataPoints: List = []
 
+		self.hasArtists: bool = False
 		self.forceDistanceLines: List = []
+		self.curveBuffer: CurveBuffer
+		self.curveIndex: Optional[CurveIndex]
+		self.densityImages: List = []
+		self._densityImagesKey: Tuple = ()
+		self._densityImagesData: Tuple = ()
 		self.averageLines: List = []
 		self.zoomHistory: List = []
 
 		self.orientationMatrix: np.ndarray
-		self.selectedArea: List = []
+		self.selectedArea: np.ndarray
 		self.selectedAreaOutlines: List = []  
+		self._orientationCorners: Tuple = ()
+		self._packedSelectedArea: np.ndarray
 
 		self.binValues: List = []
+		self.heatmapImages: Dict = {}
 
-		self._create_force_distance_lines(
+		self._index_force_distance_curves(
 			forceDistanceCurves
 		)
 		self.init_orientation_matrix()
+		self.reset_selected_area()
 
-	def _create_force_distance_lines(
+	def _index_force_distance_curves(
 		self, 
 		forceDistanceCurves: List
 	) -> None:
 		"""
-		Create a displayable line representation of every 
-		corrected force distance curve of a force volume.
+		Copy the corrected force distance curves of a 
+		force volume into a single buffer and index them.
 
 		Parameters
 		----------
@@ -96,13 +136,150 @@ class PlotInterface():
 			Piezo(x) and deflection (y) values of every
 			corrected fore distance curve of a force volume.
 		"""
-		for index, forceDistanceCurve in enumerate(forceDistanceCurves):
-			self.forceDistanceLines.append(
-				plt_data.create_corrected_line(
-					str(index),
-					forceDistanceCurve
-				)
+		# Iterate only once, the curves may be corrected on access.
+		forceDistanceCurves = list(forceDistanceCurves)
+
+		self.curveBuffer = CurveBuffer.from_curves(
+			forceDistanceCurves,
+			range(len(forceDistanceCurves))
+		)
+		self.curveIndex = CurveIndex(self.curveBuffer)
+
+	def create_artists(self) -> None:
+		"""
+		Create a displayable line representation of every 
+		force distance curve and restore the orientation
+		and the selected area of the heatmap with its outline.
+		The lines share the values of the curve buffer.
+		"""
+		if self.hasArtists:
+			return
+
+		self.forceDistanceLines = [
+			plt_data.create_corrected_line(
+				str(index),
+				self.curveBuffer.get_curve(index)
 			)
+			for index in range(len(self.curveBuffer))
+		]
+
+		self.hasArtists = True
+
+		if self.orientationMatrix is not None:
+			return
+
+		self.orientationMatrix = self._restore_orientation_matrix()
+		self.selectedArea = np.unpackbits(
+			self._packedSelectedArea, 
+			count=self.orientationMatrix.size
+		).reshape(self.orientationMatrix.shape).astype(bool)
+		if self.selectedArea.any():
+			self.selectedAreaOutlines = [
+				plt_data.create_selected_area_outline(
+					*get_area_outlines(self.selectedArea)
+				)
+			]
+
+	def release_artists(self) -> None:
+		"""
+		Release the artists and cached images of an inactive
+		force volume and keep the orientation and selected 
+		area of the heatmap in a compact form.
+		"""
+		if not self.hasArtists:
+			return
+
+		self.hasArtists = False
+		self.forceDistanceLines = []
+		self.averageLines = []
+		self.densityImages = []
+		self._densityImagesKey = ()
+		self._densityImagesData = ()
+		self.selectedAreaOutlines = []
+		self.heatmapImages = {}
+
+		# The three corners determine the flips and rotations of the orientation.
+		self._orientationCorners = (
+			self.orientationMatrix[0, 0],
+			self.orientationMatrix[0, -1],
+			self.orientationMatrix[-1, 0]
+		)
+		self._packedSelectedArea = np.packbits(self.selectedArea)
+		self.orientationMatrix = None
+		self.selectedArea = None
+
+	def _restore_orientation_matrix(self) -> np.ndarray:
+		"""
+		Find the orientation matrix whose corners match 
+		the corners of the released orientation matrix.
+
+		Returns
+		-------
+		orientationMatrix : np.ndarray
+			Orientation matrix of the heatmap before the
+			artists were released.
+		"""
+		defaultOrientation = np.arange(
+			self.size[0] * self.size[1]
+		).reshape(self.size)
+
+		for rotations in range(4):
+			for orientationMatrix in (
+				np.rot90(defaultOrientation, rotations),
+				np.flip(np.rot90(defaultOrientation, rotations), 0)
+			):
+				corners = (
+					orientationMatrix[0, 0],
+					orientationMatrix[0, -1],
+					orientationMatrix[-1, 0]
+				)
+				if corners == self._orientationCorners:
+					return orientationMatrix
+
+		return defaultOrientation
+
+	def get_memory_footprint(self) -> int:
+		"""
+		Get the number of bytes of the curve buffer and
+		the curve index held in memory.
+
+		Returns
+		-------
+		memoryFootprint : int
+			Size of the curve buffer and index in bytes.
+		"""
+		memoryFootprint = self.curveBuffer.get_memory_footprint()
+		if self.curveIndex is not None:
+			memoryFootprint += self.curveIndex.get_memory_footprint()
+
+		return memoryFootprint
+
+	def spill_curves(self, filePath: str) -> None:
+		"""
+		Release the artists, move the values of the curve 
+		buffer into a memory mapped scratch file and drop 
+		the curve index until the curves are reloaded.
+
+		Parameters
+		----------
+		filePath : str
+			Path of the scratch file.
+		"""
+		# The lines share the values of the curve buffer.
+		self.release_artists()
+		self.curveBuffer.spill(filePath)
+		self.curveIndex = None
+
+	def reload_curves(self) -> None:
+		"""
+		Copy the values of the curve buffer back into
+		memory and index the curves again.
+		"""
+		if self.curveIndex is not None:
+			return
+
+		self.curveBuffer.reload()
+		self.curveIndex = CurveIndex(self.curveBuffer)
 
 	def delete_average_lines(self) -> None: 
 		"""
@@ -113,6 +290,73 @@ class PlotInterface():
 			line.remove()
 		self.averageLines = []
 
+	def delete_density_images(self) -> None:
+		"""
+		Delete the density images of the force 
+		distance curves.
+		"""
+		for image in self.densityImages:
+			# Images of a cleared axes are already removed.
+			if image.axes is not None:
+				image.remove()
+		self.densityImages = []
+
+	def get_density_images(
+		self,
+		viewLimits: nt.ViewLimits,
+		shape: Tuple[int, int],
+		includeInactive: bool
+	) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+		"""
+		Rasterize the active and optionally the inactive force
+		distance curves into density images of the view. The
+		images are only rasterized again if the view or the
+		inactive data points have changed.
+
+		Parameters
+		----------
+		viewLimits : nt.ViewLimits
+			The minimum and maximum x and y values
+			of the view.
+		shape : tuple[int]
+			Number of rows and columns of the images.
+		includeInactive : bool
+			Whether the inactive curves are rasterized.
+
+		Returns
+		-------
+		activeDensityImage : np.ndarray
+			Number of active curves passing every pixel.
+		inactiveDensityImage : np.ndarray or None
+			Number of inactive curves passing every pixel.
+		"""
+		key = (
+			tuple(viewLimits), 
+			tuple(shape), 
+			frozenset(self.inactiveDataPoints), 
+			includeInactive
+		)
+		if key == self._densityImagesKey:
+			return self._densityImagesData
+
+		isInactive = np.zeros(len(self.curveBuffer), dtype=bool)
+		inactiveCurves = np.asarray(self.inactiveDataPoints, dtype=np.int64)
+		isInactive[inactiveCurves[inactiveCurves < len(isInactive)]] = True
+
+		activeDensityImage = rasterize_curves(
+			self.curveBuffer, ~isInactive, viewLimits, shape
+		)
+		inactiveDensityImage = None
+		if includeInactive:
+			inactiveDensityImage = rasterize_curves(
+				self.curveBuffer, isInactive, viewLimits, shape
+			)
+
+		self._densityImagesKey = key
+		self._densityImagesData = (activeDensityImage, inactiveDensityImage)
+
+		return self._densityImagesData
+
 	def check_active_data_points(self) -> bool:
 		"""
 		Checks if any data points are still active
@@ -136,12 +380,21 @@ class PlotInterface():
 		self.orientationMatrix = np.arange(
 			self.size[0] * self.size[1]
 		).reshape(self.size)
+		self.heatmapImages = {}
+
+	def reset_selected_area(self) -> None:
+		"""
+		Deselect every data point of the heatmap.
+		"""
+		self.selectedArea = np.zeros(self.orientationMatrix.shape, dtype=bool)
 
 	def reset_inactive_data_points(self) -> None: 
 		"""
-		Reset the inactive data points.
+		Reset the inactive and flagged data points.
 		"""
 		self.inactiveDataPoints = []
+		self.flaggedDataPoints = []
+		self.heatmapImages = {}
 
 	def add_inactive_data_point(
 		self, 
@@ -160,6 +413,7 @@ class PlotInterface():
 		"""
 		if inactiveDataPoint not in self.inactiveDataPoints:
 			self.inactiveDataPoints.append(inactiveDataPoint)
+			self.heatmapImages = {}
 
 	def remove_inactive_data_point(
 		self,
@@ -177,6 +431,7 @@ class PlotInterface():
 		"""
 		if inactiveDataPoint in self.inactiveDataPoints:
 			self.inactiveDataPoints.remove(inactiveDataPoint)
+			self.heatmapImages = {}
 
 	def add_inactive_data_points(
 		self, 
@@ -188,33 +443,140 @@ class PlotInterface():
 
 		Parameters
 		----------
-		inactiveDataPoints : list[int]
+		inactiveDataPoints : list[int] or np.ndarray
 			Contains all data points which are added
 			to the inactive data points.
 		"""
 		flatOrientationMatrix = self.orientationMatrix.flatten()
 
-		# Map new data points to the current alignment.
-		for inactiveDataPoint in inactiveDataPoints:
-			self.inactiveDataPoints.append(flatOrientationMatrix[inactiveDataPoint])
-		
-		# Remove duplicates.
-		self.inactiveDataPoints = list(set(self.inactiveDataPoints))
+		# Map new data points to the current alignment and remove duplicates.
+		self.inactiveDataPoints = list(
+			set(self.inactiveDataPoints).union(
+				flatOrientationMatrix[np.asarray(inactiveDataPoints, dtype=np.int64)].tolist()
+			)
+		)
+		self.heatmapImages = {}
+
+	def add_curves_in_view(
+		self,
+		viewLimits: nt.ViewLimits
+	) -> None:
+		"""
+		Add every force distance curve with a data point
+		within the view of the line plot to the inactive
+		data points (no mapping is required as the points
+		are indices of the force distance curves).
+
+		Parameters
+		----------
+		viewLimits : nt.ViewLimits
+			The minimum and maximum x and y values
+			of the view.
+		"""
+		self._add_inactive_curves(
+			self.curveIndex.get_curves_in_view(viewLimits).tolist()
+		)
+
+	def _add_inactive_curves(
+		self,
+		inactiveCurves: List[int]
+	) -> None:
+		"""
+		Add force distance curves to the inactive data points
+		and remove duplicates.
+
+		Parameters
+		----------
+		inactiveCurves : list[int]
+			Indices of the new inactive curves.
+		"""
+		self.inactiveDataPoints = list(set(self.inactiveDataPoints).union(inactiveCurves))
+		self.heatmapImages = {}
+
+	def add_outliers(
+		self,
+		outliers: List[int],
+		deactivate: bool
+	) -> None:
+		"""
+		Flag outliers or add them to the inactive data
+		points (no mapping is required as the outliers are
+		indices of the force distance curves).
+
+		Parameters
+		----------
+		outliers : list[int]
+			Indices of the detected outliers.
+		deactivate : bool
+			Whether the outliers become inactive or
+			are only flagged.
+		"""
+		if deactivate:
+			self._add_inactive_curves(outliers)
+		else:
+			self.flaggedDataPoints = list(outliers)
+
+	def get_heatmap_image(
+		self,
+		channel
+	) -> nt.HeatmapImage:
+		"""
+		Get the active data of a channel in the current 
+		orientation and its color limits. The data is only
+		mapped again if the channel, its orientation or the
+		inactive data points changed.
+
+		Parameters
+		----------
+		channel : Channel
+			Channel displayed in the heatmap.
+
+		Returns
+		-------
+		heatmapImage : nt.HeatmapImage
+			Active data of the channel, the minimum and 
+			maximum active value and a resolution pyramid
+			of the data.
+		"""
+		heatmapImage = self.heatmapImages.get(channel.name)
+		if heatmapImage is not None and heatmapImage.channelVersion == channel.version:
+			return heatmapImage
+
+		activeData = channel.get_active_heatmap_data(
+			self.inactiveDataPoints,
+			self.orientationMatrix
+		)
+		colorLimits = (0.0, 1.0)
+		if np.any(np.isfinite(activeData)):
+			colorLimits = (np.nanmin(activeData), np.nanmax(activeData))
+
+		heatmapImage = nt.HeatmapImage(
+			channelVersion=channel.version,
+			data=activeData,
+			colorLimits=colorLimits,
+			pyramid=ImagePyramid(activeData)
+		)
+		self.heatmapImages[channel.name] = heatmapImage
+
+		return heatmapImage
 
 	def flip_orientation_matrix_horizontal(self) -> None: 
 		"""
 		Flip the orientation matrix of the heatmap horizontally.
 		"""
 		self.orientationMatrix = np.flip(self.orientationMatrix, 0)
+		self.heatmapImages = {}
 
 	def flip_orientation_matrix_vertical(self) -> None: 
 		"""
 		Flip the orientation matrix of the heatmap vertically.
 		"""
 		self.orientationMatrix = np.flip(self.orientationMatrix, 1)
+		self.heatmapImages = {}
 
 	def rotate_orientation_matrix(self) -> None: 
 		"""
 		Rotate the orientation matrix of the heatmap by 90 degrees.
 		"""
-		self.orientationMatrix = np.rot90(self.orientationMatrix)
\ No newline at end of file
+		self.orientationMatrix = np.rot90(self.orientationMatrix)
+		self.heatmapImages = {}
\ No newline at end of file
@@ -0,0 +1,260 @@
+"""
+This file is part of SOFA.
+SOFA is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+SOFA is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from typing import Callable, Dict, List, Optional, Tuple
+import glob
+import os
+import re
+import time
+
+import data_processing.named_tuples as nt
+from data_processing.import_data.import_formats.import_ibw_data import (
+	import_ibw_measurement_curve
+)
+from force_spectroscopy_data.incremental_force_volume import IncrementalForceVolume
+
+curveFileNamePattern = re.compile(
+	r"Line(\d+)Point(\d+)(ZSnsr|Defl)\.ibw$"
+)
+
+class FolderWatcher():
+	"""
+	Poll a measurement folder for new pairs of piezo and
+	deflection files while the AFM is still writing them.
+
+	Attributes
+	----------
+	folderPath : str
+		Path of the watched measurement folder.
+	size : tuple[int]
+		Expected number of lines and points of the
+		measurement grid.
+	processedDataPoints : set[int]
+		Indices of the curves which have already been
+		returned.
+	failedDataPoints : set[int]
+		Indices of the curves which could not be read
+		in any attempt.
+	maximumNumberOfAttempts : int
+		Number of times a curve is returned before
+		it is considered failed.
+	"""
+	def __init__(
+		self,
+		folderPath: str,
+		size: Tuple[int],
+		maximumNumberOfAttempts: int = 3
+	) -> None:
+		"""
+		Initialize a watcher for a measurement folder.
+
+		Parameters
+		----------
+		folderPath : str
+			Path of the watched measurement folder.
+		size : tuple[int]
+			Expected number of lines and points of the
+			measurement grid.
+		maximumNumberOfAttempts : int, optional
+			Number of times a curve is returned before
+			it is considered failed.
+		"""
+		self.folderPath: str = folderPath
+		self.size: Tuple[int] = tuple(size)
+		self.processedDataPoints = set()
+		self.failedDataPoints = set()
+		self.maximumNumberOfAttempts: int = maximumNumberOfAttempts
+
+		self._fileSizes: Dict[str, int] = {}
+		self._numberOfAttempts: Dict[int, int] = {}
+
+	def get_new_curve_files(self) -> List[nt.CurveFilePaths]:
+		"""
+		Find every curve whose piezo and deflection file both
+		exist and did not change in size since the last poll, so
+		files which are still written are not read.
+
+		Returns
+		-------
+		newCurveFiles : list[nt.CurveFilePaths]
+			Index and file paths of every new complete curve.
+		"""
+		curveFiles = {}
+		fileSizes = {}
+
+		for filePath in glob.glob(os.path.join(self.folderPath, "**", "*.ibw")):
+			match = curveFileNamePattern.search(os.path.basename(filePath))
+			if match is None:
+				continue
+			index = self.get_curve_index(int(match.group(1)), int(match.group(2)))
+			if index is None or index in self.processedDataPoints:
+				continue
+			try:
+				fileSizes[filePath] = os.path.getsize(filePath)
+			except OSError:
+				continue
+			curveFiles.setdefault(index, {})[match.group(3)] = filePath
+
+		newCurveFiles = []
+
+		for index, filePaths in sorted(curveFiles.items()):
+			if len(filePaths) != 2:
+				continue
+			if not all(
+				fileSizes[filePath] > 0
+				and self._fileSizes.get(filePath) == fileSizes[filePath]
+				for filePath in filePaths.values()
+			):
+				continue
+			newCurveFiles.append(
+				nt.CurveFilePaths(index, filePaths["ZSnsr"], filePaths["Defl"])
+			)
+			self.processedDataPoints.add(index)
+
+		self._fileSizes = fileSizes
+
+		return newCurveFiles
+
+	def retry_curve(self, index: int) -> bool:
+		"""
+		Return a curve which could not be read again in a later
+		poll, unless it has already been returned too often.
+
+		Parameters
+		----------
+		index : int
+			Position of the curve in the measurement grid.
+
+		Returns
+		-------
+		isRetried : bool
+			False if the curve is considered failed.
+		"""
+		numberOfAttempts = self._numberOfAttempts.get(index, 0) + 1
+		self._numberOfAttempts[index] = numberOfAttempts
+
+		if numberOfAttempts >= self.maximumNumberOfAttempts:
+			self.failedDataPoints.add(index)
+			return False
+
+		self.processedDataPoints.discard(index)
+		return True
+
+	def get_curve_index(
+		self,
+		line: int,
+		point: int
+	) -> Optional[int]:
+		"""
+		Map the line and point number of a curve to its
+		position in the measurement grid.
+
+		Parameters
+		----------
+		line : int
+			Line number of the curve.
+		point : int
+			Point number of the curve in the line.
+
+		Returns
+		-------
+		index : int or None
+			Position of the curve or None if it lies
+			outside of the expected grid.
+		"""
+		numberOfLines, numberOfPoints = self.size
+		if line >= numberOfLines or point >= numberOfPoints:
+			return None
+
+		return line * numberOfPoints + point
+
+def watch_folder(
+	folderPath: str,
+	size: Tuple[int],
+	pollInterval: float = 1.0,
+	idleTimeout: float = 0.0,
+	report_progress: Optional[Callable] = None
+) -> IncrementalForceVolume:
+	"""
+	Process the curves of a measurement as soon as they are
+	written until the measurement grid is complete or no new
+	curve was found for a given time.
+
+	Parameters
+	----------
+	folderPath : str
+		Path of the watched measurement folder.
+	size : tuple[int]
+		Expected number of lines and points of the
+		measurement grid.
+	pollInterval : float
+		Time in seconds between two polls of the folder.
+	idleTimeout : float
+		Time in seconds without new curves after which the
+		measurement is considered finished, 0 to wait until
+		the grid is complete or the watcher is interrupted.
+	report_progress : function, optional
+		Called with the force volume and the newly added
+		curves after every poll with new curves.
+
+	Returns
+	-------
+	forceVolume : IncrementalForceVolume
+		Force volume with every processed curve.
+	"""
+	folderPath = os.path.normpath(folderPath)
+	forceVolume = IncrementalForceVolume(
+		os.path.basename(folderPath),
+		size,
+		folderPath
+	)
+	folderWatcher = FolderWatcher(folderPath, size)
+	timeLastCurve = time.monotonic()
+
+	try:
+		while not forceVolume.isComplete:
+			newCurveFiles = []
+
+			for curveFiles in folderWatcher.get_new_curve_files():
+				try:
+					approachCurve, _ = import_ibw_measurement_curve(
+						curveFiles.filePathPiezo,
+						curveFiles.filePathDeflection
+					)
+				except Exception:
+					# Partly written or corrupt files are read again in a later poll.
+					if not folderWatcher.retry_curve(curveFiles.index):
+						forceVolume.add_failed_data_point(curveFiles.index)
+					continue
+				forceVolume.add_force_distance_curve(
+					curveFiles.index,
+					approachCurve
+				)
+				newCurveFiles.append(curveFiles)
+
+			if newCurveFiles:
+				timeLastCurve = time.monotonic()
+				if report_progress:
+					report_progress(forceVolume, newCurveFiles)
+			elif idleTimeout and time.monotonic() - timeLastCurve > idleTimeout:
+				break
+
+			if not forceVolume.isComplete:
+				time.sleep(pollInterval)
+	except KeyboardInterrupt:
+		# Stopping the watcher keeps the already processed curves.
+		pass
+
+	return forceVolume
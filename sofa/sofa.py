@@ -21,5 +21,7 @@ from gui.main_window import MainWindow
 
 if __name__ == "__main__":
 	app = ttk.Window("SOFA", "minty")
-	MainWindow(app)
-	app.mainloop()
\ No newline at end of file
+	mainWindow = MainWindow(app)
+	app.mainloop()
+	# Delete the scratch files of spilled force volumes.
+	mainWindow.guiInterface.memoryManager.close()
\ No newline at end of file
@@ -0,0 +1,171 @@
+"""
+This file is part of SOFA.
+SOFA is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+SOFA is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import argparse
+import os
+import sys
+
+import data_processing.named_tuples as nt
+import interfaces.batch_interface as batch
+from data_processing.export_data import exportFormats
+from data_processing.import_data.import_data import precisions
+from data_processing.calculate_elastic_modulus import tipGeometries, defaultTipParameters
+from data_processing.contact_detection import contactDetectionMethods
+
+def parse_arguments() -> argparse.Namespace:
+	"""
+	Define and parse the command line arguments.
+
+	Returns
+	-------
+	arguments : argparse.Namespace
+		Parsed command line arguments.
+	"""
+	parser = argparse.ArgumentParser(
+		description=(
+			"Import, correct and export many force volumes "
+			"without the graphical user interface."
+		)
+	)
+	parser.add_argument(
+		"paths", nargs="+",
+		help="measurement folders (.ibw) or files (.hdf5), glob patterns are expanded"
+	)
+	parser.add_argument(
+		"-o", "--output", required=True,
+		help="folder in which a subfolder is created for every force volume"
+	)
+	parser.add_argument(
+		"-f", "--formats", nargs="+", default=["csv"], choices=exportFormats.keys(),
+		help="export formats (default: csv)"
+	)
+	parser.add_argument(
+		"-p", "--processes", type=int, default=os.cpu_count(),
+		help="number of parallel worker processes (default: number of CPUs)"
+	)
+	parser.add_argument(
+		"-m", "--memory-limit", type=int, default=0,
+		help="maximum memory per job in megabytes, 0 for no limit (default: 0)"
+	)
+	parser.add_argument(
+		"--precision", default="native", choices=precisions.keys(),
+		help="precision in which the curves are stored (default: native)"
+	)
+	parser.add_argument(
+		"--implicit-correction", action="store_true",
+		help="calculate the corrected curves from the raw curves when needed instead of storing them"
+	)
+	parser.add_argument(
+		"--contact-detection", default="derivative", choices=contactDetectionMethods.keys(),
+		help="algorithm which locates the end of the zero line (default: derivative)"
+	)
+	parser.add_argument(
+		"--tip", default="sphere", choices=tipGeometries.keys(),
+		help="tip geometry of the elastic modulus fit (default: sphere)"
+	)
+	parser.add_argument(
+		"--tip-parameter", type=float, default=None,
+		help="tip radius in m or half angle in degrees (default: {})".format(
+			", ".join(
+				"{} for a {}".format(tipParameter, tipGeometry)
+				for tipGeometry, tipParameter in defaultTipParameters.items()
+			)
+		)
+	)
+	parser.add_argument(
+		"--poisson-ratio", type=float, default=0.5,
+		help="poisson ratio of the sample (default: 0.5)"
+	)
+	parser.add_argument(
+		"--spring-constant", type=float, default=None,
+		help="spring constant of the cantilever in N/m, required for the elastic modulus"
+	)
+	parser.add_argument(
+		"-r", "--report", default="",
+		help="path of the summary report (default: <output>/summary_report.csv)"
+	)
+
+	return parser.parse_args()
+
+def print_batch_result(batchResult: nt.BatchResult) -> None:
+	"""
+	Print a single line summary of a processed force volume.
+
+	Parameters
+	----------
+	batchResult : nt.BatchResult
+		Result of the processed force volume.
+	"""
+	if batchResult.succeeded:
+		print(
+			"{}: {} curves, {} failed, {:.2f} s".format(
+				batchResult.name,
+				batchResult.numberOfCurves,
+				batchResult.numberOfFailedCurves,
+				batchResult.importTime + batchResult.processingTime + batchResult.exportTime
+			)
+		)
+	else:
+		print(batchResult.name + ": failed, " + batchResult.errorMessage)
+
+def main() -> int:
+	"""
+	Process all given force volumes and write a summary report.
+
+	Returns
+	-------
+	exitCode : int
+		0 if every force volume was processed, 1 otherwise.
+	"""
+	arguments = parse_arguments()
+
+	measurementPaths = batch.get_measurement_paths(arguments.paths)
+	if not measurementPaths:
+		print("No measurement data found.")
+		return 1
+
+	os.makedirs(arguments.output, exist_ok=True)
+	batchParameter = nt.BatchParameter(
+		measurementPaths=measurementPaths,
+		outputFolderPath=arguments.output,
+		exportFormats=arguments.formats,
+		numberOfProcesses=max(1, arguments.processes),
+		memoryLimit=arguments.memory_limit,
+		precision=arguments.precision,
+		storeCorrectedCurves=not arguments.implicit_correction,
+		indentationParameters=nt.IndentationParameters(
+			tipGeometry=arguments.tip,
+			tipParameter=arguments.tip_parameter,
+			poissonRatio=arguments.poisson_ratio,
+			springConstant=arguments.spring_constant
+		),
+		contactDetection=arguments.contact_detection
+	)
+	batchResults = batch.run_batch_processing(
+		batchParameter,
+		print_batch_result
+	)
+	batch.write_summary_report(
+		batchResults,
+		arguments.report or os.path.join(arguments.output, "summary_report.csv")
+	)
+
+	if all(batchResult.succeeded for batchResult in batchResults):
+		return 0
+
+	return 1
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+This file is part of SOFA.
+SOFA is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+SOFA is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import argparse
+import sys
+
+import data_processing.export_data as exp_data
+import interfaces.watch_folder_interface as watch
+
+def parse_arguments() -> argparse.Namespace:
+	"""
+	Define and parse the command line arguments.
+
+	Returns
+	-------
+	arguments : argparse.Namespace
+		Parsed command line arguments.
+	"""
+	parser = argparse.ArgumentParser(
+		description=(
+			"Watch a measurement folder, correct every force distance "
+			"curve as soon as it is written and export the force volume "
+			"when the measurement is finished."
+		)
+	)
+	parser.add_argument(
+		"folder",
+		help="measurement folder in which the AFM writes the .ibw files"
+	)
+	parser.add_argument(
+		"-s", "--size", type=int, nargs=2, required=True, metavar=("LINES", "POINTS"),
+		help="number of lines and points per line of the measurement grid"
+	)
+	parser.add_argument(
+		"-o", "--output", required=True,
+		help="folder in which a subfolder is created for the force volume"
+	)
+	parser.add_argument(
+		"-f", "--formats", nargs="+", default=["csv"], choices=exp_data.exportFormats.keys(),
+		help="export formats (default: csv)"
+	)
+	parser.add_argument(
+		"-i", "--interval", type=float, default=1.0,
+		help="time in seconds between two polls of the folder (default: 1)"
+	)
+	parser.add_argument(
+		"-t", "--timeout", type=float, default=0.0,
+		help=(
+			"time in seconds without new curves after which the measurement "
+			"is considered finished, 0 to wait for the complete grid (default: 0)"
+		)
+	)
+
+	return parser.parse_args()
+
+def print_progress(forceVolume, newCurveFiles) -> None:
+	"""
+	Print the number of processed and failed curves.
+
+	Parameters
+	----------
+	forceVolume : IncrementalForceVolume
+		The partially measured force volume.
+	newCurveFiles : list[nt.CurveFilePaths]
+		Curves which were added since the last poll.
+	"""
+	numberOfAddedCurves = len(forceVolume.addedDataPoints)
+	numberOfFailedCurves = numberOfAddedCurves - len(
+		forceVolume.get_force_distance_curves_data()
+	)
+	print(
+		"{}: {}/{} curves, {} failed, +{}".format(
+			forceVolume.name,
+			numberOfAddedCurves,
+			len(forceVolume.forceDistanceCurves),
+			numberOfFailedCurves,
+			len(newCurveFiles)
+		)
+	)
+
+def main() -> int:
+	"""
+	Watch the measurement folder and export the processed
+	force volume.
+
+	Returns
+	-------
+	exitCode : int
+		0 if the complete measurement grid was processed,
+		1 otherwise.
+	"""
+	arguments = parse_arguments()
+
+	forceVolume = watch.watch_folder(
+		arguments.folder,
+		arguments.size,
+		arguments.interval,
+		arguments.timeout,
+		print_progress
+	)
+	if not forceVolume.addedDataPoints:
+		print("No measurement data found.")
+		return 1
+
+	if forceVolume.get_force_distance_curves_data():
+		forceVolume.calculate_average([])
+
+	pathOutputFolder = exp_data.setup_output_folder(
+		arguments.output,
+		forceVolume.name
+	)
+	for exportFormat in arguments.formats:
+		exp_data.exportFormats[exportFormat](forceVolume, pathOutputFolder)
+
+	if forceVolume.isComplete:
+		return 0
+
+	print("The measurement grid is incomplete.")
+	return 1
+
+if __name__ == "__main__":
+	sys.exit(main())
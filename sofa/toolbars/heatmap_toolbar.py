@@ -16,12 +16,19 @@ along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
 
 import os
 import functools
-from typing import List, Tuple, Optional
 
 import matplotlib as mpl
 import numpy as np 
 
 from toolbars.sofa_toolbar import SofaToolbar
+from data_processing.select_heatmap_area import (
+	get_rectangular_area,
+	get_polygon_area,
+	get_connected_region,
+	get_area_outlines
+)
+import data_visualization.plot_data as plt_data
+from utilities.action_profiling import decorator_profile_action
 
 def decorator_check_selected_rectangle(function):
 	"""
@@ -43,7 +50,7 @@ def decorator_check_selected_area(function):
 	@functools.wraps(function)
 	def wrapper_check_selected_area(self, *args):
 		activePlotInterface = args[0]
-		if len(activePlotInterface.selectedArea) != 0:
+		if activePlotInterface.selectedArea.any():
 			function(self, *args)
 
 	return wrapper_check_selected_area
@@ -66,6 +73,7 @@ class HeatmapToolbar(SofaToolbar):
 			("reset", "", os.path.join(iconPath, "reset.gif"), "_reset_heatmap"),
 			("select_area", "", os.path.join(iconPath, "select_area.gif"), "_toggle_select_arbitrary_area"),
 			("select_rectangle", "", os.path.join(iconPath, "select_rectangle.gif"), "_toggle_select_rectangular_area"),
+			("select_region", "", os.path.join(iconPath, "select_region.gif"), "_toggle_select_region"),
 			("include_area", "", os.path.join(iconPath, "include.gif"), "_include_area"),
 			("exclude_area", "", os.path.join(iconPath, "exclude.gif"), "_exclude_area"),
 			("flip_h", "", os.path.join(iconPath, "flip_h.gif"), "_flip_heatmap_horizontal"),
@@ -93,18 +101,18 @@ class HeatmapToolbar(SofaToolbar):
 			Interface between a force volume and 
 			the different plots.
 		"""
-		activePlotInterface.selectedArea = []
 		self._delete_selected_area_outlines()
 
 		activePlotInterface.reset_inactive_data_points()
 		activePlotInterface.init_orientation_matrix()
+		activePlotInterface.reset_selected_area()
 		activeForceVolume.reset_channel_orientation()
 
 		self.guiInterface.update_inactive_data_points_heatmap()
 		
 	def _toggle_select_arbitrary_area(self) -> None:
 		"""
-		Toggle the selector to select an arbitrary area.
+		Toggle the lasso to select an arbitrary area.
 		"""
 		self._update_toolbar_mode("select arbitrary area")
 		self._update_event_connections()
@@ -114,19 +122,35 @@ class HeatmapToolbar(SofaToolbar):
 	def _select_arbitrary_area_on_click(
 		self, 
 		activePlotInterface,
-		_
+		event: mpl.backend_bases.MouseEvent
 	) -> None:
 		"""
-		Prepare to capture and chache the mouse motion
-		while a mouse button is clicked.
+		Start a lasso at the clicked point and prepare to 
+		capture the mouse motion while a mouse button is clicked.
 
 		Parameters
 		----------
 		activePlotInterface : PlotInterface
 			Interface between a force volume and 
 			the different plots.
+		event : mpl.backend_bases.MouseEvent
+			button_press_event triggers when the 
+			mouse button is pressed.
 		"""
-		activePlotInterface.selectedArea = []
+		activePlotInterface.reset_selected_area()
+		self._outline_area()
+		self.holder.draw()
+
+		self.lassoVertices = []
+		if event.xdata and event.ydata:
+			self.lassoVertices.append((event.xdata, event.ydata))
+
+		# Cache the heatmap without the lasso to redraw only the lasso while moving.
+		axes = self.holder.figure.get_axes()[0]
+		self.lassoBackground = self.holder.copy_from_bbox(axes.bbox)
+		self.lassoLine = axes.plot(
+			[], [], color="r", linestyle="-", linewidth=1, animated=True
+		)[0]
 	   
 		self._add_motion_capture_event()
 
@@ -142,42 +166,59 @@ class HeatmapToolbar(SofaToolbar):
 			)
 		)
 
-	@SofaToolbar.decorator_get_active_plot_interface
 	def _select_arbitrary_area_motion(
 		self,
-		activePlotInterface, 
 		event: mpl.backend_bases.MouseEvent
 	) -> None:
 		"""
-		Cache the mouse movement while the mouse 
-		is within the heatmap.
+		Add the mouse position to the vertices of the lasso
+		while the mouse is within the heatmap and blit the lasso.
 		
 		Parameters
 		----------
-		activePlotInterface : PlotInterface
-			Interface between a force volume and 
-			the different plots.
 		event : mpl.backend_bases.MouseEvent
 			motion_notify_event triggers while the
 			mouse is moving.
 		"""
-		if event.xdata and event.ydata:
-			activePlotInterface.selectedArea.append(
-				(
-					int(np.trunc(event.xdata)), 
-					int(np.trunc(event.ydata))
-				)
-			)
+		if not (event.xdata and event.ydata):
+			return
+
+		self.lassoVertices.append((event.xdata, event.ydata))
+		self.lassoLine.set_data(*zip(*self.lassoVertices))
+
+		axes = self.lassoLine.axes
+		self.holder.restore_region(self.lassoBackground)
+		axes.draw_artist(self.lassoLine)
+		self.holder.blit(axes.bbox)
 
-	def _select_arbitrary_area_on_release(self, _) -> None:
+	@SofaToolbar.decorator_get_active_plot_interface
+	def _select_arbitrary_area_on_release(
+		self,
+		activePlotInterface,
+		_
+	) -> None:
 		"""
-		Select the arbitrary area over which the mouse has moved
-		while a button was pressed and outline it in the heatmap.
+		Select every data point enclosed by the lasso
+		and outline the selected area in the heatmap.
+
+		Parameters
+		----------
+		activePlotInterface : PlotInterface
+			Interface between a force volume and 
+			the different plots.
 		"""
 		self._remove_motion_capture_event()
-		self._delete_selected_area_outlines()		
-		self._remove_double_values_from_selected_area()
+		self.lassoLine.remove()
+
+		if len(self.lassoVertices) >= 3:
+			activePlotInterface.selectedArea = get_polygon_area(
+				activePlotInterface.selectedArea.shape,
+				np.array(self.lassoVertices)
+			)
+		self.lassoVertices = []
+
 		self._outline_area()
+		self.holder.draw()
 
 	def _remove_motion_capture_event(self) -> None: 
 		"""
@@ -200,33 +241,14 @@ class HeatmapToolbar(SofaToolbar):
 			outline.remove()
 		activePlotInterface.selectedAreaOutlines = []
 
-	@SofaToolbar.decorator_get_active_plot_interface
-	def _remove_double_values_from_selected_area(
-		self,
-		activePlotInterface
-	) -> None: 
-		"""
-		Remove potential duplicates in the selected area.
-
-		Parameters
-		----------
-		activePlotInterface : PlotInterface
-			Interface between a force volume and 
-			the different plots.
-		"""
-		activePlotInterface.selectedArea = [
-			list(entry) 
-			for entry 
-			in set(activePlotInterface.selectedArea)
-		]
-
 	@SofaToolbar.decorator_get_active_plot_interface
 	def _outline_area(
 		self,
 		activePlotInterface
 	) -> None: 
 		"""
-		Outline an arbitrary area in the heatmap.
+		Replace the outlines with the borders of the 
+		selected area in the heatmap.
 
 		Parameters
 		----------
@@ -234,86 +256,12 @@ class HeatmapToolbar(SofaToolbar):
 			Interface between a force volume and 
 			the different plots.
 		"""
-		for section in activePlotInterface.selectedArea:
-			self._outline_section(section)
-		
-		self._delete_equal_outlines()
-	
-		self.holder.draw()
-
-	def _outline_section(
-		self, 
-		section: Tuple[int, int]
-	) -> None:
-		"""
-		Outline a section/single point in the heatmap.
-
-		Parameters
-		----------
-		section : tuple[int]
-			X and y coordinates of the data point 
-			to be outlined.
-		"""
-		# Plot left line.
-		self._plot_outline(
-			(section[0], section[0]), 
-			(section[1], section[1]+1)
-		)
-		# Plot right line.
-		self._plot_outline(
-			(section[0]+1, section[0]+1), 
-			(section[1], section[1]+1)
-		)
-		# Plot top line.
-		self._plot_outline(
-			(section[0], section[0]+1), 
-			(section[1], section[1])
-		)
-		# Plot bottom line.
-		self._plot_outline(
-			(section[0], section[0]+1), 
-			(section[1]+1, section[1]+1)
-		)
-
-	@SofaToolbar.decorator_get_active_plot_interface
-	def _delete_equal_outlines(
-		self,
-		activePlotInterface
-	) -> None:
-		"""
-		Find all outlines that exist more than once and delete them.
-
-		Parameters
-		----------
-		activePlotInterface : PlotInterface
-			Interface between a force volume and 
-			the different plots.
-		"""
-		outlineData = [
-			outline.get_xydata() 
-			for outline 
-			in activePlotInterface.selectedAreaOutlines
-		]
-		uniqueValues, count = np.unique(
-			outlineData, 
-			axis=0, 
-			return_counts=True
-		)
-		doubledValues = uniqueValues[np.where(count > 1)]
-		
-		doubledIndices = []
-
-		for index, outline in enumerate(activePlotInterface.selectedAreaOutlines):
-			for doubledValue in doubledValues:
-				if np.array_equal(outline.get_xydata(), doubledValue):
-					outline.remove()
-					doubledIndices.append(index)
+		self._delete_selected_area_outlines()
 
-		activePlotInterface.selectedAreaOutlines = [
-			outline
-			for index, outline in enumerate(activePlotInterface.selectedAreaOutlines) 
-			if index not in doubledIndices
-		]
+		if activePlotInterface.selectedArea.any():
+			self._plot_outline(
+				*get_area_outlines(activePlotInterface.selectedArea)
+			)
 
 	def _toggle_select_rectangular_area(self) -> None:
 		"""
@@ -342,7 +290,7 @@ class HeatmapToolbar(SofaToolbar):
 			button_press_event triggers when the 
 			mouse button is pressed.
 		"""
-		activePlotInterface.selectedArea = []
+		activePlotInterface.reset_selected_area()
 		self.xStart = self.yStart = 0
 	   
 		if event.xdata and event.ydata:
@@ -369,8 +317,6 @@ class HeatmapToolbar(SofaToolbar):
 			button_release_event triggers when the 
 			mouse button is released.
 		"""
-		self._delete_selected_area_outlines()
-		
 		xStart, xEnd = self._standardize_value_pair(self.xStart, event.xdata)
 		yStart, yEnd = self._standardize_value_pair(self.yStart, event.ydata)
 		
@@ -379,51 +325,61 @@ class HeatmapToolbar(SofaToolbar):
 		yStart = int(np.trunc(yStart))
 		yEnd = int(np.ceil(yEnd))
 
-		activePlotInterface.selectedArea = self._get_data_points_in_rectangular_area(
+		activePlotInterface.selectedArea = get_rectangular_area(
+			activePlotInterface.selectedArea.shape,
 			xStart, xEnd, yStart, yEnd
 		)
-		
-		self._plot_outline((xStart, xStart), (yStart, yEnd))
-		self._plot_outline((xStart, xEnd), (yStart, yStart))
-		self._plot_outline((xEnd, xEnd), (yStart, yEnd))
-		self._plot_outline((xEnd, xStart), (yEnd, yEnd))
+		self._outline_area()
 
 		self.holder.draw()
 
-	@staticmethod
-	def _get_data_points_in_rectangular_area(
-		xStart: int, 
-		xEnd: int, 
-		yStart: int, 
-		yEnd: int
-	) -> List[List[int]]:
+	def _toggle_select_region(self) -> None:
 		"""
-		Get the indices of all data points of the heatmap 
-		that lie within the selected area. 
+		Toggle the selector to select a connected region
+		of similar channel values.
+		"""
+		self._update_toolbar_mode("select region")
+		self._update_event_connections()
+		self._update_toolbar_buttons()
+
+	@decorator_profile_action
+	@SofaToolbar.decorator_get_active_plot_interface
+	def _select_region_on_click(
+		self,
+		activePlotInterface,
+		event: mpl.backend_bases.MouseEvent
+	) -> None:
+		"""
+		Select every data point connected to the clicked one
+		whose value of the displayed channel lies within the
+		tolerance and outline the region in the heatmap.
 
 		Parameters
 		----------
-		xStart : int 
-			X value of one corner of the rectangular area.
-		xEnd : int
-			X value of the opposite corner of the rectangular area.
-		yStart : int
-			Y value of one corner of the rectangular area.
-		yEnd : int
-			Y value of the opposite corner of the rectangular area.
-
-		Returns
-		-------
-		selectedArea : list
-			A list of indices of all points within 
-			the rectangular area.
-		"""
-		return [
-			[i, j] 
-			for i in range(xStart, xEnd) 
-			for j in range(yStart, yEnd)
-		]
+		activePlotInterface : PlotInterface
+			Interface between a force volume and 
+			the different plots.
+		event : mpl.backend_bases.MouseEvent
+			button_press_event triggers when the 
+			mouse button is pressed.
+		"""
+		if not (event.xdata and event.ydata):
+			return
+
+		activeHeatmapData = self.guiInterface.get_active_heatmap_data()
+		m, n = activeHeatmapData.shape
+
+		activePlotInterface.selectedArea = get_connected_region(
+			activeHeatmapData,
+			min(int(np.trunc(event.ydata)), m - 1),
+			min(int(np.trunc(event.xdata)), n - 1),
+			self.guiInterface.heatmapParameters.regionTolerance.get() / 100
+		)
+		self._outline_area()
+
+		self.holder.draw()
 
+	@decorator_profile_action
 	@SofaToolbar.decorator_get_active_plot_interface
 	@decorator_check_selected_area
 	def _include_area(
@@ -439,22 +395,17 @@ class HeatmapToolbar(SofaToolbar):
 			Interface between a force volume and 
 			the different plots.
 		"""
-		m, n = self.guiInterface.get_active_force_volume().size
-		# Map new inactive points in a two dimensional array to their corresponding points in a one dimensional array.
-		newInactiveDataPoints = [
-			i 
-			for i in range(m * n) 
-			if i not in [dataPoint[1] * n + dataPoint[0] 
-			for dataPoint in activePlotInterface.selectedArea]
-		]
+		# Map the unselected points of the heatmap to their positions in a one dimensional array.
+		newInactiveDataPoints = np.flatnonzero(~activePlotInterface.selectedArea)
 
-		activePlotInterface.selectedArea = []
+		activePlotInterface.reset_selected_area()
 		self._delete_selected_area_outlines()	
 		
 		activePlotInterface.add_inactive_data_points(newInactiveDataPoints)
 
 		self.guiInterface.update_inactive_data_points_heatmap()
 
+	@decorator_profile_action
 	@SofaToolbar.decorator_get_active_plot_interface
 	@decorator_check_selected_area
 	def _exclude_area(
@@ -470,16 +421,10 @@ class HeatmapToolbar(SofaToolbar):
 			Interface between a force volume and 
 			the different plots.
 		"""
-		m, n = self.guiInterface.get_active_force_volume().size 
-		# Map new inactive points in a two dimensional array to 
-		# their corresponding points in a one dimensional array.
-		newInactiveDataPoints = [
-			dataPoint[1] * n + dataPoint[0] 
-			for dataPoint 
-			in activePlotInterface.selectedArea
-		]
+		# Map the selected points of the heatmap to their positions in a one dimensional array.
+		newInactiveDataPoints = np.flatnonzero(activePlotInterface.selectedArea)
 	
-		activePlotInterface.selectedArea = []
+		activePlotInterface.reset_selected_area()
 		self._delete_selected_area_outlines()	
 		
 		activePlotInterface.add_inactive_data_points(newInactiveDataPoints)
@@ -505,7 +450,7 @@ class HeatmapToolbar(SofaToolbar):
 			the different plots.
 		"""
 		self._flip_selected_area_horizontal()
-		self._flip_selected_area_outlines_horizontal()
+		self._outline_area()
 		
 		activePlotInterface.flip_orientation_matrix_horizontal()
 		activeForceVolume.flip_channel_horizontal()
@@ -526,50 +471,7 @@ class HeatmapToolbar(SofaToolbar):
 			Interface between a force volume and 
 			the different plots.
 		"""
-		m, n = self.guiInterface.get_active_force_volume().size
-
-		for section in activePlotInterface.selectedArea:
-			section[1] = m - section[1] - 1
-
-	@SofaToolbar.decorator_get_active_plot_interface
-	def _flip_selected_area_outlines_horizontal(
-		self,
-		activePlotInterface
-	) -> None: 
-		"""
-		Flip the outlines of the selected area horizontal.
-
-		Parameters
-		----------
-		activePlotInterface : PlotInterface
-			Interface between a force volume and 
-			the different plots.
-		"""
-		for outline in activePlotInterface.selectedAreaOutlines:
-			self._flip_outline_horizontal(outline)
-
-	def _flip_outline_horizontal(
-		self, 
-		outline: mpl.lines.Line2D
-	) -> None:
-		"""
-		Flip a single outline horizontal.
-
-		Parameters
-		----------
-		outline : mpl.lines.Line2D
-			The outline to be flipped.
-		"""
-		m, n = self.guiInterface.get_active_force_volume().size
-		flippedLine = outline.get_xydata().copy()
-
-		flippedLine[0][1] = m - flippedLine[0][1]
-		flippedLine[1][1] = m - flippedLine[1][1]
-
-		outline.set_data(
-			[flippedLine[0][0], flippedLine[1][0]], 
-			[flippedLine[0][1], flippedLine[1][1]]
-		)
+		activePlotInterface.selectedArea = np.flip(activePlotInterface.selectedArea, 0)
 
 	@SofaToolbar.decorator_get_active_data_set
 	def _flip_heatmap_vertical(
@@ -590,7 +492,7 @@ class HeatmapToolbar(SofaToolbar):
 			the different plots.
 		"""
 		self._flip_selected_area_vertical()
-		self._flip_selected_area_outlines_vertical()
+		self._outline_area()
 
 		activePlotInterface.flip_orientation_matrix_vertical()
 		activeForceVolume.flip_channel_vertical()
@@ -611,50 +513,7 @@ class HeatmapToolbar(SofaToolbar):
 			Interface between a force volume and 
 			the different plots.
 		"""
-		m, n = self.guiInterface.get_active_force_volume().size
-
-		for section in activePlotInterface.selectedArea:
-			section[0] = n - section[0] - 1 
-
-	@SofaToolbar.decorator_get_active_plot_interface
-	def _flip_selected_area_outlines_vertical(
-		self,
-		activePlotInterface
-	) -> None: 
-		"""
-		Flip the outlines of the selected area vertical.
-
-		Parameters
-		----------
-		activePlotInterface : PlotInterface
-			Interface between a force volume and 
-			the different plots.
-		"""
-		for outline in activePlotInterface.selectedAreaOutlines:
-			self._flip_outline_vertical(outline)
-
-	def _flip_outline_vertical(
-		self, 
-		outline: mpl.lines.Line2D
-	) -> None:
-		"""
-		Flip a single outline vertical.
-
-		Parameters
-		----------
-		outline : mpl.lines.Line2D
-			The outline to be flipped.
-		"""
-		m, n = self.guiInterface.get_active_force_volume().size
-		flippedLine = outline.get_xydata().copy()
-
-		flippedLine[0][0] = n - flippedLine[0][0]
-		flippedLine[1][0] = n - flippedLine[1][0]
-
-		outline.set_data(
-			[flippedLine[0][0], flippedLine[1][0]], 
-			[flippedLine[0][1], flippedLine[1][1]]
-		)
+		activePlotInterface.selectedArea = np.flip(activePlotInterface.selectedArea, 1)
 
 	@SofaToolbar.decorator_get_active_data_set
 	def _rotate_heatmap(
@@ -675,7 +534,7 @@ class HeatmapToolbar(SofaToolbar):
 			the different plots.
 		"""	
 		self._rotate_selected_area()
-		self._rotate_selected_area_outlines()
+		self._outline_area()
 
 		activePlotInterface.rotate_orientation_matrix()
 		activeForceVolume.rotate_channel()
@@ -696,81 +555,30 @@ class HeatmapToolbar(SofaToolbar):
 			Interface between a force volume and 
 			the different plots.
 		"""
-		m, n = self.guiInterface.get_active_force_volume().size
-		
-		for section in activePlotInterface.selectedArea:
-			temp1, temp2 = section[1], n - section[0] - 1
-			section[0] = temp1
-			section[1] = temp2
-
-	@SofaToolbar.decorator_get_active_plot_interface
-	def _rotate_selected_area_outlines(
-		self,
-		activePlotInterface
-	) -> None: 
-		"""
-		Rotate the outlines of the selected area.
-
-		Parameters
-		----------
-		activePlotInterface : PlotInterface
-			Interface between a force volume and 
-			the different plots.
-		"""
-		for outline in activePlotInterface.selectedAreaOutlines:
-			self._rotate_outline(outline)
-
-	def _rotate_outline(
-		self, 
-		outline: mpl.lines.Line2D
-	) -> None:
-		"""
-		Rotate a single outline by 90 degrees.
-
-		Parameters
-		----------
-		outline : mpl.lines.Line2D
-			The outline to be rotated.
-		"""
-		m, n = self.guiInterface.get_active_force_volume().size
-		rotatedLine = outline.get_xydata().copy()
-		
-		rotatedLine[0] = [rotatedLine[0][1], n-rotatedLine[0][0]]
-		rotatedLine[1] = [rotatedLine[1][1], n-rotatedLine[1][0]]
-
-		outline.set_data(
-			[rotatedLine[0][0], rotatedLine[1][0]], 
-			[rotatedLine[0][1], rotatedLine[1][1]]
-		)
+		activePlotInterface.selectedArea = np.rot90(activePlotInterface.selectedArea)
 
 	@SofaToolbar.decorator_get_active_plot_interface
 	def _plot_outline(
 		self,
 		activePlotInterface,
-		xValues: Tuple[int, int], 
-		yValues: Tuple[int, int]
+		xValues: np.ndarray, 
+		yValues: np.ndarray
 	) -> None:
 		"""
-		Plot a single outline of the selected area.
+		Plot the outline of the selected area.
 		
 		Parameters
 		----------
 		activePlotInterface : PlotInterface
 			Interface between a force volume and 
 			the different plots. 
-		xValues : tuple[int]
-			X values of the start and end point of 
-			the outline.
-		yValues : tuple[int]
-			Y values of the start and end point of
-			the outline.
-		"""
-		activePlotInterface.selectedAreaOutlines.append(
-			self.holder.figure.get_axes()[0].plot(
-				xValues, 
-				yValues, 
-				color="r", 
-				linestyle="-", 
-				linewidth=2
-			)[0]
-		)
\ No newline at end of file
+		xValues : np.ndarray
+			X values of the outline, segments are
+			separated by nan values.
+		yValues : np.ndarray
+			Y values of the outline, segments are
+			separated by nan values.
+		"""
+		outline = plt_data.create_selected_area_outline(xValues, yValues)
+		self.holder.figure.get_axes()[0].add_line(outline)
+		activePlotInterface.selectedAreaOutlines.append(outline)
\ No newline at end of file
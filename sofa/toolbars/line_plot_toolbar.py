@@ -16,13 +16,13 @@ along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
 
 import os
 import functools
-from typing import List, Tuple, Optional
+from typing import List, Optional
 
 import matplotlib as mpl
-import numpy as np 
 
 from toolbars.sofa_toolbar import SofaToolbar
 import data_processing.named_tuples as nt
+from utilities.action_profiling import decorator_profile_action
 
 def decorator_check_zoom_history_empty(function):
 	"""
@@ -286,7 +286,8 @@ class LinePlotToolbar(SofaToolbar):
 	) -> None: 
 		"""
 		Adjust the x and y axis limits to zoom 
-		in or out.
+		in or out and rasterize the density image
+		of the new view.
 
 		Parameters
 		----------
@@ -299,6 +300,8 @@ class LinePlotToolbar(SofaToolbar):
 		axes.set_xlim(viewLimits.xMin, viewLimits.xMax)
 		axes.set_ylim(viewLimits.yMin, viewLimits.yMax)
 
+		self.guiInterface.update_density_image()
+
 	def _toggle_pick_single_line(self) -> None:
 		"""
 		Toggle the selctor to pick a single curve.
@@ -323,126 +326,27 @@ class LinePlotToolbar(SofaToolbar):
 		self._toggle_line(event.artist)
 		self.guiInterface.update_inactive_data_points_line_plot()
 
-	def _pick_multiple_lines(self) -> None:
+	@decorator_profile_action
+	@SofaToolbar.decorator_get_active_plot_interface
+	def _pick_multiple_lines(
+		self,
+		activePlotInterface
+	) -> None:
 		"""
 		Select all currently visiable curves that 
 		have a datapoint within the current view limits.
-		"""
-		currentViewLimits = self._get_view_limits()
-		
-		for line in self.holder.figure.get_axes()[0].get_lines():
-			hasIntersection = self._check_line_intersection(
-				line, 
-				currentViewLimits
-			)
-			
-			if hasIntersection:
-				self._deactivate_line(line)
-		
-		self.guiInterface.update_inactive_data_points_line_plot()
-
-	def _check_line_intersection(
-		self,
-		line: mpl.lines.Line2D, 
-		currentViewLimits: nt.ViewLimits
-	) -> bool:
-		"""
-		Check whether a line lies within the current view limits.
-		
-		Paramters
-		---------
-		line : matplotlib.lines.Line2D
-			Line to be checked.
-		currentViewLimits : nt.ViewLimits
-			Contains the current x and y view limits.
-
-		Returns
-		-------
-		hasIntersection : bool
-			True if the line has a data point within the current
-			view limits, otherwise false.
-		"""
-		validLineXData, validLineYData = self._get_valid_line_data(line)
-
-		xIntersections = self._get_value_intersections(
-			validLineXData,
-			currentViewLimits.xMin,
-			currentViewLimits.xMax
-		)
-		yIntersections = self._get_value_intersections(
-			validLineYData,
-			currentViewLimits.yMin,
-			currentViewLimits.yMax
-		)
-		# If there is a x and y intersection at the same time, the line lies within the view.
-		if np.any(np.isin(xIntersections, yIntersections)):
-			return True
-
-		return False
-
-	@staticmethod
-	def _get_valid_line_data(
-		line: mpl.lines.Line2D
-	) -> Tuple[np.ndarray]:
-		"""
-		Get the valid piezo(x) and deflection (y)
-		values from a line representation of a 
-		force distance curve
-
-		Parameters
-		----------
-		line : matplotlib.lines.Line2D
-			Line representation of a force
-			distance curve.
-
-		Returns
-		-------
-		validLineXData : np.ndarray
-			Piezo (x) values of the force distance 
-			curve that are not nan.
-		validLineYData : np.ndarray
-			Deflection (y) values of the force distance 
-			curve that are not nan.
-		"""
-		lineData = line.get_xydata()
-		
-		lineXData = lineData[:,0]
-		lineYData = lineData[:,1]
-		validLineXData = lineXData[~np.isnan(lineXData)]
-		validLineYData = lineYData[~np.isnan(lineYData)]
-
-		return validLineXData, validLineYData
-
-	@staticmethod
-	def _get_value_intersections(
-		validLineData: np.ndarray,
-		minimumBorder: float,
-		maximumBorder: float
-	) -> np.ndarray:
-		"""
-		Locate the parts of a force distance curve
-		that lie within the current view limits.
 
 		Parameters
 		----------
-		validLineData : np.ndarray
-			Piezo(x) or deflection (y) values
-			of a force distance cure.
-		minimumBorder : float
-			Minimum x or y axis limit.
-		maximumBorder: float
-			Maximum x or y axis limit.
-
-		Returns
-		-------
-		valueIntersections : np.ndarray
-			Indices of all piezo (x) or deflection (y) 
-			values where the value is within the minimum and
-			maximum x or y view limit.
+		activePlotInterface : PlotInterface
+			Interface between a force volume and 
+			the different plots.
 		"""
-		return np.where(
-			np.logical_and(validLineData >= minimumBorder, validLineData <= maximumBorder)
+		activePlotInterface.add_curves_in_view(
+			self._get_view_limits()
 		)
+		
+		self.guiInterface.update_inactive_data_points_line_plot()
 
 	@SofaToolbar.decorator_get_active_plot_interface
 	def _toggle_line(
@@ -462,7 +366,7 @@ class LinePlotToolbar(SofaToolbar):
 		"""
 		if line.get_color() == "gray":
 			activePlotInterface.remove_inactive_data_point(int(line._label))
-		elif line.get_color() == "red":
+		elif line.get_color() in ("red", "orange"):
 			activePlotInterface.add_inactive_data_point(int(line._label))
 
 	@SofaToolbar.decorator_get_active_plot_interface
@@ -481,5 +385,5 @@ class LinePlotToolbar(SofaToolbar):
 		line : matplotlib.lines.Line2D
 			Line representation of the curve that is deactivated.
 		"""
-		if line.get_color() == "red":
+		if line.get_color() in ("red", "orange"):
 			activePlotInterface.add_inactive_data_point(int(line._label))
\ No newline at end of file
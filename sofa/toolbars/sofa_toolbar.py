@@ -223,6 +223,10 @@ class SofaToolbar(NavigationToolbar2Tk):
 					self.holder.figure.canvas.mpl_connect("button_release_event", self._select_rectangular_area_on_release)
 				)
 			)
+		elif self.mode == "select region":
+			self.eventConnectionIds.append(
+				self.holder.figure.canvas.mpl_connect("button_press_event", self._select_region_on_click)
+			)
 
 	def _reset_event_connections(self) -> None:
 		"""
@@ -257,6 +261,10 @@ class SofaToolbar(NavigationToolbar2Tk):
 			self._set_toolbar_button_state(
 				self._buttons["select_rectangle"]
 			)
+		elif self.mode == "select region":
+			self._set_toolbar_button_state(
+				self._buttons["select_region"]
+			)
 
 	def _set_toolbar_button_state(
 		self,
@@ -0,0 +1,249 @@
+"""
+This file is part of SOFA.
+SOFA is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+SOFA is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from typing import Dict, List, Tuple
+import cProfile
+import functools
+import json
+import os
+import pstats
+import time
+
+import data_processing.named_tuples as nt
+
+# Profiling of the user actions is enabled at startup if this environment variable is set.
+outputFolderPath = os.environ.get("SOFA_PROFILE_FOLDER", "")
+isEnabled = bool(outputFolderPath)
+
+profiledActions: List[nt.ProfiledAction] = []
+
+_isProfiling = False
+
+def decorator_profile_action(function):
+	"""
+	Profile a user action with cProfile and store the call
+	statistics and collapsed stacks in the output folder.
+	Actions which are started by an already profiled action
+	are part of the outer profile.
+	"""
+	@functools.wraps(function)
+	def wrapper_profile_action(self, *args, **kwargs):
+		global _isProfiling
+
+		if not isEnabled or _isProfiling:
+			return function(self, *args, **kwargs)
+
+		_isProfiling = True
+		profile = cProfile.Profile()
+		startTime = time.perf_counter()
+		try:
+			return profile.runcall(function, self, *args, **kwargs)
+		finally:
+			wallTime = time.perf_counter() - startTime
+			_isProfiling = False
+			store_profile(
+				profile,
+				function.__qualname__,
+				get_active_volume_size(self),
+				wallTime
+			)
+
+	return wrapper_profile_action
+
+def enable_action_profiling(folderPath: str) -> None:
+	"""
+	Start to profile the user actions.
+
+	Parameters
+	----------
+	folderPath : str
+		Folder in which the profiles are stored.
+	"""
+	global outputFolderPath, isEnabled
+
+	outputFolderPath = folderPath
+	isEnabled = True
+
+def disable_action_profiling() -> None:
+	"""
+	Stop to profile the user actions.
+	"""
+	global isEnabled
+
+	isEnabled = False
+
+def get_active_volume_size(instance) -> Tuple[int, ...]:
+	"""
+	Get the size of the active force volume of a window,
+	toolbar or gui interface.
+
+	Parameters
+	----------
+	instance : object
+		GUIInterface or an object with a guiInterface.
+
+	Returns
+	-------
+	size : tuple[int]
+		Size of the active force volume or an empty
+		tuple if no force volume is imported.
+	"""
+	guiInterface = getattr(instance, "guiInterface", instance)
+
+	try:
+		return tuple(guiInterface.get_active_force_volume().size)
+	except (AttributeError, KeyError):
+		return ()
+
+def store_profile(
+	profile: cProfile.Profile,
+	actionName: str,
+	size: Tuple[int, ...],
+	wallTime: float
+) -> nt.ProfiledAction:
+	"""
+	Write the statistics of a profiled action as .prof file
+	and as collapsed stacks, which can be read by flame graph
+	tools like flamegraph.pl or speedscope, and append the
+	action to the index file of the output folder.
+
+	Parameters
+	----------
+	profile : cProfile.Profile
+		Profile of the action.
+	actionName : str
+		Qualified name of the profiled function.
+	size : tuple[int]
+		Size of the active force volume.
+	wallTime : float
+		Duration of the action in seconds.
+
+	Returns
+	-------
+	profiledAction : nt.ProfiledAction
+		Name, size, duration and files of the action.
+	"""
+	os.makedirs(outputFolderPath, exist_ok=True)
+
+	fileName = "{:04d}_{}_{}".format(
+		len(profiledActions),
+		actionName.replace(".", "_"),
+		"x".join(str(dimension) for dimension in size) or "none"
+	)
+	filePathStats = os.path.join(outputFolderPath, fileName + ".prof")
+	filePathStacks = os.path.join(outputFolderPath, fileName + ".folded")
+
+	profile.dump_stats(filePathStats)
+	stats = pstats.Stats(profile).stats
+	# The action and size are the root frame, so the stacks of several actions can be merged.
+	rootFrame = "{}[{}]".format(actionName, "x".join(str(dimension) for dimension in size))
+	with open(filePathStacks, "w") as stacksFile:
+		for stack, value in get_collapsed_stacks(stats).items():
+			stacksFile.write(rootFrame + ";" + stack + " " + str(value) + "\n")
+
+	profiledAction = nt.ProfiledAction(
+		name=actionName,
+		size=size,
+		wallTime=wallTime,
+		filePathStats=filePathStats,
+		filePathStacks=filePathStacks
+	)
+	profiledActions.append(profiledAction)
+
+	with open(os.path.join(outputFolderPath, "actions.jsonl"), "a") as indexFile:
+		indexFile.write(json.dumps(profiledAction._asdict()) + "\n")
+
+	return profiledAction
+
+def get_collapsed_stacks(
+	stats: Dict,
+	maximumDepth: int = 64
+) -> Dict[str, int]:
+	"""
+	Convert cProfile statistics into collapsed stacks. cProfile
+	only records the time between callers and callees, so the
+	time of a function is split between its callers in proportion
+	to the time of every caller edge.
+
+	Parameters
+	----------
+	stats : dict
+		Statistics of pstats.Stats.
+	maximumDepth : int, optional
+		Deeper stacks are cut off.
+
+	Returns
+	-------
+	collapsedStacks : dict[str, int]
+		Own time in microseconds of every stack, the
+		frames are separated by semicolons.
+	"""
+	callees: Dict = {function: [] for function in stats}
+	for function, (_, _, _, _, callers) in stats.items():
+		for caller, callerStats in callers.items():
+			if caller in callees:
+				callees[caller].append((function, callerStats[3]))
+
+	collapsedStacks: Dict[str, int] = {}
+
+	def add_stack(function, stack: List[str], share: float) -> None:
+		ownTime = stats[function][2]
+		stack = stack + [get_frame_name(function)]
+		value = int(round(ownTime * share * 1e6))
+		if value > 0:
+			key = ";".join(stack)
+			collapsedStacks[key] = collapsedStacks.get(key, 0) + value
+		if len(stack) >= maximumDepth:
+			return
+
+		for callee, edgeTime in callees[function]:
+			calleeTotalTime = stats[callee][3]
+			# Skip recursive calls and paths below a microsecond.
+			if (
+				calleeTotalTime <= 0
+				or share * edgeTime < 1e-6
+				or get_frame_name(callee) in stack
+			):
+				continue
+			add_stack(callee, stack, share * edgeTime / calleeTotalTime)
+
+	for function, (_, _, _, _, callers) in stats.items():
+		if not any(caller in stats for caller in callers):
+			add_stack(function, [], 1.0)
+
+	return collapsedStacks
+
+def get_frame_name(function: Tuple[str, int, str]) -> str:
+	"""
+	Name a function of the cProfile statistics.
+
+	Parameters
+	----------
+	function : tuple
+		File name, line number and name of the function.
+
+	Returns
+	-------
+	frameName : str
+		Name and location of the function without
+		semicolons and spaces.
+	"""
+	fileName, lineNumber, functionName = function
+	if fileName == "~":
+		frameName = functionName
+	else:
+		frameName = "{}:{}:{}".format(os.path.basename(fileName), lineNumber, functionName)
+
+	return frameName.replace(";", ",").replace(" ", "_")
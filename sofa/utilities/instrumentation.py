@@ -0,0 +1,359 @@
+"""
+This file is part of SOFA.
+SOFA is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+SOFA is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from typing import Callable, Deque, Dict, List, Optional
+import collections
+import contextlib
+import functools
+import os
+import threading
+import time
+import tracemalloc
+
+import data_processing.named_tuples as nt
+
+# The instrumentation can be enabled at startup with the environment variable.
+isEnabled = os.environ.get("SOFA_INSTRUMENTATION", "") not in ("", "0")
+isTracingMemory = isEnabled
+
+# Only the most recent stages are kept, the GUI measures stages for the whole session.
+maximumNumberOfStageRecords = 10000
+stageRecords: Deque[nt.StageRecord] = collections.deque(maxlen=maximumNumberOfStageRecords)
+
+_lock = threading.Lock()
+_openStages = threading.local()
+_nullContext = contextlib.nullcontext()
+
+class StageMeasurement():
+	"""
+	Context manager which measures the wall time, cpu time and
+	peak memory of a single stage and stores the result in
+	stageRecords when the stage is left.
+
+	Attributes
+	----------
+	name : str
+		Name of the measured stage.
+	numberOfCurves : int
+		Number of force distance curves processed in the
+		stage, can be changed while the stage is running.
+	"""
+	def __init__(
+		self,
+		name: str,
+		numberOfCurves: int = 0
+	) -> None:
+		"""
+		Initialize the measurement of a stage.
+
+		Parameters
+		----------
+		name : str
+			Name of the measured stage.
+		numberOfCurves : int, optional
+			Number of processed force distance curves.
+		"""
+		self.name: str = name
+		self.numberOfCurves: int = numberOfCurves
+
+		self._startWallTime: float = 0.0
+		self._startCpuTime: float = 0.0
+		self._startMemory: int = 0
+		self._peakMemory: int = 0
+
+	def __enter__(self) -> "StageMeasurement":
+		if isTracingMemory:
+			if not tracemalloc.is_tracing():
+				tracemalloc.start()
+			stack = _get_open_stages()
+			currentMemory, peakMemory = tracemalloc.get_traced_memory()
+			# Keep the peak of the enclosing stage before the peak is reset.
+			if stack:
+				stack[-1]._peakMemory = max(stack[-1]._peakMemory, peakMemory)
+			_reset_memory_peak()
+			self._startMemory = currentMemory
+			self._peakMemory = currentMemory
+			stack.append(self)
+
+		self._startWallTime = time.perf_counter()
+		self._startCpuTime = time.thread_time()
+
+		return self
+
+	def __exit__(self, *exceptionInfo) -> None:
+		wallTime = time.perf_counter() - self._startWallTime
+		cpuTime = time.thread_time() - self._startCpuTime
+		peakMemory = None
+
+		if isTracingMemory and tracemalloc.is_tracing():
+			stack = _get_open_stages()
+			self._peakMemory = max(self._peakMemory, tracemalloc.get_traced_memory()[1])
+			peakMemory = self._peakMemory - self._startMemory
+			if self in stack:
+				stack.remove(self)
+			if stack:
+				stack[-1]._peakMemory = max(stack[-1]._peakMemory, self._peakMemory)
+
+		with _lock:
+			stageRecords.append(
+				nt.StageRecord(
+					name=self.name,
+					wallTime=wallTime,
+					cpuTime=cpuTime,
+					numberOfCurves=self.numberOfCurves,
+					peakMemory=peakMemory
+				)
+			)
+
+def measure_stage(
+	name: str,
+	numberOfCurves: int = 0
+):
+	"""
+	Measure the code within a with statement as a stage.
+	If the instrumentation is disabled a shared empty
+	context manager is returned.
+
+	Parameters
+	----------
+	name : str
+		Name of the measured stage.
+	numberOfCurves : int, optional
+		Number of processed force distance curves.
+
+	Returns
+	-------
+	measurement : StageMeasurement or contextlib.nullcontext
+		Context manager which measures the stage.
+	"""
+	if not isEnabled:
+		return _nullContext
+
+	return StageMeasurement(name, numberOfCurves)
+
+def decorator_measure_stage(
+	function: Optional[Callable] = None,
+	*,
+	name: str = "",
+	count_curves: Optional[Callable] = None
+):
+	"""
+	Measure every call of a function as a stage. Can be used
+	without arguments, then the qualified name of the function
+	is the name of the stage.
+
+	Parameters
+	----------
+	function : function, optional
+		Measured function.
+	name : str, optional
+		Name of the stage.
+	count_curves : function, optional
+		Gets the arguments of the function and returns
+		the number of processed force distance curves.
+	"""
+	def decorator(function):
+		stageName = name or function.__qualname__
+
+		@functools.wraps(function)
+		def wrapper_measure_stage(*args, **kwargs):
+			if not isEnabled:
+				return function(*args, **kwargs)
+
+			numberOfCurves = count_curves(*args, **kwargs) if count_curves else 0
+			with StageMeasurement(stageName, numberOfCurves):
+				return function(*args, **kwargs)
+
+		return wrapper_measure_stage
+
+	if function is None:
+		return decorator
+
+	return decorator(function)
+
+def enable_instrumentation(
+	traceMemory: bool = True
+) -> None:
+	"""
+	Start to record every measured stage.
+
+	Parameters
+	----------
+	traceMemory : bool, optional
+		Whether the peak memory is measured with tracemalloc,
+		which slows down the measured code noticeably.
+	"""
+	global isEnabled, isTracingMemory
+
+	isTracingMemory = traceMemory
+	if traceMemory and not tracemalloc.is_tracing():
+		tracemalloc.start()
+	isEnabled = True
+
+def disable_instrumentation() -> None:
+	"""
+	Stop to record stages and stop tracing the memory.
+	"""
+	global isEnabled, isTracingMemory
+
+	isEnabled = False
+	if isTracingMemory and tracemalloc.is_tracing():
+		tracemalloc.stop()
+	isTracingMemory = False
+
+def reset_stage_records() -> None:
+	"""
+	Delete every recorded stage.
+	"""
+	with _lock:
+		stageRecords.clear()
+
+def get_last_stage_record() -> Optional[nt.StageRecord]:
+	"""
+	Get the most recently finished stage.
+
+	Returns
+	-------
+	stageRecord : nt.StageRecord or None
+		Measurement of the last stage or None if no
+		stage has been recorded yet.
+	"""
+	with _lock:
+		return stageRecords[-1] if stageRecords else None
+
+def get_stage_report() -> List[nt.StageSummary]:
+	"""
+	Combine the recorded measurements of every stage.
+
+	Returns
+	-------
+	stageReport : list[nt.StageSummary]
+		Number of calls, total times, total number of curves
+		and maximum peak memory of every stage in the order
+		in which the stages were first finished.
+	"""
+	with _lock:
+		records = list(stageRecords)
+
+	summaries: Dict[str, nt.StageSummary] = {}
+	for record in records:
+		summary = summaries.get(record.name)
+		if summary is None:
+			summaries[record.name] = nt.StageSummary(
+				name=record.name,
+				numberOfCalls=1,
+				wallTime=record.wallTime,
+				cpuTime=record.cpuTime,
+				numberOfCurves=record.numberOfCurves,
+				peakMemory=record.peakMemory
+			)
+			continue
+		if summary.peakMemory is None or record.peakMemory is None:
+			peakMemory = summary.peakMemory if record.peakMemory is None else record.peakMemory
+		else:
+			peakMemory = max(summary.peakMemory, record.peakMemory)
+		summaries[record.name] = nt.StageSummary(
+			name=record.name,
+			numberOfCalls=summary.numberOfCalls + 1,
+			wallTime=summary.wallTime + record.wallTime,
+			cpuTime=summary.cpuTime + record.cpuTime,
+			numberOfCurves=summary.numberOfCurves + record.numberOfCurves,
+			peakMemory=peakMemory
+		)
+
+	return list(summaries.values())
+
+def format_stage_record(
+	stageRecord: nt.StageRecord
+) -> str:
+	"""
+	Describe a single measurement in one line, for
+	example in a status bar.
+
+	Parameters
+	----------
+	stageRecord : nt.StageRecord
+		Measurement of a stage.
+
+	Returns
+	-------
+	text : str
+		Name, wall time, cpu time, curves and peak memory.
+	"""
+	text = "{}: {:.3f} s wall, {:.3f} s cpu".format(
+		stageRecord.name,
+		stageRecord.wallTime,
+		stageRecord.cpuTime
+	)
+	if stageRecord.numberOfCurves:
+		text += ", {} curves".format(stageRecord.numberOfCurves)
+	if stageRecord.peakMemory is not None:
+		text += ", {:.1f} MB peak".format(stageRecord.peakMemory / 2**20)
+
+	return text
+
+def format_stage_report(
+	stageReport: List[nt.StageSummary]
+) -> str:
+	"""
+	Format a stage report as a table.
+
+	Parameters
+	----------
+	stageReport : list[nt.StageSummary]
+		Combined measurements of every stage.
+
+	Returns
+	-------
+	table : str
+		One row per stage.
+	"""
+	rows = [
+		"{:<48}{:>7}{:>12}{:>12}{:>9}{:>12}".format(
+			"stage", "calls", "wall [s]", "cpu [s]", "curves", "peak [MB]"
+		)
+	]
+	for summary in stageReport:
+		rows.append(
+			"{:<48}{:>7}{:>12.4f}{:>12.4f}{:>9}{:>12}".format(
+				summary.name,
+				summary.numberOfCalls,
+				summary.wallTime,
+				summary.cpuTime,
+				summary.numberOfCurves,
+				"-" if summary.peakMemory is None
+				else "{:.1f}".format(summary.peakMemory / 2**20)
+			)
+		)
+
+	return "\n".join(rows)
+
+def _get_open_stages() -> List[StageMeasurement]:
+	"""
+	Get the stages of the current thread which are running.
+	"""
+	if not hasattr(_openStages, "stack"):
+		_openStages.stack = []
+
+	return _openStages.stack
+
+def _reset_memory_peak() -> None:
+	"""
+	Set the traced memory peak to the current memory.
+	tracemalloc.reset_peak is only available since
+	Python 3.9, older versions keep the global peak.
+	"""
+	if hasattr(tracemalloc, "reset_peak"):
+		tracemalloc.reset_peak()
@@ -0,0 +1,64 @@
+"""
+This file is part of SOFA.
+SOFA is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+SOFA is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from types import ModuleType
+import importlib.util
+import sys
+
+def lazy_import(moduleName: str) -> ModuleType:
+	"""
+	Import a module lazily. The module is registered right 
+	away, but its code is only executed when one of its
+	attributes is accessed for the first time.
+
+	Parameters
+	----------
+	moduleName : str
+		Absolute name of the module, for example "scipy.stats".
+
+	Returns
+	-------
+	module : ModuleType
+		The already imported module or a placeholder which 
+		loads the module on first use.
+
+	Raises
+	------
+	ModuleNotFoundError
+		If the module can not be found.
+	"""
+	if moduleName in sys.modules:
+		return sys.modules[moduleName]
+
+	moduleSpec = importlib.util.find_spec(moduleName)
+
+	if moduleSpec is None:
+		raise ModuleNotFoundError(
+			"No module named '" + moduleName + "'", 
+			name=moduleName
+		)
+
+	lazyLoader = importlib.util.LazyLoader(moduleSpec.loader)
+	moduleSpec.loader = lazyLoader
+	module = importlib.util.module_from_spec(moduleSpec)
+	sys.modules[moduleName] = module
+	lazyLoader.exec_module(module)
+
+	# Bind a submodule to its parent package like a regular import.
+	parentName, _, childName = moduleName.rpartition(".")
+	if parentName:
+		setattr(sys.modules[parentName], childName, module)
+
+	return module
@@ -0,0 +1,213 @@
+"""
+This file is part of SOFA.
+SOFA is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+SOFA is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
+"""
+import os
+import shutil
+import tempfile
+from typing import Dict, List, Optional, Sequence, Set
+
+# The memory budget in megabytes can be set at startup with this environment variable.
+defaultMemoryBudget = int(float(os.environ.get("SOFA_MEMORY_BUDGET", "4096")) * 1024**2)
+
+class MemoryManager():
+	"""
+	Track the memory footprint of the imported data sets and keep
+	it within a budget by spilling the curves of the least recently
+	used data sets into memory mapped scratch files. The curves of
+	a data set are reloaded when it is activated again.
+
+	Every member of a data set provides get_memory_footprint(),
+	spill_curves(filePath) and reload_curves().
+
+	Attributes
+	----------
+	memoryBudget : int
+		Maximum number of bytes of the data sets in memory,
+		the most recently used data set is never spilled.
+	dataSets : dict[str, list]
+		Members of every tracked data set.
+	recentDataSets : list[str]
+		Names of the tracked data sets, the most recently
+		used one last.
+	spilledDataSets : set[str]
+		Names of the data sets whose curves are spilled.
+	scratchDirectory : str or None
+		Directory of the scratch files, created with
+		the first spilled data set.
+	"""
+	def __init__(self, memoryBudget: int = defaultMemoryBudget) -> None:
+		"""
+		Initialize a manager without data sets.
+
+		Parameters
+		----------
+		memoryBudget : int, optional
+			Maximum number of bytes of the data sets in memory.
+		"""
+		self.memoryBudget: int = memoryBudget
+		self.dataSets: Dict[str, List] = {}
+		self.recentDataSets: List[str] = []
+		self.spilledDataSets: Set[str] = set()
+		self.scratchDirectory: Optional[str] = None
+		self._scratchFiles: Dict[str, List[str]] = {}
+		self._numberOfSpills: int = 0
+
+	def add_data_set(self, name: str, members: Sequence) -> None:
+		"""
+		Track a new data set as the most recently used one,
+		an older data set with the same name is removed.
+
+		Parameters
+		----------
+		name : str
+			Name of the data set.
+		members : list
+			Objects which hold the curves of the data set.
+		"""
+		self.remove_data_set(name)
+		self.dataSets[name] = list(members)
+		self.recentDataSets.append(name)
+		self.enforce_budget()
+
+	def activate_data_set(self, name: str) -> None:
+		"""
+		Reload the curves of a data set if they are spilled
+		and mark it as the most recently used one.
+
+		Parameters
+		----------
+		name : str
+			Name of the data set.
+		"""
+		if name in self.spilledDataSets:
+			for member in self.dataSets[name]:
+				member.reload_curves()
+			self.spilledDataSets.discard(name)
+			self._remove_scratch_files(name)
+
+		self.recentDataSets.remove(name)
+		self.recentDataSets.append(name)
+		self.enforce_budget()
+
+	def remove_data_set(self, name: str) -> None:
+		"""
+		Stop tracking a data set and delete its scratch files.
+
+		Parameters
+		----------
+		name : str
+			Name of the data set.
+		"""
+		if name not in self.dataSets:
+			return
+
+		del self.dataSets[name]
+		self.recentDataSets.remove(name)
+		self.spilledDataSets.discard(name)
+		self._remove_scratch_files(name)
+
+	def get_memory_footprint(self, name: Optional[str] = None) -> int:
+		"""
+		Get the number of bytes of a data set or every
+		data set held in memory.
+
+		Parameters
+		----------
+		name : str, optional
+			Name of the data set, every data set if omitted.
+
+		Returns
+		-------
+		memoryFootprint : int
+			Size of the data in bytes.
+		"""
+		names = self.recentDataSets if name is None else [name]
+
+		return sum(
+			member.get_memory_footprint()
+			for dataSetName in names
+			for member in self.dataSets[dataSetName]
+		)
+
+	def enforce_budget(self) -> List[str]:
+		"""
+		Spill the least recently used data sets until
+		the footprint of all data sets is within the budget.
+
+		Returns
+		-------
+		spilledDataSets : list[str]
+			Names of the newly spilled data sets.
+		"""
+		newlySpilledDataSets = []
+		memoryFootprint = self.get_memory_footprint()
+
+		for name in self.recentDataSets[:-1]:
+			if memoryFootprint <= self.memoryBudget:
+				break
+			if name in self.spilledDataSets:
+				continue
+
+			dataSetFootprint = self.get_memory_footprint(name)
+			self._spill_data_set(name)
+			memoryFootprint += self.get_memory_footprint(name) - dataSetFootprint
+			newlySpilledDataSets.append(name)
+
+		return newlySpilledDataSets
+
+	def close(self) -> None:
+		"""
+		Stop tracking every data set and delete the
+		scratch directory.
+		"""
+		for name in list(self.dataSets):
+			self.remove_data_set(name)
+
+		if self.scratchDirectory is not None:
+			shutil.rmtree(self.scratchDirectory, ignore_errors=True)
+			self.scratchDirectory = None
+
+	def _spill_data_set(self, name: str) -> None:
+		"""
+		Spill the curves of every member of a data set
+		into their own scratch file.
+		"""
+		if self.scratchDirectory is None:
+			self.scratchDirectory = tempfile.mkdtemp(prefix="sofa_")
+
+		self._numberOfSpills += 1
+		scratchFiles = [
+			os.path.join(
+				self.scratchDirectory,
+				f"spill_{self._numberOfSpills}_{memberIndex}.bin"
+			)
+			for memberIndex in range(len(self.dataSets[name]))
+		]
+		for member, scratchFile in zip(self.dataSets[name], scratchFiles):
+			member.spill_curves(scratchFile)
+
+		self._scratchFiles[name] = scratchFiles
+		self.spilledDataSets.add(name)
+
+	def _remove_scratch_files(self, name: str) -> None:
+		"""
+		Delete the scratch files of a data set.
+		"""
+		for scratchFile in self._scratchFiles.pop(name, []):
+			# Files which are still mapped can not be deleted on every system.
+			try:
+				os.remove(scratchFile)
+			except OSError:
+				pass
@@ -0,0 +1,75 @@
+"""
+This file is part of SOFA.
+SOFA is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+SOFA is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with SOFA.  If not, see <http://www.gnu.org/licenses/>.
+"""
+from typing import Callable, Set
+
+class RedrawScheduler():
+	"""
+	Collect the plots which are out of date and redraw
+	them together once the event loop is idle, so several
+	changes in quick succession cause a single redraw.
+
+	Attributes
+	----------
+	dirtyPlots : set[str]
+		Names of the plots which need to be redrawn.
+	"""
+	def __init__(
+		self,
+		schedule_idle: Callable[[Callable[[], None]], object],
+		redraw_plots: Callable[[Set[str]], None]
+	) -> None:
+		"""
+		Initialize a scheduler without out of date plots.
+
+		Parameters
+		----------
+		schedule_idle : function
+			Calls a function once the event loop is idle,
+			for example the after_idle method of a tk widget.
+		redraw_plots : function
+			Redraws the given plots.
+		"""
+		self.dirtyPlots: Set[str] = set()
+		self._schedule_idle = schedule_idle
+		self._redraw_plots = redraw_plots
+		self._isScheduled: bool = False
+
+	def mark_dirty(self, *plotNames: str) -> None:
+		"""
+		Mark plots as out of date and schedule a redraw,
+		if none is pending.
+
+		Parameters
+		----------
+		plotNames : str
+			Names of the plots which need to be redrawn.
+		"""
+		self.dirtyPlots.update(plotNames)
+
+		if not self._isScheduled:
+			self._isScheduled = True
+			self._schedule_idle(self.flush)
+
+	def flush(self) -> None:
+		"""
+		Redraw every out of date plot now.
+		"""
+		self._isScheduled = False
+		dirtyPlots = self.dirtyPlots
+		self.dirtyPlots = set()
+
+		if dirtyPlots:
+			self._redraw_plots(dirtyPlots)
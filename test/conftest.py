@@ -0,0 +1,63 @@
+import functools
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append('./sofa')
+
+import data_processing.named_tuples as nt
+from data_processing.import_data.import_formats.import_ibw_data import (
+	import_ibw_measurement_curves
+)
+from force_spectroscopy_data.force_volume import ForceVolume
+
+@functools.lru_cache(maxsize=None)
+def import_approach_curves(folderName):
+	"""
+	"""
+	approachCurves, _ = import_ibw_measurement_curves("test_data/" + folderName)
+
+	return tuple(approachCurves)
+
+def create_force_volume(
+	folderName="fdc_data_2",
+	size=(1, 20),
+	storeCorrectedCurves=True,
+	calculateAverage=True,
+	approachCurves=None,
+	correctionSettings=nt.CorrectionSettings()
+):
+	"""
+	"""
+	if approachCurves is None:
+		approachCurves = import_approach_curves(folderName)[:int(np.prod(size))]
+
+	forceVolume = ForceVolume(
+		{"measurementData": nt.MeasurementData(folderName, size, list(approachCurves), [])},
+		"test_data/" + folderName,
+		storeCorrectedCurves,
+		correctionSettings=correctionSettings
+	)
+	if calculateAverage:
+		forceVolume.calculate_average([])
+
+	return forceVolume
+
+@pytest.fixture(name="import_approach_curves", scope="session")
+def fixture_import_approach_curves():
+	"""
+	"""
+	return import_approach_curves
+
+@pytest.fixture(name="create_force_volume", scope="session")
+def fixture_create_force_volume():
+	"""
+	"""
+	return create_force_volume
+
+@pytest.fixture
+def force_volume(request):
+	"""
+	"""
+	return create_force_volume(**getattr(request, "param", {}))
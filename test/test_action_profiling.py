@@ -0,0 +1,54 @@
+import json
+import sys
+
+sys.path.append('./sofa')
+
+import utilities.action_profiling as prof
+
+class ForceVolumeStub():
+	size = (4, 5)
+
+class GUIInterfaceStub():
+	def get_active_force_volume(self):
+		return ForceVolumeStub()
+
+	@prof.decorator_profile_action
+	def update_plots(self):
+		return self.update_line_plot() + sum(range(10000))
+
+	@prof.decorator_profile_action
+	def update_line_plot(self):
+		return sorted(range(10000), reverse=True)[0]
+
+def test_nested_actions_are_profiled_once(tmp_path):
+	"""
+	"""
+	prof.enable_action_profiling(str(tmp_path))
+	try:
+		result = GUIInterfaceStub().update_plots()
+	finally:
+		prof.disable_action_profiling()
+
+	assert result == 9999 + sum(range(10000))
+
+	with open(tmp_path / "actions.jsonl") as indexFile:
+		actions = [json.loads(line) for line in indexFile]
+	assert len(actions) == 1
+	assert actions[0]["name"] == "GUIInterfaceStub.update_plots"
+	assert actions[0]["size"] == [4, 5]
+
+	with open(actions[0]["filePathStacks"]) as stacksFile:
+		stacks = [line.rsplit(" ", 1) for line in stacksFile]
+	assert stacks
+	assert all(stack.startswith("GUIInterfaceStub.update_plots[4x5];") for stack, _ in stacks)
+	assert any("update_line_plot" in stack for stack, _ in stacks)
+	assert all(int(value) > 0 for _, value in stacks)
+
+def test_disabled_profiling_calls_the_action():
+	"""
+	"""
+	prof.disable_action_profiling()
+	numberOfProfiledActions = len(prof.profiledActions)
+
+	assert GUIInterfaceStub().update_line_plot() == 9999
+	assert len(prof.profiledActions) == numberOfProfiledActions
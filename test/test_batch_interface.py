@@ -0,0 +1,52 @@
+import csv
+import sys
+
+sys.path.append('./sofa')
+
+import data_processing.named_tuples as nt
+import interfaces.batch_interface as batch
+
+def test_get_measurement_paths_expands_glob_patterns():
+	"""
+	"""
+	measurementPaths = batch.get_measurement_paths(
+		["test_data/fdc_data_*", "test_data/*.ibw", "test_data/missing"]
+	)
+
+	assert [path.replace("\\", "/") for path in measurementPaths] == [
+		"test_data/fdc_data_1",
+		"test_data/fdc_data_2",
+		"test_data/fdc_data_3"
+	]
+
+def test_output_folder_names_are_unique():
+	"""
+	"""
+	outputFolderNames = batch.get_output_folder_names(
+		["run1/map", "run2/map", "a/run1/map.hdf5", "run1/other"]
+	)
+
+	assert outputFolderNames["run1/map"] == "map_run1"
+	assert outputFolderNames["run2/map"] == "map_run2"
+	assert outputFolderNames["a/run1/map.hdf5"] == "map_run1_1"
+	assert outputFolderNames["run1/other"] == "other"
+	assert len(set(outputFolderNames.values())) == 4
+
+def test_write_summary_report(tmp_path):
+	"""
+	"""
+	batchResults = [
+		nt.BatchResult("a", "data/a", True, 4, 1, 1.0, 2.0, 3.0, ""),
+		nt.BatchResult("b", "data/b", False, 0, 0, 0.5, 0.0, 0.0, "Error")
+	]
+	filePathReport = tmp_path / "summary_report.csv"
+
+	batch.write_summary_report(batchResults, str(filePathReport))
+
+	with open(filePathReport, newline="") as reportFile:
+		rows = list(csv.DictReader(reportFile))
+
+	assert [row["name"] for row in rows] == ["a", "b"]
+	assert rows[0]["numberOfFailedCurves"] == "1"
+	assert float(rows[0]["totalTime"]) == 6.0
+	assert rows[1]["errorMessage"] == "Error"
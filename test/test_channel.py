@@ -0,0 +1,41 @@
+import sys
+
+import numpy as np
+
+sys.path.append('./sofa')
+
+from force_spectroscopy_data.channel import Channel
+
+def test_active_heatmap_data_follows_orientation():
+	"""
+	"""
+	data = np.arange(6, dtype=float).reshape(2, 3)
+	channel = Channel("height", (2, 3), data)
+	orientationMatrix = np.arange(6).reshape(2, 3)
+
+	channel.rotate_channel()
+	channel.flip_channel_horizontal()
+	orientationMatrix = np.flip(np.rot90(orientationMatrix), 0)
+
+	activeData = channel.get_active_heatmap_data([1, 5], orientationMatrix)
+
+	expectedData = np.flip(np.rot90(data), 0)
+	expectedData[np.isin(orientationMatrix, [1, 5])] = np.nan
+	np.testing.assert_array_equal(activeData, expectedData)
+	assert channel.version == 0
+
+	channel.update_data(np.array([0]), np.array([10.0]))
+	assert channel.version == 1
+	assert channel.get_active_heatmap_data([], orientationMatrix)[0, 0] == 10.0
+
+def test_active_histogram_data_masks_nan_values():
+	"""
+	"""
+	data = np.array([[1.0, np.nan, 3.0], [np.nan, 5.0, 6.0]])
+	channel = Channel("elasticModulus", (2, 3), data)
+
+	activeData = channel.get_active_histogram_data([0, 5])
+
+	np.testing.assert_array_equal(activeData.mask, [True, False, True, False])
+	assert np.ma.min(activeData) == 3.0
+	assert np.ma.count(channel.get_active_histogram_data([0, 2, 4, 5])) == 0
@@ -0,0 +1,209 @@
+import sys
+
+import numpy as np
+from scipy import ndimage, stats
+
+sys.path.append('./sofa')
+
+import data_processing.named_tuples as nt
+import data_processing.custom_exceptions as ce
+from data_processing.correct_data import calculate_correction_parameters_batch
+from data_processing.contact_detection import (
+	contactDetectionMethods,
+	calculate_linear_fits,
+	calculate_decreasing_derivations,
+	calculate_deflection_borders
+)
+from data_processing.import_data.import_formats.import_ibw_data import (
+	import_ibw_measurement_curves
+)
+
+def locate_end_of_zeroline(approachCurve, smoothFactor=10, borderShift=0.05):
+	"""
+	Single curve reference of the derivative heuristic.
+	"""
+	slope, intercept, _, _, _ = stats.linregress(approachCurve.piezo, approachCurve.deflection)
+	fitDeflection = intercept + slope*approachCurve.piezo
+
+	innerIntersection = np.where(approachCurve.deflection < fitDeflection)[0]
+	indexFirstIntersection = innerIntersection[0]
+	indexLastIntersection = innerIntersection[-1]
+	indexMaxDeflectionDifference = np.argmax(
+		np.absolute(fitDeflection - approachCurve.deflection)[indexFirstIntersection:indexLastIntersection]
+	) + indexFirstIntersection
+	indexRightBorder = int(
+		indexMaxDeflectionDifference
+		+ (indexLastIntersection - indexMaxDeflectionDifference)*borderShift
+	)
+
+	smoothedDerivationDeflection = ndimage.gaussian_filter1d(
+		np.diff(approachCurve.deflection) / np.diff(approachCurve.piezo),
+		sigma=smoothFactor
+	)
+	pointsWithDecreasingDeflection = np.where(
+		smoothedDerivationDeflection[indexFirstIntersection:indexRightBorder] < 0
+	)[0]
+
+	return pointsWithDecreasingDeflection[-1] + indexFirstIntersection
+
+def test_calculate_linear_fits_simple():
+	"""
+	"""
+	piezo = np.array([[1, 2, 3, 4, 5]], dtype=np.float64)
+	deflection = np.array([[1, -1, 0, -1, 1]], dtype=np.float64)
+	expectedDeflectionValues = np.array([[0, 0, 0, 0, 0]])
+
+	slopes, intercepts = calculate_linear_fits(piezo, deflection)
+
+	np.testing.assert_allclose(
+		intercepts[:, np.newaxis] + slopes[:, np.newaxis]*piezo,
+		expectedDeflectionValues,
+		atol=1e-12
+	)
+
+def test_calculate_decreasing_derivations_simple():
+	"""
+	"""
+	piezo = np.array([[1, 2, 3, 4, 5]], dtype=np.float64)
+	deflection = np.array([[1, 1, 0, 4, 8]], dtype=np.float64)
+	expectedIsDecreasing = np.array([[False, True, False, False]])
+
+	isDecreasing = calculate_decreasing_derivations(piezo, deflection, 0.1)
+
+	np.testing.assert_array_equal(isDecreasing, expectedIsDecreasing)
+
+def test_calculate_deflection_borders_simple():
+	"""
+	"""
+	piezo = np.array([[1, 2, 3, 4, 5, 6]], dtype=np.float64)
+	deflection = np.array([[1, 1, -1, -0.5, 2, 6]])
+	expectedFirstIntersection = 2
+	expectedMaxDeflectionDifference = 3
+
+	indicesLeftBorder, indicesRightBorder, hasBorders = calculate_deflection_borders(
+		piezo,
+		deflection,
+		np.array([1.0]),
+		np.array([-2.0]),
+		0.05
+	)
+
+	np.testing.assert_array_equal(
+		[indicesLeftBorder[0], indicesRightBorder[0]],
+		[expectedFirstIntersection, expectedMaxDeflectionDifference]
+	)
+	assert hasBorders[0]
+
+def create_synthetic_curve(random, indexContact):
+	"""
+	"""
+	piezo = np.linspace(0, 1e-6, 1000)
+	deflection = 2e-3*piezo + random.normal(0, 2e-10, len(piezo))
+	deflection[indexContact - 8:indexContact] -= np.linspace(0, 4e-9, 8)
+	deflection[indexContact:] += 0.5*(piezo[indexContact:] - piezo[indexContact])
+
+	return nt.ForceDistanceCurve(piezo, deflection)
+
+def test_contact_detection_methods_locate_synthetic_contact():
+	"""
+	"""
+	random = np.random.default_rng(0)
+	indicesContact = [700, 750, 800, 850]
+	approachCurves = [
+		create_synthetic_curve(random, indexContact)
+		for indexContact in indicesContact
+	]
+
+	for contactDetection in contactDetectionMethods:
+		correctionResults = calculate_correction_parameters_batch(
+			approachCurves,
+			nt.CorrectionSettings(contactDetection=contactDetection),
+			batchSize=3
+		)
+		for indexContact, (_, channelMetadata) in zip(indicesContact, correctionResults):
+			assert abs(channelMetadata.pointOfContact.index - indexContact) <= 3
+
+def test_batched_derivative_matches_single_curve_heuristic():
+	"""
+	"""
+	approachCurves, _ = import_ibw_measurement_curves("test_data/fdc_data_1")
+	approachCurves = approachCurves[:60]
+
+	correctionResults = calculate_correction_parameters_batch(approachCurves)
+
+	for approachCurve, correctionResult in zip(approachCurves, correctionResults):
+		if isinstance(correctionResult, ce.CorrectionError):
+			continue
+		indexEndOfZeroline = locate_end_of_zeroline(
+			nt.ForceDistanceCurve(
+				np.asarray(approachCurve.piezo, dtype=np.float64),
+				np.asarray(approachCurve.deflection, dtype=np.float64)
+			)
+		)
+		assert correctionResult[0].indexEndOfZeroline == indexEndOfZeroline
+
+def test_compare_and_change_contact_detection(create_force_volume):
+	"""
+	"""
+	forceVolume = create_force_volume("fdc_data_1", (4, 6), calculateAverage=False)
+
+	pointsOfContact = forceVolume.compare_contact_detection(list(contactDetectionMethods))
+	assert all(points.shape == (4, 6) for points in pointsOfContact.values())
+
+	correctionUpdate = forceVolume.update_correction_settings(
+		forceVolume.correctionSettings._replace(contactDetection="goodnessOfFit")
+	)
+	assert forceVolume.correctionSettings.contactDetection == "goodnessOfFit"
+	assert len(correctionUpdate.changedCurves) > 0
+	for forceDistanceCurve, pointOfContact in zip(
+		forceVolume.forceDistanceCurves,
+		pointsOfContact["goodnessOfFit"].flatten()
+	):
+		if forceDistanceCurve.couldBeCorrected:
+			assert forceDistanceCurve.correctionParameters.piezoPointOfContact == pointOfContact
+		else:
+			assert np.isnan(pointOfContact)
+
+def test_update_correction_settings_matches_new_force_volume(create_force_volume):
+	"""
+	"""
+	forceVolume = create_force_volume("fdc_data_1", (6, 8), calculateAverage=False)
+	forceVolume.flip_channel_horizontal()
+	forceVolume.calculate_average([])
+
+	correctionUpdate = forceVolume.update_correction_settings(
+		nt.CorrectionSettings(borderShift=0.3)
+	)
+	assert len(correctionUpdate.changedCurves) == 0
+	assert not correctionUpdate.averageChanged
+
+	correctionSettings = nt.CorrectionSettings(smoothFactor=25, borderShift=0.3)
+	correctionUpdate = forceVolume.update_correction_settings(correctionSettings)
+	expectedForceVolume = create_force_volume(
+		"fdc_data_1",
+		(6, 8),
+		calculateAverage=False,
+		correctionSettings=correctionSettings
+	)
+
+	assert len(correctionUpdate.changedCurves) > 0
+	assert correctionUpdate.averageChanged
+	for forceDistanceCurve, expectedForceDistanceCurve in zip(
+		forceVolume.forceDistanceCurves,
+		expectedForceVolume.forceDistanceCurves
+	):
+		assert forceDistanceCurve.couldBeCorrected == expectedForceDistanceCurve.couldBeCorrected
+		if forceDistanceCurve.couldBeCorrected:
+			assert forceDistanceCurve.correctionParameters == expectedForceDistanceCurve.correctionParameters
+	for channelName in correctionUpdate.changedChannels:
+		np.testing.assert_array_equal(
+			forceVolume.channels[channelName].data,
+			np.flip(expectedForceVolume.channels[channelName].data, 0)
+		)
+
+	correctionUpdate = forceVolume.update_correction_settings(
+		correctionSettings._replace(numberOfDataPoints=500)
+	)
+	assert len(correctionUpdate.changedCurves) == 0
+	assert correctionUpdate.averageChanged
+	assert len(forceVolume.average.piezoNonContact) == 500
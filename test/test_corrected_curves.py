@@ -0,0 +1,90 @@
+import sys
+
+import numpy as np
+
+sys.path.append('./sofa')
+
+import data_processing.named_tuples as nt
+import force_spectroscopy_data.force_distance_curve as fdc
+from force_spectroscopy_data.corrected_curves import CorrectedCurves
+
+def test_implicit_corrected_curves_match_stored_curves(create_force_volume):
+	"""
+	"""
+	storedForceVolume = create_force_volume("fdc_data_1", (6, 8), True)
+	implicitForceVolume = create_force_volume("fdc_data_1", (6, 8), False)
+
+	storedCurves = storedForceVolume.get_force_distance_curves_data()
+	implicitCurves = implicitForceVolume.get_force_distance_curves_data()
+
+	assert isinstance(implicitCurves, CorrectedCurves)
+	assert all(
+		forceDistanceCurve._dataApproachCorrected is None
+		for forceDistanceCurve in implicitForceVolume.forceDistanceCurves
+	)
+	assert len(implicitCurves) == len(storedCurves) > 0
+
+	implicitCurves.batchSize = 5
+	for storedCurve, batchedCurve, singleCurve, slicedCurve in zip(
+		storedCurves,
+		implicitCurves,
+		[implicitCurves[index] for index in range(len(implicitCurves))],
+		implicitCurves[:]
+	):
+		for curve in (batchedCurve, singleCurve, slicedCurve):
+			np.testing.assert_array_equal(curve.piezo, storedCurve.piezo)
+			np.testing.assert_array_equal(curve.deflection, storedCurve.deflection)
+			assert curve.piezo.dtype == storedCurve.piezo.dtype
+
+	for channelName, channel in storedForceVolume.channels.items():
+		np.testing.assert_array_equal(
+			implicitForceVolume.channels[channelName].data,
+			channel.data
+		)
+	np.testing.assert_array_equal(
+		implicitForceVolume.average.deflectionContact,
+		storedForceVolume.average.deflectionContact
+	)
+
+def test_implicit_consumers_correct_curves_in_batches(create_force_volume, monkeypatch):
+	"""
+	"""
+	storedForceVolume = create_force_volume("fdc_data_1", (6, 8), True)
+	implicitForceVolume = create_force_volume("fdc_data_1", (6, 8), False)
+
+	numberOfSingleCorrections = []
+	apply_correction = fdc.apply_correction
+	def count_single_corrections(*args, **kwargs):
+		numberOfSingleCorrections.append(1)
+		return apply_correction(*args, **kwargs)
+	monkeypatch.setattr(fdc, "apply_correction", count_single_corrections)
+
+	correctionSettings = nt.CorrectionSettings(
+		contactDetection="ratioOfVariances",
+		numberOfDataPoints=500
+	)
+	storedForceVolume.update_correction_settings(correctionSettings)
+	numberOfSingleCorrections.clear()
+	implicitForceVolume.update_correction_settings(correctionSettings)
+	implicitForceVolume.calculate_average([0, 1], recalculate=True)
+	storedForceVolume.calculate_average([0, 1], recalculate=True)
+	implicitOutlierScores = implicitForceVolume.detect_outliers([0, 1])
+
+	assert numberOfSingleCorrections == []
+	assert all(
+		forceDistanceCurve._dataApproachCorrected is None
+		for forceDistanceCurve in implicitForceVolume.forceDistanceCurves
+	)
+	for channelName, channel in storedForceVolume.channels.items():
+		np.testing.assert_array_equal(
+			implicitForceVolume.channels[channelName].data,
+			channel.data
+		)
+	np.testing.assert_array_equal(
+		implicitForceVolume.average.deflectionContact,
+		storedForceVolume.average.deflectionContact
+	)
+	np.testing.assert_array_equal(
+		implicitOutlierScores.curveDistance,
+		storedForceVolume.detect_outliers([0, 1]).curveDistance
+	)
@@ -0,0 +1,41 @@
+import sys
+
+import numpy as np
+
+sys.path.append('./sofa')
+
+import data_processing.named_tuples as nt
+from force_spectroscopy_data.curve_index import CurveIndex
+
+def test_curves_in_view_match_every_data_point():
+	"""
+	"""
+	randomGenerator = np.random.default_rng(4)
+	curves = []
+	for _ in range(200):
+		numberOfPoints = randomGenerator.integers(1, 60)
+		piezo = np.cumsum(randomGenerator.normal(size=numberOfPoints))
+		deflection = np.cumsum(randomGenerator.normal(size=numberOfPoints))
+		piezo[randomGenerator.random(numberOfPoints) < 0.1] = np.nan
+		curves.append(nt.ForceDistanceCurve(piezo, deflection))
+	curves.append(nt.ForceDistanceCurve(np.full(3, np.nan), np.zeros(3)))
+
+	curveIndex = CurveIndex.from_curves(curves, numberOfCells=16)
+
+	for _ in range(50):
+		xMin, xMax = np.sort(randomGenerator.uniform(-20, 20, 2))
+		yMin, yMax = np.sort(randomGenerator.uniform(-20, 20, 2))
+		expectedCurves = [
+			index for index, curve in enumerate(curves)
+			if np.any(
+				(curve.piezo >= xMin) & (curve.piezo <= xMax)
+				& (curve.deflection >= yMin) & (curve.deflection <= yMax)
+			)
+		]
+
+		np.testing.assert_array_equal(
+			curveIndex.get_curves_in_view(nt.ViewLimits(xMax, xMin, yMin, yMax)),
+			expectedCurves
+		)
+
+	assert len(curveIndex.get_curves_in_view(nt.ViewLimits(-1e6, 1e6, -1e6, 1e6))) == 200
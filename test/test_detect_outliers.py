@@ -0,0 +1,45 @@
+import sys
+
+import numpy as np
+
+sys.path.append('./sofa')
+
+import data_processing.named_tuples as nt
+from data_processing.detect_outliers import calculate_robust_z_scores
+
+def test_robust_z_scores_ignore_outliers_and_nan():
+	"""
+	"""
+	values = np.array([1.0, 2.0, 3.0, 4.0, 5.0, 1000.0, np.nan])
+
+	zScores = calculate_robust_z_scores(values)
+
+	np.testing.assert_allclose(zScores[:5], (values[:5] - 3.5) / (1.4826 * 1.5))
+	assert zScores[5] > 100
+	assert np.isnan(zScores[6])
+	np.testing.assert_array_equal(calculate_robust_z_scores(np.ones(3)), np.zeros(3))
+
+def test_detect_outliers_finds_distorted_curve(create_force_volume, import_approach_curves):
+	"""
+	"""
+	approachCurves = list(import_approach_curves("fdc_data_1")[:48])
+	distortedCurve = approachCurves[17]
+	approachCurves[17] = nt.ForceDistanceCurve(
+		distortedCurve.piezo,
+		5*distortedCurve.deflection
+	)
+	forceVolume = create_force_volume(
+		"fdc_data_1",
+		(6, 8),
+		calculateAverage=False,
+		approachCurves=approachCurves
+	)
+
+	outlierScores = forceVolume.detect_outliers([])
+	assert outlierScores.isOutlier[17]
+	assert outlierScores.isOutlier.sum() < 48 // 4
+	assert set(outlierScores.channelScores) == set(nt.OutlierParameters().channels)
+
+	outlierScores = forceVolume.detect_outliers([17])
+	assert not outlierScores.isOutlier[17]
+	assert np.isnan(outlierScores.curveDistance[17])
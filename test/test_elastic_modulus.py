@@ -0,0 +1,112 @@
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.append('./sofa')
+
+import data_processing.named_tuples as nt
+from data_processing.calculate_elastic_modulus import (
+	calculate_elastic_modulus_channels,
+	get_tip_parameter,
+	defaultTipParameters,
+	tipGeometries
+)
+
+def create_indentation_curve(elasticModulus, indentationParameters, springConstant):
+	"""
+	"""
+	prefactor, exponent = tipGeometries[indentationParameters.tipGeometry](
+		indentationParameters.tipParameter
+	)
+	reducedModulus = elasticModulus / (1 - indentationParameters.poissonRatio**2)
+	indentation = np.linspace(0, 50e-9, 200)
+	deflection = prefactor * reducedModulus * indentation**exponent / springConstant
+	piezo = np.concatenate((np.linspace(-100e-9, 0, 100, endpoint=False), indentation + deflection))
+	deflection = np.concatenate((np.zeros(100), deflection))
+
+	return SimpleNamespace(
+		couldBeCorrected=True,
+		channelMetadata=SimpleNamespace(pointOfContact=SimpleNamespace(index=100)),
+		dataApproachCorrected=nt.ForceDistanceCurve(piezo, deflection)
+	)
+
+def test_elastic_modulus_of_synthetic_curves():
+	"""
+	"""
+	springConstant = 0.5
+	elasticModuli = [1e6, 5e6, 2e7, 1e8]
+
+	for tipGeometry, tipParameter in [("sphere", 20e-9), ("cone", 35), ("pyramid", 20)]:
+		indentationParameters = nt.IndentationParameters(tipGeometry, tipParameter, 0.3)
+		curves = [
+			create_indentation_curve(elasticModulus, indentationParameters, springConstant)
+			for elasticModulus in elasticModuli
+		]
+		curves.append(SimpleNamespace(couldBeCorrected=False))
+
+		channels = calculate_elastic_modulus_channels(
+			curves, (1, 5), indentationParameters, str(springConstant), chunkSize=3
+		)
+
+		np.testing.assert_allclose(channels["elasticModulus"][0, :4], elasticModuli, rtol=1e-6)
+		np.testing.assert_allclose(channels["fitQualityElasticModulus"][0, :4], 1.0)
+		assert np.isnan(channels["elasticModulus"][0, 4])
+
+	channels = calculate_elastic_modulus_channels(curves, (5, 1), indentationParameters, None)
+	assert np.isnan(channels["elasticModulus"]).all()
+	np.testing.assert_allclose(channels["fitQualityElasticModulus"][:4, 0], 1.0)
+
+def test_default_tip_parameter_of_tip_geometry():
+	"""
+	"""
+	assert get_tip_parameter(nt.IndentationParameters("sphere")) == 10e-9
+	assert get_tip_parameter(nt.IndentationParameters("sphere", 20e-9)) == 20e-9
+
+	springConstant = 0.5
+	for tipGeometry in ("cone", "pyramid"):
+		indentationParameters = nt.IndentationParameters(tipGeometry)
+		assert get_tip_parameter(indentationParameters) == defaultTipParameters[tipGeometry] == 35
+
+		curves = [
+			create_indentation_curve(
+				1e7,
+				indentationParameters._replace(tipParameter=35),
+				springConstant
+			)
+		]
+		channels = calculate_elastic_modulus_channels(
+			curves, (1, 1), indentationParameters, springConstant
+		)
+		np.testing.assert_allclose(channels["elasticModulus"], 1e7, rtol=1e-6)
+
+def test_fit_quality_of_measured_curves(create_force_volume):
+	"""
+	"""
+	forceVolume = create_force_volume("fdc_data_1", (6, 8), calculateAverage=False)
+
+	channels = calculate_elastic_modulus_channels(
+		forceVolume.forceDistanceCurves,
+		(6, 8),
+		nt.IndentationParameters("sphere"),
+		0.1
+	)
+
+	rSquared = channels["fitQualityElasticModulus"]
+	assert np.mean(rSquared[np.isfinite(rSquared)] > 0) > 0.9
+	assert np.nanmedian(rSquared) > 0.8
+
+def test_spring_constant_of_indentation_parameters():
+	"""
+	"""
+	indentationParameters = nt.IndentationParameters("sphere", 20e-9, 0.3)
+	curves = [create_indentation_curve(1e7, indentationParameters, 0.5)]
+
+	for springConstant in (None, "0.1"):
+		channels = calculate_elastic_modulus_channels(
+			curves,
+			(1, 1),
+			indentationParameters._replace(springConstant=0.5),
+			springConstant
+		)
+		np.testing.assert_allclose(channels["elasticModulus"], 1e7, rtol=1e-6)
@@ -0,0 +1,156 @@
+import json
+import sys
+
+import h5py
+import numpy as np
+import pytest
+
+sys.path.append('./sofa')
+
+import data_processing.export_data as exp_data
+from force_spectroscopy_data.corrected_curves import CorrectedCurves
+
+@pytest.fixture(scope="module")
+def force_volume(create_force_volume):
+	"""
+	"""
+	return create_force_volume("fdc_data_1", (2, 26))
+
+def assert_curves_equal(forceVolume, curveType, curveIds, offsets, piezo, deflection):
+	"""
+	"""
+	expectedCurveIds, expectedCurves = forceVolume.get_curves(curveType)
+
+	np.testing.assert_array_equal(curveIds, expectedCurveIds)
+	for index, curve in enumerate(expectedCurves):
+		start, stop = offsets[index], offsets[index + 1]
+		np.testing.assert_array_equal(piezo[start:stop], curve.piezo)
+		np.testing.assert_array_equal(deflection[start:stop], curve.deflection)
+
+def test_export_to_npz_round_trip(force_volume, tmp_path):
+	"""
+	"""
+	exp_data.export_to_npz(force_volume, str(tmp_path), chunkSize=5)
+
+	with np.load(tmp_path / "force_volume.npz") as npzFile:
+		assert json.loads(str(npzFile["meta_data"])) == {
+			"name": "fdc_data_1", "size": [2, 26]
+		}
+		for curveType in ["raw", "corrected"]:
+			assert_curves_equal(
+				force_volume,
+				curveType,
+				npzFile[curveType + "_curve_ids"],
+				npzFile[curveType + "_offsets"],
+				npzFile[curveType + "_piezo"],
+				npzFile[curveType + "_deflection"]
+			)
+		for channel in force_volume.channels.values():
+			np.testing.assert_array_equal(
+				npzFile["channel_" + channel.name], channel.rawData
+			)
+		np.testing.assert_array_equal(
+			npzFile["average_deflectionContact"],
+			force_volume.average.deflectionContact
+		)
+
+def test_export_to_hdf5_round_trip(force_volume, tmp_path):
+	"""
+	"""
+	exp_data.export_to_hdf5(force_volume, str(tmp_path), chunkSize=5)
+
+	with h5py.File(tmp_path / "force_volume.h5", "r") as hdf5File:
+		assert hdf5File.attrs["name"] == "fdc_data_1"
+		np.testing.assert_array_equal(hdf5File.attrs["size"], [2, 26])
+		for curveType in ["raw", "corrected"]:
+			group = hdf5File["curves/" + curveType]
+			assert_curves_equal(
+				force_volume,
+				curveType,
+				group["curve_ids"][()],
+				group["offsets"][()],
+				group["piezo"][()],
+				group["deflection"][()]
+			)
+		for channel in force_volume.channels.values():
+			np.testing.assert_array_equal(
+				hdf5File["channels/" + channel.name][()], channel.rawData
+			)
+
+def test_export_to_parquet_round_trip(force_volume, tmp_path):
+	"""
+	"""
+	pq = pytest.importorskip("pyarrow.parquet")
+	exp_data.export_to_parquet(force_volume, str(tmp_path), chunkSize=5)
+
+	table = pq.read_table(tmp_path / "corrected_curves.parquet")
+	curveIds = table.column("curve_id").to_numpy()
+	offsets = np.concatenate([np.flatnonzero(table.column("index").to_numpy() == 0), [len(curveIds)]])
+	assert_curves_equal(
+		force_volume,
+		"corrected",
+		curveIds[offsets[:-1]],
+		offsets,
+		table.column("piezo").to_numpy(),
+		table.column("deflection").to_numpy()
+	)
+	assert json.loads(table.schema.metadata[b"sofa"])["size"] == [2, 26]
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_export_to_csv_long_format(force_volume, tmp_path, compress):
+	"""
+	"""
+	pd = pytest.importorskip("pandas")
+	exp_data.export_to_csv(force_volume, str(tmp_path), compress=compress, chunkSize=5)
+	fileExtension = ".csv.gz" if compress else ".csv"
+
+	curveData = pd.read_csv(tmp_path / ("curve_data" + fileExtension))
+	assert list(curveData.columns) == ["curve_id", "index", "piezo", "deflection", "kind"]
+	for curveType in ["raw", "corrected"]:
+		curveIds, curves = force_volume.get_curves(curveType)
+		curveDataType = curveData[curveData["kind"] == curveType]
+		assert list(curveDataType["curve_id"].unique()) == curveIds
+		curve = curveDataType[curveDataType["curve_id"] == curveIds[-1]]
+		np.testing.assert_array_equal(curve["index"], np.arange(len(curves[-1].piezo)))
+		np.testing.assert_array_equal(
+			curve["piezo"].to_numpy(curves[-1].piezo.dtype), curves[-1].piezo
+		)
+		np.testing.assert_array_equal(
+			curve["deflection"].to_numpy(curves[-1].deflection.dtype), curves[-1].deflection
+		)
+	channelData = pd.read_csv(tmp_path / ("channel_data" + fileExtension))
+	np.testing.assert_allclose(
+		channelData["topography"], force_volume.channels["topography"].rawData.ravel()
+	)
+
+def test_export_corrects_implicit_curves_once(create_force_volume, tmp_path, monkeypatch):
+	"""
+	"""
+	forceVolume = create_force_volume(
+		"fdc_data_1",
+		(2, 26),
+		storeCorrectedCurves=False,
+		calculateAverage=False
+	)
+	get_batch = CorrectedCurves.get_batch
+	correctedBatches = []
+
+	def count_batches(forceDistanceCurves):
+		correctedBatches.append(len(forceDistanceCurves))
+		return get_batch(forceDistanceCurves)
+
+	monkeypatch.setattr(CorrectedCurves, "get_batch", staticmethod(count_batches))
+	exp_data.export_to_hdf5(forceVolume, str(tmp_path), chunkSize=20)
+
+	assert sum(correctedBatches) == len(forceVolume.get_curves("corrected")[0])
+	monkeypatch.undo()
+	with h5py.File(tmp_path / "force_volume.h5", "r") as hdf5File:
+		group = hdf5File["curves/corrected"]
+		assert_curves_equal(
+			forceVolume,
+			"corrected",
+			group["curve_ids"][()],
+			group["offsets"][()],
+			group["piezo"][()],
+			group["deflection"][()]
+		)
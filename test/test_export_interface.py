@@ -0,0 +1,148 @@
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+from matplotlib.figure import Figure
+
+sys.path.append('./sofa')
+
+import data_processing.named_tuples as nt
+import data_processing.export_data as exp_data
+from interfaces.export_interface import ExportScheduler
+
+def create_figure():
+	"""
+	"""
+	figure = Figure()
+	figure.add_subplot().imshow(np.arange(4).reshape(2, 2))
+
+	return figure
+
+def test_export_scheduler_exports_data_and_figures(force_volume, tmp_path):
+	"""
+	"""
+	exportScheduler = ExportScheduler(numberOfWorkers=2)
+	exportScheduler.start(
+		force_volume,
+		nt.ExportParameter(str(tmp_path), "export", ["csv", "npz"], True),
+		{"heatmap": create_figure()}
+	)
+	exportScheduler.wait()
+
+	assert exportScheduler.isFinished
+	assert exportScheduler.numberOfFinishedTasks == exportScheduler.numberOfTasks == 3
+	assert exportScheduler.get_errors() == []
+	assert (tmp_path / "export" / "curve_data.csv").is_file()
+	assert (tmp_path / "export" / "force_volume.npz").is_file()
+	assert (tmp_path / "export" / "heatmap.png").is_file()
+
+def test_export_scheduler_cancel(force_volume, tmp_path):
+	"""
+	"""
+	exportScheduler = ExportScheduler(numberOfWorkers=1)
+	exportScheduler.start(
+		force_volume,
+		nt.ExportParameter(str(tmp_path), "export", ["npz", "hdf5"], False),
+		{}
+	)
+	exportScheduler.cancel()
+	exportScheduler.wait()
+
+	assert exportScheduler.isCancelled
+	assert exportScheduler.isFinished
+	assert exportScheduler.get_errors() == []
+	assert not (tmp_path / "export" / "force_volume.h5").exists()
+
+def test_export_scheduler_exports_snapshot(force_volume, tmp_path, monkeypatch):
+	"""
+	"""
+	forceVolume = force_volume
+	_, correctedCurves = forceVolume.get_curves("corrected")
+	expectedDeflection = np.concatenate(
+		[curve.deflection for curve in correctedCurves]
+	)
+	expectedAverage = forceVolume.average.deflectionContact.copy()
+	expectedChannel = forceVolume.channels["topography"].rawData.copy()
+
+	exportStarted = threading.Event()
+	continueExport = threading.Event()
+	def export_to_npz(*args, **kwargs):
+		exportStarted.set()
+		continueExport.wait()
+		exp_data.export_to_npz(*args, **kwargs)
+	monkeypatch.setitem(exp_data.exportFormats, "npz", export_to_npz)
+
+	exportScheduler = ExportScheduler(numberOfWorkers=1)
+	exportScheduler.start(
+		forceVolume,
+		nt.ExportParameter(str(tmp_path), "export", ["npz"], False),
+		{}
+	)
+	exportStarted.wait()
+
+	forceVolume.update_correction_settings(
+		nt.CorrectionSettings(contactDetection="ratioOfVariances", numberOfDataPoints=500)
+	)
+	forceVolume.calculate_average(list(range(10)))
+	scratchFile = str(tmp_path / "curves.bin")
+	forceVolume.spill_curves(scratchFile)
+	os.remove(scratchFile)
+
+	continueExport.set()
+	exportScheduler.wait()
+
+	assert exportScheduler.get_errors() == []
+	with np.load(tmp_path / "export" / "force_volume.npz") as npzFile:
+		np.testing.assert_array_equal(npzFile["corrected_deflection"], expectedDeflection)
+		np.testing.assert_array_equal(npzFile["average_deflectionContact"], expectedAverage)
+		np.testing.assert_array_equal(npzFile["channel_topography"], expectedChannel)
+
+def record_curve_data_frame_threads(monkeypatch):
+	"""
+	"""
+	callingThreads = []
+	create_data_frame_raw_curves = exp_data.create_data_frame_raw_curves
+	def record_calling_thread(*args, **kwargs):
+		callingThreads.append(threading.current_thread())
+		return create_data_frame_raw_curves(*args, **kwargs)
+	monkeypatch.setattr(exp_data, "create_data_frame_raw_curves", record_calling_thread)
+
+	return callingThreads
+
+def test_export_scheduler_csv_without_curve_data_frames(force_volume, tmp_path, monkeypatch):
+	"""
+	"""
+	callingThreads = record_curve_data_frame_threads(monkeypatch)
+
+	exportScheduler = ExportScheduler(numberOfWorkers=2)
+	exportScheduler.start(
+		force_volume,
+		nt.ExportParameter(str(tmp_path), "export", ["csv", "csv.gz"], False),
+		{}
+	)
+	exportScheduler.wait()
+
+	assert exportScheduler.get_errors() == []
+	assert (tmp_path / "export" / "channel_data.csv.gz").is_file()
+	assert callingThreads == []
+
+def test_export_scheduler_creates_curve_data_frames_in_xlsx_task(force_volume, tmp_path, monkeypatch):
+	"""
+	"""
+	pytest.importorskip("openpyxl")
+	callingThreads = record_curve_data_frame_threads(monkeypatch)
+
+	exportScheduler = ExportScheduler(numberOfWorkers=2)
+	exportScheduler.start(
+		force_volume,
+		nt.ExportParameter(str(tmp_path), "export", ["csv", "xlsx"], False),
+		{}
+	)
+	exportScheduler.wait()
+
+	assert exportScheduler.get_errors() == []
+	assert (tmp_path / "export" / "data.xlsx").is_file()
+	assert len(callingThreads) == 1
+	assert callingThreads[0] is not threading.main_thread()
@@ -0,0 +1,34 @@
+import sys
+
+import numpy as np
+
+sys.path.append('./sofa')
+
+from data_processing.image_pyramid import ImagePyramid, reduce_image
+
+def test_reduce_image_ignores_nan_values():
+	"""
+	"""
+	data = np.array([
+		[1.0, 3.0, 5.0],
+		[np.nan, 5.0, np.nan],
+		[np.nan, np.nan, 2.0]
+	])
+
+	np.testing.assert_array_equal(
+		reduce_image(data),
+		np.array([[3.0, 5.0], [np.nan, 2.0]])
+	)
+
+def test_image_uses_matching_level():
+	"""
+	"""
+	data = np.arange(1024*1000, dtype=float).reshape(1024, 1000)
+	imagePyramid = ImagePyramid(data)
+
+	image = imagePyramid.get_image((256, 250))
+	assert image.shape == (256, 250)
+	assert len(imagePyramid.levels) == 3
+
+	np.testing.assert_array_equal(imagePyramid.get_image((2000, 2000)), data)
+	assert imagePyramid.get_image((300, 300)).shape == (512, 500)
@@ -0,0 +1,66 @@
+import sys
+
+sys.path.append('./sofa')
+
+import utilities.instrumentation as instr
+
+def test_stages_are_not_recorded_when_disabled(create_force_volume):
+	"""
+	"""
+	instr.disable_instrumentation()
+	instr.reset_stage_records()
+
+	create_force_volume()
+
+	assert instr.get_stage_report() == []
+	assert instr.get_last_stage_record() is None
+
+def test_stage_report_of_force_volume(create_force_volume):
+	"""
+	"""
+	instr.reset_stage_records()
+	instr.enable_instrumentation()
+	try:
+		forceVolume = create_force_volume(calculateAverage=False)
+		forceVolume.calculate_average([])
+		with instr.measure_stage("outer") as measurement:
+			measurement.numberOfCurves = 3
+			with instr.measure_stage("inner"):
+				data = [0.0] * 100000
+			del data
+	finally:
+		instr.disable_instrumentation()
+
+	stageReport = {
+		summary.name: summary
+		for summary in instr.get_stage_report()
+	}
+	instr.reset_stage_records()
+
+	assert stageReport["force_volume.correct_curves"].numberOfCurves == 20
+	assert stageReport["force_volume.calculate_average"].numberOfCalls == 1
+	assert "channel.topography" in stageReport
+	assert stageReport["outer"].numberOfCurves == 3
+	assert stageReport["outer"].peakMemory >= stageReport["inner"].peakMemory > 0
+	assert stageReport["outer"].wallTime >= stageReport["inner"].wallTime
+	assert "force_volume.calculate_average" in instr.format_stage_report(
+		list(stageReport.values())
+	)
+
+def test_stage_records_are_bounded():
+	"""
+	"""
+	instr.reset_stage_records()
+	instr.enable_instrumentation()
+	try:
+		for index in range(instr.maximumNumberOfStageRecords + 5):
+			with instr.measure_stage("stage_" + str(index)):
+				pass
+	finally:
+		instr.disable_instrumentation()
+
+	assert len(instr.stageRecords) == instr.maximumNumberOfStageRecords
+	assert instr.get_last_stage_record().name == "stage_" + str(
+		instr.maximumNumberOfStageRecords + 4
+	)
+	instr.reset_stage_records()
@@ -0,0 +1,45 @@
+import subprocess
+import sys
+
+import pytest
+
+sys.path.append('./sofa')
+
+from utilities.lazy_import import lazy_import
+
+def test_lazy_import_loads_module_on_first_use():
+	"""
+	"""
+	lazyModule = lazy_import("json.tool")
+
+	assert callable(lazyModule.main)
+
+def test_lazy_import_unknown_module():
+	"""
+	"""
+	with pytest.raises(ModuleNotFoundError):
+		lazy_import("sofa_module_that_does_not_exist")
+
+def test_headless_core_does_not_load_gui_or_heavy_modules():
+	"""
+	"""
+	script = (
+		"import sys\n"
+		"sys.path.insert(0, './sofa')\n"
+		"import force_spectroscopy_data.force_volume\n"
+		"import data_processing.import_data.import_data\n"
+		"import data_processing.export_data\n"
+		"loadedModules = [\n"
+		"	name for name in ['tkinter', 'ttkbootstrap', 'matplotlib', 'pandas', 'scipy.stats', 'h5py', 'igor2']\n"
+		"	if name in sys.modules and type(sys.modules[name]).__name__ != '_LazyModule'\n"
+		"]\n"
+		"print(','.join(loadedModules))\n"
+	)
+	loadedModules = subprocess.run(
+		[sys.executable, "-c", script],
+		check=True,
+		capture_output=True,
+		text=True
+	).stdout.strip()
+
+	assert loadedModules == ""
@@ -0,0 +1,80 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append('./sofa')
+
+import data_processing.named_tuples as nt
+from force_spectroscopy_data.curve_buffer import CurveBuffer
+from utilities.memory_manager import MemoryManager
+
+def create_curve_buffer(numberOfCurves):
+	curves = [
+		nt.ForceDistanceCurve(np.arange(100.0) + index, np.sin(np.arange(100.0) * index))
+		for index in range(numberOfCurves)
+	]
+
+	return CurveBuffer.from_curves(curves, range(numberOfCurves))
+
+class SpillableCurves():
+	def __init__(self, numberOfCurves):
+		self.curveBuffer = create_curve_buffer(numberOfCurves)
+
+	def get_memory_footprint(self):
+		return self.curveBuffer.get_memory_footprint()
+
+	def spill_curves(self, filePath):
+		self.curveBuffer.spill(filePath)
+
+	def reload_curves(self):
+		self.curveBuffer.reload()
+
+def test_spill_and_reload_curve_buffer(tmp_path):
+	"""
+	"""
+	curveBuffer = create_curve_buffer(5)
+	expectedCurve = curveBuffer.get_curve(3)
+	footprint = curveBuffer.get_memory_footprint()
+
+	curveBuffer.spill(str(tmp_path / "curves.bin"))
+
+	assert curveBuffer.isSpilled
+	assert isinstance(curveBuffer.deflection, np.memmap)
+	assert curveBuffer.get_memory_footprint() == footprint - 2 * 500 * 8
+	np.testing.assert_array_equal(curveBuffer.get_curve(3).deflection, expectedCurve.deflection)
+
+	curveBuffer.reload()
+
+	assert not curveBuffer.isSpilled
+	assert not isinstance(curveBuffer.piezo, np.memmap)
+	assert curveBuffer.get_memory_footprint() == footprint
+	np.testing.assert_array_equal(curveBuffer.get_curve(3).piezo, expectedCurve.piezo)
+
+def test_memory_manager_spills_least_recently_used():
+	"""
+	"""
+	dataSets = {name: SpillableCurves(10) for name in "abc"}
+	dataSetFootprint = dataSets["a"].get_memory_footprint()
+	memoryManager = MemoryManager(int(2.5 * dataSetFootprint))
+
+	for name, dataSet in dataSets.items():
+		memoryManager.add_data_set(name, [dataSet])
+	assert memoryManager.spilledDataSets == {"a"}
+	assert memoryManager.get_memory_footprint() <= memoryManager.memoryBudget
+
+	memoryManager.activate_data_set("a")
+	assert memoryManager.spilledDataSets == {"b"}
+	assert not dataSets["a"].curveBuffer.isSpilled
+	assert dataSets["b"].curveBuffer.isSpilled
+
+	scratchDirectory = memoryManager.scratchDirectory
+	assert len(os.listdir(scratchDirectory)) == 1
+
+	memoryManager.remove_data_set("b")
+	assert memoryManager.recentDataSets == ["c", "a"]
+	assert os.listdir(scratchDirectory) == []
+
+	memoryManager.close()
+	assert memoryManager.dataSets == {}
+	assert not os.path.exists(scratchDirectory)
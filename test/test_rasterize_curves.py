@@ -0,0 +1,36 @@
+import sys
+
+import numpy as np
+
+sys.path.append('./sofa')
+
+import data_processing.named_tuples as nt
+from data_processing.rasterize_curves import rasterize_curves
+from force_spectroscopy_data.curve_buffer import CurveBuffer
+
+def test_rasterize_curves_counts_every_curve_once_per_pixel():
+	"""
+	"""
+	curves = [
+		nt.ForceDistanceCurve(np.array([0.5, 9.5]), np.array([0.5, 0.5])),
+		nt.ForceDistanceCurve(np.array([0.5, 0.5, 5.5]), np.array([-5.0, 9.5, 9.5])),
+		nt.ForceDistanceCurve(np.array([-3.0, 20.0]), np.array([-1.0, -1.0])),
+		nt.ForceDistanceCurve(np.array([2.5, np.nan, 7.5]), np.array([4.5, 4.5, 4.5]))
+	]
+	curveBuffer = CurveBuffer.from_curves(curves, range(len(curves)))
+
+	densityImage = rasterize_curves(
+		curveBuffer, np.array([True, True, True, True]), nt.ViewLimits(0, 10, 0, 10), (10, 10)
+	)
+
+	expectedImage = np.zeros((10, 10), dtype=np.int64)
+	expectedImage[0, :] += 1
+	expectedImage[:, 0] += 1
+	expectedImage[9, :6] += 1
+	expectedImage[9, 0] -= 1
+	np.testing.assert_array_equal(densityImage, expectedImage)
+
+	densityImage = rasterize_curves(
+		curveBuffer, np.array([True, False, False, False]), nt.ViewLimits(0, 10, 0, 10), (5, 10)
+	)
+	assert densityImage.sum() == 10 and densityImage[0].sum() == 10
@@ -0,0 +1,27 @@
+import sys
+
+sys.path.append('./sofa')
+
+from utilities.redraw_scheduler import RedrawScheduler
+
+def test_redraw_scheduler_coalesces_changes():
+	"""
+	"""
+	idleCallbacks = []
+	redraws = []
+	redrawScheduler = RedrawScheduler(idleCallbacks.append, redraws.append)
+
+	redrawScheduler.mark_dirty("histogram")
+	redrawScheduler.mark_dirty("histogram")
+	redrawScheduler.mark_dirty("linePlot", "heatmap", "histogram")
+
+	assert len(idleCallbacks) == 1
+	assert redraws == []
+
+	idleCallbacks.pop()()
+	assert redraws == [{"linePlot", "heatmap", "histogram"}]
+
+	redrawScheduler.mark_dirty("heatmap")
+	assert len(idleCallbacks) == 1
+	idleCallbacks.pop()()
+	assert redraws[-1] == {"heatmap"}
@@ -0,0 +1,61 @@
+import sys
+
+import numpy as np
+
+sys.path.append('./sofa')
+
+from data_processing.select_heatmap_area import (
+	get_rectangular_area,
+	get_polygon_area,
+	get_connected_region,
+	get_area_outlines
+)
+
+def test_outlines_of_selected_area():
+	"""
+	"""
+	selectedArea = get_rectangular_area((5, 6), 1, 4, 2, 4)
+	assert selectedArea.sum() == 6
+	assert selectedArea[2:4, 1:4].all()
+
+	xValues, yValues = get_area_outlines(selectedArea)
+	# A 3x2 rectangle has 10 unit borders, each followed by nan.
+	assert len(xValues) == len(yValues) == 30
+	assert np.isnan(xValues[2::3]).all()
+	assert np.nanmin(xValues) == 1 and np.nanmax(xValues) == 4
+	assert np.nanmin(yValues) == 2 and np.nanmax(yValues) == 4
+
+	selectedArea[3, 2] = False
+	assert len(get_area_outlines(selectedArea)[0]) == 3*12
+
+def test_polygon_area_contains_enclosed_centers():
+	"""
+	"""
+	triangle = np.array([[0, 0], [8.5, 0], [0, 8.5]])
+
+	selectedArea = get_polygon_area((10, 10), triangle)
+
+	rows, columns = np.indices((10, 10))
+	np.testing.assert_array_equal(selectedArea, rows + columns + 1 < 8.5)
+	np.testing.assert_array_equal(
+		get_polygon_area((10, 10), np.array([[1, 2], [4, 2], [4, 5], [1, 5]])),
+		get_rectangular_area((10, 10), 1, 4, 2, 5)
+	)
+
+def test_connected_region_of_similar_values():
+	"""
+	"""
+	channelData = np.zeros((6, 6))
+	channelData[1:3, 1:4] = 10.0
+	channelData[4:, 4:] = 10.2
+	channelData[2, 2] = np.nan
+
+	selectedArea = get_connected_region(channelData, 1, 1, 0.05)
+
+	expectedArea = np.zeros((6, 6), dtype=bool)
+	expectedArea[1:3, 1:4] = True
+	expectedArea[2, 2] = False
+	np.testing.assert_array_equal(selectedArea, expectedArea)
+	assert get_connected_region(channelData, 5, 5, 0.05).sum() == 4
+	assert get_connected_region(channelData, 0, 0, 0.05).sum() == 36 - 6 - 4
+	assert not get_connected_region(channelData, 2, 2, 0.05).any()
@@ -0,0 +1,78 @@
+import sys
+
+import numpy as np
+
+sys.path.append('./sofa')
+sys.path.append('./benchmarks')
+
+import data_processing.named_tuples as nt
+from data_processing.import_data.import_data import import_data
+from force_spectroscopy_data.force_volume import ForceVolume
+import synthetic_force_volume as sfv
+
+def test_synthetic_force_volume_can_be_imported(tmp_path):
+	"""
+	"""
+	parameters = sfv.SyntheticParameters(size=(3, 3), numberOfPoints=400, artifactFraction=0)
+	curves = sfv.create_synthetic_force_volume(parameters)
+	sfv.write_ibw_folder(str(tmp_path / "synthetic"), curves, parameters.size)
+	sfv.write_hdf5_file(str(tmp_path / "synthetic.hdf5"), curves)
+
+	importedDataIbw = import_data(
+		nt.ImportParameter(".ibw", str(tmp_path / "synthetic"), "", "", False)
+	)
+	importedDataHdf5 = import_data(
+		nt.ImportParameter(".hdf5", str(tmp_path / "synthetic.hdf5"), "", "", False)
+	)
+
+	assert importedDataIbw["measurementData"].size == (3, 3)
+	assert importedDataHdf5["measurementData"].size == (3, 3)
+	for curve, approachCurveIbw, approachCurveHdf5 in zip(
+		curves,
+		importedDataIbw["measurementData"].approachCurves,
+		importedDataHdf5["measurementData"].approachCurves
+	):
+		np.testing.assert_array_equal(
+			approachCurveIbw.piezo, curve.piezo[:curve.indexMaximumPiezo]
+		)
+		np.testing.assert_array_equal(
+			approachCurveIbw.deflection, curve.deflection[:curve.indexMaximumPiezo]
+		)
+		np.testing.assert_allclose(approachCurveHdf5.piezo, approachCurveIbw.piezo, rtol=1e-6)
+
+def test_float32_precision_keeps_channels(tmp_path):
+	"""
+	"""
+	parameters = sfv.SyntheticParameters(size=(6, 6), numberOfPoints=1000, artifactFraction=0)
+	sfv.write_hdf5_file(
+		str(tmp_path / "synthetic.hdf5"),
+		sfv.create_synthetic_force_volume(parameters)
+	)
+
+	forceVolumes = {}
+	for precision in ("native", "float32"):
+		importedData = import_data(
+			nt.ImportParameter(
+				".hdf5", str(tmp_path / "synthetic.hdf5"), "", "", False, precision
+			)
+		)
+		forceVolumes[precision] = ForceVolume(importedData, str(tmp_path))
+		forceVolumes[precision].calculate_average([])
+
+	correctedCurves = forceVolumes["float32"].get_force_distance_curves_data()
+	assert correctedCurves
+	assert all(curve.piezo.dtype == np.float32 for curve in correctedCurves)
+	assert forceVolumes["float32"].average.deflectionContact.dtype == np.float64
+
+	for channelName, channel in forceVolumes["native"].channels.items():
+		np.testing.assert_allclose(
+			forceVolumes["float32"].channels[channelName].data,
+			channel.data,
+			rtol=1e-5
+		)
+	np.testing.assert_allclose(
+		forceVolumes["float32"].average.deflectionContact,
+		forceVolumes["native"].average.deflectionContact,
+		rtol=1e-5,
+		atol=1e-12
+	)
@@ -0,0 +1,106 @@
+import shutil
+import sys
+
+import numpy as np
+
+sys.path.append('./sofa')
+
+from force_spectroscopy_data.incremental_force_volume import IncrementalForceVolume
+from interfaces.watch_folder_interface import FolderWatcher, watch_folder
+
+def test_incremental_force_volume_matches_force_volume(create_force_volume, import_approach_curves):
+	"""
+	"""
+	approachCurves = import_approach_curves("fdc_data_1")[:52]
+	forceVolume = create_force_volume("fdc_data_1", (2, 26))
+
+	incrementalForceVolume = IncrementalForceVolume("fdc_data_1", (2, 26), "")
+	for index in reversed(range(len(approachCurves))):
+		assert not incrementalForceVolume.isComplete
+		incrementalForceVolume.add_force_distance_curve(index, approachCurves[index])
+	incrementalForceVolume.calculate_average([])
+
+	assert incrementalForceVolume.isComplete
+	for channelName, channel in forceVolume.channels.items():
+		np.testing.assert_allclose(
+			incrementalForceVolume.channels[channelName].data,
+			channel.data
+		)
+	for averageData, incrementalAverageData in zip(
+		forceVolume.average, incrementalForceVolume.average
+	):
+		np.testing.assert_allclose(
+			incrementalAverageData,
+			averageData,
+			rtol=1e-6,
+			atol=1e-6 * np.max(np.abs(averageData))
+		)
+
+def test_folder_watcher_waits_for_complete_curve_files(tmp_path):
+	"""
+	"""
+	folderPathLine = tmp_path / "Line0001"
+	folderPathLine.mkdir()
+	folderWatcher = FolderWatcher(str(tmp_path), (2, 2))
+
+	shutil.copy(
+		"test_data/fdc_data_2/Line0001/Line0001Point0001ZSnsr.ibw",
+		folderPathLine
+	)
+	assert folderWatcher.get_new_curve_files() == []
+
+	shutil.copy(
+		"test_data/fdc_data_2/Line0001/Line0001Point0001Defl.ibw",
+		folderPathLine
+	)
+	assert folderWatcher.get_new_curve_files() == []
+
+	newCurveFiles = folderWatcher.get_new_curve_files()
+	assert [curveFiles.index for curveFiles in newCurveFiles] == [3]
+	assert newCurveFiles[0].filePathDeflection.endswith("Line0001Point0001Defl.ibw")
+	assert folderWatcher.get_new_curve_files() == []
+
+def test_incremental_force_volume_supports_inherited_methods(import_approach_curves, tmp_path):
+	"""
+	"""
+	approachCurves = import_approach_curves("fdc_data_1")
+	incrementalForceVolume = IncrementalForceVolume("fdc_data_1", (2, 26), "")
+	for index in range(40):
+		incrementalForceVolume.add_force_distance_curve(index, approachCurves[index])
+	incrementalForceVolume.calculate_average([], recalculate=True)
+
+	footprint = incrementalForceVolume.get_memory_footprint()
+	incrementalForceVolume.spill_curves(str(tmp_path / "curves.bin"))
+	assert incrementalForceVolume.get_memory_footprint() < footprint
+	incrementalForceVolume.reload_curves()
+	assert incrementalForceVolume.get_memory_footprint() == footprint
+
+	correctionUpdate = incrementalForceVolume.update_correction_settings(
+		incrementalForceVolume.correctionSettings._replace(numberOfDataPoints=500)
+	)
+	assert correctionUpdate.averageChanged
+	assert len(incrementalForceVolume.average.deflectionContact) == 500
+
+	incrementalForceVolume.add_force_distance_curve(40, approachCurves[40])
+	incrementalForceVolume.calculate_average([])
+	recalculatedAverage = incrementalForceVolume.average
+	incrementalForceVolume.calculate_average([51])
+	incrementalForceVolume.calculate_average([])
+	for runningAverageData, averageData in zip(
+		recalculatedAverage, incrementalForceVolume.average
+	):
+		np.testing.assert_allclose(runningAverageData, averageData)
+
+def test_folder_watcher_retries_unreadable_curves(tmp_path):
+	"""
+	"""
+	folderPathLine = tmp_path / "Line0000"
+	folderPathLine.mkdir()
+	(folderPathLine / "Line0000Point0000ZSnsr.ibw").write_bytes(b"corrupt")
+	(folderPathLine / "Line0000Point0000Defl.ibw").write_bytes(b"corrupt")
+
+	forceVolume = watch_folder(str(tmp_path), (1, 1), pollInterval=0.0)
+
+	assert forceVolume.isComplete
+	assert forceVolume.failedDataPoints == {0}
+	assert forceVolume.addedDataPoints == set()